@@ -0,0 +1,209 @@
+# app/api/routes.py
+"""
+Rotas da API local. Cada rota indica se é de leitura ("read") ou escrita ("write"):
+o servidor executa as de leitura no pool de conexões somente leitura e as de
+escrita, uma por vez, na conexão de escrita.
+
+Os handlers recebem (path_params, query, body) e devolvem o mesmo dicionário
+{"success", "message"/"data"} dos serviços.
+"""
+import math
+import re
+from app.item.item_repository import ItemRepository
+from app.item.service import ItemService
+from app.item.unit_service import UnitService
+from app.production import order_operations
+from app.production_line import line_operations
+from app.sales.sale_repository import SaleRepository
+from app.sales.sale_service import SaleService
+from app.stock.service import StockService
+from app.supplier.service import SupplierService
+from app.supplier.supplier_repository import SupplierRepository
+
+def _flag(value):
+    return str(value).lower() in ("1", "true", "sim", "s")
+
+def _required(body, *fields):
+    missing = [field for field in fields if body.get(field) in (None, "")]
+    if missing:
+        return {"success": False, "message": f"Campos obrigatórios ausentes: {', '.join(missing)}"}
+    return None
+
+def _positive_number(body, field):
+    """(valor, erro): o campo convertido em número finito maior que zero."""
+    try:
+        value = math.nan if isinstance(body[field], bool) else float(body[field])
+    except (TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value) or value <= 0:
+        return None, {"success": False, "message": f"O campo {field} deve ser um número maior que zero."}
+    return value, None
+
+def _search_field(query, allowed, default):
+    """(campo, erro): o parâmetro 'campo' da pesquisa, recusado se não for um dos campos permitidos."""
+    field = query.get("campo", default)
+    if field not in allowed:
+        return None, {"success": False, "message": f"Campo de pesquisa inválido: {field}. Use um destes: {', '.join(allowed)}."}
+    return field, None
+
+# Campos de pesquisa aceitos pela API em cada listagem
+ITEM_SEARCH_FIELDS = ["ID", *ItemRepository.SEARCHABLE_FIELDS]
+SUPPLIER_SEARCH_FIELDS = [field for field in SupplierRepository.SEARCH_FIELDS if field.isupper()]
+SALE_SEARCH_FIELDS = list(SaleRepository.SEARCH_FIELDS)
+
+# --- Itens e unidades ---
+
+def list_items(params, query, body):
+    item_types = [t for t in query.get("tipos", "").split(",") if t] or None
+    only_in_stock = _flag(query.get("com_estoque", "0"))
+    if query.get("texto"):
+        field, error = _search_field(query, ITEM_SEARCH_FIELDS, "DESCRICAO")
+        if error:
+            return error
+        return ItemService().search_items(field, query["texto"], item_types, only_in_stock)
+    return ItemService().get_all_items(item_types, only_in_stock)
+
+def get_item(params, query, body):
+    return ItemService().get_item_by_id(params["id"])
+
+def create_item(params, query, body):
+    return ItemService().add_item(body.get("codigo_interno"), body.get("descricao"), body.get("tipo_item"),
+                                  body.get("id_unidade"), body.get("id_fornecedor_padrao"))
+
+def list_units(params, query, body):
+    return UnitService().get_all_units()
+
+# --- Fornecedores ---
+
+def list_suppliers(params, query, body):
+    if query.get("texto"):
+        field, error = _search_field(query, SUPPLIER_SEARCH_FIELDS, "RAZAO_SOCIAL")
+        if error:
+            return error
+        return SupplierService().search_suppliers(field, query["texto"])
+    return SupplierService().get_all_suppliers()
+
+def get_supplier(params, query, body):
+    return SupplierService().get_supplier_by_id(params["id"])
+
+def create_supplier(params, query, body):
+    return SupplierService().add_supplier(body.get("razao_social"), body.get("nome_fantasia"), body.get("cnpj"),
+                                          body.get("telefone"), body.get("email"), body.get("endereco") or {},
+                                          body.get("status", "Ativo"))
+
+# --- Entradas de insumos ---
+
+def list_entries(params, query, body):
+    return StockService().list_entries(query.get("texto", ""), query.get("campo", "id"))
+
+def get_entry(params, query, body):
+    return StockService().get_entry_details(params["id"])
+
+def create_entry(params, query, body):
+    return StockService().create_entry_with_items(body.get("data_entrada"), body.get("data_digitacao"),
+                                                  body.get("numero_nota"), body.get("observacao"), body.get("itens") or [])
+
+def finalize_entry(params, query, body):
+    return StockService().finalize_entry(params["id"], body.get("versao"))
+
+# --- Ordens de produção ---
+
+def list_ops(params, query, body):
+    return {"success": True, "data": order_operations.list_ops(query.get("texto", ""), query.get("campo", "id"))}
+
+def get_op(params, query, body):
+    details = order_operations.get_op_details(params["id"])
+    if not details:
+        return {"success": False, "message": "Ordem de Produção não encontrada."}
+    return {"success": True, "data": details}
+
+def create_op(params, query, body):
+    error = _required(body, "numero", "itens")
+    if error:
+        return error
+    op_id = order_operations.create_op(body["numero"], body.get("data_prevista"), body["itens"], body.get("id_linha_producao"))
+    if op_id is None:
+        return {"success": False, "message": "Erro ao criar a Ordem de Produção."}
+    return {"success": True, "data": op_id, "message": "Ordem de Produção criada com sucesso."}
+
+def finalize_op(params, query, body):
+    error = _required(body, "quantidade")
+    if error:
+        return error
+    quantity, error = _positive_number(body, "quantidade")
+    if error:
+        return error
+    success, message = order_operations.finalize_op(params["id"], quantity)
+    return {"success": success, "message": message}
+
+# --- Linhas de produção ---
+
+def list_lines(params, query, body):
+    return {"success": True, "data": line_operations.get_all_production_lines()}
+
+def get_line(params, query, body):
+    details = line_operations.get_production_line_details(params["id"])
+    if not details:
+        return {"success": False, "message": "Linha de produção não encontrada."}
+    return {"success": True, "data": details}
+
+# --- Saídas de produtos ---
+
+def list_sales(params, query, body):
+    field, error = _search_field(query, SALE_SEARCH_FIELDS, "id")
+    if error:
+        return error
+    return SaleService().list_sales(query.get("texto", ""), field)
+
+def get_sale(params, query, body):
+    return SaleService().get_sale_details(params["id"])
+
+def create_sale(params, query, body):
+    return SaleService().create_sale(body.get("data_saida"), body.get("observacao"), body.get("itens") or [])
+
+def finalize_sale(params, query, body):
+    return SaleService().finalize_sale(params["id"], body.get("versao"))
+
+ROUTES = [
+    ("GET", "/items", "read", list_items),
+    ("GET", "/items/{id}", "read", get_item),
+    ("POST", "/items", "write", create_item),
+    ("GET", "/units", "read", list_units),
+    ("GET", "/suppliers", "read", list_suppliers),
+    ("GET", "/suppliers/{id}", "read", get_supplier),
+    ("POST", "/suppliers", "write", create_supplier),
+    ("GET", "/entries", "read", list_entries),
+    ("GET", "/entries/{id}", "read", get_entry),
+    ("POST", "/entries", "write", create_entry),
+    ("POST", "/entries/{id}/finalize", "write", finalize_entry),
+    ("GET", "/ops", "read", list_ops),
+    ("GET", "/ops/{id}", "read", get_op),
+    ("POST", "/ops", "write", create_op),
+    ("POST", "/ops/{id}/finalize", "write", finalize_op),
+    ("GET", "/lines", "read", list_lines),
+    ("GET", "/lines/{id}", "read", get_line),
+    ("GET", "/sales", "read", list_sales),
+    ("GET", "/sales/{id}", "read", get_sale),
+    ("POST", "/sales", "write", create_sale),
+    ("POST", "/sales/{id}/finalize", "write", finalize_sale),
+]
+
+# Padrões já compilados: {id} aceita apenas inteiros
+_COMPILED_ROUTES = [
+    (method, re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>\\d+)", pattern) + "$"), kind, handler)
+    for method, pattern, kind, handler in ROUTES
+]
+
+def match_route(method, path):
+    """
+    Devolve (kind, handler, path_params) da rota, ou (None, None, allowed) quando não há
+    rota: allowed indica se o caminho existe com outro método (405) ou não (404).
+    """
+    path_exists = False
+    for route_method, regex, kind, handler in _COMPILED_ROUTES:
+        found = regex.match(path)
+        if found:
+            if route_method == method:
+                return kind, handler, {key: int(value) for key, value in found.groupdict().items()}
+            path_exists = True
+    return None, None, path_exists
@@ -0,0 +1,190 @@
+# app/api/server.py
+"""
+Servidor HTTP/JSON local sobre a camada de serviço, para várias estações usarem o
+mesmo DADOS.DB ao mesmo tempo.
+
+Uso (a partir da raiz do projeto):
+    python -m app.api.server --host 0.0.0.0 --port 8765 --readers 4
+
+O asyncio atende as conexões HTTP; as chamadas aos serviços rodam em threads:
+    - leituras: pool de N threads, cada uma com sua conexão somente leitura;
+    - escritas: uma única thread com a conexão de escrita, que serializa os comandos.
+O banco passa para o modo WAL, em que as leituras não esperam pelas escritas.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+from app.api.routes import match_route
+from app.database.db import get_db_manager
+from app.database.records import Record
+from app.diagnostics.metrics import registry
+
+MAX_BODY_SIZE = 1024 * 1024
+HTTP_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _json_default(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, sqlite3.Row):
+        return dict(value)
+    raise TypeError(f"Objeto não serializável: {type(value).__name__}")
+
+class ApiServer:
+    def __init__(self, host="127.0.0.1", port=8765, readers=4):
+        self.host = host
+        self.port = port
+        self.readers = readers
+        self.db_manager = get_db_manager()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.reader_pool = None
+        self.writer_pool = None
+        self.server = None
+
+    def _bind_connection(self, read_only):
+        """Inicializador das threads dos pools: cada thread fica com a sua conexão."""
+        connection = self.db_manager.open_connection(read_only=read_only)
+        with self._connections_lock:
+            self._connections.append(connection)
+        self.db_manager.bind_thread_connection(connection)
+
+    def _enable_wal(self):
+        connection = self.db_manager.open_connection()
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+        finally:
+            connection.close()
+
+    async def start(self):
+        self._enable_wal()
+        self.reader_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="api-leitura",
+                                              initializer=self._bind_connection, initargs=(True,))
+        self.writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-escrita",
+                                              initializer=self._bind_connection, initargs=(False,))
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logging.info(f"API local ouvindo em http://{self.host}:{self.port}")
+        return self.server
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for pool in (self.reader_pool, self.writer_pool):
+            if pool:
+                pool.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, 400, {"success": False, "message": "Requisição inválida."}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY_SIZE:
+                    await self._send(writer, 413, {"success": False, "message": "Corpo da requisição muito grande."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        if method == "GET" and path == "/metrics":
+            return 200, registry.to_prometheus()
+
+        kind, handler, params = match_route(method, path)
+        if handler is None:
+            if params:
+                return 405, {"success": False, "message": "Método não permitido para este recurso."}
+            return 404, {"success": False, "message": "Recurso não encontrado."}
+
+        try:
+            data = json.loads(body) if body else {}
+        except (ValueError, UnicodeDecodeError):
+            return 400, {"success": False, "message": "O corpo da requisição não é um JSON válido."}
+        if not isinstance(data, dict):
+            return 400, {"success": False, "message": "O corpo da requisição deve ser um objeto JSON."}
+        query = dict(parse_qsl(url.query))
+
+        pool = self.reader_pool if kind == "read" else self.writer_pool
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(pool, handler, params, query, data)
+        except Exception as e:
+            logging.error(f"Erro na API em {method} {path}: {e}", exc_info=True)
+            return 500, {"success": False, "message": f"Erro interno: {e}"}
+        return (200 if response.get("success") else 400), response
+
+    async def _send(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            content, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            content = json.dumps(payload, default=_json_default, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + content)
+        await writer.drain()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP/JSON local do MiniSis.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--readers", type=int, default=4, help="Quantidade de conexões de leitura.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
+    server = ApiServer(args.host, args.port, args.readers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# app/archive/archive_repository.py
+import os
+from datetime import datetime
+from app.database.archive import ARCHIVE_SCHEMA, table_columns
+from app.database.db import get_db_manager
+
+# Seleção das linhas a arquivar, em tabelas temporárias de IDs
+CANDIDATE_QUERIES = {
+    # OPs encerradas antes do corte e sem movimento a partir dele
+    "ARQ_ORDEM": """
+        SELECT o.ID FROM ORDEMPRODUCAO o
+        WHERE o.STATUS IN ('Concluída', 'Cancelada') AND o.DATA_CRIACAO < ?
+          AND NOT EXISTS (SELECT 1 FROM MOVIMENTO m WHERE m.ID_ORDEM_PRODUCAO = o.ID AND m.DATA_MOVIMENTO >= ?)
+    """,
+    "ARQ_ENTRADA": "SELECT ID FROM ENTRADANOTA WHERE STATUS = 'Finalizada' AND DATA_ENTRADA < ?",
+    "ARQ_SAIDA": "SELECT ID FROM SAIDA WHERE STATUS = 'Finalizada' AND DATA_SAIDA < ?",
+    # Movimentos de OPs que continuam no banco principal ficam com elas (estorno e reabertura)
+    "ARQ_MOVIMENTO": """
+        SELECT ID FROM MOVIMENTO
+        WHERE DATA_MOVIMENTO < ?
+          AND (ID_ORDEM_PRODUCAO IS NULL OR ID_ORDEM_PRODUCAO IN (SELECT ID FROM temp.ARQ_ORDEM))
+    """,
+}
+
+# Tabela, condição sobre as tabelas temporárias. Itens antes dos cabeçalhos.
+MOVES = [
+    ("MOVIMENTO", "ID IN (SELECT ID FROM temp.ARQ_MOVIMENTO)"),
+    ("ORDEMPRODUCAO_ITENS", "ID_ORDEM_PRODUCAO IN (SELECT ID FROM temp.ARQ_ORDEM)"),
+    ("ORDEMPRODUCAO", "ID IN (SELECT ID FROM temp.ARQ_ORDEM)"),
+    ("ENTRADANOTA_ITENS", "ID_ENTRADA IN (SELECT ID FROM temp.ARQ_ENTRADA)"),
+    ("ENTRADANOTA", "ID IN (SELECT ID FROM temp.ARQ_ENTRADA)"),
+    ("SAIDA_ITENS", "ID_SAIDA IN (SELECT ID FROM temp.ARQ_SAIDA)"),
+    ("SAIDA", "ID IN (SELECT ID FROM temp.ARQ_SAIDA)"),
+]
+
+class ArchiveRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def archive_before(self, cutoff):
+        """
+        Move para o banco de arquivo o MOVIMENTO e os documentos encerrados anteriores a cutoff,
+        numa única transação, e devolve a quantidade de linhas movidas por tipo.
+        """
+        conn = self.db_manager.get_connection()
+        self.db_manager.attach_archive(conn, create=True)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                counts = {}
+                for temp_table, query in CANDIDATE_QUERIES.items():
+                    cursor.execute(f"CREATE TEMP TABLE {temp_table} (ID INTEGER PRIMARY KEY)")
+                    params = (cutoff, cutoff) if query.count("?") == 2 else (cutoff,)
+                    cursor.execute(f"INSERT INTO temp.{temp_table} (ID) {query}", params)
+                    counts[temp_table] = cursor.rowcount
+
+                self._snapshot_balances(cursor)
+                for table, condition in MOVES:
+                    columns = ", ".join(table_columns(conn, table))
+                    cursor.execute(
+                        f"INSERT INTO {ARCHIVE_SCHEMA}.{table} ({columns}) SELECT {columns} FROM main.{table} WHERE {condition}"
+                    )
+                    cursor.execute(f"DELETE FROM main.{table} WHERE {condition}")
+
+                cursor.execute(
+                    "INSERT INTO ARQUIVAMENTO (DATA_CORTE, DATA_EXECUCAO, MOVIMENTOS, ORDENS, ENTRADAS, SAIDAS) VALUES (?, ?, ?, ?, ?, ?)",
+                    (cutoff, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), counts["ARQ_MOVIMENTO"],
+                     counts["ARQ_ORDEM"], counts["ARQ_ENTRADA"], counts["ARQ_SAIDA"])
+                )
+        finally:
+            for temp_table in CANDIDATE_QUERIES:
+                conn.execute(f"DROP TABLE IF EXISTS temp.{temp_table}")
+        return {
+            "movimentos": counts["ARQ_MOVIMENTO"],
+            "ordens": counts["ARQ_ORDEM"],
+            "entradas": counts["ARQ_ENTRADA"],
+            "saidas": counts["ARQ_SAIDA"],
+        }
+
+    def _snapshot_balances(self, cursor):
+        """Acumula em SALDO_ARQUIVADO os totais, por item e tipo, dos movimentos que saem do banco principal."""
+        cursor.execute("""
+            INSERT INTO SALDO_ARQUIVADO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR, MOVIMENTOS)
+            SELECT ID_ITEM, TIPO_MOVIMENTO, SUM(QUANTIDADE), SUM(QUANTIDADE * COALESCE(VALOR_UNITARIO, 0)), COUNT(*)
+            FROM MOVIMENTO
+            WHERE ID IN (SELECT ID FROM temp.ARQ_MOVIMENTO)
+            GROUP BY ID_ITEM, TIPO_MOVIMENTO
+            ON CONFLICT (ID_ITEM, TIPO_MOVIMENTO) DO UPDATE SET
+                QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE,
+                VALOR = VALOR + excluded.VALOR,
+                MOVIMENTOS = MOVIMENTOS + excluded.MOVIMENTOS
+        """)
+
+    def vacuum(self):
+        """Compacta o banco principal, devolvendo ao sistema as páginas liberadas pelo arquivamento."""
+        self.db_manager.get_connection().execute("VACUUM main")
+
+    def last_archive(self):
+        conn = self.db_manager.get_connection()
+        return conn.execute("SELECT * FROM ARQUIVAMENTO ORDER BY ID DESC LIMIT 1").fetchone()
+
+    def file_sizes(self):
+        """Tamanho em bytes do banco principal e do arquivo (0 se ainda não existir)."""
+        sizes = {}
+        for key, path in (("principal", self.db_manager.db_path), ("arquivo", self.db_manager.archive_path)):
+            sizes[key] = os.path.getsize(path) if os.path.exists(path) else 0
+        return sizes
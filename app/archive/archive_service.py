@@ -0,0 +1,35 @@
+# app/archive/archive_service.py
+from datetime import date
+from app.archive.archive_repository import ArchiveRepository
+from app.diagnostics.metrics import timed_service
+
+@timed_service
+class ArchiveService:
+    def __init__(self):
+        self.archive_repository = ArchiveRepository()
+
+    def archive_before(self, cutoff, vacuum=True):
+        """Arquiva o histórico anterior a cutoff (AAAA-MM-DD) e, opcionalmente, compacta o banco principal."""
+        if not cutoff:
+            return {"success": False, "message": "Informe a data de corte."}
+        if cutoff > date.today().isoformat():
+            return {"success": False, "message": "A data de corte não pode ser futura."}
+
+        try:
+            counts = self.archive_repository.archive_before(cutoff)
+            if vacuum:
+                self.archive_repository.vacuum()
+            message = (f"Arquivados {counts['movimentos']} movimentos, {counts['ordens']} ordens de produção, "
+                       f"{counts['entradas']} entradas e {counts['saidas']} saídas.")
+            return {"success": True, "data": counts, "message": message}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao arquivar o histórico: {e}"}
+
+    def get_status(self):
+        try:
+            return {"success": True, "data": {
+                "last_archive": self.archive_repository.last_archive(),
+                "sizes": self.archive_repository.file_sizes(),
+            }}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao consultar o arquivamento: {e}"}
@@ -0,0 +1,74 @@
+# app/archive/ui_archive_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QFormLayout, QGroupBox, QHBoxLayout, QPushButton, QLabel, QDateEdit, QCheckBox,
+    QMessageBox
+)
+from PySide6.QtCore import QDate, Qt
+from app.archive.archive_service import ArchiveService
+from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db
+from app.utils.ui_utils import show_confirmation_message, show_error_message, show_success_message
+
+class ArchiveWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.archive_service = ArchiveService()
+        self.setWindowTitle("Arquivar Histórico")
+        self.setGeometry(250, 250, 480, 260)
+        self.setup_ui()
+        self.refresh_status()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        options_group = QGroupBox("Arquivamento")
+        form_layout = QFormLayout()
+        self.cutoff_input = QDateEdit(calendarPopup=True)
+        self.cutoff_input.setDisplayFormat(BRAZILIAN_DATE_FORMAT)
+        self.cutoff_input.setDate(QDate.currentDate().addYears(-1))
+        self.vacuum_checkbox = QCheckBox("Compactar o banco principal após arquivar")
+        self.vacuum_checkbox.setChecked(True)
+        form_layout.addRow("Arquivar anteriores a:", self.cutoff_input)
+        form_layout.addRow(self.vacuum_checkbox)
+        options_group.setLayout(form_layout)
+        self.main_layout.addWidget(options_group)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        self.main_layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        archive_button = QPushButton("Arquivar")
+        archive_button.clicked.connect(self.archive)
+        button_layout.addWidget(archive_button)
+        self.main_layout.addLayout(button_layout)
+
+    def refresh_status(self):
+        response = self.archive_service.get_status()
+        if not response["success"]:
+            self.status_label.setText(response["message"])
+            return
+        sizes = response["data"]["sizes"]
+        last = response["data"]["last_archive"]
+        text = (f"Banco principal: {sizes['principal'] / 1024 ** 2:.1f} MB — "
+                f"arquivo: {sizes['arquivo'] / 1024 ** 2:.1f} MB")
+        if last:
+            text += f"\nÚltimo arquivamento em {last['DATA_EXECUCAO']}, corte em {last['DATA_CORTE']}."
+        self.status_label.setText(text)
+
+    def archive(self):
+        cutoff = format_qdate_for_db(self.cutoff_input.date())
+        reply = show_confirmation_message(
+            self, "Confirmar Arquivamento",
+            "Os movimentos e documentos encerrados anteriores à data de corte serão movidos para o banco "
+            "de arquivo e deixarão de aparecer nas pesquisas de documentos. Deseja continuar?"
+        )
+        if reply != QMessageBox.Yes:
+            return
+        response = self.archive_service.archive_before(cutoff, self.vacuum_checkbox.isChecked())
+        if response["success"]:
+            show_success_message(self, "Sucesso", response["message"])
+        else:
+            show_error_message(self, "Erro", response["message"])
+        self.refresh_status()
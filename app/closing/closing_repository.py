@@ -0,0 +1,83 @@
+# app/closing/closing_repository.py
+from datetime import datetime
+from app.database.db import get_db_manager
+from app.database.records import fetch_records
+
+# 'Saída por OP' é gravada com quantidade positiva; os demais tipos já têm o sinal do efeito no saldo
+SIGNED_QUANTITY = "CASE WHEN TIPO_MOVIMENTO = 'Saída por OP' THEN -QUANTIDADE ELSE QUANTIDADE END"
+
+# Saldo de cada item no fim do período: o saldo atual menos os movimentos posteriores
+SNAPSHOT_QUERY = f"""
+    INSERT INTO SALDO_FECHAMENTO (PERIODO, ID_ITEM, SALDO, CUSTO_MEDIO, VALOR)
+    SELECT :periodo, I.ID, I.SALDO_ESTOQUE - COALESCE(P.QUANTIDADE, 0), I.CUSTO_MEDIO,
+           (I.SALDO_ESTOQUE - COALESCE(P.QUANTIDADE, 0)) * I.CUSTO_MEDIO
+    FROM ITEM I
+    LEFT JOIN (
+        SELECT ID_ITEM, SUM({SIGNED_QUANTITY}) AS QUANTIDADE
+        FROM MOVIMENTO_HISTORICO WHERE DATA_MOVIMENTO > :fim GROUP BY ID_ITEM
+    ) P ON P.ID_ITEM = I.ID
+    WHERE ABS(I.SALDO_ESTOQUE - COALESCE(P.QUANTIDADE, 0)) > 1e-9
+"""
+
+def closed_until(cursor):
+    """Último dia do último período fechado (AAAA-MM-DD), ou None se nenhum foi fechado."""
+    return cursor.execute("SELECT MAX(DATA_FIM) FROM FECHAMENTO").fetchone()[0]
+
+class ClosingRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def is_closed(self, document_date):
+        """True se a data cai num período já fechado."""
+        closed = closed_until(self.db_manager.get_connection())
+        return closed is not None and document_date <= closed
+
+    def list_closings(self):
+        conn = self.db_manager.get_connection()
+        return fetch_records(conn.execute("SELECT * FROM FECHAMENTO ORDER BY PERIODO DESC"))
+
+    def last_closing(self):
+        conn = self.db_manager.get_connection()
+        return conn.execute("SELECT * FROM FECHAMENTO ORDER BY PERIODO DESC LIMIT 1").fetchone()
+
+    def first_movement_date(self):
+        conn = self.db_manager.get_connection()
+        return conn.execute("SELECT MIN(DATA_MOVIMENTO) FROM MOVIMENTO_HISTORICO").fetchone()[0]
+
+    def open_documents_until(self, end_date):
+        """Entradas, saídas e inventários em aberto com data até end_date, que não poderiam mais ser finalizados."""
+        conn = self.db_manager.get_connection()
+        return dict(conn.execute("""
+            SELECT 'entradas', COUNT(*) FROM ENTRADANOTA WHERE STATUS = 'Em Aberto' AND DATA_ENTRADA <= :fim
+            UNION ALL
+            SELECT 'saidas', COUNT(*) FROM SAIDA WHERE STATUS = 'Em Aberto' AND DATA_SAIDA <= :fim
+            UNION ALL
+            SELECT 'inventarios', COUNT(*) FROM INVENTARIO WHERE STATUS = 'Em Aberto' AND DATA_INVENTARIO <= :fim
+        """, {"fim": end_date}).fetchall())
+
+    def close_period(self, period, start_date, end_date):
+        """
+        Grava numa única transação o saldo, o custo médio e o valor de cada item no fim do
+        período e registra o fechamento, que passa a bloquear movimentos com data até end_date.
+        Devolve (itens, valor total).
+        """
+        conn = self.db_manager.get_connection()
+        with conn:
+            cursor = conn.cursor()
+            cursor.execute(SNAPSHOT_QUERY, {"periodo": period, "fim": end_date})
+            items, total = cursor.execute(
+                "SELECT COUNT(*), COALESCE(SUM(VALOR), 0) FROM SALDO_FECHAMENTO WHERE PERIODO = ?", (period,)
+            ).fetchone()
+            cursor.execute(
+                "INSERT INTO FECHAMENTO (PERIODO, DATA_INICIO, DATA_FIM, DATA_EXECUCAO, ITENS, VALOR_TOTAL) VALUES (?, ?, ?, ?, ?, ?)",
+                (period, start_date, end_date, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), items, total)
+            )
+        return items, total
+
+    def reopen_period(self, period):
+        """Remove o fechamento e o seu saldo, liberando de novo os movimentos do período."""
+        conn = self.db_manager.get_connection()
+        with conn:
+            conn.execute("DELETE FROM SALDO_FECHAMENTO WHERE PERIODO = ?", (period,))
+            conn.execute("DELETE FROM FECHAMENTO WHERE PERIODO = ?", (period,))
+        return True
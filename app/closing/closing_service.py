@@ -0,0 +1,87 @@
+# app/closing/closing_service.py
+"""
+Fechamento mensal do estoque.
+
+Fechar um mês grava, para cada item com saldo, o saldo, o custo médio e o valor no
+último dia do mês (tabela SALDO_FECHAMENTO) e bloqueia o período: gatilhos no
+MOVIMENTO recusam movimentos gravados ou alterados com data até o fim do último mês
+fechado, e a exclusão de OPs com movimento nesse período é recusada. Os relatórios
+de meses fechados leem o saldo gravado em vez de refazer as contas a partir do
+MOVIMENTO.
+
+Os meses são fechados em ordem e só depois de terminados. O saldo no fim do mês é o
+saldo atual menos os movimentos posteriores; o custo médio é o do momento do
+fechamento, por isso o mês deve ser fechado logo no início do mês seguinte.
+Só o último mês fechado pode ser reaberto.
+"""
+from datetime import date, timedelta
+from app.closing.closing_repository import ClosingRepository
+from app.diagnostics.metrics import timed_service
+
+def period_bounds(period):
+    """(primeiro dia, último dia) do mês AAAA-MM; ValueError se o período for inválido."""
+    start = date.fromisoformat(f"{period}-01")
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+def next_period(period):
+    start, end = period_bounds(period)
+    return (end + timedelta(days=1)).strftime("%Y-%m")
+
+@timed_service
+class ClosingService:
+    def __init__(self):
+        self.closing_repository = ClosingRepository()
+
+    def list_closings(self):
+        try:
+            return {"success": True, "data": self.closing_repository.list_closings()}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao listar os fechamentos: {e}"}
+
+    def pending_period(self):
+        """Próximo mês a fechar (AAAA-MM): o seguinte ao último fechado, ou o do primeiro movimento."""
+        last = self.closing_repository.last_closing()
+        if last:
+            return next_period(last['PERIODO'])
+        first = self.closing_repository.first_movement_date()
+        return (first or date.today().isoformat())[:7]
+
+    def close_period(self, period):
+        try:
+            start, end = period_bounds(period)
+        except ValueError:
+            return {"success": False, "message": "Período inválido. Use o formato AAAA-MM."}
+        if end >= date.today():
+            return {"success": False, "message": "Só é possível fechar um mês já terminado."}
+
+        try:
+            last = self.closing_repository.last_closing()
+            if last and period <= last['PERIODO']:
+                return {"success": False, "message": f"O período {period} já está fechado."}
+            if last and period != next_period(last['PERIODO']):
+                return {"success": False, "message": f"Feche antes o período {next_period(last['PERIODO'])}."}
+
+            pending = self.closing_repository.open_documents_until(end.isoformat())
+            if any(pending.values()):
+                return {"success": False, "message": (
+                    f"Há {pending['entradas']} entradas, {pending['saidas']} saídas e {pending['inventarios']} "
+                    f"inventários em aberto com data até {end.strftime('%d-%m-%Y')}. "
+                    "Finalize-os ou altere a data antes de fechar o período."
+                )}
+
+            items, total = self.closing_repository.close_period(period, start.isoformat(), end.isoformat())
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao fechar o período: {e}"}
+        return {"success": True, "data": {"itens": items, "valor": total},
+                "message": f"Período {period} fechado: {items} itens, valor do estoque R$ {total:.2f}."}
+
+    def reopen_last_period(self):
+        try:
+            last = self.closing_repository.last_closing()
+            if not last:
+                return {"success": False, "message": "Nenhum período fechado."}
+            self.closing_repository.reopen_period(last['PERIODO'])
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao reabrir o período: {e}"}
+        return {"success": True, "message": f"Período {last['PERIODO']} reaberto."}
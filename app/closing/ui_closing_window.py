@@ -0,0 +1,99 @@
+# app/closing/ui_closing_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout, QLineEdit, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QMessageBox
+)
+from PySide6.QtCore import Qt
+from app.closing.closing_service import ClosingService
+from app.utils.date_utils import format_date_for_display
+from app.utils.ui_utils import NumericTableWidgetItem, show_confirmation_message, show_error_message, show_success_message
+
+class ClosingWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.closing_service = ClosingService()
+        self.setWindowTitle("Fechamento de Período")
+        self.setGeometry(250, 250, 640, 420)
+        self.setup_ui()
+        self.load_closings()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        closing_group = QGroupBox("Fechamento Mensal")
+        form_layout = QFormLayout()
+        self.period_input = QLineEdit()
+        self.period_input.setInputMask("9999-99")
+        form_layout.addRow("Período (AAAA-MM):", self.period_input)
+        info_label = QLabel("Grava o saldo e o custo de cada item no fim do mês e bloqueia "
+                            "movimentos com data até esse dia.")
+        info_label.setWordWrap(True)
+        form_layout.addRow(info_label)
+        closing_group.setLayout(form_layout)
+        self.main_layout.addWidget(closing_group)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        reopen_button = QPushButton("Reabrir Último")
+        reopen_button.clicked.connect(self.reopen_last_period)
+        close_button = QPushButton("Fechar Período")
+        close_button.clicked.connect(self.close_period)
+        button_layout.addWidget(reopen_button)
+        button_layout.addWidget(close_button)
+        self.main_layout.addLayout(button_layout)
+
+        self.closings_table = QTableWidget()
+        self.closings_table.setColumnCount(5)
+        self.closings_table.setHorizontalHeaderLabels(["Período", "Até", "Itens", "Valor do Estoque", "Fechado em"])
+        self.closings_table.verticalHeader().setVisible(False)
+        self.closings_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.closings_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.closings_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.main_layout.addWidget(self.closings_table)
+
+    def load_closings(self):
+        self.period_input.setText(self.closing_service.pending_period())
+        response = self.closing_service.list_closings()
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        self.closings_table.setRowCount(0)
+        for closing in response["data"]:
+            row = self.closings_table.rowCount()
+            self.closings_table.insertRow(row)
+            self.closings_table.setItem(row, 0, QTableWidgetItem(closing['PERIODO']))
+            self.closings_table.setItem(row, 1, QTableWidgetItem(format_date_for_display(closing['DATA_FIM'])))
+            self.closings_table.setItem(row, 2, NumericTableWidgetItem(str(closing['ITENS'])))
+            self.closings_table.setItem(row, 3, NumericTableWidgetItem(f"{closing['VALOR_TOTAL']:.2f}"))
+            self.closings_table.setItem(row, 4, QTableWidgetItem(closing['DATA_EXECUCAO']))
+
+    def close_period(self):
+        period = self.period_input.text()
+        reply = show_confirmation_message(
+            self, "Confirmar Fechamento",
+            f"Depois de fechar {period}, nenhum movimento com data até o fim do mês poderá ser gravado, "
+            "estornado ou excluído. Deseja continuar?"
+        )
+        if reply != QMessageBox.Yes:
+            return
+        response = self.closing_service.close_period(period)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        show_success_message(self, "Sucesso", response["message"])
+        self.load_closings()
+
+    def reopen_last_period(self):
+        reply = show_confirmation_message(
+            self, "Reabrir Período",
+            "O último período fechado será reaberto e o saldo gravado dele será descartado. Deseja continuar?"
+        )
+        if reply != QMessageBox.Yes:
+            return
+        response = self.closing_service.reopen_last_period()
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        show_success_message(self, "Sucesso", response["message"])
+        self.load_closings()
@@ -0,0 +1,87 @@
+# app/database/archive.py
+"""
+Banco de arquivo do histórico (DADOS_ARQUIVO.DB, ao lado do DADOS.DB).
+
+O arquivamento (app/archive) move para esse arquivo o MOVIMENTO antigo e os documentos
+encerrados. Cada conexão o anexa como "arquivo" e ganha views temporárias
+<TABELA>_HISTORICO, que juntam (UNION ALL) as linhas do banco principal e as do
+arquivo. Consultas de histórico leem essas views; o restante da aplicação continua
+usando só as tabelas do banco principal, que fica pequeno.
+"""
+import os
+from pathlib import Path
+
+ARCHIVE_SCHEMA = "arquivo"
+
+# Tabelas arquivadas e as colunas indexadas no arquivo
+ARCHIVED_TABLES = {
+    "MOVIMENTO": ("ID_ITEM", "ID_ORDEM_PRODUCAO", "DATA_MOVIMENTO"),
+    "ORDEMPRODUCAO": ("ID",),
+    "ORDEMPRODUCAO_ITENS": ("ID_ORDEM_PRODUCAO", "ID_PRODUTO"),
+    "ENTRADANOTA": ("ID",),
+    "ENTRADANOTA_ITENS": ("ID_ENTRADA", "ID_INSUMO"),
+    "SAIDA": ("ID",),
+    "SAIDA_ITENS": ("ID_SAIDA", "ID_PRODUTO"),
+}
+
+def archive_path_for(db_path):
+    base, extension = os.path.splitext(db_path)
+    return f"{base}_ARQUIVO{extension or '.DB'}"
+
+def table_columns(connection, table, schema="main"):
+    return [row[1] for row in connection.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+def is_attached(connection):
+    return any(row[1] == ARCHIVE_SCHEMA for row in connection.execute("PRAGMA database_list").fetchall())
+
+def attach_archive(connection, archive_path, read_only=False, create=False):
+    """
+    Anexa o arquivo à conexão (se existir, ou se create=True) e (re)cria as views de histórico.
+    Conexões de escrita também completam o esquema do arquivo. Não pode rodar dentro de transação.
+    Devolve True se o arquivo ficou anexado.
+    """
+    attached = is_attached(connection)
+    if not attached and (create or os.path.exists(archive_path)):
+        if read_only:
+            target = f"{Path(archive_path).resolve().as_uri()}?mode=ro"
+        else:
+            target = archive_path
+        connection.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (target,))
+        attached = True
+    if attached and not read_only:
+        _ensure_archive_tables(connection)
+    create_history_views(connection, attached)
+    return attached
+
+def _ensure_archive_tables(connection):
+    """Cria no arquivo as tabelas que faltam e acrescenta as colunas novas do banco principal."""
+    for table, indexed_columns in ARCHIVED_TABLES.items():
+        archived = table_columns(connection, table, ARCHIVE_SCHEMA)
+        if not archived:
+            # Cópia só das colunas: o arquivo recebe linhas já validadas e não precisa das restrições
+            connection.execute(f"CREATE TABLE {ARCHIVE_SCHEMA}.{table} AS SELECT * FROM main.{table} WHERE 0")
+        else:
+            for column in table_columns(connection, table):
+                if column not in archived:
+                    connection.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN {column}")
+        for column in indexed_columns:
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.IDX_{table}_{column} ON {table} ({column})"
+            )
+    connection.commit()
+
+def create_history_views(connection, attached):
+    for table in ARCHIVED_TABLES:
+        columns = table_columns(connection, table)
+        if not columns:
+            continue
+        column_list = ", ".join(columns)
+        query = f"SELECT {column_list} FROM main.{table}"
+        if attached:
+            archived = set(table_columns(connection, table, ARCHIVE_SCHEMA))
+            if archived:
+                # Colunas que o arquivo ainda não tem (conexões somente leitura) entram como NULL
+                archive_list = ", ".join(c if c in archived else f"NULL AS {c}" for c in columns)
+                query += f" UNION ALL SELECT {archive_list} FROM {ARCHIVE_SCHEMA}.{table}"
+        connection.execute(f"DROP VIEW IF EXISTS temp.{table}_HISTORICO")
+        connection.execute(f"CREATE TEMP VIEW {table}_HISTORICO AS {query}")
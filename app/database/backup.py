@@ -0,0 +1,251 @@
+# app/database/backup.py
+"""
+Cópias de segurança do banco com a aplicação em uso.
+
+A cópia é feita pela API de backup do SQLite (Connection.backup) em passos de poucas
+páginas, com uma pausa entre eles: cada passo segura o banco só por um instante, e
+as gravações da aplicação continuam entre um passo e outro. Uma gravação no meio da
+cópia faz o SQLite recomeçá-la; se isso se repetir, a cópia termina numa passada só,
+que trava o banco uma única vez pelo tempo de copiar o arquivo. O banco de arquivo
+(DADOS_ARQUIVO.DB), se existir, é copiado junto.
+
+Cada geração é conferida com PRAGMA integrity_check numa thread separada e só as
+cópias íntegras contam para a rotação das N gerações mais recentes; as demais são
+renomeadas para .INVALIDO.
+
+Uso avulso (a partir da raiz do projeto):
+    python -m app.database.backup --dir "Gestão de Produção/Backup" --generations 7
+
+Variáveis de ambiente do agendador iniciado pelo main.py:
+    MINISIS_BACKUP_DIR                pasta das cópias (padrão: Backup, ao lado da pasta Dados)
+    MINISIS_BACKUP_GENERATIONS        gerações mantidas (padrão 7)
+    MINISIS_BACKUP_INTERVAL_HOURS     intervalo entre cópias (padrão 24; 0 desliga o agendador)
+"""
+import argparse
+import glob
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.database.db import get_db_manager
+from app.diagnostics.metrics import registry
+
+DEFAULT_GENERATIONS = 7
+DEFAULT_INTERVAL_HOURS = 24
+PAGES_PER_STEP = 256
+STEP_PAUSE = 0.01
+STAMP_FORMAT = "%Y%m%d_%H%M%S"
+MAX_RESTARTS = 3
+
+class _BackupRestarted(Exception):
+    pass
+
+def default_backup_dir(db_path):
+    env_dir = os.environ.get("MINISIS_BACKUP_DIR")
+    if env_dir:
+        return env_dir
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(db_path))), "Backup")
+
+def verify_backup(path):
+    """Roda PRAGMA integrity_check na cópia e devolve (ok, mensagem)."""
+    connection = sqlite3.connect(path)
+    try:
+        rows = connection.execute("PRAGMA integrity_check").fetchall()
+    except sqlite3.Error as e:
+        return False, str(e)
+    finally:
+        connection.close()
+    messages = [row[0] for row in rows]
+    return messages == ["ok"], "; ".join(messages[:10])
+
+class BackupManager:
+    def __init__(self, backup_dir=None, generations=DEFAULT_GENERATIONS,
+                 pages_per_step=PAGES_PER_STEP, step_pause=STEP_PAUSE):
+        self.db_manager = get_db_manager()
+        self.backup_dir = backup_dir or default_backup_dir(self.db_manager.db_path)
+        self.generations = max(1, generations)
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self._verifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup-verificacao")
+        self._lock = threading.Lock()
+
+    def _sources(self):
+        sources = [self.db_manager.db_path]
+        if os.path.exists(self.db_manager.archive_path):
+            sources.append(self.db_manager.archive_path)
+        return sources
+
+    def _copy(self, source_path, target_path):
+        """Copia source_path para target_path em passos de pages_per_step páginas e devolve o total de páginas."""
+        progress = {"pages": 0, "remaining": None, "restarts": 0}
+
+        def on_progress(status, remaining, total):
+            # Uma gravação de outra conexão no meio da cópia faz o SQLite recomeçá-la
+            if progress["remaining"] is not None and remaining > progress["remaining"]:
+                progress["restarts"] += 1
+                if progress["restarts"] > MAX_RESTARTS:
+                    raise _BackupRestarted()
+            progress["pages"], progress["remaining"] = total, remaining
+            # Chamado entre os passos, já sem trava no banco: a pausa abre espaço para as gravações
+            if remaining:
+                time.sleep(self.step_pause)
+
+        temp_path = target_path + ".tmp"
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(temp_path)
+        try:
+            try:
+                source.backup(target, pages=self.pages_per_step, progress=on_progress, sleep=self.step_pause)
+            except _BackupRestarted:
+                # Banco muito movimentado: termina numa passada só, que trava o banco uma única vez
+                logging.info(f"Cópia de {source_path} reiniciada {MAX_RESTARTS} vezes; concluindo numa passada.")
+                source.backup(target, sleep=self.step_pause)
+                progress["pages"] = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+            source.close()
+        os.replace(temp_path, target_path)
+        return progress["pages"]
+
+    def run_backup(self):
+        """
+        Gera uma nova geração e devolve o relatório (arquivos, páginas, bytes, segundos, MB/s).
+        A conferência de integridade fica em report["verification"], um Future com a lista
+        de (caminho, ok, mensagem); a rotação só acontece depois dela.
+        """
+        with self._lock:
+            os.makedirs(self.backup_dir, exist_ok=True)
+            stamp = datetime.now().strftime(STAMP_FORMAT)
+            start = time.perf_counter()
+            files, pages, size = [], 0, 0
+            try:
+                for source_path in self._sources():
+                    base, extension = os.path.splitext(os.path.basename(source_path))
+                    target_path = os.path.join(self.backup_dir, f"{base}_{stamp}{extension}")
+                    pages += self._copy(source_path, target_path)
+                    size += os.path.getsize(target_path)
+                    files.append(target_path)
+            except (sqlite3.Error, OSError) as e:
+                registry.observe("backup.copy", time.perf_counter() - start, failed=True)
+                logging.error(f"Falha no backup do banco de dados: {e}")
+                return {"success": False, "message": f"Falha no backup: {e}"}
+            elapsed = time.perf_counter() - start
+            registry.observe("backup.copy", elapsed)
+
+        report = {
+            "success": True,
+            "files": files,
+            "pages": pages,
+            "bytes": size,
+            "seconds": round(elapsed, 3),
+            "mb_per_s": round(size / 1024 ** 2 / elapsed, 1) if elapsed else 0.0,
+        }
+        logging.info(f"Backup gravado em {self.backup_dir}: {size / 1024 ** 2:.1f} MB em "
+                     f"{elapsed:.2f} s ({report['mb_per_s']} MB/s)")
+        report["verification"] = self._verifier.submit(self._verify_and_rotate, files)
+        return report
+
+    def _verify_and_rotate(self, files):
+        start = time.perf_counter()
+        results = []
+        for path in files:
+            ok, message = verify_backup(path)
+            if not ok:
+                logging.error(f"Backup inválido ({message}): {path}")
+                os.replace(path, path + ".INVALIDO")
+            results.append((path, ok, message))
+        registry.observe("backup.verify", time.perf_counter() - start,
+                         failed=not all(ok for _, ok, _ in results))
+        self.rotate()
+        return results
+
+    def generations_of(self, source_path):
+        """Cópias íntegras de source_path, da mais antiga para a mais recente."""
+        base, extension = os.path.splitext(os.path.basename(source_path))
+        # O carimbo tem tamanho fixo: o padrão não confunde DADOS_ com DADOS_ARQUIVO_
+        pattern = os.path.join(glob.escape(self.backup_dir), f"{base}_{'[0-9]' * 8}_{'[0-9]' * 6}{extension}")
+        return sorted(glob.glob(pattern))
+
+    def rotate(self):
+        """Mantém apenas as `generations` cópias mais recentes de cada banco."""
+        for source_path in self._sources():
+            for old_path in self.generations_of(source_path)[:-self.generations]:
+                try:
+                    os.remove(old_path)
+                except OSError as e:
+                    logging.warning(f"Não foi possível remover o backup antigo {old_path}: {e}")
+
+    def shutdown(self):
+        self._verifier.shutdown(wait=True)
+
+class BackupScheduler:
+    """Thread em segundo plano que roda o BackupManager a cada interval_hours."""
+
+    def __init__(self, manager=None, interval_hours=DEFAULT_INTERVAL_HOURS):
+        self.manager = manager or BackupManager()
+        self.interval = interval_hours * 3600
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_environment(cls):
+        """Agendador configurado pelas variáveis MINISIS_BACKUP_*; None se o intervalo for 0."""
+        interval = float(os.environ.get("MINISIS_BACKUP_INTERVAL_HOURS", DEFAULT_INTERVAL_HOURS))
+        if interval <= 0:
+            return None
+        generations = int(os.environ.get("MINISIS_BACKUP_GENERATIONS", DEFAULT_GENERATIONS))
+        return cls(BackupManager(generations=generations), interval)
+
+    def _seconds_until_next(self):
+        """Espera até a última cópia completar o intervalo (a primeira sai logo se não houver cópia)."""
+        copies = self.manager.generations_of(self.manager.db_manager.db_path)
+        latest = max((os.path.getmtime(path) for path in copies), default=0)
+        return max(0.0, latest + self.interval - time.time())
+
+    def _loop(self):
+        while not self._stop.wait(self._seconds_until_next()):
+            report = self.manager.run_backup()
+            if report["success"]:
+                report["verification"].result()
+            else:
+                # Tenta de novo em um décimo do intervalo
+                if self._stop.wait(self.interval / 10):
+                    break
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="backup-agendador", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.manager.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backup do banco de dados do MiniSis.")
+    parser.add_argument("--dir", help="Pasta das cópias.")
+    parser.add_argument("--generations", type=int, default=DEFAULT_GENERATIONS)
+    parser.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="Páginas copiadas por passo.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(name)s - %(levelname)s - %(message)s')
+    manager = BackupManager(args.dir, args.generations, args.pages)
+    report = manager.run_backup()
+    if not report["success"]:
+        print(report["message"])
+        return 1
+    for path, ok, message in report["verification"].result():
+        print(f"{'OK' if ok else 'INVÁLIDO':<9} {path}" + ("" if ok else f" ({message})"))
+    print(f"{report['pages']} páginas, {report['bytes'] / 1024 ** 2:.1f} MB em {report['seconds']:.2f} s "
+          f"({report['mb_per_s']} MB/s)")
+    manager.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,6 +3,10 @@ import sqlite3
 import os
 import atexit
 import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from app.database import archive, instrumentation
 
 class DatabaseManager:
     _instance = None
@@ -15,12 +19,18 @@ class DatabaseManager:
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self.db_path = self._get_db_path()
+            self.archive_path = archive.archive_path_for(self.db_path)
             self.connection = None
+            self._thread_local = threading.local()
             self.initialize_database()
             atexit.register(self.close_connection)
             self.initialized = True
 
     def _get_db_path(self):
+        # Permite apontar para outro banco (ex.: benchmarks) sem tocar no banco da aplicação
+        env_path = os.environ.get("MINISIS_DB_PATH")
+        if env_path:
+            return env_path
         # Build a path relative to the project root
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
         return os.path.join(project_root, "Gestão de Produção", "Dados", "DADOS.DB")
@@ -30,19 +40,70 @@ class DatabaseManager:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
         
-        self.connection = sqlite3.connect(self.db_path)
+        if instrumentation.is_enabled():
+            self.profiler = instrumentation.create_profiler()
+            self.connection = sqlite3.connect(self.db_path, factory=instrumentation.InstrumentedConnection)
+        else:
+            self.profiler = None
+            self.connection = sqlite3.connect(self.db_path)
         self.connection.row_factory = sqlite3.Row
         self._create_tables()
+        self.connection.commit()
+        # As views de histórico precisam existir antes das migrações (ex.: rebuild_aggregates)
+        self.attach_archive(self.connection)
         self._run_migrations()
         self.connection.commit()
+        # Recria as views com as colunas acrescentadas pelas migrações
+        self.attach_archive(self.connection)
         logging.info(f"Banco de dados inicializado em: {self.db_path}")
 
     def get_connection(self):
+        # Conexão própria da thread (ex.: pools do servidor da API), se houver
+        thread_connection = getattr(self._thread_local, "connection", None)
+        if thread_connection is not None:
+            return thread_connection
         if self.connection is None:
             raise Exception("A conexão com o banco de dados não foi inicializada.")
         return self.connection
 
+    def open_connection(self, read_only=False):
+        """
+        Abre uma conexão adicional com o mesmo banco, configurada como a principal.
+        Conexões somente leitura usam o modo 'ro' do SQLite e falham em qualquer escrita.
+        """
+        factory = instrumentation.InstrumentedConnection if self.profiler is not None else sqlite3.Connection
+        if read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            connection = sqlite3.connect(uri, uri=True, factory=factory, check_same_thread=False)
+        else:
+            connection = sqlite3.connect(self.db_path, factory=factory, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        self.attach_archive(connection, read_only=read_only)
+        return connection
+
+    def attach_archive(self, connection, read_only=False, create=False):
+        """Anexa o banco de arquivo à conexão e cria as views <TABELA>_HISTORICO (ver archive.py)."""
+        return archive.attach_archive(connection, self.archive_path, read_only=read_only, create=create)
+
+    def bind_thread_connection(self, connection):
+        """Faz get_connection devolver esta conexão na thread atual; None volta a usar a principal."""
+        self._thread_local.connection = connection
+
+    @contextmanager
+    def bound_connection(self, connection):
+        """Liga a conexão à thread atual durante o bloco e depois restaura a ligação anterior."""
+        previous = getattr(self._thread_local, "connection", None)
+        self._thread_local.connection = connection
+        try:
+            yield connection
+        finally:
+            self._thread_local.connection = previous
+
     def close_connection(self):
+        profile_path = os.environ.get("MINISIS_SQL_PROFILE")
+        if self.profiler is not None and profile_path:
+            self.profiler.dump(profile_path)
+            logging.info(f"Perfil das consultas gravado em: {profile_path}")
         if self.connection:
             self.connection.close()
             self.connection = None
@@ -58,6 +119,7 @@ class DatabaseManager:
                         ID INTEGER PRIMARY KEY AUTOINCREMENT, CODIGO_INTERNO TEXT, DESCRICAO TEXT NOT NULL UNIQUE,
                         TIPO_ITEM TEXT NOT NULL CHECK(TIPO_ITEM IN ('Insumo', 'Produto', 'Ambos')), ID_UNIDADE INTEGER NOT NULL,
                         ID_FORNECEDOR_PADRAO INTEGER, SALDO_ESTOQUE REAL NOT NULL DEFAULT 0, CUSTO_MEDIO REAL NOT NULL DEFAULT 0,
+                        SALDO_RESERVADO REAL NOT NULL DEFAULT 0,
                         FOREIGN KEY (ID_UNIDADE) REFERENCES UNIDADE (ID) ON DELETE RESTRICT,
                         FOREIGN KEY (ID_FORNECEDOR_PADRAO) REFERENCES FORNECEDOR (ID) ON DELETE RESTRICT )''',
             "FORNECEDOR": '''CREATE TABLE IF NOT EXISTS FORNECEDOR (
@@ -67,7 +129,8 @@ class DatabaseManager:
             "ENTRADANOTA": '''CREATE TABLE IF NOT EXISTS ENTRADANOTA (
                                 ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_ENTRADA TEXT NOT NULL, DATA_DIGITACAO TEXT,
                                 NUMERO_NOTA TEXT, VALOR_TOTAL REAL, OBSERVACAO TEXT,
-                                STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')) )''',
+                                STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')),
+                                VERSAO INTEGER NOT NULL DEFAULT 1 )''',
             "COMPOSICAO": '''CREATE TABLE IF NOT EXISTS COMPOSICAO (
                                 ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_PRODUTO INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL,
                                 QUANTIDADE REAL NOT NULL, FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
@@ -75,7 +138,7 @@ class DatabaseManager:
             "ORDEMPRODUCAO": '''CREATE TABLE IF NOT EXISTS ORDEMPRODUCAO (
                                     ID INTEGER PRIMARY KEY AUTOINCREMENT, NUMERO TEXT, DATA_CRIACAO TEXT NOT NULL,
                                     DATA_PREVISTA TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Andamento', 'Concluída', 'Cancelada')),
-                                    QUANTIDADE_PRODUZIDA REAL, CUSTO_TOTAL REAL, ID_LINHA_PRODUCAO INTEGER,
+                                    QUANTIDADE_PRODUZIDA REAL, CUSTO_TOTAL REAL, ID_LINHA_PRODUCAO INTEGER, VERSAO INTEGER NOT NULL DEFAULT 1,
                                     FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO_MASTER(ID) ON DELETE SET NULL)''',
             "ORDEMPRODUCAO_ITENS": '''CREATE TABLE IF NOT EXISTS ORDEMPRODUCAO_ITENS (
                                         ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ORDEM_PRODUCAO INTEGER NOT NULL,
@@ -90,29 +153,109 @@ class DatabaseManager:
                                 FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE RESTRICT )''',
             "ENTRADANOTA_ITENS": '''CREATE TABLE IF NOT EXISTS ENTRADANOTA_ITENS (
                                     ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ENTRADA INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL,
-                                    ID_FORNECEDOR INTEGER NOT NULL, QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL,
+                                    ID_FORNECEDOR INTEGER NOT NULL, QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL, LOTE TEXT,
                                     FOREIGN KEY (ID_ENTRADA) REFERENCES ENTRADANOTA (ID) ON DELETE RESTRICT,
                                     FOREIGN KEY (ID_INSUMO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
                                     FOREIGN KEY (ID_FORNECEDOR) REFERENCES FORNECEDOR (ID) ON DELETE RESTRICT,
                                     UNIQUE (ID_ENTRADA, ID_INSUMO) )''',
             "SAIDA": '''CREATE TABLE IF NOT EXISTS SAIDA (
                             ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_SAIDA TEXT NOT NULL, VALOR_TOTAL REAL,
-                            OBSERVACAO TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')) )''',
+                            OBSERVACAO TEXT, STATUS TEXT NOT NULL CHECK(STATUS IN ('Em Aberto', 'Finalizada')),
+                            VERSAO INTEGER NOT NULL DEFAULT 1 )''',
             "SAIDA_ITENS": '''CREATE TABLE IF NOT EXISTS SAIDA_ITENS (
                                 ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_SAIDA INTEGER NOT NULL, ID_PRODUTO INTEGER NOT NULL,
-                                QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL,
+                                QUANTIDADE REAL NOT NULL, VALOR_UNITARIO REAL NOT NULL, CUSTO_UNITARIO REAL,
                                 FOREIGN KEY (ID_SAIDA) REFERENCES SAIDA (ID) ON DELETE RESTRICT,
                                 FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
                                 UNIQUE (ID_SAIDA, ID_PRODUTO) )''',
             "LINHAPRODUCAO_MASTER": '''CREATE TABLE IF NOT EXISTS LINHAPRODUCAO_MASTER (
                                         ID INTEGER PRIMARY KEY AUTOINCREMENT, NOME TEXT NOT NULL UNIQUE,
-                                        DESCRICAO TEXT, STATUS TEXT NOT NULL DEFAULT 'Ativa' CHECK(STATUS IN ('Ativa', 'Inativa')) )''',
+                                        DESCRICAO TEXT, STATUS TEXT NOT NULL DEFAULT 'Ativa' CHECK(STATUS IN ('Ativa', 'Inativa')),
+                                        VERSAO INTEGER NOT NULL DEFAULT 1, HORAS_DIA REAL NOT NULL DEFAULT 8,
+                                        DIAS_SEMANA TEXT NOT NULL DEFAULT '12345' )''',
             "LINHAPRODUCAO_ITEMS": '''CREATE TABLE IF NOT EXISTS LINHAPRODUCAO_ITEMS (
                                         ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_LINHA_PRODUCAO INTEGER NOT NULL,
-                                        ID_PRODUTO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
+                                        ID_PRODUTO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL, TAXA_HORA REAL,
                                         FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO_MASTER (ID) ON DELETE CASCADE,
                                         FOREIGN KEY (ID_PRODUTO) REFERENCES ITEM (ID) ON DELETE RESTRICT,
-                                        UNIQUE (ID_LINHA_PRODUCAO, ID_PRODUTO) )'''
+                                        UNIQUE (ID_LINHA_PRODUCAO, ID_PRODUTO) )''',
+            "RESUMO_CONSUMO_DIARIO": '''CREATE TABLE IF NOT EXISTS RESUMO_CONSUMO_DIARIO (
+                                        DATA TEXT NOT NULL, ID_ITEM INTEGER NOT NULL,
+                                        QUANTIDADE REAL NOT NULL DEFAULT 0, VALOR REAL NOT NULL DEFAULT 0,
+                                        PRIMARY KEY (DATA, ID_ITEM) ) WITHOUT ROWID''',
+            "RESUMO_VENDAS_DIARIO": '''CREATE TABLE IF NOT EXISTS RESUMO_VENDAS_DIARIO (
+                                        DATA TEXT NOT NULL, ID_PRODUTO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL DEFAULT 0,
+                                        RECEITA REAL NOT NULL DEFAULT 0, CUSTO REAL NOT NULL DEFAULT 0,
+                                        PRIMARY KEY (DATA, ID_PRODUTO) ) WITHOUT ROWID''',
+            "SALDO_ARQUIVADO": '''CREATE TABLE IF NOT EXISTS SALDO_ARQUIVADO (
+                                    ID_ITEM INTEGER NOT NULL, TIPO_MOVIMENTO TEXT NOT NULL,
+                                    QUANTIDADE REAL NOT NULL DEFAULT 0, VALOR REAL NOT NULL DEFAULT 0,
+                                    MOVIMENTOS INTEGER NOT NULL DEFAULT 0,
+                                    PRIMARY KEY (ID_ITEM, TIPO_MOVIMENTO) ) WITHOUT ROWID''',
+            "RESERVA": '''CREATE TABLE IF NOT EXISTS RESERVA (
+                            ID_ORDEM_PRODUCAO INTEGER NOT NULL, ID_INSUMO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
+                            PRIMARY KEY (ID_ORDEM_PRODUCAO, ID_INSUMO),
+                            FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE RESTRICT,
+                            FOREIGN KEY (ID_INSUMO) REFERENCES ITEM (ID) ON DELETE RESTRICT ) WITHOUT ROWID''',
+            "PROGRAMACAO": '''CREATE TABLE IF NOT EXISTS PROGRAMACAO (
+                                ID_ORDEM_PRODUCAO INTEGER PRIMARY KEY, ID_LINHA_PRODUCAO INTEGER, SEQUENCIA INTEGER,
+                                INICIO TEXT, FIM TEXT, SITUACAO TEXT NOT NULL, DATA_PROGRAMACAO TEXT NOT NULL,
+                                FOREIGN KEY (ID_ORDEM_PRODUCAO) REFERENCES ORDEMPRODUCAO (ID) ON DELETE CASCADE,
+                                FOREIGN KEY (ID_LINHA_PRODUCAO) REFERENCES LINHAPRODUCAO_MASTER (ID) ON DELETE SET NULL )''',
+            "CEP": '''CREATE TABLE IF NOT EXISTS CEP (
+                        CEP TEXT PRIMARY KEY, LOGRADOURO TEXT, BAIRRO TEXT, CIDADE TEXT, UF TEXT ) WITHOUT ROWID''',
+            "ARQUIVAMENTO": '''CREATE TABLE IF NOT EXISTS ARQUIVAMENTO (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_CORTE TEXT NOT NULL, DATA_EXECUCAO TEXT NOT NULL,
+                                MOVIMENTOS INTEGER NOT NULL, ORDENS INTEGER NOT NULL, ENTRADAS INTEGER NOT NULL,
+                                SAIDAS INTEGER NOT NULL )''',
+            "CLASSIFICACAO_ITEM": '''CREATE TABLE IF NOT EXISTS CLASSIFICACAO_ITEM (
+                                    ID_ITEM INTEGER PRIMARY KEY, CLASSE_ABC TEXT NOT NULL, CLASSE_XYZ TEXT NOT NULL,
+                                    VALOR_CONSUMO REAL NOT NULL DEFAULT 0, PARTICIPACAO_ACUMULADA REAL,
+                                    COEFICIENTE_VARIACAO REAL,
+                                    FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE CASCADE )''',
+            "CLASSIFICACAO_EXECUCAO": '''CREATE TABLE IF NOT EXISTS CLASSIFICACAO_EXECUCAO (
+                                        ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_EXECUCAO TEXT NOT NULL,
+                                        DATA_INICIO TEXT NOT NULL, ULTIMO_MOVIMENTO INTEGER NOT NULL,
+                                        ITENS INTEGER NOT NULL )''',
+            "INVENTARIO": '''CREATE TABLE IF NOT EXISTS INVENTARIO (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, DATA_INVENTARIO TEXT NOT NULL, OBSERVACAO TEXT,
+                                STATUS TEXT NOT NULL DEFAULT 'Em Aberto' CHECK(STATUS IN ('Em Aberto', 'Finalizado')),
+                                DATA_FINALIZACAO TEXT, VERSAO INTEGER NOT NULL DEFAULT 1 )''',
+            "INVENTARIO_ITENS": '''CREATE TABLE IF NOT EXISTS INVENTARIO_ITENS (
+                                    ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_INVENTARIO INTEGER NOT NULL,
+                                    ID_ITEM INTEGER NOT NULL, QUANTIDADE_CONTADA REAL NOT NULL,
+                                    SALDO_SISTEMA REAL, CUSTO_UNITARIO REAL,
+                                    FOREIGN KEY (ID_INVENTARIO) REFERENCES INVENTARIO (ID) ON DELETE RESTRICT,
+                                    FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                                    UNIQUE (ID_INVENTARIO, ID_ITEM) )''',
+            "FECHAMENTO": '''CREATE TABLE IF NOT EXISTS FECHAMENTO (
+                                ID INTEGER PRIMARY KEY AUTOINCREMENT, PERIODO TEXT NOT NULL UNIQUE,
+                                DATA_INICIO TEXT NOT NULL, DATA_FIM TEXT NOT NULL, DATA_EXECUCAO TEXT NOT NULL,
+                                ITENS INTEGER NOT NULL, VALOR_TOTAL REAL NOT NULL )''',
+            "SALDO_FECHAMENTO": '''CREATE TABLE IF NOT EXISTS SALDO_FECHAMENTO (
+                                    PERIODO TEXT NOT NULL, ID_ITEM INTEGER NOT NULL, SALDO REAL NOT NULL,
+                                    CUSTO_MEDIO REAL NOT NULL, VALOR REAL NOT NULL,
+                                    PRIMARY KEY (PERIODO, ID_ITEM),
+                                    FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE RESTRICT ) WITHOUT ROWID''',
+            "LOTE": '''CREATE TABLE IF NOT EXISTS LOTE (
+                        ID INTEGER PRIMARY KEY AUTOINCREMENT, ID_ITEM INTEGER NOT NULL, NUMERO TEXT NOT NULL,
+                        DATA_CRIACAO TEXT NOT NULL, QUANTIDADE REAL NOT NULL DEFAULT 0, SALDO REAL NOT NULL DEFAULT 0,
+                        ID_ENTRADA INTEGER, ID_ORDEM_PRODUCAO INTEGER,
+                        FOREIGN KEY (ID_ITEM) REFERENCES ITEM (ID) ON DELETE RESTRICT,
+                        UNIQUE (ID_ITEM, NUMERO) )''',
+            "LOTE_GENEALOGIA": '''CREATE TABLE IF NOT EXISTS LOTE_GENEALOGIA (
+                                    ID_LOTE_ORIGEM INTEGER NOT NULL, ID_LOTE_DESTINO INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
+                                    PRIMARY KEY (ID_LOTE_ORIGEM, ID_LOTE_DESTINO),
+                                    FOREIGN KEY (ID_LOTE_ORIGEM) REFERENCES LOTE (ID) ON DELETE RESTRICT,
+                                    FOREIGN KEY (ID_LOTE_DESTINO) REFERENCES LOTE (ID) ON DELETE RESTRICT ) WITHOUT ROWID''',
+            "LOTE_SAIDA": '''CREATE TABLE IF NOT EXISTS LOTE_SAIDA (
+                            ID_LOTE INTEGER NOT NULL, ID_SAIDA INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
+                            PRIMARY KEY (ID_LOTE, ID_SAIDA),
+                            FOREIGN KEY (ID_LOTE) REFERENCES LOTE (ID) ON DELETE RESTRICT ) WITHOUT ROWID''',
+            "LOTE_ENTRADA": '''CREATE TABLE IF NOT EXISTS LOTE_ENTRADA (
+                            ID_LOTE INTEGER NOT NULL, ID_ENTRADA INTEGER NOT NULL, QUANTIDADE REAL NOT NULL,
+                            PRIMARY KEY (ID_LOTE, ID_ENTRADA),
+                            FOREIGN KEY (ID_LOTE) REFERENCES LOTE (ID) ON DELETE RESTRICT ) WITHOUT ROWID'''
         }
         for table_sql in tables.values():
             cursor.execute(table_sql)
@@ -141,6 +284,42 @@ class DatabaseManager:
             self._migrate_v3(cursor)
             cursor.execute("PRAGMA user_version = 3")
 
+        if db_version < 4:
+            self._migrate_v4(cursor)
+            cursor.execute("PRAGMA user_version = 4")
+
+        if db_version < 5:
+            self._migrate_v5(cursor)
+            cursor.execute("PRAGMA user_version = 5")
+
+        if db_version < 6:
+            self._migrate_v6(cursor)
+            cursor.execute("PRAGMA user_version = 6")
+
+        if db_version < 7:
+            self._migrate_v7(cursor)
+            cursor.execute("PRAGMA user_version = 7")
+
+        if db_version < 8:
+            self._migrate_v8(cursor)
+            cursor.execute("PRAGMA user_version = 8")
+
+        if db_version < 9:
+            self._migrate_v9(cursor)
+            cursor.execute("PRAGMA user_version = 9")
+
+        if db_version < 10:
+            self._migrate_v10(cursor)
+            cursor.execute("PRAGMA user_version = 10")
+
+        if db_version < 11:
+            self._migrate_v11(cursor)
+            cursor.execute("PRAGMA user_version = 11")
+
+        if db_version < 12:
+            self._migrate_v12(cursor)
+            cursor.execute("PRAGMA user_version = 12")
+
         self.connection.commit()
 
     def _migrate_v1(self, cursor):
@@ -215,6 +394,95 @@ class DatabaseManager:
                 ADD COLUMN ID_LINHA_PRODUCAO INTEGER REFERENCES LINHAPRODUCAO_MASTER(ID) ON DELETE SET NULL
             ''')
 
+    def _migrate_v4(self, cursor):
+        """Migrations for version 4 of the database."""
+        # Índice para os filtros de tipo das janelas de seleção de itens
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_ITEM_TIPO_DESCRICAO ON ITEM (TIPO_ITEM, DESCRICAO)")
+
+    def _migrate_v5(self, cursor):
+        """Migrations for version 5 of the database."""
+        # Custo do produto no momento da venda, usado no relatório de margem
+        if not self._column_exists(cursor, 'SAIDA_ITENS', 'CUSTO_UNITARIO'):
+            cursor.execute('ALTER TABLE SAIDA_ITENS ADD COLUMN CUSTO_UNITARIO REAL')
+            # As views de histórico foram criadas antes da coluna nova
+            archive.create_history_views(self.connection, archive.is_attached(self.connection))
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_MOVIMENTO_OP ON MOVIMENTO (ID_ORDEM_PRODUCAO)")
+        # Popula os resumos diários dos relatórios com o histórico existente
+        from app.reports.aggregates import rebuild_aggregates
+        rebuild_aggregates(cursor)
+
+    def _migrate_v6(self, cursor):
+        """Migrations for version 6 of the database."""
+        # Versão da linha para o controle de concorrência otimista dos documentos
+        for table in ('ORDEMPRODUCAO', 'ENTRADANOTA', 'SAIDA', 'LINHAPRODUCAO_MASTER'):
+            if not self._column_exists(cursor, table, 'VERSAO'):
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN VERSAO INTEGER NOT NULL DEFAULT 1')
+
+    def _migrate_v7(self, cursor):
+        """Migrations for version 7 of the database."""
+        # Reserva de insumos das OPs em andamento
+        if not self._column_exists(cursor, 'ITEM', 'SALDO_RESERVADO'):
+            cursor.execute('ALTER TABLE ITEM ADD COLUMN SALDO_RESERVADO REAL NOT NULL DEFAULT 0')
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_RESERVA_INSUMO ON RESERVA (ID_INSUMO)")
+        from app.production.reservations import rebuild_reservations
+        rebuild_reservations(cursor)
+
+    def _migrate_v8(self, cursor):
+        """Migrations for version 8 of the database."""
+        # Calendário e taxas das linhas para a programação da produção
+        if not self._column_exists(cursor, 'LINHAPRODUCAO_MASTER', 'HORAS_DIA'):
+            cursor.execute('ALTER TABLE LINHAPRODUCAO_MASTER ADD COLUMN HORAS_DIA REAL NOT NULL DEFAULT 8')
+        if not self._column_exists(cursor, 'LINHAPRODUCAO_MASTER', 'DIAS_SEMANA'):
+            cursor.execute("ALTER TABLE LINHAPRODUCAO_MASTER ADD COLUMN DIAS_SEMANA TEXT NOT NULL DEFAULT '12345'")
+        if not self._column_exists(cursor, 'LINHAPRODUCAO_ITEMS', 'TAXA_HORA'):
+            cursor.execute('ALTER TABLE LINHAPRODUCAO_ITEMS ADD COLUMN TAXA_HORA REAL')
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_PROGRAMACAO_LINHA ON PROGRAMACAO (ID_LINHA_PRODUCAO, SEQUENCIA)")
+
+    def _migrate_v9(self, cursor):
+        """Migrations for version 9 of the database."""
+        # Classificação ABC/XYZ dos itens
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_CLASSIFICACAO_CLASSE ON CLASSIFICACAO_ITEM (CLASSE_ABC, CLASSE_XYZ)")
+        from app.item.classification import refresh_classification
+        refresh_classification(self.connection, force=True)
+
+    def _migrate_v10(self, cursor):
+        """Migrations for version 10 of the database."""
+        # Bloqueio dos períodos fechados: nenhum movimento entra, muda ou sai de um mês fechado.
+        # A exclusão não tem gatilho porque o arquivamento também apaga movimentos antigos;
+        # a exclusão de OPs verifica o período (ver order_operations.delete_op).
+        closed = "(SELECT MAX(DATA_FIM) FROM FECHAMENTO)"
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS TRG_MOVIMENTO_FECHADO_INSERT BEFORE INSERT ON MOVIMENTO
+                          WHEN NEW.DATA_MOVIMENTO <= {closed}
+                          BEGIN SELECT RAISE(ABORT, 'Movimento com data em período fechado.'); END''')
+        cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS TRG_MOVIMENTO_FECHADO_UPDATE BEFORE UPDATE ON MOVIMENTO
+                          WHEN OLD.DATA_MOVIMENTO <= {closed} OR NEW.DATA_MOVIMENTO <= {closed}
+                          BEGIN SELECT RAISE(ABORT, 'Movimento com data em período fechado.'); END''')
+
+    def _migrate_v11(self, cursor):
+        """Migrations for version 11 of the database."""
+        # Rastreabilidade por lote: número do lote na entrada e índices nos dois sentidos da genealogia
+        if not self._column_exists(cursor, 'ENTRADANOTA_ITENS', 'LOTE'):
+            cursor.execute('ALTER TABLE ENTRADANOTA_ITENS ADD COLUMN LOTE TEXT')
+            archive.create_history_views(self.connection, archive.is_attached(self.connection))
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_LOTE_NUMERO ON LOTE (NUMERO)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_LOTE_DISPONIVEL ON LOTE (ID_ITEM, ID) WHERE SALDO > 0")
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_LOTE_OP ON LOTE (ID_ORDEM_PRODUCAO) WHERE ID_ORDEM_PRODUCAO IS NOT NULL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_LOTE_GENEALOGIA_DESTINO ON LOTE_GENEALOGIA (ID_LOTE_DESTINO, ID_LOTE_ORIGEM)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_LOTE_SAIDA_SAIDA ON LOTE_SAIDA (ID_SAIDA, ID_LOTE)")
+
+    def _migrate_v12(self, cursor):
+        """Migrations for version 12 of the database."""
+        # Várias entradas podem trazer o mesmo lote do fornecedor: a ligação entrada -> lote
+        # passa para LOTE_ENTRADA, preenchida a partir das entradas finalizadas
+        cursor.execute("""
+            INSERT OR IGNORE INTO LOTE_ENTRADA (ID_LOTE, ID_ENTRADA, QUANTIDADE)
+            SELECT L.ID, EI.ID_ENTRADA, EI.QUANTIDADE
+            FROM ENTRADANOTA_ITENS_HISTORICO EI
+            JOIN ENTRADANOTA_HISTORICO E ON E.ID = EI.ID_ENTRADA AND E.STATUS = 'Finalizada'
+            JOIN LOTE L ON L.ID_ITEM = EI.ID_INSUMO AND L.NUMERO = COALESCE(NULLIF(EI.LOTE, ''), 'E' || EI.ID_ENTRADA)
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS IDX_LOTE_ENTRADA_ENTRADA ON LOTE_ENTRADA (ID_ENTRADA, ID_LOTE)")
+
     def _column_exists(self, cursor, table_name, column_name):
         cursor.execute(f"PRAGMA table_info({table_name})")
         return any(column[1] == column_name for column in cursor.fetchall())
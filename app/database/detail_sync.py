@@ -0,0 +1,52 @@
+# app/database/detail_sync.py
+"""
+Sincronização dos itens (detalhes) de um documento com a lista vinda da tela.
+
+Em vez de apagar todos os itens e inseri-los de novo a cada gravação, compara as
+linhas já gravadas, identificadas por (documento, produto), com as novas e aplica
+apenas a diferença: insere os produtos novos, atualiza os que mudaram e remove os
+que saíram. Itens inalterados não são tocados e mantêm o seu ID.
+"""
+import logging
+import sqlite3
+
+def sync_details(cursor, table, parent_column, parent_id, key_column, value_columns, rows):
+    """
+    Aplica em `table` a diferença entre os itens gravados do documento `parent_id` e `rows`.
+
+    rows: tuplas (chave, valor, ...) com os valores na ordem de value_columns.
+    Roda dentro da transação de quem chamou e devolve {"inserted", "updated", "deleted"}.
+    Chaves repetidas em rows levantam sqlite3.IntegrityError, como a restrição UNIQUE faria.
+    """
+    desired = {}
+    for row in rows:
+        key, values = row[0], tuple(row[1:])
+        if key in desired:
+            raise sqlite3.IntegrityError(f"{key_column} {key} repetido nos itens de {table}.")
+        desired[key] = values
+
+    columns = ", ".join([key_column, *value_columns])
+    cursor.execute(f"SELECT {columns} FROM {table} WHERE {parent_column} = ?", (parent_id,))
+    existing = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    to_delete = [(parent_id, key) for key in existing if key not in desired]
+    to_update = [(*values, parent_id, key) for key, values in desired.items()
+                 if key in existing and existing[key] != values]
+    to_insert = [(parent_id, key, *values) for key, values in desired.items() if key not in existing]
+
+    if to_delete:
+        cursor.executemany(f"DELETE FROM {table} WHERE {parent_column} = ? AND {key_column} = ?", to_delete)
+    if to_update:
+        assignments = ", ".join(f"{column} = ?" for column in value_columns)
+        cursor.executemany(
+            f"UPDATE {table} SET {assignments} WHERE {parent_column} = ? AND {key_column} = ?", to_update
+        )
+    if to_insert:
+        placeholders = ", ".join("?" * (len(value_columns) + 2))
+        cursor.executemany(
+            f"INSERT INTO {table} ({parent_column}, {columns}) VALUES ({placeholders})", to_insert
+        )
+
+    changes = {"inserted": len(to_insert), "updated": len(to_update), "deleted": len(to_delete)}
+    logging.debug(f"Itens de {table} #{parent_id} sincronizados: {changes}")
+    return changes
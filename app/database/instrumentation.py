@@ -0,0 +1,222 @@
+# app/database/instrumentation.py
+"""
+Instrumentação das consultas feitas pela conexão do DatabaseManager.
+
+A conexão é criada com InstrumentedConnection, cujos cursores medem o tempo de
+cada comando (execução + leitura das linhas), contam as linhas lidas/alteradas e
+identificam quem chamou (ex.: "stock_repository:StockRepository.finalize_entry").
+Comandos acima do limite vão para o log de consultas lentas e todos entram no
+perfil agregado, que pode ser gravado ao fechar a aplicação.
+
+A instrumentação vem desligada: o cursor instrumentado passa cada linha lida por
+código Python (cerca de 2x a 3x o tempo de leitura de uma consulta simples).
+
+Configuração por variáveis de ambiente:
+    MINISIS_SQL_INSTRUMENTATION=1   liga a instrumentação
+    MINISIS_SLOW_QUERY_MS=200       limite (ms) do log de consultas lentas
+    MINISIS_SLOW_QUERY_LOG=arquivo  arquivo do log (padrão: slow_queries.log)
+    MINISIS_SQL_PROFILE=arquivo     grava o perfil agregado neste arquivo ao sair
+"""
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+DEFAULT_SLOW_QUERY_MS = 200
+DEFAULT_SLOW_QUERY_LOG = "slow_queries.log"
+
+_THIS_FILE = __file__
+
+def _normalize(sql):
+    """Colapsa espaços para que a mesma consulta vinda de lugares diferentes seja agrupada."""
+    return " ".join(sql.split())
+
+def _is_lock_error(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+def _call_site():
+    """Primeiro quadro da pilha fora deste módulo, no formato modulo:Classe.metodo."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return "desconhecido"
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+class QueryProfiler:
+    """Agrega o tempo das consultas por (comando, origem) e registra as lentas."""
+
+    def __init__(self, slow_threshold_ms=DEFAULT_SLOW_QUERY_MS, slow_log_path=DEFAULT_SLOW_QUERY_LOG):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.slow_log_path = slow_log_path
+        self.stats = {}
+        self.lock_errors = 0
+        self._lock = threading.Lock()
+        self._slow_logger = None
+
+    def record_lock_error(self):
+        """Conta os comandos que falharam com 'database is locked'/'busy' (concorrência entre conexões)."""
+        with self._lock:
+            self.lock_errors += 1
+
+    def record(self, sql, params, call_site, elapsed, rows):
+        key = (_normalize(sql), call_site)
+        with self._lock:
+            entry = self.stats.get(key)
+            if entry is None:
+                self.stats[key] = [1, elapsed, elapsed, rows]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+                entry[3] += rows
+        if elapsed >= self.slow_threshold:
+            self._log_slow(key[0], params, call_site, elapsed, rows)
+
+    def _log_slow(self, sql, params, call_site, elapsed, rows):
+        if self._slow_logger is None:
+            logger = logging.getLogger("minisis.slow_query")
+            logger.propagate = False
+            if not logger.handlers:
+                handler = logging.FileHandler(self.slow_log_path, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+                logger.addHandler(handler)
+            logger.setLevel(logging.WARNING)
+            self._slow_logger = logger
+        self._slow_logger.warning(f"{elapsed * 1000:.1f} ms | {rows} linhas | {call_site} | {sql} | params={params!r}")
+
+    def top(self, limit=20):
+        """Comandos ordenados pelo tempo total: dicts com sql, origem, execuções, tempos e linhas."""
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"sql": sql, "call_site": call_site, "count": count, "total_ms": total * 1000,
+             "avg_ms": total / count * 1000, "max_ms": maximum * 1000, "rows": rows}
+            for (sql, call_site), (count, total, maximum, rows) in items
+        ]
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.lock_errors = 0
+
+    def format_report(self, limit=20):
+        lines = [f"Erros de bloqueio (database is locked): {self.lock_errors}",f"{'total ms':>10} {'qtd':>7} {'média ms':>9} {'máx ms':>9} {'linhas':>9}  origem | comando"]
+        for entry in self.top(limit):
+            lines.append(
+                f"{entry['total_ms']:>10.1f} {entry['count']:>7} {entry['avg_ms']:>9.3f} {entry['max_ms']:>9.3f} "
+                f"{entry['rows']:>9}  {entry['call_site']} | {entry['sql']}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, file_path, limit=50):
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(self.format_report(limit) + "\n")
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor que mede cada comando. O tempo de leitura das linhas (fetch/iteração) é
+    somado ao do execute, e o comando é registrado quando o cursor termina de ser
+    lido, recebe outro comando ou é descartado.
+    """
+    profiler = None
+
+    def _start(self, sql, params, run):
+        self._finish()
+        call_site = _call_site()
+        start = time.perf_counter()
+        try:
+            run()
+        except sqlite3.OperationalError as e:
+            if self.profiler is not None and _is_lock_error(e):
+                self.profiler.record_lock_error()
+            raise
+        finally:
+            self._current = [sql, params, call_site, time.perf_counter() - start, 0]
+        if self.rowcount > 0:
+            self._current[4] = self.rowcount
+        return self
+
+    def _finish(self):
+        current = getattr(self, "_current", None)
+        if current is not None:
+            self._current = None
+            if self.profiler is not None:
+                self.profiler.record(*current)
+
+    def _timed_fetch(self, fetch, count_rows, exhausted):
+        start = time.perf_counter()
+        result = fetch()
+        current = getattr(self, "_current", None)
+        if current is not None:
+            current[3] += time.perf_counter() - start
+            current[4] += count_rows(result)
+            if exhausted(result):
+                self._finish()
+        return result
+
+    def execute(self, sql, parameters=()):
+        return self._start(sql, parameters, lambda: super(InstrumentedCursor, self).execute(sql, parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._start(sql, None, lambda: super(InstrumentedCursor, self).executemany(sql, seq_of_parameters))
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone, lambda row: row is not None, lambda row: row is None)
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        return self._timed_fetch(lambda: super(InstrumentedCursor, self).fetchmany(size), len, lambda rows: len(rows) < size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall, len, lambda rows: True)
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de conn.execute) são instrumentados."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        try:
+            super().commit()
+        except sqlite3.OperationalError as e:
+            if InstrumentedCursor.profiler is not None and _is_lock_error(e):
+                InstrumentedCursor.profiler.record_lock_error()
+            raise
+
+def is_enabled():
+    return os.environ.get("MINISIS_SQL_INSTRUMENTATION", "0") == "1"
+
+def create_profiler():
+    """Profiler configurado pelas variáveis de ambiente; também é ligado aos cursores instrumentados."""
+    profiler = QueryProfiler(
+        slow_threshold_ms=float(os.environ.get("MINISIS_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS)),
+        slow_log_path=os.environ.get("MINISIS_SLOW_QUERY_LOG", DEFAULT_SLOW_QUERY_LOG)
+    )
+    InstrumentedCursor.profiler = profiler
+    return profiler
@@ -0,0 +1,103 @@
+# app/database/records.py
+"""
+Registros compactos para os resultados das consultas.
+
+Cada formato de consulta (a sequência de nomes das colunas) ganha uma classe Record
+própria, criada uma única vez: os nomes e o índice das colunas ficam na classe e cada
+linha guarda apenas a tupla de valores vinda do sqlite3. Os registros são lidos como
+os dicionários usados até aqui (record['DESCRICAO'], record.get(...), 'CAMPO' in record,
+dict(record)) e também por atributo (record.DESCRICAO), sem criar um dict por linha.
+"""
+
+class Record:
+    """Linha somente leitura de uma consulta; as subclasses definem _fields e _index."""
+    __slots__ = ("_values",)
+    _fields = ()
+    _index = {}
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def __getattr__(self, name):
+        index = type(self)._index.get(name)
+        if index is None:
+            raise AttributeError(name)
+        return self._values[index]
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return list(zip(self._fields, self._values))
+
+    def to_dict(self):
+        return dict(zip(self._fields, self._values))
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._fields == other._fields and self._values == other._values
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self._values))
+        return f"Record({fields})"
+
+_RECORD_CLASSES = {}
+
+def record_class(fields):
+    """Devolve (criando na primeira vez) a classe Record para a sequência de colunas informada."""
+    fields = tuple(fields)
+    cls = _RECORD_CLASSES.get(fields)
+    if cls is None:
+        cls = type("Record", (Record,), {
+            "__slots__": (),
+            "_fields": fields,
+            "_index": {name: position for position, name in enumerate(fields)},
+        })
+        _RECORD_CLASSES[fields] = cls
+    return cls
+
+def _cursor_record_class(cursor):
+    cls = record_class(column[0] for column in cursor.description)
+    # As tuplas cruas do sqlite3 passam direto para o Record, sem criar sqlite3.Row
+    cursor.row_factory = None
+    return cls
+
+def fetch_records(cursor):
+    """Lê todas as linhas restantes do cursor já executado como registros compactos."""
+    if cursor.description is None:
+        return []
+    return list(map(_cursor_record_class(cursor), cursor.fetchall()))
+
+def fetch_record(cursor):
+    """Lê a próxima linha do cursor como registro compacto, ou None se não houver."""
+    if cursor.description is None:
+        return None
+    cls = _cursor_record_class(cursor)
+    row = cursor.fetchone()
+    return None if row is None else cls(row)
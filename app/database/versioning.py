@@ -0,0 +1,34 @@
+# app/database/versioning.py
+"""
+Controle de concorrência otimista dos documentos (OP, entrada, saída, inventário e linha de produção).
+
+Cada documento tem a coluna VERSAO, lida junto com o cabeçalho. Ao salvar, a tela
+informa a versão que carregou: se outra estação salvou antes, a versão no banco
+já é outra e a gravação é recusada com StaleDocumentError, sem perder a alteração
+que chegou primeiro.
+"""
+
+class StaleDocumentError(Exception):
+    """O documento foi alterado ou excluído por outra estação depois de ser carregado."""
+
+    def __init__(self, table, document_id):
+        super().__init__(
+            "O documento foi alterado ou excluído em outra estação desde que foi aberto. "
+            "Recarregue-o e refaça as alterações."
+        )
+        self.table = table
+        self.document_id = document_id
+
+def bump_version(cursor, table, document_id, expected_version=None):
+    """
+    Incrementa a VERSAO do documento dentro da transação em andamento e devolve a nova versão.
+    Com expected_version, só incrementa se o documento ainda estiver nessa versão; caso
+    contrário levanta StaleDocumentError (a transação deve ser desfeita por quem chamou).
+    """
+    if expected_version is None:
+        cursor.execute(f"UPDATE {table} SET VERSAO = VERSAO + 1 WHERE ID = ?", (document_id,))
+    else:
+        cursor.execute(f"UPDATE {table} SET VERSAO = VERSAO + 1 WHERE ID = ? AND VERSAO = ?", (document_id, expected_version))
+    if cursor.rowcount == 0:
+        raise StaleDocumentError(table, document_id)
+    return cursor.execute(f"SELECT VERSAO FROM {table} WHERE ID = ?", (document_id,)).fetchone()[0]
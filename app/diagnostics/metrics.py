@@ -0,0 +1,157 @@
+# app/diagnostics/metrics.py
+"""
+Métricas das operações da camada de serviço, mantidas em memória.
+
+Os serviços recebem o decorador de classe timed_service e as funções dos módulos
+*_operations o decorador timed. Cada chamada entra no histograma de latência da
+operação e é contada como falha quando devolve {"success": False, ...},
+(False, mensagem) ou False, e como exceção quando levanta erro. O conteúdo pode ser visto
+na janela de diagnóstico ou gravado no formato texto do Prometheus.
+"""
+import atexit
+import functools
+import os
+import threading
+import time
+
+# Limites superiores (em segundos) dos baldes do histograma, no padrão do Prometheus
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class OperationStats:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # o último é o +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.failures = 0
+        self.exceptions = 0
+
+    def observe(self, elapsed, failed=False, raised=False):
+        index = 0
+        while index < len(LATENCY_BUCKETS) and elapsed > LATENCY_BUCKETS[index]:
+            index += 1
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if failed:
+            self.failures += 1
+        if raised:
+            self.exceptions += 1
+
+    def quantile(self, q):
+        """Estimativa do quantil a partir dos baldes, interpolando dentro do balde (como o histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+                if index == len(LATENCY_BUCKETS):
+                    return self.max
+                upper = min(LATENCY_BUCKETS[index], self.max)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+    @property
+    def error_rate(self):
+        return (self.failures + self.exceptions) / self.count if self.count else 0.0
+
+class MetricsRegistry:
+    def __init__(self):
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, elapsed, failed=False, raised=False):
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.observe(elapsed, failed, raised)
+
+    def snapshot(self):
+        """Resumo de cada operação, da que consumiu mais tempo para a que consumiu menos."""
+        with self._lock:
+            items = sorted(self.operations.items(), key=lambda item: item[1].total, reverse=True)
+            return [
+                {"operation": name, "count": stats.count, "failures": stats.failures,
+                 "exceptions": stats.exceptions, "error_rate": stats.error_rate,
+                 "p50_ms": stats.quantile(0.5) * 1000, "p95_ms": stats.quantile(0.95) * 1000,
+                 "max_ms": stats.max * 1000, "total_ms": stats.total * 1000}
+                for name, stats in items
+            ]
+
+    def reset(self):
+        with self._lock:
+            self.operations.clear()
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP minisis_operation_duration_seconds Latência das operações da camada de serviço.",
+            "# TYPE minisis_operation_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self.operations.items())
+            for name, stats in items:
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'minisis_operation_duration_seconds_bucket{{operation="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'minisis_operation_duration_seconds_bucket{{operation="{label}",le="+Inf"}} {stats.count}')
+                lines.append(f'minisis_operation_duration_seconds_sum{{operation="{label}"}} {stats.total}')
+                lines.append(f'minisis_operation_duration_seconds_count{{operation="{label}"}} {stats.count}')
+            lines.append("# HELP minisis_operation_failures_total Chamadas que devolveram falha.")
+            lines.append("# TYPE minisis_operation_failures_total counter")
+            for name, stats in items:
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'minisis_operation_failures_total{{operation="{label}"}} {stats.failures}')
+            lines.append("# HELP minisis_operation_exceptions_total Chamadas que levantaram exceção.")
+            lines.append("# TYPE minisis_operation_exceptions_total counter")
+            for name, stats in items:
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'minisis_operation_exceptions_total{{operation="{label}"}} {stats.exceptions}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+registry = MetricsRegistry()
+
+def _is_failure(result):
+    if isinstance(result, dict):
+        return result.get("success") is False
+    if isinstance(result, tuple) and result:
+        return result[0] is False
+    return result is False
+
+def timed(func):
+    """Registra latência, falhas e exceções de cada chamada de func no registry."""
+    qualname = func.__qualname__
+    name = qualname if "." in qualname else f"{func.__module__.rsplit('.', 1)[-1]}.{qualname}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            registry.observe(name, time.perf_counter() - start, raised=True)
+            raise
+        registry.observe(name, time.perf_counter() - start, failed=_is_failure(result))
+        return result
+    return wrapper
+
+def timed_service(cls):
+    """Decorador de classe: aplica timed a todos os métodos públicos do serviço."""
+    for attr_name, attr in list(vars(cls).items()):
+        if not attr_name.startswith("_") and callable(attr):
+            setattr(cls, attr_name, timed(attr))
+    return cls
+
+_metrics_file = os.environ.get("MINISIS_METRICS_FILE")
+if _metrics_file:
+    atexit.register(registry.write_prometheus, _metrics_file)
@@ -0,0 +1,103 @@
+# app/diagnostics/ui_diagnostics_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTabWidget, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QFileDialog
+)
+from PySide6.QtCore import Qt
+from app.database.db import get_db_manager
+from app.diagnostics.metrics import registry
+from app.utils.ui_utils import NumericTableWidgetItem, show_error_message, show_success_message
+
+class DiagnosticsWindow(QWidget):
+    OPERATION_HEADERS = ["Operação", "Chamadas", "Falhas", "Exceções", "Taxa de Erro (%)", "p50 (ms)", "p95 (ms)", "Máx. (ms)", "Total (ms)"]
+    OPERATION_KEYS = ["operation", "count", "failures", "exceptions", "error_rate", "p50_ms", "p95_ms", "max_ms", "total_ms"]
+    QUERY_HEADERS = ["Origem", "Comando", "Execuções", "Linhas", "Média (ms)", "Máx. (ms)", "Total (ms)"]
+    QUERY_KEYS = ["call_site", "sql", "count", "rows", "avg_ms", "max_ms", "total_ms"]
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle("Diagnóstico de Desempenho")
+        self.setGeometry(200, 200, 1000, 600)
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Atualizar")
+        refresh_button.clicked.connect(self.refresh)
+        reset_button = QPushButton("Zerar")
+        reset_button.clicked.connect(self.reset)
+        export_button = QPushButton("Exportar Prometheus")
+        export_button.clicked.connect(self.export_prometheus)
+        button_layout.addWidget(refresh_button)
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(export_button)
+        self.main_layout.addLayout(button_layout)
+
+        self.tabs = QTabWidget()
+        self.operations_table = self._create_table(self.OPERATION_HEADERS, 0)
+        self.queries_table = self._create_table(self.QUERY_HEADERS, 1)
+        self.tabs.addTab(self.operations_table, "Operações")
+        self.tabs.addTab(self.queries_table, "Consultas SQL")
+        self.main_layout.addWidget(self.tabs)
+
+    def _create_table(self, headers, stretch_column):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.setSortingEnabled(True)
+        table.setStyleSheet("QTableView::item:selected { background-color: #D3D3D3; color: black; }")
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(stretch_column, QHeaderView.Stretch)
+        return table
+
+    def _fill_table(self, table, rows, keys):
+        table.setSortingEnabled(False)
+        table.setRowCount(0)
+        for data in rows:
+            row = table.rowCount()
+            table.insertRow(row)
+            for col, key in enumerate(keys):
+                value = data[key]
+                if key == "error_rate":
+                    table.setItem(row, col, NumericTableWidgetItem(f"{value * 100:.1f}"))
+                elif isinstance(value, float):
+                    table.setItem(row, col, NumericTableWidgetItem(f"{value:.3f}"))
+                elif isinstance(value, int):
+                    table.setItem(row, col, NumericTableWidgetItem(str(value)))
+                else:
+                    table.setItem(row, col, QTableWidgetItem(value))
+        table.setSortingEnabled(True)
+
+    def refresh(self):
+        self._fill_table(self.operations_table, registry.snapshot(), self.OPERATION_KEYS)
+        profiler = get_db_manager().profiler
+        self.queries_table.setEnabled(profiler is not None)
+        self.queries_table.setToolTip("" if profiler else "Instrumentação de SQL desligada. Inicie com MINISIS_SQL_INSTRUMENTATION=1.")
+        self.tabs.setTabText(1, "Consultas SQL" if profiler else "Consultas SQL (desligado)")
+        self._fill_table(self.queries_table, profiler.top(100) if profiler else [], self.QUERY_KEYS)
+
+    def reset(self):
+        registry.reset()
+        profiler = get_db_manager().profiler
+        if profiler:
+            profiler.reset()
+        self.refresh()
+
+    def export_prometheus(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exportar Métricas", "minisis_metrics.prom", "Prometheus (*.prom *.txt)")
+        if not file_path:
+            return
+        try:
+            registry.write_prometheus(file_path)
+            show_success_message(self, "Sucesso", f"Métricas exportadas para {file_path}.")
+        except OSError as e:
+            show_error_message(self, "Erro", f"Não foi possível gravar as métricas: {e}")
@@ -0,0 +1,178 @@
+# app/export/export_service.py
+import csv
+import os
+from app.database.db import get_db_manager
+from app.item.item_repository import ItemRepository
+from app.production import order_operations
+from app.reports.report_repository import ReportRepository
+from app.sales.sale_repository import SaleRepository
+from app.stock.stock_repository import StockRepository
+from app.supplier.supplier_repository import SupplierRepository
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Parquet/Arrow são opcionais
+    pyarrow = None
+
+CHUNK_SIZE = 1000
+
+class ExportService:
+    """
+    Exporta o resultado das consultas das listagens e relatórios para arquivo,
+    lendo em blocos com cursor.fetchmany para manter a memória constante.
+    """
+
+    def __init__(self):
+        self.db_manager = get_db_manager()
+        stock_repository = StockRepository()
+        report_repository = ReportRepository()
+        # Cada fonte recebe os mesmos filtros da listagem e devolve (query, params)
+        self.sources = {
+            "ops": order_operations.list_ops_query,
+            "entries": stock_repository.list_entries_query,
+            "movements": stock_repository.movements_query,
+            "sales": SaleRepository().list_sales_query,
+            "items": ItemRepository().search_query,
+            "suppliers": SupplierRepository().search_query,
+            "stock_valuation": report_repository.stock_valuation_query,
+            "consumption": report_repository.consumption_query,
+            "sales_margin": report_repository.sales_margin_query,
+        }
+
+    def available_formats(self):
+        formats = ["csv"]
+        if pyarrow is not None:
+            formats += ["parquet", "arrow"]
+        return formats
+
+    def export(self, source, file_path, file_format="csv", progress_callback=None, filters=None):
+        """
+        Exporta uma fonte registrada. filters são repassados ao construtor da consulta
+        (os mesmos argumentos da listagem). progress_callback(linhas_escritas) é chamado a
+        cada bloco gravado; o total não é contado antes para não executar a consulta duas vezes.
+        """
+        if source not in self.sources:
+            return {"success": False, "message": f"Fonte de exportação desconhecida: {source}"}
+
+        try:
+            query, params = self.sources[source](**(filters or {}))
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao montar a consulta de exportação: {e}"}
+        if query is None:
+            return {"success": False, "message": "A pesquisa informada não possui resultados para exportar."}
+        return self.export_query(query, params, file_path, file_format, progress_callback)
+
+    def export_query(self, query, params, file_path, file_format="csv", progress_callback=None, chunk_size=CHUNK_SIZE):
+        if file_format not in self.available_formats():
+            return {"success": False, "message": f"Formato '{file_format}' indisponível. Instale o pacote pyarrow para Parquet/Arrow."}
+
+        conn = self.db_manager.get_connection()
+        # Grava num arquivo temporário ao lado do destino e só o substitui no fim: um erro
+        # não deixa arquivo parcial nem apaga o arquivo que já existia no destino
+        temp_path = file_path + ".tmp"
+        try:
+            cursor = conn.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+
+            if file_format == "csv":
+                written = self._write_csv(cursor, columns, temp_path, chunk_size, progress_callback)
+            else:
+                written = self._write_arrow(cursor, columns, temp_path, file_format, chunk_size, progress_callback)
+            os.replace(temp_path, file_path)
+            return {"success": True, "data": written, "message": f"{written} registros exportados para {os.path.basename(file_path)}."}
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return {"success": False, "message": f"Erro ao exportar: {e}"}
+
+    def _write_csv(self, cursor, columns, file_path, chunk_size, progress_callback):
+        written = 0
+        # utf-8-sig e ';' para abrir corretamente no Excel em português
+        with open(file_path, "w", newline="", encoding="utf-8-sig") as file:
+            writer = csv.writer(file, delimiter=";")
+            writer.writerow(columns)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                written += len(rows)
+                if progress_callback:
+                    progress_callback(written)
+        return written
+
+    def _write_arrow(self, cursor, columns, file_path, file_format, chunk_size, progress_callback):
+        written = 0
+        writer = None
+        schema = None
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if schema is None:
+                    schema = self._infer_schema(columns, rows)
+                batch = self._record_batch(rows, schema)
+                if writer is None:
+                    if file_format == "parquet":
+                        writer = pyarrow.parquet.ParquetWriter(file_path, schema)
+                    else:
+                        writer = pyarrow.ipc.new_file(file_path, schema)
+                if file_format == "parquet":
+                    writer.write_batch(batch)
+                else:
+                    writer.write(batch)
+                written += len(rows)
+                if progress_callback:
+                    progress_callback(written)
+
+            if writer is None:
+                # Consulta sem linhas: grava um arquivo vazio só com as colunas
+                schema = pyarrow.schema([(name, pyarrow.string()) for name in columns])
+                if file_format == "parquet":
+                    writer = pyarrow.parquet.ParquetWriter(file_path, schema)
+                else:
+                    writer = pyarrow.ipc.new_file(file_path, schema)
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
+    def _infer_schema(self, columns, rows):
+        """
+        Define o tipo de cada coluna pelo primeiro bloco; colunas só com NULL viram texto.
+        O SQLite não tem tipo fixo por coluna: uma quantidade pode vir inteira nas primeiras
+        linhas e fracionária depois. Por isso só as chaves (ID, ID_*) ficam inteiras; as
+        demais colunas numéricas são gravadas como float64.
+        """
+        fields = []
+        for index, name in enumerate(columns):
+            arrow_type = pyarrow.string()
+            for row in rows:
+                value = row[index]
+                if value is None:
+                    continue
+                if isinstance(value, int) and self._is_key(name):
+                    arrow_type = pyarrow.int64()
+                elif isinstance(value, (int, float)):
+                    arrow_type = pyarrow.float64()
+                break
+            fields.append((name, arrow_type))
+        return pyarrow.schema(fields)
+
+    def _is_key(self, column):
+        name = column.upper()
+        return name == "ID" or name.startswith("ID_")
+
+    def _record_batch(self, rows, schema):
+        arrays = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in rows]
+            if pyarrow.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            elif pyarrow.types.is_floating(field.type):
+                values = [None if value is None else float(value) for value in values]
+            arrays.append(pyarrow.array(values, type=field.type))
+        return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
@@ -0,0 +1,42 @@
+# app/export/ui_export.py
+from PySide6.QtWidgets import QApplication, QFileDialog, QProgressDialog
+from PySide6.QtCore import Qt
+from app.export.export_service import ExportService
+from app.utils.ui_utils import show_error_message, show_success_message
+
+FILE_FILTERS = {
+    "csv": "CSV (*.csv)",
+    "parquet": "Parquet (*.parquet)",
+    "arrow": "Arrow (*.arrow)",
+}
+
+def export_with_dialog(parent, source, default_name, filters=None):
+    """Pergunta o arquivo de destino e exporta a fonte com uma barra de progresso."""
+    export_service = ExportService()
+    formats = export_service.available_formats()
+    file_path, selected_filter = QFileDialog.getSaveFileName(
+        parent, "Exportar", f"{default_name}.csv", ";;".join(FILE_FILTERS[fmt] for fmt in formats)
+    )
+    if not file_path:
+        return
+
+    file_format = next((fmt for fmt in formats if FILE_FILTERS[fmt] == selected_filter), "csv")
+    if not file_path.lower().endswith(f".{file_format}"):
+        file_path += f".{file_format}"
+
+    # O total não é conhecido antes de terminar: a barra fica indeterminada e o texto mostra as linhas gravadas
+    progress = QProgressDialog("Exportando registros...", None, 0, 0, parent)
+    progress.setWindowTitle("Exportar")
+    progress.setWindowModality(Qt.WindowModal)
+    progress.setMinimumDuration(500)
+
+    def on_progress(written):
+        progress.setLabelText(f"{written} registros exportados...")
+        QApplication.processEvents()
+
+    response = export_service.export(source, file_path, file_format, on_progress, filters)
+    progress.close()
+    if response["success"]:
+        show_success_message(parent, "Exportar", response["message"])
+    else:
+        show_error_message(parent, "Erro", response["message"])
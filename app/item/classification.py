@@ -0,0 +1,173 @@
+# app/item/classification.py
+"""
+Classificação ABC/XYZ dos itens (tabela CLASSIFICACAO_ITEM).
+
+ABC: os itens são ordenados pelo valor consumido no período (saídas por OP, ao custo do
+consumo, mais vendas, ao custo da venda, dos resumos diários). São A os que, somados
+aos anteriores, formam até LIMIT_A do valor total, B até LIMIT_B e C o restante;
+itens sem consumo são C.
+
+XYZ: coeficiente de variação (desvio padrão / média) da quantidade semanal no período,
+com zero nas semanas sem consumo: X até LIMIT_X, Y até LIMIT_Y e Z acima disso ou sem
+consumo.
+
+O cálculo é um único INSERT ... SELECT com funções de janela. Como a classe ABC de
+um item depende de todos os outros, cada atualização recalcula o catálogo inteiro;
+o agendador só recalcula quando há movimento novo desde a última execução ou quando
+o período mudou de dia (ver refresh_classification).
+
+Variáveis de ambiente do agendador iniciado pelo main.py:
+    MINISIS_CLASSIFICACAO_INTERVAL_HOURS   intervalo entre verificações (padrão 6; 0 desliga)
+    MINISIS_CLASSIFICACAO_DIAS             período analisado em dias (padrão 365)
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from app.database.db import get_db_manager
+
+LIMIT_A = 0.80
+LIMIT_B = 0.95
+LIMIT_X = 0.5
+LIMIT_Y = 1.0
+DEFAULT_DAYS = 365
+DEFAULT_INTERVAL_HOURS = 6
+
+CLASSIFY_QUERY = """
+    WITH DIARIO AS (
+        SELECT ID_ITEM, DATA, QUANTIDADE, VALOR FROM RESUMO_CONSUMO_DIARIO WHERE DATA >= :inicio
+        UNION ALL
+        SELECT ID_PRODUTO, DATA, QUANTIDADE, CUSTO FROM RESUMO_VENDAS_DIARIO WHERE DATA >= :inicio
+    ),
+    SEMANAL AS (
+        SELECT ID_ITEM, CAST((julianday(DATA) - julianday(:inicio)) / 7 AS INTEGER) AS SEMANA,
+               SUM(QUANTIDADE) AS QUANTIDADE, SUM(VALOR) AS VALOR
+        FROM DIARIO GROUP BY ID_ITEM, SEMANA
+    ),
+    POR_ITEM AS (
+        SELECT I.ID, COALESCE(SUM(S.VALOR), 0) AS VALOR,
+               COALESCE(SUM(S.QUANTIDADE), 0) / :semanas AS MEDIA,
+               COALESCE(SUM(S.QUANTIDADE * S.QUANTIDADE), 0) / :semanas AS QUADRADOS
+        FROM ITEM I LEFT JOIN SEMANAL S ON S.ID_ITEM = I.ID
+        GROUP BY I.ID
+    ),
+    ACUMULADO AS (
+        SELECT ID, VALOR, MEDIA, QUADRADOS,
+               SUM(VALOR) OVER (ORDER BY VALOR DESC, ID ROWS UNBOUNDED PRECEDING) AS ACUMULADO,
+               SUM(VALOR) OVER () AS TOTAL
+        FROM POR_ITEM
+    ),
+    INDICES AS (
+        SELECT ID, VALOR,
+               CASE WHEN TOTAL > 0 THEN ACUMULADO / TOTAL END AS PARTICIPACAO,
+               CASE WHEN TOTAL > 0 THEN (ACUMULADO - VALOR) / TOTAL END AS ANTERIOR,
+               CASE WHEN MEDIA > 0 THEN sqrt(max(QUADRADOS - MEDIA * MEDIA, 0)) / MEDIA END AS CV
+        FROM ACUMULADO
+    )
+    INSERT INTO CLASSIFICACAO_ITEM (ID_ITEM, CLASSE_ABC, CLASSE_XYZ, VALOR_CONSUMO, PARTICIPACAO_ACUMULADA, COEFICIENTE_VARIACAO)
+    SELECT ID,
+           CASE WHEN VALOR <= 0 THEN 'C' WHEN ANTERIOR < :limite_a THEN 'A' WHEN ANTERIOR < :limite_b THEN 'B' ELSE 'C' END,
+           CASE WHEN CV IS NULL THEN 'Z' WHEN CV <= :limite_x THEN 'X' WHEN CV <= :limite_y THEN 'Y' ELSE 'Z' END,
+           VALOR, PARTICIPACAO, CV
+    FROM INDICES
+"""
+
+def _ensure_sqrt(connection):
+    # sqrt só existe no SQLite compilado com as funções matemáticas
+    try:
+        connection.execute("SELECT sqrt(1)")
+    except sqlite3.OperationalError:
+        connection.create_function("sqrt", 1, math.sqrt, deterministic=True)
+
+def _last_movement(connection):
+    row = connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'MOVIMENTO'").fetchone()
+    return row[0] if row else 0
+
+def refresh_classification(connection=None, days=DEFAULT_DAYS, force=False):
+    """
+    Recalcula a classificação dos últimos `days` dias. Sem force, não faz nada se a última
+    execução foi hoje, com o mesmo período, e nenhum movimento foi gravado desde então.
+    Devolve o número de itens classificados, ou None se não houve recálculo.
+    """
+    connection = connection or get_db_manager().get_connection()
+    today = date.today()
+    start = today - timedelta(days=days)
+    last_movement = _last_movement(connection)
+    if not force:
+        last = connection.execute(
+            "SELECT DATA_INICIO, ULTIMO_MOVIMENTO FROM CLASSIFICACAO_EXECUCAO ORDER BY ID DESC LIMIT 1"
+        ).fetchone()
+        if last and last[0] == start.isoformat() and last[1] == last_movement:
+            return None
+
+    _ensure_sqrt(connection)
+    with connection:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM CLASSIFICACAO_ITEM")
+        cursor.execute(CLASSIFY_QUERY, {
+            "inicio": start.isoformat(), "semanas": math.ceil((days + 1) / 7),
+            "limite_a": LIMIT_A, "limite_b": LIMIT_B, "limite_x": LIMIT_X, "limite_y": LIMIT_Y,
+        })
+        # rowcount não vale para comandos que começam por WITH
+        classified = cursor.execute("SELECT changes()").fetchone()[0]
+        cursor.execute(
+            "INSERT INTO CLASSIFICACAO_EXECUCAO (DATA_EXECUCAO, DATA_INICIO, ULTIMO_MOVIMENTO, ITENS) VALUES (?, ?, ?, ?)",
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), start.isoformat(), last_movement, classified)
+        )
+    return classified
+
+def get_summary(connection=None):
+    """Quantidade de itens e valor consumido por classe ABC/XYZ, com a data da última execução."""
+    connection = connection or get_db_manager().get_connection()
+    rows = connection.execute("""
+        SELECT CLASSE_ABC, CLASSE_XYZ, COUNT(*) AS ITENS, SUM(VALOR_CONSUMO) AS VALOR
+        FROM CLASSIFICACAO_ITEM GROUP BY CLASSE_ABC, CLASSE_XYZ ORDER BY CLASSE_ABC, CLASSE_XYZ
+    """).fetchall()
+    last = connection.execute("SELECT MAX(DATA_EXECUCAO) FROM CLASSIFICACAO_EXECUCAO").fetchone()[0]
+    return {"classes": [dict(row) for row in rows], "last_run": last}
+
+class ClassificationScheduler:
+    """Thread em segundo plano que verifica a classificação a cada interval_hours, com conexão própria."""
+
+    def __init__(self, interval_hours=DEFAULT_INTERVAL_HOURS, days=DEFAULT_DAYS):
+        self.interval = interval_hours * 3600
+        self.days = days
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_environment(cls):
+        """Agendador configurado pelas variáveis MINISIS_CLASSIFICACAO_*; None se o intervalo for 0."""
+        interval = float(os.environ.get("MINISIS_CLASSIFICACAO_INTERVAL_HOURS", DEFAULT_INTERVAL_HOURS))
+        if interval <= 0:
+            return None
+        return cls(interval, int(os.environ.get("MINISIS_CLASSIFICACAO_DIAS", DEFAULT_DAYS)))
+
+    def _loop(self):
+        connection = get_db_manager().open_connection()
+        try:
+            # A primeira verificação sai logo; as seguintes a cada intervalo
+            while True:
+                try:
+                    classified = refresh_classification(connection, self.days)
+                    if classified is not None:
+                        logging.info(f"Classificação ABC/XYZ atualizada: {classified} itens.")
+                except sqlite3.Error as e:
+                    logging.warning(f"Falha ao atualizar a classificação ABC/XYZ: {e}")
+                if self._stop.wait(self.interval):
+                    break
+        finally:
+            connection.close()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="classificacao-agendador", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -1,10 +1,30 @@
 # app/item/item_repository.py
 from app.database.db import get_db_manager
+from app.database.records import fetch_records
 
 class ItemRepository:
+    # Colunas que podem ser projetadas nas buscas de itens
+    SEARCH_COLUMNS = {
+        "ID": "i.ID",
+        "CODIGO_INTERNO": "i.CODIGO_INTERNO",
+        "DESCRICAO": "i.DESCRICAO",
+        "TIPO_ITEM": "i.TIPO_ITEM",
+        "SIGLA": "u.SIGLA",
+        "SALDO_ESTOQUE": "i.SALDO_ESTOQUE",
+        "CUSTO_MEDIO": "i.CUSTO_MEDIO",
+        "ID_FORNECEDOR_PADRAO": "i.ID_FORNECEDOR_PADRAO",
+        "CLASSE": "COALESCE(c.CLASSE_ABC || c.CLASSE_XYZ, '') AS CLASSE",
+    }
+    DEFAULT_SEARCH_COLUMNS = ("ID", "CODIGO_INTERNO", "DESCRICAO", "TIPO_ITEM", "SIGLA", "SALDO_ESTOQUE", "CUSTO_MEDIO")
+    SEARCHABLE_FIELDS = {"DESCRICAO": "DESCRICAO", "CODIGO_INTERNO": "CODIGO_INTERNO", "TIPO_ITEM": "TIPO_ITEM"}
+
     def __init__(self):
         self.db_manager = get_db_manager()
-        self.connection = self.db_manager.get_connection()
+
+    @property
+    def connection(self):
+        # Resolvida a cada uso para respeitar a conexão da thread (servidor da API)
+        return self.db_manager.get_connection()
 
     def add(self, codigo_interno, description, item_type, unit_id, id_fornecedor_padrao):
         cursor = self.connection.cursor()
@@ -19,15 +39,8 @@ class ItemRepository:
             self.connection.rollback()
             return None
 
-    def get_all(self):
-        cursor = self.connection.cursor()
-        cursor.execute("""
-            SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA, i.SALDO_ESTOQUE, i.CUSTO_MEDIO
-            FROM ITEM i
-            JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
-            ORDER BY i.DESCRICAO
-        """)
-        return cursor.fetchall()
+    def get_all(self, item_types=None, only_in_stock=False, columns=None):
+        return self.search(None, None, item_types=item_types, only_in_stock=only_in_stock, columns=columns)
 
     def get_by_id(self, item_id):
         cursor = self.connection.cursor()
@@ -65,12 +78,12 @@ class ItemRepository:
 
     def is_item_in_production_order(self, item_id):
         cursor = self.connection.cursor()
-        cursor.execute("SELECT 1 FROM ORDEMPRODUCAO_ITENS WHERE ID_PRODUTO = ?", (item_id,))
+        cursor.execute("SELECT 1 FROM ORDEMPRODUCAO_ITENS_HISTORICO WHERE ID_PRODUTO = ?", (item_id,))
         return cursor.fetchone() is not None
 
     def has_stock_movement(self, item_id):
         cursor = self.connection.cursor()
-        cursor.execute("SELECT 1 FROM MOVIMENTO WHERE ID_ITEM = ?", (item_id,))
+        cursor.execute("SELECT 1 FROM MOVIMENTO_HISTORICO WHERE ID_ITEM = ?", (item_id,))
         return cursor.fetchone() is not None
 
     def has_composition(self, item_id):
@@ -78,20 +91,47 @@ class ItemRepository:
         cursor.execute("SELECT 1 FROM COMPOSICAO WHERE ID_PRODUTO = ?", (item_id,))
         return cursor.fetchone() is not None
 
-    def search(self, search_type, search_text):
+    def search(self, search_type, search_text, item_types=None, only_in_stock=False, columns=None):
+        """
+        Busca itens aplicando todos os filtros no SQL.
+        item_types restringe TIPO_ITEM (ex.: ['Insumo', 'Ambos']), only_in_stock traz apenas
+        itens com saldo positivo e columns permite projetar só as colunas necessárias.
+        """
         cursor = self.connection.cursor()
-        query = "SELECT i.ID, i.CODIGO_INTERNO, i.DESCRICAO, i.TIPO_ITEM, u.SIGLA, i.SALDO_ESTOQUE, i.CUSTO_MEDIO FROM ITEM i JOIN UNIDADE u ON i.ID_UNIDADE = u.ID"
-        
-        if search_type == "ID":
-            query += " WHERE i.ID = ?"
-            params = (search_text,)
-        else:
-            query += f" WHERE i.{search_type} LIKE ?"
-            params = (f"%{search_text}%",)
-            
-        query += " ORDER BY i.DESCRICAO"
+        query, params = self.search_query(search_type, search_text, item_types, only_in_stock, columns)
         cursor.execute(query, params)
-        return cursor.fetchall()
+        return fetch_records(cursor)
+
+    def search_query(self, search_type=None, search_text=None, item_types=None, only_in_stock=False, columns=None):
+        """Monta a consulta de busca de itens usada por search/get_all."""
+        selected = [self.SEARCH_COLUMNS[col] for col in (columns or self.DEFAULT_SEARCH_COLUMNS) if col in self.SEARCH_COLUMNS]
+        if not selected:
+            selected = [self.SEARCH_COLUMNS[col] for col in self.DEFAULT_SEARCH_COLUMNS]
+        query = f"SELECT {', '.join(selected)} FROM ITEM i JOIN UNIDADE u ON i.ID_UNIDADE = u.ID"
+        if columns and "CLASSE" in columns:
+            # Classificação ABC/XYZ (ver app/item/classification.py)
+            query += " LEFT JOIN CLASSIFICACAO_ITEM c ON c.ID_ITEM = i.ID"
+
+        conditions = []
+        params = []
+        if search_text:
+            if search_type == "ID":
+                conditions.append("i.ID = ?")
+                params.append(search_text)
+            else:
+                column = self.SEARCHABLE_FIELDS.get(search_type, "DESCRICAO")
+                conditions.append(f"i.{column} LIKE ?")
+                params.append(f"%{search_text}%")
+        if item_types:
+            conditions.append(f"i.TIPO_ITEM IN ({', '.join('?' for _ in item_types)})")
+            params.extend(item_types)
+        if only_in_stock:
+            conditions.append("i.SALDO_ESTOQUE > 0")
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY i.DESCRICAO"
+        return query, tuple(params)
         
     def update_stock_and_cost(self, item_id, new_balance, new_average_cost):
         cursor = self.connection.cursor()
@@ -1,6 +1,8 @@
 # app/item/service.py
 from app.item.item_repository import ItemRepository
+from app.diagnostics.metrics import timed_service
 
+@timed_service
 class ItemService:
     def __init__(self):
         self.item_repository = ItemRepository()
@@ -18,9 +20,9 @@ class ItemService:
         except Exception as e:
             return {"success": False, "message": f"Erro ao adicionar item: {e}"}
 
-    def get_all_items(self):
+    def get_all_items(self, item_types=None, only_in_stock=False, columns=None):
         try:
-            items = self.item_repository.get_all()
+            items = self.item_repository.get_all(item_types, only_in_stock, columns)
             return {"success": True, "data": items}
         except Exception as e:
             return {"success": False, "message": f"Erro ao buscar itens: {e}"}
@@ -72,9 +74,9 @@ class ItemService:
         except Exception as e:
             return {"success": False, "message": f"Erro no banco de dados ao tentar excluir o item: {e}"}
 
-    def search_items(self, search_type, search_text):
+    def search_items(self, search_type, search_text, item_types=None, only_in_stock=False, columns=None):
         try:
-            items = self.item_repository.search(search_type, search_text)
+            items = self.item_repository.search(search_type, search_text, item_types, only_in_stock, columns)
             return {"success": True, "data": items}
         except Exception as e:
             return {"success": False, "message": f"Erro ao buscar itens: {e}"}
@@ -9,18 +9,21 @@ from PySide6.QtGui import QStandardItemModel, QStandardItem
 from app.item.service import ItemService
 from app.utils.ui_utils import show_error_message
 
+# Colunas padrão da busca mais a classe ABC/XYZ
+SEARCH_COLUMNS = ("ID", "CODIGO_INTERNO", "DESCRICAO", "TIPO_ITEM", "SIGLA", "SALDO_ESTOQUE", "CUSTO_MEDIO", "CLASSE")
 
 class ItemSearchWindow(QWidget):
     # Sinal que emitirá os dados do item selecionado
     item_selected = Signal(dict)
     
-    def __init__(self, selection_mode=False, item_type_filter=None):
+    def __init__(self, selection_mode=False, item_type_filter=None, only_in_stock=False):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.item_service = ItemService()
         self.edit_window = None # Para manter referência da janela de edição
         self.selection_mode = selection_mode
         self.item_type_filter = item_type_filter # Lista de tipos de item a exibir
+        self.only_in_stock = only_in_stock # Exibe apenas itens com saldo em estoque
         
         title = "Selecionar Insumo" if selection_mode else "Pesquisa de Produto"
         self.setWindowTitle(title)
@@ -54,10 +57,15 @@ class ItemSearchWindow(QWidget):
         new_button = QPushButton("Novo Item")
         new_button.clicked.connect(self.open_new_item_window)
 
+        export_button = QPushButton("Exportar")
+        export_button.clicked.connect(self.export_items)
+
         search_layout.addWidget(self.search_field_combo)
         search_layout.addWidget(self.search_text, 1) # O campo de texto se expande
         search_layout.addWidget(search_button)
         search_layout.addWidget(new_button)
+        if not self.selection_mode:
+            search_layout.addWidget(export_button)
         search_group.setLayout(search_layout)
         
         self.main_layout.addWidget(search_group)
@@ -68,7 +76,7 @@ class ItemSearchWindow(QWidget):
 
         self.table_view = QTableView()
         self.table_model = QStandardItemModel()
-        self.table_model.setHorizontalHeaderLabels(["ID", "Descrição", "Código Interno", "Tipo", "Un.", "Quantidade", "Custo Unit."])
+        self.table_model.setHorizontalHeaderLabels(["ID", "Descrição", "Código Interno", "Tipo", "Un.", "Quantidade", "Custo Unit.", "Classe"])
         self.table_view.setModel(self.table_model)
         header = self.table_view.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeToContents)
@@ -98,20 +106,17 @@ class ItemSearchWindow(QWidget):
                 "ID": "ID"
             }
             search_type = search_type_map.get(search_type_text, "DESCRICAO")
-            response = self.item_service.search_items(search_type, search_content)
+            response = self.item_service.search_items(search_type, search_content, self.item_type_filter,
+                                                      self.only_in_stock, SEARCH_COLUMNS)
         else:
-            response = self.item_service.get_all_items()
+            response = self.item_service.get_all_items(self.item_type_filter, self.only_in_stock, SEARCH_COLUMNS)
 
         if not response["success"]:
             show_error_message(self, "Error", response["message"])
             return
 
-        # Aplica o filtro de tipo de item, se existir
-        items = response["data"]
-        if self.item_type_filter:
-            items = [item for item in items if item['TIPO_ITEM'] in self.item_type_filter]
-            
-        for item in items:
+        # Os filtros de tipo e de estoque já são aplicados na consulta
+        for item in response["data"]:
             id_item = QStandardItem()
             id_item.setData(item['ID'], 0)
 
@@ -128,26 +133,34 @@ class ItemSearchWindow(QWidget):
                 QStandardItem(item['TIPO_ITEM']),
                 QStandardItem(item['SIGLA'].upper()),
                 qty_item,
-                cost_item
+                cost_item,
+                QStandardItem(item['CLASSE'])
             ]
             # Adiciona a linha à tabela primeiro
             self.table_model.appendRow(row)
-            # Agora que a linha existe, podemos adicionar o dado extra
+            # Agora que a linha existe, guarda o próprio registro; a cópia em dict só é feita na seleção
             row_index = self.table_model.rowCount() - 1
-            full_item_data = {
-                'ID': item['ID'],
-                'DESCRICAO': item['DESCRICAO'],
-                'TIPO_ITEM': item['TIPO_ITEM'],
-                'SIGLA': item['SIGLA'],
-                'SALDO_ESTOQUE': item['SALDO_ESTOQUE'],
-                'CUSTO_MEDIO': item['CUSTO_MEDIO']
-            }
-            self.table_model.item(row_index, 0).setData(full_item_data)
+            self.table_model.item(row_index, 0).setData(item)
+
+    def export_items(self):
+        from app.export.ui_export import export_with_dialog
+        search_type_map = {
+            "Descrição": "DESCRICAO",
+            "Código Interno": "CODIGO_INTERNO",
+            "Tipo": "TIPO_ITEM",
+            "ID": "ID"
+        }
+        export_with_dialog(self, "items", "itens", {
+            "search_type": search_type_map.get(self.search_field_combo.currentText(), "DESCRICAO"),
+            "search_text": self.search_text.text(),
+            "item_types": self.item_type_filter,
+            "only_in_stock": self.only_in_stock
+        })
 
     def handle_double_click(self, model_index):
         if self.selection_mode:
             item_data = self.table_model.item(model_index.row(), 0).data()
-            self.item_selected.emit(item_data)
+            self.item_selected.emit(dict(item_data))
             self.close()
         else:
             self.open_edit_item_window(model_index)
@@ -4,7 +4,11 @@ from app.database.db import get_db_manager
 class UnitRepository:
     def __init__(self):
         self.db_manager = get_db_manager()
-        self.connection = self.db_manager.get_connection()
+
+    @property
+    def connection(self):
+        # Resolvida a cada uso para respeitar a conexão da thread (servidor da API)
+        return self.db_manager.get_connection()
 
     def add(self, name, abbreviation):
         cursor = self.connection.cursor()
@@ -1,6 +1,8 @@
 # app/item/unit_service.py
 from app.item.unit_repository import UnitRepository
+from app.diagnostics.metrics import timed_service
 
+@timed_service
 class UnitService:
     def __init__(self):
         self.unit_repository = UnitRepository()
@@ -0,0 +1,117 @@
+# app/lot/lot_repository.py
+from app.database.db import get_db_manager
+from app.database.records import fetch_records
+
+# Limite de níveis da genealogia, para o caso de um ciclo (item 'Ambos' que entra na própria composição)
+MAX_DEPTH = 50
+
+# Lotes alcançados a partir de :lote seguindo a genealogia para frente (origem -> destino)
+DESCENDANTS = f"""
+    WITH RECURSIVE ARVORE (ID_LOTE, NIVEL) AS (
+        SELECT :lote, 0
+        UNION
+        SELECT G.ID_LOTE_DESTINO, A.NIVEL + 1
+        FROM ARVORE A JOIN LOTE_GENEALOGIA G ON G.ID_LOTE_ORIGEM = A.ID_LOTE
+        WHERE A.NIVEL < {MAX_DEPTH}
+    )
+"""
+
+# Lotes de que os lotes iniciais ({seed}) foram feitos, seguindo a genealogia para trás (destino -> origem)
+ANCESTORS = f"""
+    WITH RECURSIVE ARVORE (ID_LOTE, NIVEL) AS (
+        {{seed}}
+        UNION
+        SELECT G.ID_LOTE_ORIGEM, A.NIVEL + 1
+        FROM ARVORE A JOIN LOTE_GENEALOGIA G ON G.ID_LOTE_DESTINO = A.ID_LOTE
+        WHERE A.NIVEL < {MAX_DEPTH}
+    )
+"""
+SEED_LOT = "SELECT :lote, 0"
+SEED_SALE = "SELECT ID_LOTE, 0 FROM LOTE_SAIDA WHERE ID_SAIDA = :saida"
+
+# Cada lote da árvore uma vez, no menor nível em que aparece, com o item e o documento de origem
+TREE_LOTS = """
+    SELECT L.ID, MIN(A.NIVEL) AS NIVEL, L.NUMERO, L.ID_ITEM, I.DESCRICAO, I.TIPO_ITEM, L.DATA_CRIACAO,
+           L.QUANTIDADE, L.SALDO, L.ID_ENTRADA, L.ID_ORDEM_PRODUCAO
+    FROM ARVORE A
+    JOIN LOTE L ON L.ID = A.ID_LOTE
+    JOIN ITEM I ON I.ID = L.ID_ITEM
+    GROUP BY L.ID
+    ORDER BY NIVEL, L.ID
+"""
+
+# Entradas de nota que trouxeram os lotes da árvore (um lote pode ter vindo em várias notas)
+ENTRIES_QUERY = """
+    SELECT LE.ID_ENTRADA, E.DATA_ENTRADA, E.NUMERO_NOTA, F.RAZAO_SOCIAL AS FORNECEDOR,
+           L.ID AS ID_LOTE, L.NUMERO, I.DESCRICAO, LE.QUANTIDADE
+    FROM (SELECT DISTINCT ID_LOTE FROM ARVORE) A
+    JOIN LOTE_ENTRADA LE ON LE.ID_LOTE = A.ID_LOTE
+    JOIN LOTE L ON L.ID = LE.ID_LOTE
+    JOIN ITEM I ON I.ID = L.ID_ITEM
+    LEFT JOIN ENTRADANOTA_HISTORICO E ON E.ID = LE.ID_ENTRADA
+    LEFT JOIN ENTRADANOTA_ITENS_HISTORICO EI ON EI.ID_ENTRADA = LE.ID_ENTRADA AND EI.ID_INSUMO = L.ID_ITEM
+    LEFT JOIN FORNECEDOR F ON F.ID = EI.ID_FORNECEDOR
+    ORDER BY E.DATA_ENTRADA, LE.ID_ENTRADA
+"""
+
+class LotRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def search_lots(self, term="", limit=200):
+        """Lotes cujo número, código ou descrição do item contém o termo, dos mais novos aos mais antigos."""
+        conn = self.db_manager.get_connection()
+        pattern = f"%{term}%"
+        return fetch_records(conn.execute("""
+            SELECT L.ID, L.NUMERO, L.ID_ITEM, I.CODIGO_INTERNO, I.DESCRICAO, I.TIPO_ITEM, L.DATA_CRIACAO,
+                   L.QUANTIDADE, L.SALDO, L.ID_ENTRADA, L.ID_ORDEM_PRODUCAO
+            FROM LOTE L JOIN ITEM I ON I.ID = L.ID_ITEM
+            WHERE L.NUMERO LIKE :termo OR I.DESCRICAO LIKE :termo OR I.CODIGO_INTERNO LIKE :termo
+            ORDER BY L.ID DESC
+            LIMIT :limite
+        """, {"termo": pattern, "limite": limit}))
+
+    def get_lot(self, lot_id):
+        conn = self.db_manager.get_connection()
+        return conn.execute("""
+            SELECT L.*, I.DESCRICAO FROM LOTE L JOIN ITEM I ON I.ID = L.ID_ITEM WHERE L.ID = ?
+        """, (lot_id,)).fetchone()
+
+    def forward_trace(self, lot_id):
+        """
+        Rastreamento para frente: os lotes produzidos com o lote (em qualquer nível) e as
+        saídas que levaram algum deles. Devolve (lotes, saídas).
+        """
+        conn = self.db_manager.get_connection()
+        params = {"lote": lot_id}
+        lots = fetch_records(conn.execute(DESCENDANTS + TREE_LOTS, params))
+        sales = fetch_records(conn.execute(DESCENDANTS + """
+            SELECT LS.ID_SAIDA, S.DATA_SAIDA, S.OBSERVACAO, L.ID AS ID_LOTE, L.NUMERO, I.DESCRICAO, LS.QUANTIDADE
+            FROM (SELECT DISTINCT ID_LOTE FROM ARVORE) A
+            JOIN LOTE_SAIDA LS ON LS.ID_LOTE = A.ID_LOTE
+            JOIN LOTE L ON L.ID = LS.ID_LOTE
+            JOIN ITEM I ON I.ID = L.ID_ITEM
+            LEFT JOIN SAIDA_HISTORICO S ON S.ID = LS.ID_SAIDA
+            ORDER BY S.DATA_SAIDA, LS.ID_SAIDA
+        """, params))
+        return lots, sales
+
+    def backward_trace(self, lot_id):
+        """
+        Rastreamento para trás: os lotes de que o lote foi feito (em qualquer nível) e as
+        entradas, com o fornecedor, que deram origem aos lotes de insumo. Devolve (lotes, entradas).
+        """
+        conn = self.db_manager.get_connection()
+        params = {"lote": lot_id}
+        lots = fetch_records(conn.execute(ANCESTORS.format(seed=SEED_LOT) + TREE_LOTS, params))
+        entries = fetch_records(conn.execute(ANCESTORS.format(seed=SEED_LOT) + ENTRIES_QUERY, params))
+        return lots, entries
+
+    def sale_trace(self, sale_id):
+        """Rastreamento de uma saída: os lotes que ela levou e tudo de que eles foram feitos. Devolve (lotes, entradas)."""
+        conn = self.db_manager.get_connection()
+        params = {"saida": sale_id}
+        lots = fetch_records(conn.execute(ANCESTORS.format(seed=SEED_SALE) + TREE_LOTS, params))
+        entries = fetch_records(conn.execute(ANCESTORS.format(seed=SEED_SALE) + ENTRIES_QUERY, params))
+        return lots, entries
+
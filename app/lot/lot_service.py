@@ -0,0 +1,50 @@
+# app/lot/lot_service.py
+"""
+Rastreabilidade de lotes.
+
+Para frente, a partir de um lote de insumo: em que lotes de produto ele foi usado e
+em que saídas esses lotes foram vendidos. Para trás, a partir de um lote de produto
+ou de uma saída: de que lotes de insumo foi feito e de que entradas (nota e
+fornecedor) eles vieram. As duas direções são consultas recursivas sobre a
+LOTE_GENEALOGIA, cada uma servida por um índice (origem, destino) ou (destino, origem).
+Como os lotes são gravados ver lots.py.
+"""
+from app.diagnostics.metrics import timed_service
+from app.lot.lot_repository import LotRepository
+
+@timed_service
+class LotService:
+    def __init__(self):
+        self.lot_repository = LotRepository()
+
+    def search_lots(self, term=""):
+        try:
+            return {"success": True, "data": self.lot_repository.search_lots(term.strip())}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao buscar os lotes: {e}"}
+
+    def trace_lot(self, lot_id):
+        """Lote, os lotes e saídas para frente e os lotes e entradas para trás."""
+        try:
+            lot = self.lot_repository.get_lot(lot_id)
+            if not lot:
+                return {"success": False, "message": "Lote não encontrado."}
+            descendants, sales = self.lot_repository.forward_trace(lot_id)
+            ancestors, entries = self.lot_repository.backward_trace(lot_id)
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao rastrear o lote: {e}"}
+        return {"success": True, "data": {
+            "lot": lot,
+            "forward": {"lots": descendants, "sales": sales},
+            "backward": {"lots": ancestors, "entries": entries},
+        }}
+
+    def trace_sale(self, sale_id):
+        """Lotes que saíram na saída e as entradas de que eles foram feitos."""
+        try:
+            lots, entries = self.lot_repository.sale_trace(sale_id)
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao rastrear a saída: {e}"}
+        if not lots:
+            return {"success": False, "message": f"A saída #{sale_id} não tem lotes registrados."}
+        return {"success": True, "data": {"lots": lots, "entries": entries}}
@@ -0,0 +1,125 @@
+# app/lot/lots.py
+"""
+Lotes dos itens e a sua genealogia.
+
+Cada entrada finalizada dá entrada de um lote de cada insumo (o número informado na
+nota, ou E<id da entrada>) e cada OP concluída gera um lote de cada produto
+(OP<id da OP>). LOTE.SALDO é a quantidade ainda não consumida do lote: as OPs e as
+saídas consomem os lotes do item por ordem de criação (PEPS) e registram de onde
+veio cada quantidade:
+
+- LOTE_ENTRADA: lote de insumo -> entradas que o trouxeram (o mesmo lote do fornecedor
+  pode chegar em mais de uma nota), com a quantidade de cada uma;
+- LOTE_GENEALOGIA: lote de insumo -> lote de produto, com a quantidade consumida pela OP;
+- LOTE_SAIDA: lote de produto -> saída, com a quantidade vendida.
+
+O que passar do saldo dos lotes (estoque anterior aos lotes, entradas manuais,
+ajustes de inventário) fica sem lote e não aparece no rastreamento.
+
+As funções recebem o cursor da transação em andamento, como em reports/aggregates.py:
+os lotes mudam no mesmo commit que o documento.
+"""
+
+def receive(cursor, item_id, number, quantity, created_at, entry_id=None, op_id=None):
+    """
+    Soma a quantidade ao lote (item, número), criando-o se preciso, e devolve o ID do lote.
+    LOTE.ID_ENTRADA guarda a entrada que criou o lote; todas as que o trouxeram ficam em LOTE_ENTRADA.
+    """
+    lot_id = cursor.execute("""
+        INSERT INTO LOTE (ID_ITEM, NUMERO, DATA_CRIACAO, QUANTIDADE, SALDO, ID_ENTRADA, ID_ORDEM_PRODUCAO)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (ID_ITEM, NUMERO) DO UPDATE SET
+            QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE, SALDO = SALDO + excluded.SALDO
+        RETURNING ID
+    """, (item_id, number, created_at, quantity, quantity, entry_id, op_id)).fetchone()[0]
+    if entry_id is not None:
+        cursor.execute("""
+            INSERT INTO LOTE_ENTRADA (ID_LOTE, ID_ENTRADA, QUANTIDADE) VALUES (?, ?, ?)
+            ON CONFLICT (ID_LOTE, ID_ENTRADA) DO UPDATE SET QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE
+        """, (lot_id, entry_id, quantity))
+    return lot_id
+
+class LotConsumedError(Exception):
+    """O lote já foi consumido e não tem saldo para devolver a quantidade da entrada."""
+
+    def __init__(self, number, balance, quantity):
+        super().__init__(
+            f"O lote {number} já foi consumido e tem saldo {balance:.3f}, menor que os {quantity:.3f} "
+            "da entrada. Estorne antes as OPs que usaram o lote."
+        )
+        self.number = number
+
+def reverse(cursor, item_id, number, quantity, entry_id):
+    """
+    Retira a quantidade do lote (estorno da entrada); o lote fica para o rastreamento do que já foi consumido.
+    Se o saldo do lote não cobre a quantidade, levanta LotConsumedError e a transação deve ser desfeita.
+    """
+    lot = cursor.execute("SELECT ID, SALDO FROM LOTE WHERE ID_ITEM = ? AND NUMERO = ?", (item_id, number)).fetchone()
+    if lot is None:
+        # Entrada finalizada antes do controle de lotes
+        return
+    if lot[1] < quantity - 1e-9:
+        raise LotConsumedError(number, lot[1], quantity)
+    cursor.execute("UPDATE LOTE SET QUANTIDADE = QUANTIDADE - ?, SALDO = SALDO - ? WHERE ID = ?",
+                   (quantity, quantity, lot[0]))
+    cursor.execute("DELETE FROM LOTE_ENTRADA WHERE ID_LOTE = ? AND ID_ENTRADA = ?", (lot[0], entry_id))
+
+def consume(cursor, item_id, quantity):
+    """Baixa a quantidade dos lotes com saldo do item, do mais antigo ao mais novo. Devolve [(lote, quantidade)]."""
+    taken = []
+    remaining = quantity
+    cursor.execute("SELECT ID, SALDO FROM LOTE WHERE ID_ITEM = ? AND SALDO > 0 ORDER BY ID", (item_id,))
+    for lot_id, balance in cursor.fetchall():
+        if remaining <= 1e-9:
+            break
+        quantity_taken = min(balance, remaining)
+        taken.append((lot_id, quantity_taken))
+        remaining -= quantity_taken
+    cursor.executemany("UPDATE LOTE SET SALDO = SALDO - ? WHERE ID = ?",
+                       [(quantity_taken, lot_id) for lot_id, quantity_taken in taken])
+    return taken
+
+def record_production(cursor, op_id, product_id, quantity, created_at):
+    """Gera o lote do produto da OP e liga a ele os lotes dos insumos consumidos pela composição."""
+    product_lot = receive(cursor, product_id, f"OP{op_id}", quantity, created_at, op_id=op_id)
+    cursor.execute("SELECT ID_INSUMO, QUANTIDADE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
+    edges = []
+    for insumo_id, per_unit in cursor.fetchall():
+        edges += [(lot_id, product_lot, quantity_taken)
+                  for lot_id, quantity_taken in consume(cursor, insumo_id, per_unit * quantity)]
+    cursor.executemany("""
+        INSERT INTO LOTE_GENEALOGIA (ID_LOTE_ORIGEM, ID_LOTE_DESTINO, QUANTIDADE) VALUES (?, ?, ?)
+        ON CONFLICT (ID_LOTE_ORIGEM, ID_LOTE_DESTINO) DO UPDATE SET QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE
+    """, edges)
+    return product_lot
+
+def record_sale(cursor, sale_id, product_id, quantity):
+    """Baixa dos lotes do produto a quantidade vendida e registra quais lotes foram na saída."""
+    cursor.executemany("""
+        INSERT INTO LOTE_SAIDA (ID_LOTE, ID_SAIDA, QUANTIDADE) VALUES (?, ?, ?)
+        ON CONFLICT (ID_LOTE, ID_SAIDA) DO UPDATE SET QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE
+    """, [(lot_id, sale_id, quantity_taken) for lot_id, quantity_taken in consume(cursor, product_id, quantity)])
+
+def remove_op(cursor, op_id):
+    """
+    Desfaz os lotes da OP excluída: devolve aos lotes de insumo o que ela consumiu, apaga a
+    genealogia e tira dos lotes de produto a quantidade produzida. Lotes de produto que não
+    chegaram a ser vendidos nem consumidos são apagados.
+    """
+    cursor.execute("""
+        UPDATE LOTE SET SALDO = SALDO + G.QUANTIDADE
+        FROM (SELECT G.ID_LOTE_ORIGEM, SUM(G.QUANTIDADE) AS QUANTIDADE
+              FROM LOTE_GENEALOGIA G JOIN LOTE P ON P.ID = G.ID_LOTE_DESTINO
+              WHERE P.ID_ORDEM_PRODUCAO = ? GROUP BY G.ID_LOTE_ORIGEM) G
+        WHERE LOTE.ID = G.ID_LOTE_ORIGEM
+    """, (op_id,))
+    cursor.execute("""
+        DELETE FROM LOTE_GENEALOGIA
+        WHERE ID_LOTE_DESTINO IN (SELECT ID FROM LOTE WHERE ID_ORDEM_PRODUCAO = ?)
+    """, (op_id,))
+    cursor.execute("""
+        DELETE FROM LOTE WHERE ID_ORDEM_PRODUCAO = ?
+          AND NOT EXISTS (SELECT 1 FROM LOTE_SAIDA S WHERE S.ID_LOTE = LOTE.ID)
+          AND NOT EXISTS (SELECT 1 FROM LOTE_GENEALOGIA G WHERE G.ID_LOTE_ORIGEM = LOTE.ID)
+    """, (op_id,))
+    cursor.execute("UPDATE LOTE SET SALDO = 0, QUANTIDADE = 0 WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
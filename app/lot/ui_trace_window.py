@@ -0,0 +1,155 @@
+# app/lot/ui_trace_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QTabWidget, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIntValidator
+from app.lot.lot_service import LotService
+from app.utils.date_utils import format_date_for_display
+from app.utils.ui_utils import NumericTableWidgetItem, show_error_message
+
+class TraceWindow(QWidget):
+    SEARCH_HEADERS = ["ID", "Lote", "Item", "Tipo", "Criação", "Quantidade", "Saldo"]
+    SEARCH_KEYS = ["ID", "NUMERO", "DESCRICAO", "TIPO_ITEM", "DATA_CRIACAO", "QUANTIDADE", "SALDO"]
+    LOT_HEADERS = ["Nível", "Lote", "Item", "Tipo", "Criação", "Quantidade", "Saldo", "Entrada", "OP"]
+    LOT_KEYS = ["NIVEL", "NUMERO", "DESCRICAO", "TIPO_ITEM", "DATA_CRIACAO", "QUANTIDADE", "SALDO", "ID_ENTRADA", "ID_ORDEM_PRODUCAO"]
+    SALE_HEADERS = ["Saída", "Data", "Lote", "Produto", "Quantidade", "Observação"]
+    SALE_KEYS = ["ID_SAIDA", "DATA_SAIDA", "NUMERO", "DESCRICAO", "QUANTIDADE", "OBSERVACAO"]
+    ENTRY_HEADERS = ["Entrada", "Data", "Nota", "Fornecedor", "Lote", "Insumo", "Quantidade"]
+    ENTRY_KEYS = ["ID_ENTRADA", "DATA_ENTRADA", "NUMERO_NOTA", "FORNECEDOR", "NUMERO", "DESCRICAO", "QUANTIDADE"]
+    DATE_KEYS = ("DATA_CRIACAO", "DATA_SAIDA", "DATA_ENTRADA")
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.lot_service = LotService()
+        self.setWindowTitle("Rastreabilidade de Lotes")
+        self.setGeometry(200, 200, 1000, 700)
+        self.setup_ui()
+        self.search_lots()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Número do lote, código ou descrição do item")
+        self.search_input.returnPressed.connect(self.search_lots)
+        search_button = QPushButton("Buscar")
+        search_button.clicked.connect(self.search_lots)
+        self.sale_input = QLineEdit()
+        self.sale_input.setValidator(QIntValidator(1, 2**31 - 1))
+        self.sale_input.setMaximumWidth(100)
+        self.sale_input.returnPressed.connect(self.trace_sale)
+        sale_button = QPushButton("Rastrear Saída")
+        sale_button.clicked.connect(self.trace_sale)
+        search_layout.addWidget(QLabel("Lote:"))
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(search_button)
+        search_layout.addSpacing(20)
+        search_layout.addWidget(QLabel("Saída nº:"))
+        search_layout.addWidget(self.sale_input)
+        search_layout.addWidget(sale_button)
+        self.main_layout.addLayout(search_layout)
+
+        self.lots_table = self._create_table(self.SEARCH_HEADERS, 2)
+        self.lots_table.itemSelectionChanged.connect(self.trace_selected_lot)
+        self.main_layout.addWidget(self.lots_table)
+
+        self.trace_label = QLabel("Selecione um lote para rastrear.")
+        self.main_layout.addWidget(self.trace_label)
+
+        self.tabs = QTabWidget()
+        self.forward_lots_table = self._create_table(self.LOT_HEADERS, 2)
+        self.sales_table = self._create_table(self.SALE_HEADERS, 3)
+        self.backward_lots_table = self._create_table(self.LOT_HEADERS, 2)
+        self.entries_table = self._create_table(self.ENTRY_HEADERS, 3)
+        self.tabs.addTab(self.forward_lots_table, "Para Frente: Lotes")
+        self.tabs.addTab(self.sales_table, "Para Frente: Saídas")
+        self.tabs.addTab(self.backward_lots_table, "Para Trás: Lotes")
+        self.tabs.addTab(self.entries_table, "Para Trás: Entradas")
+        self.main_layout.addWidget(self.tabs, 2)
+
+    def _create_table(self, headers, stretch_column):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.verticalHeader().setVisible(False)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(stretch_column, QHeaderView.Stretch)
+        return table
+
+    def _fill_table(self, table, rows, keys):
+        table.setSortingEnabled(False)
+        table.setRowCount(0)
+        for data in rows:
+            row = table.rowCount()
+            table.insertRow(row)
+            for col, key in enumerate(keys):
+                value = data[key]
+                if value is None:
+                    table.setItem(row, col, QTableWidgetItem(""))
+                elif isinstance(value, float):
+                    table.setItem(row, col, NumericTableWidgetItem(f"{value:.3f}"))
+                elif isinstance(value, int):
+                    table.setItem(row, col, NumericTableWidgetItem(str(value)))
+                elif key in self.DATE_KEYS:
+                    table.setItem(row, col, QTableWidgetItem(format_date_for_display(value)))
+                else:
+                    table.setItem(row, col, QTableWidgetItem(value))
+        table.setSortingEnabled(True)
+
+    def _clear_trace(self, text):
+        self.trace_label.setText(text)
+        for table in (self.forward_lots_table, self.sales_table, self.backward_lots_table, self.entries_table):
+            table.setRowCount(0)
+
+    def search_lots(self):
+        response = self.lot_service.search_lots(self.search_input.text())
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        self.lots_table.blockSignals(True)
+        self._fill_table(self.lots_table, response["data"], self.SEARCH_KEYS)
+        self.lots_table.blockSignals(False)
+        self._clear_trace("Selecione um lote para rastrear.")
+
+    def trace_selected_lot(self):
+        row = self.lots_table.currentRow()
+        if row < 0:
+            return
+        response = self.lot_service.trace_lot(int(self.lots_table.item(row, 0).text()))
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        data = response["data"]
+        lot = data["lot"]
+        forward, backward = data["forward"], data["backward"]
+        self.trace_label.setText(
+            f"Lote {lot['NUMERO']} de {lot['DESCRICAO']}: {len(forward['lots']) - 1} lotes e "
+            f"{len(forward['sales'])} saídas para frente, {len(backward['lots']) - 1} lotes e "
+            f"{len(backward['entries'])} entradas para trás."
+        )
+        self._fill_table(self.forward_lots_table, forward["lots"], self.LOT_KEYS)
+        self._fill_table(self.sales_table, forward["sales"], self.SALE_KEYS)
+        self._fill_table(self.backward_lots_table, backward["lots"], self.LOT_KEYS)
+        self._fill_table(self.entries_table, backward["entries"], self.ENTRY_KEYS)
+
+    def trace_sale(self):
+        if not self.sale_input.text():
+            return
+        sale_id = int(self.sale_input.text())
+        response = self.lot_service.trace_sale(sale_id)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        data = response["data"]
+        self._clear_trace(f"Saída #{sale_id}: {len(data['lots'])} lotes e {len(data['entries'])} entradas de origem.")
+        self._fill_table(self.backward_lots_table, data["lots"], self.LOT_KEYS)
+        self._fill_table(self.entries_table, data["entries"], self.ENTRY_KEYS)
+        self.tabs.setCurrentWidget(self.backward_lots_table)
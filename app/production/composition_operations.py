@@ -1,7 +1,11 @@
 # app/production/composition_operations.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.detail_sync import sync_details
+from app.diagnostics.metrics import timed
+from app.production import reservations
 
+@timed
 def validate_bom_item(product_id, material_id):
     """
     Valida se um insumo pode ser adicionado à composição de um produto.
@@ -18,6 +22,7 @@ def validate_bom_item(product_id, material_id):
         
     return True, None
 
+@timed
 def get_bom(product_id):
     """Busca a Composição (BOM) de um determinado produto."""
     conn = get_db_manager().get_connection()
@@ -36,51 +41,62 @@ def get_bom(product_id):
     ''', (product_id,)).fetchall()
     return bom
 
+@timed
 def add_bom_item(product_id, material_id, quantity):
     """Adiciona um novo item à Composição (BOM)."""
     try:
         conn = get_db_manager().get_connection()
-        conn.execute(
+        cursor = conn.cursor()
+        cursor.execute(
             'INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)',
             (product_id, material_id, quantity)
         )
+        reservations.refresh_product(cursor, product_id)
         conn.commit()
         return True
     except sqlite3.IntegrityError:
         get_db_manager().get_connection().rollback()
         return False
 
+@timed
 def update_bom_item(bom_id, quantity):
     """Atualiza a quantidade de um item na Composição (BOM)."""
     conn = get_db_manager().get_connection()
-    conn.execute(
-        'UPDATE COMPOSICAO SET QUANTIDADE = ? WHERE ID = ?',
+    cursor = conn.cursor()
+    cursor.execute(
+        'UPDATE COMPOSICAO SET QUANTIDADE = ? WHERE ID = ? RETURNING ID_PRODUTO',
         (quantity, bom_id)
     )
+    row = cursor.fetchone()
+    if row:
+        reservations.refresh_product(cursor, row[0])
     conn.commit()
 
+@timed
 def delete_bom_item(bom_id):
     """Exclui um item da Composição (BOM)."""
     conn = get_db_manager().get_connection()
-    conn.execute('DELETE FROM COMPOSICAO WHERE ID = ?', (bom_id,))
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM COMPOSICAO WHERE ID = ? RETURNING ID_PRODUTO', (bom_id,))
+    row = cursor.fetchone()
+    if row:
+        reservations.refresh_product(cursor, row[0])
     conn.commit()
 
+@timed
 def update_composition(product_id, new_composition):
     """
     Atualiza a composição de um produto.
-    Apaga a composição antiga e insere a nova.
+    Grava apenas os insumos incluídos, alterados ou removidos.
     """
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
     try:
         with conn:
-            cursor.execute("DELETE FROM COMPOSICAO WHERE ID_PRODUTO = ?", (product_id,))
-            if new_composition:
-                cursor.executemany(
-                    "INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)",
-                    [(product_id, item['id_insumo'], item['quantidade']) for item in new_composition]
-                )
-        print(f"Composição do produto ID {product_id} atualizada com sucesso.")
+            # sync_details registra no log (debug) quantos insumos foram incluídos, alterados e removidos
+            sync_details(cursor, "COMPOSICAO", "ID_PRODUTO", product_id, "ID_INSUMO", ["QUANTIDADE"],
+                         [(item['id_insumo'], item['quantidade']) for item in new_composition or []])
+            reservations.refresh_product(cursor, product_id)
         return True
     except sqlite3.Error as e:
         print(f"Erro ao atualizar a composição: {e}")
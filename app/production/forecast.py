@@ -0,0 +1,74 @@
+# app/production/forecast.py
+"""
+Previsão da demanda semanal dos produtos.
+
+Cada série é a quantidade vendida por semana, da mais antiga para a mais recente, com
+zero nas semanas sem venda. Dois modelos simples são ajustados em cada série:
+
+- média móvel das últimas `window` semanas;
+- suavização exponencial simples com fator `alpha`.
+
+Fica o modelo com o menor erro absoluto médio das previsões de um passo à frente
+no histórico; a previsão é a mesma para todas as semanas seguintes. O custo é
+O(semanas) por produto; catálogos grandes podem ser divididos entre processos
+(forecast_all com processes > 1). O módulo não acessa o banco (ver forecast_operations.py).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+METHOD_MOVING_AVERAGE = "Média Móvel"
+METHOD_SMOOTHING = "Suavização Exponencial"
+
+# Abaixo disso, criar os processos custa mais que prever tudo num só
+MIN_PRODUCTS_PER_PROCESS = 20000
+
+def moving_average(series, window):
+    """(previsão, erro absoluto médio) da média móvel das últimas `window` semanas."""
+    window = max(1, min(window, len(series)))
+    total = sum(series[:window])
+    errors = 0.0
+    for index in range(window, len(series)):
+        errors += abs(series[index] - total / window)
+        total += series[index] - series[index - window]
+    count = len(series) - window
+    return total / window, errors / count if count else None
+
+def exponential_smoothing(series, alpha):
+    """(previsão, erro absoluto médio) da suavização exponencial simples."""
+    level = series[0]
+    errors = 0.0
+    for value in series[1:]:
+        errors += abs(value - level)
+        level += alpha * (value - level)
+    count = len(series) - 1
+    return level, errors / count if count else None
+
+def forecast_series(series, window=4, alpha=0.3):
+    """{"method", "weekly", "mae"} do melhor modelo para a série (lista de quantidades semanais)."""
+    if not series:
+        return {"method": METHOD_MOVING_AVERAGE, "weekly": 0.0, "mae": None}
+    average, average_error = moving_average(series, window)
+    level, level_error = exponential_smoothing(series, alpha)
+    if average_error is not None and (level_error is None or average_error <= level_error):
+        return {"method": METHOD_MOVING_AVERAGE, "weekly": average, "mae": average_error}
+    return {"method": METHOD_SMOOTHING, "weekly": level, "mae": level_error}
+
+def _forecast_chunk(chunk, window, alpha):
+    return {product_id: forecast_series(series, window, alpha) for product_id, series in chunk}
+
+def forecast_all(series_by_product, window=4, alpha=0.3, processes=None):
+    """
+    Previsão de cada produto de {produto: série}. Com processes > 1 e catálogo grande,
+    os produtos são divididos em blocos entre processos.
+    """
+    items = list(series_by_product.items())
+    workers = min(processes or 1, os.cpu_count() or 1, len(items) // MIN_PRODUCTS_PER_PROCESS)
+    if workers < 2:
+        return _forecast_chunk(items, window, alpha)
+    size = -(-len(items) // workers)
+    chunks = [items[start:start + size] for start in range(0, len(items), size)]
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(_forecast_chunk, chunks, [window] * len(chunks), [alpha] * len(chunks)):
+            results.update(partial)
+    return results
@@ -0,0 +1,89 @@
+# app/production/forecast_operations.py
+import math
+from datetime import date, timedelta
+from app.database.db import get_db_manager
+from app.diagnostics.metrics import timed
+from app.production import forecast, order_operations
+
+@timed
+def get_weekly_sales(weeks, end=None):
+    """
+    {produto: [quantidade vendida por semana]} das `weeks` semanas completas (segunda a
+    domingo) antes de `end`, por padrão a segunda-feira da semana atual. Vem do resumo diário
+    das vendas finalizadas, que inclui o histórico arquivado.
+    """
+    end = end or date.today() - timedelta(days=date.today().weekday())
+    start = end - timedelta(weeks=weeks)
+    conn = get_db_manager().get_connection()
+    rows = conn.execute("""
+        SELECT ID_PRODUTO, CAST((julianday(DATA) - julianday(?)) / 7 AS INTEGER) AS SEMANA, SUM(QUANTIDADE)
+        FROM RESUMO_VENDAS_DIARIO
+        WHERE DATA >= ? AND DATA < ?
+        GROUP BY ID_PRODUTO, SEMANA
+    """, (start.isoformat(), start.isoformat(), end.isoformat())).fetchall()
+    series = {}
+    for product_id, week, quantity in rows:
+        series.setdefault(product_id, [0.0] * weeks)[week] = quantity
+    return series
+
+def _product_positions(cursor):
+    cursor.execute("""
+        SELECT I.ID, I.DESCRICAO, U.SIGLA, I.SALDO_ESTOQUE,
+               COALESCE(OP.QUANTIDADE, 0), COALESCE(S.QUANTIDADE, 0)
+        FROM ITEM I
+        JOIN UNIDADE U ON U.ID = I.ID_UNIDADE
+        LEFT JOIN (
+            SELECT OPI.ID_PRODUTO, SUM(OPI.QUANTIDADE_PRODUZIR) AS QUANTIDADE
+            FROM ORDEMPRODUCAO_ITENS OPI JOIN ORDEMPRODUCAO O ON O.ID = OPI.ID_ORDEM_PRODUCAO
+            WHERE O.STATUS = 'Em Andamento' GROUP BY OPI.ID_PRODUTO
+        ) OP ON OP.ID_PRODUTO = I.ID
+        LEFT JOIN (
+            SELECT SI.ID_PRODUTO, SUM(SI.QUANTIDADE) AS QUANTIDADE
+            FROM SAIDA_ITENS SI JOIN SAIDA SA ON SA.ID = SI.ID_SAIDA
+            WHERE SA.STATUS = 'Em Aberto' GROUP BY SI.ID_PRODUTO
+        ) S ON S.ID_PRODUTO = I.ID
+        WHERE I.TIPO_ITEM IN ('Produto', 'Ambos')
+    """)
+    return {row[0]: row for row in cursor.fetchall()}
+
+@timed
+def get_production_plan(weeks=26, horizon=4, window=4, alpha=0.3, processes=None):
+    """
+    Previsão de demanda e produção sugerida por produto para as próximas `horizon` semanas:
+    demanda prevista + saídas em aberto - estoque - OPs em andamento, arredondada para cima.
+    Só entram produtos com venda no período ou saída em aberto.
+    """
+    conn = get_db_manager().get_connection()
+    series = get_weekly_sales(weeks)
+    forecasts = forecast.forecast_all(series, window, alpha, processes)
+    plan = []
+    for product_id, description, unit, stock, in_production, open_sales in _product_positions(conn.cursor()).values():
+        result = forecasts.get(product_id)
+        if result is None and not open_sales:
+            continue
+        weekly = result["weekly"] if result else 0.0
+        demand = weekly * horizon + open_sales
+        suggested = max(0, math.ceil(demand - stock - in_production - 1e-9))
+        plan.append({
+            "ID_PRODUTO": product_id,
+            "DESCRICAO": description,
+            "UNIDADE": unit,
+            "METODO": result["method"] if result else "",
+            "PREVISAO_SEMANAL": weekly,
+            "ERRO_MEDIO": result["mae"] if result else None,
+            "DEMANDA": demand,
+            "ESTOQUE": stock,
+            "EM_PRODUCAO": in_production,
+            "SAIDAS_ABERTAS": open_sales,
+            "SUGESTAO": suggested,
+        })
+    plan.sort(key=lambda row: row["DESCRICAO"])
+    return plan
+
+@timed
+def create_planned_op(items, due_date):
+    """Cria uma OP com as quantidades sugeridas ({'id_produto', 'quantidade'}); devolve o ID ou None."""
+    items = [item for item in items if item['quantidade'] > 0]
+    if not items:
+        return None
+    return order_operations.create_op(f"PREV-{date.today().isoformat()}", due_date, items)
@@ -1,7 +1,16 @@
 # app/production/order_operations.py
 from datetime import datetime
+from app.closing.closing_repository import closed_until
 from app.database.db import get_db_manager
+from app.database.records import fetch_record, fetch_records
+from app.database.detail_sync import sync_details
+from app.database.versioning import StaleDocumentError, bump_version
+from app.diagnostics.metrics import timed
+from app.lot import lots
+from app.production import reservations
+from app.reports import aggregates
 
+@timed
 def create_op(numero, due_date, items_to_produce, id_linha_producao=None):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -16,6 +25,7 @@ def create_op(numero, due_date, items_to_produce, id_linha_producao=None):
                 "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
                 (op_id, item['id_produto'], item['quantidade'])
             )
+        reservations.refresh_op(cursor, op_id)
         conn.commit()
         return op_id
     except Exception as e:
@@ -23,27 +33,31 @@ def create_op(numero, due_date, items_to_produce, id_linha_producao=None):
         print(f"Erro ao criar Ordem de Produção: {e}")
         return None
 
-def update_op(op_id, numero, due_date, items_to_produce):
+@timed
+def update_op(op_id, numero, due_date, items_to_produce, expected_version=None):
+    """
+    Atualiza a OP e devolve a nova versão (False em caso de erro).
+    Com expected_version, levanta StaleDocumentError se a OP foi salva por outra estação.
+    """
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
     try:
+        new_version = bump_version(cursor, "ORDEMPRODUCAO", op_id, expected_version)
         cursor.execute("UPDATE ORDEMPRODUCAO SET NUMERO = ?, DATA_PREVISTA = ? WHERE ID = ?", (numero, due_date, op_id))
-        
-        cursor.execute("DELETE FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
-
-        for item in items_to_produce:
-            cursor.execute(
-                "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
-                (op_id, item['id_produto'], item['quantidade'])
-            )
-            
+        sync_details(cursor, "ORDEMPRODUCAO_ITENS", "ID_ORDEM_PRODUCAO", op_id, "ID_PRODUTO", ["QUANTIDADE_PRODUZIR"],
+                     [(item['id_produto'], item['quantidade']) for item in items_to_produce])
+        reservations.refresh_op(cursor, op_id)
         conn.commit()
-        return True
+        return new_version
+    except StaleDocumentError:
+        conn.rollback()
+        raise
     except Exception as e:
         conn.rollback()
         print(f"Erro ao atualizar Ordem de Produção: {e}")
         return False
 
+@timed
 def finalize_op(op_id, produced_quantity):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -67,12 +81,18 @@ def finalize_op(op_id, produced_quantity):
             # Dar entrada no produto acabado
             increase_product_stock(op_id, item['ID_PRODUTO'], produced_quantity, cost)
 
+            # Lote do produto, ligado aos lotes dos insumos consumidos
+            lots.record_production(cursor, op_id, item['ID_PRODUTO'], produced_quantity,
+                                   cursor.execute("SELECT date('now')").fetchone()[0])
+
         # Atualizar a OP com o status, quantidade produzida e custo
         cursor.execute(
-            "UPDATE ORDEMPRODUcao SET STATUS = 'Concluída', QUANTIDADE_PRODUZIDA = ?, CUSTO_TOTAL = ? WHERE ID = ?",
+            "UPDATE ORDEMPRODUCAO SET STATUS = 'Concluída', QUANTIDADE_PRODUZIDA = ?, CUSTO_TOTAL = ?, VERSAO = VERSAO + 1 WHERE ID = ?",
             (produced_quantity, total_cost, op_id)
         )
-        
+        # Os insumos foram consumidos: a reserva da OP deixa de existir
+        reservations.release_op(cursor, op_id)
+
         conn.commit()
         return True, "Ordem de Produção finalizada com sucesso."
     except Exception as e:
@@ -80,9 +100,10 @@ def finalize_op(op_id, produced_quantity):
         print(f"Erro ao finalizar Ordem de Produção: {e}")
         return False, str(e)
 
+@timed
 def get_op_details(op_id):
     conn = get_db_manager().get_connection()
-    op_master = conn.execute("SELECT * FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,)).fetchone()
+    op_master = fetch_record(conn.execute("SELECT * FROM ORDEMPRODUCAO WHERE ID = ?", (op_id,)))
     if not op_master:
         return None
     op_items = conn.execute("""
@@ -99,10 +120,18 @@ def get_op_details(op_id):
         item_dict['CUSTO_MEDIO'] = calculate_product_cost(item_dict['ID_PRODUTO'])
         items_with_cost.append(item_dict)
 
-    return {"master": dict(op_master), "items": items_with_cost}
+    return {"master": op_master, "items": items_with_cost}
 
+@timed
 def list_ops(search_term="", search_field="id"):
     conn = get_db_manager().get_connection()
+    query, params = list_ops_query(search_term, search_field)
+    if query is None:
+        return []
+    return fetch_records(conn.execute(query, params))
+
+def list_ops_query(search_term="", search_field="id"):
+    """Monta a consulta da listagem de OPs. Retorna (None, None) se a pesquisa não puder ter resultados."""
     query = "SELECT ID, NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS FROM ORDEMPRODUCAO"
     params = ()
     if search_term:
@@ -114,14 +143,14 @@ def list_ops(search_term="", search_field="id"):
                 query += f" WHERE {column} = ?"
                 params = (search_term,)
             except ValueError:
-                return []
+                return None, None
         else:
             query += f" WHERE {column} LIKE ?"
             params = (f"%{search_term}%",)
     query += " ORDER BY ID DESC"
-    orders = conn.execute(query, params).fetchall()
-    return [dict(row) for row in orders]
+    return query, params
 
+@timed
 def check_stock_for_production(product_id, quantity):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -134,20 +163,37 @@ def check_stock_for_production(product_id, quantity):
             return False, f"Estoque insuficiente para o insumo ID {insumo['ID_INSUMO']}"
     return True, ""
 
+@timed
+def get_op_shortages(op_id):
+    """Insumos da OP com disponível negativo, isto é, comprometidos além do saldo pelas OPs abertas."""
+    conn = get_db_manager().get_connection()
+    return fetch_records(conn.execute("""
+        SELECT R.ID_INSUMO, I.DESCRICAO, R.QUANTIDADE AS RESERVADO_OP,
+               I.SALDO_ESTOQUE - I.SALDO_RESERVADO AS DISPONIVEL
+        FROM RESERVA R
+        JOIN ITEM I ON I.ID = R.ID_INSUMO
+        WHERE R.ID_ORDEM_PRODUCAO = ? AND I.SALDO_ESTOQUE - I.SALDO_RESERVADO < -1e-9
+        ORDER BY I.DESCRICAO
+    """, (op_id,)))
+
+@timed
 def consume_stock_for_production(op_id, product_id, quantity):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT ID_INSUMO, QUANTIDADE, CUSTO_MEDIO FROM COMPOSICAO C JOIN ITEM I ON C.ID_INSUMO = I.ID WHERE C.ID_PRODUTO = ?", (product_id,))
     composition = cursor.fetchall()
+    movement_date = cursor.execute("SELECT date('now')").fetchone()[0]
     total_cost = 0
     for insumo in composition:
         consumed_quantity = insumo['QUANTIDADE'] * quantity
         cost = insumo['CUSTO_MEDIO'] * consumed_quantity
         total_cost += cost
         cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - ? WHERE ID = ?", (consumed_quantity, insumo['ID_INSUMO']))
-        cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Saída por OP', ?, ?, date('now'))", (insumo['ID_INSUMO'], consumed_quantity, op_id))
+        cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Saída por OP', ?, ?, ?, ?)", (insumo['ID_INSUMO'], consumed_quantity, insumo['CUSTO_MEDIO'], op_id, movement_date))
+        aggregates.record_consumption(cursor, insumo['ID_INSUMO'], movement_date, consumed_quantity, cost)
     return total_cost
 
+@timed
 def increase_product_stock(op_id, product_id, quantity, cost):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -166,6 +212,7 @@ def increase_product_stock(op_id, product_id, quantity, cost):
     cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_stock, new_avg_cost, product_id))
     cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Entrada por OP', ?, ?, date('now'))", (product_id, quantity, op_id))
 
+@timed
 def return_stock_for_production(op_id, product_id, quantity):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -177,6 +224,7 @@ def return_stock_for_production(op_id, product_id, quantity):
         cursor.execute("INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, 'Retorno por OP', ?, ?, date('now'))", (insumo['ID_INSUMO'], returned_quantity, op_id))
     conn.commit()
 
+@timed
 def calculate_product_cost(product_id):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -189,11 +237,13 @@ def calculate_product_cost(product_id):
     result = cursor.fetchone()
     return result['CUSTO_TOTAL'] if result and result['CUSTO_TOTAL'] is not None else 0
 
+@timed
 def cancel_op(op_id):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("UPDATE ORDEMPRODUCAO SET STATUS = 'Cancelada' WHERE ID = ?", (op_id,))
+        cursor.execute("UPDATE ORDEMPRODUCAO SET STATUS = 'Cancelada', VERSAO = VERSAO + 1 WHERE ID = ?", (op_id,))
+        reservations.release_op(cursor, op_id)
         conn.commit()
         return True, "Ordem de Produção cancelada com sucesso."
     except Exception as e:
@@ -219,6 +269,7 @@ def _reverse_production_stock_update(cursor, product_id, produced_quantity, prod
     cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = ?, CUSTO_MEDIO = ? WHERE ID = ?", (new_stock, new_avg_cost, product_id))
 
 
+@timed
 def delete_op(op_id):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
@@ -230,6 +281,14 @@ def delete_op(op_id):
         if not op_master:
             raise Exception("Ordem de Produção não encontrada.")
 
+        # Uma OP com movimento em período fechado mudaria o saldo já fechado
+        first_movement = cursor.execute(
+            "SELECT MIN(DATA_MOVIMENTO) FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ?", (op_id,)
+        ).fetchone()[0]
+        closed = closed_until(cursor)
+        if first_movement and closed and first_movement <= closed:
+            raise Exception("A Ordem de Produção tem movimentos em período fechado e não pode ser excluída.")
+
         op_details = get_op_details(op_id)
 
         status = op_master['STATUS']
@@ -252,10 +311,14 @@ def delete_op(op_id):
                         returned_quantity = insumo['QUANTIDADE'] * produced_quantity
                         cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE + ? WHERE ID = ?", (returned_quantity, insumo['ID_INSUMO']))
 
-        # Delete all movements related to this OP
+        # Remove the OP consumption from the report aggregates and the lot genealogy, then delete all movements related to this OP
+        aggregates.remove_op_consumption(cursor, op_id)
+        lots.remove_op(cursor, op_id)
         cursor.execute("DELETE FROM MOVIMENTO WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
         
-        # Delete items from the production order
+        # Release the reserved materials, drop the OP from the schedule and delete its items
+        reservations.release_op(cursor, op_id)
+        cursor.execute("DELETE FROM PROGRAMACAO WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
         cursor.execute("DELETE FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
         
         # Finally, delete the production order itself
@@ -268,11 +331,13 @@ def delete_op(op_id):
         print(f"Erro ao excluir Ordem de Produção: {e}")
         return False, str(e)
 
+@timed
 def reopen_op(op_id):
     conn = get_db_manager().get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("UPDATE ORDEMPRODUCAO SET STATUS = 'Em Andamento' WHERE ID = ?", (op_id,))
+        cursor.execute("UPDATE ORDEMPRODUCAO SET STATUS = 'Em Andamento', VERSAO = VERSAO + 1 WHERE ID = ?", (op_id,))
+        reservations.refresh_op(cursor, op_id)
         conn.commit()
         return True, "Ordem de Produção reaberta com sucesso."
     except Exception as e:
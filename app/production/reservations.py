@@ -0,0 +1,82 @@
+# app/production/reservations.py
+"""
+Reserva de insumos para as ordens de produção em andamento.
+
+RESERVA guarda, por OP e insumo, a quantidade que a OP vai consumir (quantidade a
+produzir x composição do produto), e ITEM.SALDO_RESERVADO a soma das reservas de
+cada insumo. O disponível de um insumo é SALDO_ESTOQUE - SALDO_RESERVADO, lido numa
+única consulta pela chave do item, sem explodir a composição das OPs abertas.
+
+As funções recebem o cursor da transação em andamento, como em reports/aggregates.py:
+a reserva muda no mesmo commit que grava a OP ou a composição. Só OPs 'Em Andamento'
+reservam; concluir, cancelar ou excluir a OP libera a reserva.
+"""
+
+def _required_materials(cursor, op_id):
+    """{insumo: quantidade} que a OP consome se estiver em andamento; vazio nos demais casos."""
+    cursor.execute("""
+        SELECT C.ID_INSUMO, SUM(OPI.QUANTIDADE_PRODUZIR * C.QUANTIDADE)
+        FROM ORDEMPRODUCAO OP
+        JOIN ORDEMPRODUCAO_ITENS OPI ON OPI.ID_ORDEM_PRODUCAO = OP.ID
+        JOIN COMPOSICAO C ON C.ID_PRODUTO = OPI.ID_PRODUTO
+        WHERE OP.ID = ? AND OP.STATUS = 'Em Andamento'
+        GROUP BY C.ID_INSUMO
+    """, (op_id,))
+    return {row[0]: row[1] for row in cursor.fetchall() if row[1]}
+
+def refresh_op(cursor, op_id):
+    """Ajusta a reserva da OP ao que ela exige hoje e aplica só a diferença em SALDO_RESERVADO."""
+    required = _required_materials(cursor, op_id)
+    cursor.execute("SELECT ID_INSUMO, QUANTIDADE FROM RESERVA WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
+    reserved = {row[0]: row[1] for row in cursor.fetchall()}
+
+    deltas = [(required.get(item_id, 0) - reserved.get(item_id, 0), item_id)
+              for item_id in required.keys() | reserved.keys()]
+    deltas = [(delta, item_id) for delta, item_id in deltas if delta]
+    if not deltas:
+        return
+    cursor.executemany("UPDATE ITEM SET SALDO_RESERVADO = SALDO_RESERVADO + ? WHERE ID = ?", deltas)
+    cursor.executemany("DELETE FROM RESERVA WHERE ID_ORDEM_PRODUCAO = ? AND ID_INSUMO = ?",
+                       [(op_id, item_id) for item_id in reserved if item_id not in required])
+    cursor.executemany("""
+        INSERT INTO RESERVA (ID_ORDEM_PRODUCAO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)
+        ON CONFLICT (ID_ORDEM_PRODUCAO, ID_INSUMO) DO UPDATE SET QUANTIDADE = excluded.QUANTIDADE
+    """, [(op_id, item_id, quantity) for item_id, quantity in required.items()])
+
+def release_op(cursor, op_id):
+    """Libera toda a reserva da OP (ela não precisa mais estar em andamento)."""
+    cursor.execute("""
+        UPDATE ITEM SET SALDO_RESERVADO = SALDO_RESERVADO - (
+            SELECT R.QUANTIDADE FROM RESERVA R WHERE R.ID_ORDEM_PRODUCAO = ? AND R.ID_INSUMO = ITEM.ID)
+        WHERE ID IN (SELECT ID_INSUMO FROM RESERVA WHERE ID_ORDEM_PRODUCAO = ?)
+    """, (op_id, op_id))
+    cursor.execute("DELETE FROM RESERVA WHERE ID_ORDEM_PRODUCAO = ?", (op_id,))
+
+def refresh_product(cursor, product_id):
+    """Refaz a reserva das OPs em andamento que produzem o produto (a composição dele mudou)."""
+    cursor.execute("""
+        SELECT DISTINCT OPI.ID_ORDEM_PRODUCAO
+        FROM ORDEMPRODUCAO_ITENS OPI
+        JOIN ORDEMPRODUCAO OP ON OP.ID = OPI.ID_ORDEM_PRODUCAO
+        WHERE OPI.ID_PRODUTO = ? AND OP.STATUS = 'Em Andamento'
+    """, (product_id,))
+    for (op_id,) in cursor.fetchall():
+        refresh_op(cursor, op_id)
+
+def rebuild_reservations(cursor):
+    """Reconstrói RESERVA e SALDO_RESERVADO a partir de todas as OPs em andamento."""
+    cursor.execute("DELETE FROM RESERVA")
+    cursor.execute("""
+        INSERT INTO RESERVA (ID_ORDEM_PRODUCAO, ID_INSUMO, QUANTIDADE)
+        SELECT OP.ID, C.ID_INSUMO, SUM(OPI.QUANTIDADE_PRODUZIR * C.QUANTIDADE)
+        FROM ORDEMPRODUCAO OP
+        JOIN ORDEMPRODUCAO_ITENS OPI ON OPI.ID_ORDEM_PRODUCAO = OP.ID
+        JOIN COMPOSICAO C ON C.ID_PRODUTO = OPI.ID_PRODUTO
+        WHERE OP.STATUS = 'Em Andamento'
+        GROUP BY OP.ID, C.ID_INSUMO
+        HAVING SUM(OPI.QUANTIDADE_PRODUZIR * C.QUANTIDADE) <> 0
+    """)
+    cursor.execute("""
+        UPDATE ITEM SET SALDO_RESERVADO = COALESCE(
+            (SELECT SUM(R.QUANTIDADE) FROM RESERVA R WHERE R.ID_INSUMO = ITEM.ID), 0)
+    """)
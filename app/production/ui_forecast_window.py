@@ -0,0 +1,126 @@
+# app/production/ui_forecast_window.py
+import os
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout, QSpinBox, QDoubleSpinBox, QCheckBox, QDateEdit,
+    QPushButton, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QDate, Signal
+from app.production import forecast_operations
+from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db
+from app.utils.row_model import parse_decimal
+from app.utils.ui_utils import NumericTableWidgetItem, show_error_message, show_success_message
+
+SUGGESTION_COLUMN = 8
+
+class ForecastWindow(QWidget):
+    op_created = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle("Previsão de Demanda")
+        self.setGeometry(250, 250, 1000, 650)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        parameters_group = QGroupBox("Parâmetros")
+        form_layout = QFormLayout()
+        self.weeks_input = QSpinBox()
+        self.weeks_input.setRange(4, 520)
+        self.weeks_input.setValue(26)
+        self.horizon_input = QSpinBox()
+        self.horizon_input.setRange(1, 52)
+        self.horizon_input.setValue(4)
+        self.window_input = QSpinBox()
+        self.window_input.setRange(1, 52)
+        self.window_input.setValue(4)
+        self.alpha_input = QDoubleSpinBox()
+        self.alpha_input.setRange(0.01, 1)
+        self.alpha_input.setSingleStep(0.05)
+        self.alpha_input.setValue(0.3)
+        self.processes_checkbox = QCheckBox("Usar vários processos (catálogos grandes)")
+        form_layout.addRow("Histórico (semanas):", self.weeks_input)
+        form_layout.addRow("Horizonte (semanas):", self.horizon_input)
+        form_layout.addRow("Média móvel (semanas):", self.window_input)
+        form_layout.addRow("Suavização (alfa):", self.alpha_input)
+        form_layout.addRow(self.processes_checkbox)
+        parameters_group.setLayout(form_layout)
+        self.main_layout.addWidget(parameters_group)
+
+        action_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        calculate_button = QPushButton("Calcular")
+        calculate_button.clicked.connect(self.load_plan)
+        self.due_date_input = QDateEdit(calendarPopup=True)
+        self.due_date_input.setDisplayFormat(BRAZILIAN_DATE_FORMAT)
+        self.due_date_input.setDate(QDate.currentDate().addDays(7))
+        create_button = QPushButton("Gerar OP")
+        create_button.clicked.connect(self.create_op)
+        action_layout.addWidget(self.summary_label, 1)
+        action_layout.addWidget(calculate_button)
+        action_layout.addWidget(QLabel("Data prevista:"))
+        action_layout.addWidget(self.due_date_input)
+        action_layout.addWidget(create_button)
+        self.main_layout.addLayout(action_layout)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(9)
+        self.table.setHorizontalHeaderLabels(
+            ["Produto", "Un.", "Modelo", "Previsão/Semana", "Demanda", "Estoque", "Em Produção", "Saídas Abertas", "Produzir"]
+        )
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        self.main_layout.addWidget(self.table)
+
+    def load_plan(self):
+        processes = os.cpu_count() if self.processes_checkbox.isChecked() else None
+        plan = forecast_operations.get_production_plan(self.weeks_input.value(), self.horizon_input.value(),
+                                                       self.window_input.value(), self.alpha_input.value(), processes)
+        self.table.setRowCount(0)
+        for entry in plan:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            # Marcado = entra na OP; só a quantidade a produzir é editável
+            product_item = QTableWidgetItem(entry['DESCRICAO'])
+            product_item.setData(Qt.UserRole, entry['ID_PRODUTO'])
+            product_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+            product_item.setCheckState(Qt.Checked if entry['SUGESTAO'] > 0 else Qt.Unchecked)
+            cells = [product_item, QTableWidgetItem(entry['UNIDADE']), QTableWidgetItem(entry['METODO'])]
+            for value in (entry['PREVISAO_SEMANAL'], entry['DEMANDA'], entry['ESTOQUE'],
+                          entry['EM_PRODUCAO'], entry['SAIDAS_ABERTAS']):
+                cell = NumericTableWidgetItem(f"{value:.2f}")
+                cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                cells.append(cell)
+            for column, cell in enumerate(cells):
+                if column:
+                    cell.setFlags(cell.flags() & ~Qt.ItemIsEditable)
+                self.table.setItem(row, column, cell)
+            self.table.setItem(row, SUGGESTION_COLUMN, NumericTableWidgetItem(str(entry['SUGESTAO'])))
+        to_produce = sum(1 for entry in plan if entry['SUGESTAO'] > 0)
+        self.summary_label.setText(f"{len(plan)} produtos com demanda, {to_produce} com produção sugerida.")
+
+    def create_op(self):
+        items = []
+        for row in range(self.table.rowCount()):
+            product_item = self.table.item(row, 0)
+            if product_item.checkState() != Qt.Checked:
+                continue
+            try:
+                quantity = parse_decimal(self.table.item(row, SUGGESTION_COLUMN).text())
+            except ValueError:
+                show_error_message(self, "Atenção", f"Quantidade inválida para {product_item.text()}.")
+                return
+            items.append({'id_produto': product_item.data(Qt.UserRole), 'quantidade': quantity})
+
+        op_id = forecast_operations.create_planned_op(items, format_qdate_for_db(self.due_date_input.date()))
+        if op_id is None:
+            show_error_message(self, "Erro", "Nenhuma quantidade a produzir ou falha ao criar a Ordem de Produção.")
+            return
+        show_success_message(self, "Sucesso", f"Ordem de Produção #{op_id} criada.")
+        self.op_created.emit()
+        self.load_plan()
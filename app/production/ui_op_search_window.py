@@ -16,6 +16,7 @@ class OPSearchWindow(QWidget):
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.selection_mode = selection_mode
         self.production_order_window = None
+        self.forecast_window = None
         self.setWindowTitle("Pesquisa de Ordens de Produção")
         self.setGeometry(200, 200, 800, 600)
         self.setup_ui()
@@ -34,11 +35,17 @@ class OPSearchWindow(QWidget):
         search_button.clicked.connect(self.load_ops)
         new_op_button = QPushButton("Nova Ordem de Produção")
         new_op_button.clicked.connect(self.open_new_production_order)
+        export_button = QPushButton("Exportar")
+        export_button.clicked.connect(self.export_ops)
+        forecast_button = QPushButton("Previsão de Demanda")
+        forecast_button.clicked.connect(self.open_forecast_window)
         layout.addWidget(self.search_field)
         layout.addWidget(self.search_term, 1)
         layout.addWidget(search_button)
         if not self.selection_mode:
             layout.addWidget(new_op_button)
+            layout.addWidget(export_button)
+            layout.addWidget(forecast_button)
         search_group.setLayout(layout)
         self.main_layout.addWidget(search_group)
         # Results Group
@@ -75,10 +82,28 @@ class OPSearchWindow(QWidget):
             ]
             self.table_model.appendRow(row)
 
+    def export_ops(self):
+        from app.export.ui_export import export_with_dialog
+        export_with_dialog(self, "ops", "ordens_producao", {
+            "search_term": self.search_term.text(),
+            "search_field": self.search_field.currentText().upper()
+        })
+
     def open_new_production_order(self):
         """Opens the production order window for a new order."""
         self.open_production_order_window(op_id=None)
 
+    def open_forecast_window(self):
+        from app.production.ui_forecast_window import ForecastWindow
+        if self.forecast_window is None:
+            self.forecast_window = ForecastWindow()
+            self.forecast_window.op_created.connect(self.load_ops)
+            self.forecast_window.destroyed.connect(lambda: setattr(self, 'forecast_window', None))
+            self.forecast_window.show()
+        else:
+            self.forecast_window.activateWindow()
+            self.forecast_window.raise_()
+
     def handle_double_click(self, model_index):
         """Opens the production order window for the selected order."""
         op_id = int(self.table_model.item(model_index.row(), 0).text())
@@ -5,10 +5,17 @@ from PySide6.QtWidgets import (
     QLabel, QDateEdit, QAbstractItemView, QInputDialog, QDialogButtonBox
 )
 from PySide6.QtCore import QDate, Qt
+from app.database.versioning import StaleDocumentError
 from app.production import order_operations
 from app.item.ui_search_window import ItemSearchWindow
 from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db
 from app.utils.ui_utils import NumericTableWidgetItem
+from app.utils.row_model import NumericRowModel, parse_decimal
+
+def shortage_message(shortages):
+    lines = [f"- {row['DESCRICAO']}: faltam {-row['DISPONIVEL']:.3f}" for row in shortages]
+    return ("As ordens em andamento reservam mais do que o estoque atual destes insumos:\n"
+            + "\n".join(lines))
 
 class ProductionOrderWindow(QWidget):
     def __init__(self, op_id=None):
@@ -17,6 +24,7 @@ class ProductionOrderWindow(QWidget):
         self.current_op_id = op_id
         self.search_item_window = None
         self.search_op_window = None
+        self.row_model = NumericRowModel() # Quantidade e custo de cada linha da grade
         self.setWindowTitle("Ordem de Produção")
         self.setGeometry(250, 250, 800, 700)
         self.setup_ui()
@@ -88,7 +96,7 @@ class ProductionOrderWindow(QWidget):
         header.setSectionResizeMode(1, QHeaderView.Stretch)
         header.setSectionResizeMode(4, QHeaderView.Stretch)
         header.setSectionResizeMode(5, QHeaderView.Stretch)
-        self.items_table.itemChanged.connect(self.update_total_cost)
+        self.items_table.itemChanged.connect(self.on_item_changed)
         layout.addWidget(self.items_table)
         buttons_layout = QHBoxLayout()
         self.add_item_button = QPushButton("Adicionar Produto")
@@ -104,12 +112,15 @@ class ProductionOrderWindow(QWidget):
 
     def new_op(self):
         self.current_op_id = None
+        self.current_version = None
         self.setWindowTitle("Nova Ordem de Produção")
         self.op_id_display.setText("(Nova)")
         self.numero_input.clear()
         self.due_date_input.setDate(QDate.currentDate().addDays(7))
         self.status_display.setText("Em aberto")
         self.items_table.setRowCount(0)
+        self.row_model.clear()
+        self.update_total_cost()
         
         self.produced_qty_display.setVisible(False)
         self.yield_display.setVisible(False)
@@ -126,11 +137,17 @@ class ProductionOrderWindow(QWidget):
             QMessageBox.warning(self, "Atenção", "Adicione pelo menos um produto.")
             return
         items = [{'id_produto': int(self.items_table.item(r, 0).text()),
-                  'quantidade': float(self.items_table.item(r, 2).text())}
+                  'quantidade': self.row_model.quantity(r)}
                  for r in range(self.items_table.rowCount())]
         if self.current_op_id:
-            if order_operations.update_op(self.current_op_id, numero, due_date, items):
+            try:
+                updated = order_operations.update_op(self.current_op_id, numero, due_date, items, self.current_version)
+            except StaleDocumentError as e:
+                QMessageBox.warning(self, "Conflito de Edição", str(e))
+                return
+            if updated:
                 QMessageBox.information(self, "Sucesso", "Ordem de Produção atualizada.")
+                self.warn_stock_shortages()
                 self.load_op_data()
             else:
                 QMessageBox.critical(self, "Erro", "Não foi possível atualizar a Ordem de Produção.")
@@ -139,15 +156,22 @@ class ProductionOrderWindow(QWidget):
             if new_id:
                 self.current_op_id = new_id
                 QMessageBox.information(self, "Sucesso", f"Ordem de Produção #{new_id} criada.")
+                self.warn_stock_shortages()
                 self.load_op_data()
             else:
                 QMessageBox.critical(self, "Erro", "Não foi possível criar a Ordem de Produção.")
 
+    def warn_stock_shortages(self):
+        shortages = order_operations.get_op_shortages(self.current_op_id)
+        if shortages:
+            QMessageBox.warning(self, "Estoque Comprometido", shortage_message(shortages))
+
     def load_op_data(self):
         if not self.current_op_id: return
         details = order_operations.get_op_details(self.current_op_id)
         if details:
             master = details['master']
+            self.current_version = master.get('VERSAO')
             self.setWindowTitle(f"Editando Ordem de Produção #{self.current_op_id}")
             self.op_id_display.setText(str(master['ID']))
             self.numero_input.setText(master.get('NUMERO', ''))
@@ -156,6 +180,7 @@ class ProductionOrderWindow(QWidget):
                 self.due_date_input.setDate(QDate.fromString(master['DATA_PREVISTA'], "yyyy-MM-dd"))
             
             self.items_table.setRowCount(0)
+            self.row_model.clear()
             total_planned_qty = 0
             for item in details['items']:
                 self.add_item_to_table(item)
@@ -205,15 +230,17 @@ class ProductionOrderWindow(QWidget):
         self.add_item_to_table(item_data)
 
     def add_item_to_table(self, item):
+        self.items_table.blockSignals(True)
         row = self.items_table.rowCount()
         self.items_table.insertRow(row)
+        total_cost = self.row_model.append(item['QUANTIDADE_PRODUZIR'], item['CUSTO_MEDIO'])
         
         id_item = NumericTableWidgetItem(str(item['ID_PRODUTO']))
         desc_item = QTableWidgetItem(item['DESCRICAO'])
         qty_item = NumericTableWidgetItem(str(item['QUANTIDADE_PRODUZIR']))
         unit_item = QTableWidgetItem(item['UNIDADE'].upper())
         cost_item = NumericTableWidgetItem(f"{item['CUSTO_MEDIO']:.2f}")
-        total_cost_item = NumericTableWidgetItem("0.00")
+        total_cost_item = NumericTableWidgetItem(f"{total_cost:.2f}")
 
         id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
         desc_item.setFlags(desc_item.flags() & ~Qt.ItemIsEditable)
@@ -227,6 +254,7 @@ class ProductionOrderWindow(QWidget):
         self.items_table.setItem(row, 3, unit_item)
         self.items_table.setItem(row, 4, cost_item)
         self.items_table.setItem(row, 5, total_cost_item)
+        self.items_table.blockSignals(False)
         self.update_total_cost()
 
     def remove_item(self):
@@ -236,6 +264,8 @@ class ProductionOrderWindow(QWidget):
             return
         for index in sorted([idx.row() for idx in rows], reverse=True):
             self.items_table.removeRow(index)
+            self.row_model.remove(index)
+        self.update_total_cost()
 
     def open_op_search(self):
         from app.production.ui_op_search_window import OPSearchWindow
@@ -292,24 +322,31 @@ class ProductionOrderWindow(QWidget):
             else:
                 QMessageBox.critical(self, "Erro", message)
 
-    def update_total_cost(self, item=None):
-        total_op_cost = 0
-        for row in range(self.items_table.rowCount()):
-            quantity_item = self.items_table.item(row, 2)
-            cost_item = self.items_table.item(row, 4)
-            total_cost_item = self.items_table.item(row, 5)
-
-            if quantity_item and cost_item and total_cost_item:
-                try:
-                    quantity = float(quantity_item.text())
-                    unit_cost = float(cost_item.text())
-                    total_cost = quantity * unit_cost
-                    total_cost_item.setText(f"{total_cost:.2f}")
-                    total_op_cost += total_cost
-                except ValueError:
-                    # Handle cases where conversion to float fails
-                    pass
-        self.total_cost_display.setText(f"{total_op_cost:.2f}")
+    def on_item_changed(self, item):
+        # Somente a quantidade a produzir (coluna 2) é editável
+        if item.column() != 2:
+            return
+        text = item.text()
+        try:
+            quantity = parse_decimal(text or 0)
+        except ValueError:
+            quantity = None
+        if quantity is not None:
+            self.row_model.set_quantity(item.row(), quantity)
+
+        # A grade volta a mostrar o que o modelo guardou (valor normalizado ou o anterior)
+        quantity_text, _, total_text = self.row_model.display_texts(item.row())
+        self.items_table.blockSignals(True)
+        item.setText(quantity_text)
+        self.items_table.item(item.row(), 5).setText(total_text)
+        self.items_table.blockSignals(False)
+        self.update_total_cost()
+        if quantity is None:
+            QMessageBox.warning(self, "Valor Inválido", f"'{text}' não é um número válido. O valor anterior foi mantido.")
+
+    def update_total_cost(self):
+        # O total é mantido incrementalmente pelo modelo de linhas
+        self.total_cost_display.setText(f"{self.row_model.total:.2f}")
 
     def cancel_op(self):
         if not self.current_op_id:
@@ -1,9 +1,20 @@
 # app/production_line/line_operations.py
+import sqlite3
+from datetime import datetime
 from app.database.db import get_db_manager
+from app.database.records import fetch_record, fetch_records
+from app.database.detail_sync import sync_details
+from app.database.versioning import StaleDocumentError, bump_version
+from app.diagnostics.metrics import timed
+from app.production import reservations
+from app.production_line import schedule_operations
 
-def create_production_line(name, description, status, items):
+@timed
+def create_production_line(name, description, status, items, hours_per_day=8, weekdays="12345"):
     """
     Cria uma nova linha de produção com seus itens.
+    hours_per_day e weekdays (dias ISO, '12345' = segunda a sexta) formam o calendário
+    usado na programação; a taxa de cada item ('taxa_hora') é opcional.
     Retorna o ID da nova linha de produção ou None em caso de erro.
     """
     db_manager = get_db_manager()
@@ -11,17 +22,17 @@ def create_production_line(name, description, status, items):
     cursor = conn.cursor()
     try:
         cursor.execute(
-            "INSERT INTO LINHAPRODUCAO_MASTER (NOME, DESCRICAO, STATUS) VALUES (?, ?, ?)",
-            (name, description, status)
+            "INSERT INTO LINHAPRODUCAO_MASTER (NOME, DESCRICAO, STATUS, HORAS_DIA, DIAS_SEMANA) VALUES (?, ?, ?, ?, ?)",
+            (name, description, status, hours_per_day, weekdays)
         )
         line_id = cursor.lastrowid
         if items:
             item_data = [
-                (line_id, item['id_produto'], item['quantidade'])
+                (line_id, item['id_produto'], item['quantidade'], item.get('taxa_hora'))
                 for item in items
             ]
             cursor.executemany(
-                "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE) VALUES (?, ?, ?)",
+                "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE, TAXA_HORA) VALUES (?, ?, ?, ?)",
                 item_data
             )
         conn.commit()
@@ -35,6 +46,7 @@ def create_production_line(name, description, status, items):
         print(f"Erro ao criar linha de produção: {e}")
         return None
 
+@timed
 def get_all_production_lines():
     """Busca todas as linhas de produção com a contagem de produtos."""
     query = """
@@ -52,8 +64,9 @@ def get_all_production_lines():
     conn = db_manager.get_connection()
     cursor = conn.cursor()
     cursor.execute(query)
-    return [dict(row) for row in cursor.fetchall()]
+    return fetch_records(cursor)
 
+@timed
 def get_production_line_details(line_id):
     """Busca os detalhes de uma linha de produção, incluindo mestre e itens."""
     db_manager = get_db_manager()
@@ -62,7 +75,7 @@ def get_production_line_details(line_id):
     
     # Busca os dados mestre
     cursor.execute("SELECT * FROM LINHAPRODUCAO_MASTER WHERE ID = ?", (line_id,))
-    master = cursor.fetchone()
+    master = fetch_record(cursor)
     if not master:
         return None
     
@@ -72,55 +85,54 @@ def get_production_line_details(line_id):
             li.ID_PRODUTO,
             i.DESCRICAO,
             li.QUANTIDADE,
+            li.TAXA_HORA,
             u.SIGLA AS UNIDADE
         FROM LINHAPRODUCAO_ITEMS li
         JOIN ITEM i ON li.ID_PRODUTO = i.ID
         JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
         WHERE li.ID_LINHA_PRODUCAO = ?
     """, (line_id,))
-    items = cursor.fetchall()
+    items = fetch_records(cursor)
     
     return {
-        "master": dict(master),
-        "items": [dict(item) for item in items]
+        "master": master,
+        "items": items
     }
 
-def update_production_line(line_id, name, description, status, items):
+@timed
+def update_production_line(line_id, name, description, status, items, expected_version=None,
+                           hours_per_day=8, weekdays="12345"):
     """
     Atualiza uma linha de produção existente.
-    Retorna True em caso de sucesso, False em caso de erro.
+    Retorna a nova versão em caso de sucesso, False em caso de erro. Com expected_version,
+    levanta StaleDocumentError se a linha foi salva por outra estação.
     """
     db_manager = get_db_manager()
     conn = db_manager.get_connection()
     cursor = conn.cursor()
     try:
+        new_version = bump_version(cursor, "LINHAPRODUCAO_MASTER", line_id, expected_version)
         # Atualiza o mestre
         cursor.execute(
-            "UPDATE LINHAPRODUCAO_MASTER SET NOME = ?, DESCRICAO = ?, STATUS = ? WHERE ID = ?",
-            (name, description, status, line_id)
+            "UPDATE LINHAPRODUCAO_MASTER SET NOME = ?, DESCRICAO = ?, STATUS = ?, HORAS_DIA = ?, DIAS_SEMANA = ? WHERE ID = ?",
+            (name, description, status, hours_per_day, weekdays, line_id)
         )
         
-        # Remove itens antigos
-        cursor.execute("DELETE FROM LINHAPRODUCAO_ITEMS WHERE ID_LINHA_PRODUCAO = ?", (line_id,))
-        
-        # Insere novos itens
-        if items:
-            item_data = [
-                (line_id, item['id_produto'], item['quantidade'])
-                for item in items
-            ]
-            cursor.executemany(
-                "INSERT INTO LINHAPRODUCAO_ITEMS (ID_LINHA_PRODUCAO, ID_PRODUTO, QUANTIDADE) VALUES (?, ?, ?)",
-                item_data
-            )
-            
+        # Aplica apenas a diferença nos itens
+        sync_details(cursor, "LINHAPRODUCAO_ITEMS", "ID_LINHA_PRODUCAO", line_id, "ID_PRODUTO", ["QUANTIDADE", "TAXA_HORA"],
+                     [(item['id_produto'], item['quantidade'], item.get('taxa_hora')) for item in items])
+
         conn.commit()
-        return True
+        return new_version
+    except StaleDocumentError:
+        conn.rollback()
+        raise
     except Exception as e:
         conn.rollback()
         print(f"Erro ao atualizar a linha de produção: {e}")
         return False
 
+@timed
 def delete_production_line(line_id):
     """
     Exclui uma linha de produção. A exclusão é em cascata para os itens.
@@ -137,3 +149,74 @@ def delete_production_line(line_id):
         conn.rollback()
         print(f"Erro ao excluir a linha de produção: {e}")
         return False
+
+ACTIVE_LINE_REQUIREMENTS_QUERY = """
+    SELECT C.ID_INSUMO, I.DESCRICAO, SUM(li.QUANTIDADE * ? * C.QUANTIDADE) AS NECESSARIO,
+           I.SALDO_ESTOQUE - I.SALDO_RESERVADO AS DISPONIVEL
+    FROM LINHAPRODUCAO_MASTER lm
+    JOIN LINHAPRODUCAO_ITEMS li ON li.ID_LINHA_PRODUCAO = lm.ID
+    JOIN COMPOSICAO C ON C.ID_PRODUTO = li.ID_PRODUTO
+    JOIN ITEM I ON I.ID = C.ID_INSUMO
+    WHERE lm.STATUS = 'Ativa'
+    GROUP BY C.ID_INSUMO
+    ORDER BY I.DESCRICAO
+"""
+
+@timed
+def get_active_lines_requirements(shift_factor=1.0):
+    """Necessidade somada de insumos de todas as linhas ativas (x shift_factor) e o disponível de cada um."""
+    conn = get_db_manager().get_connection()
+    return fetch_records(conn.execute(ACTIVE_LINE_REQUIREMENTS_QUERY, (shift_factor,)))
+
+@timed
+def generate_ops_for_active_lines(shift_factor=1.0, allow_shortage=False):
+    """
+    Cria uma OP para cada linha ativa com os produtos da linha x shift_factor, numa única transação.
+    A necessidade de insumos é conferida uma vez, somada para todas as linhas; se faltar
+    insumo e allow_shortage for falso, nada é criado.
+    Retorna (IDs das OPs criadas, insumos em falta); (None, []) em caso de erro.
+    """
+    conn = get_db_manager().get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT lm.ID, lm.NOME, li.ID_PRODUTO, li.QUANTIDADE
+            FROM LINHAPRODUCAO_MASTER lm
+            JOIN LINHAPRODUCAO_ITEMS li ON li.ID_LINHA_PRODUCAO = lm.ID
+            WHERE lm.STATUS = 'Ativa'
+            ORDER BY lm.ID
+        """)
+        lines = {}
+        for line_id, name, product_id, quantity in cursor.fetchall():
+            line = lines.setdefault(line_id, {"name": name, "items": []})
+            line["items"].append({'id_produto': product_id, 'quantidade': quantity * shift_factor})
+        if not lines:
+            return [], []
+
+        shortages = [row for row in fetch_records(cursor.execute(ACTIVE_LINE_REQUIREMENTS_QUERY, (shift_factor,)))
+                     if row['NECESSARIO'] > row['DISPONIVEL'] + 1e-9]
+        if shortages and not allow_shortage:
+            return [], shortages
+
+        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Uma OP por linha; o ID de cada uma vem do próprio INSERT
+        op_by_line = {}
+        for line_id, line in lines.items():
+            op_by_line[line_id] = cursor.execute(
+                "INSERT INTO ORDEMPRODUCAO (NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS, ID_LINHA_PRODUCAO) VALUES (?, ?, ?, 'Em Andamento', ?) RETURNING ID",
+                (f"LP-{line_id}-{line['name']}", created_at,
+                 schedule_operations.estimate_completion(line_id, line['items']), line_id)
+            ).fetchone()[0]
+        cursor.executemany(
+            "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
+            [(op_by_line[line_id], item['id_produto'], item['quantidade'])
+             for line_id, line in lines.items() for item in line['items']]
+        )
+        for op_id in op_by_line.values():
+            reservations.refresh_op(cursor, op_id)
+        conn.commit()
+        return sorted(op_by_line.values()), shortages
+    except Exception as e:
+        conn.rollback()
+        print(f"Erro ao gerar as OPs das linhas ativas: {e}")
+        return None, []
@@ -0,0 +1,112 @@
+# app/production_line/schedule_operations.py
+from datetime import datetime
+from app.database.db import get_db_manager
+from app.database.records import fetch_records
+from app.diagnostics.metrics import timed
+from app.production_line import scheduler
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+
+def _load_orders(cursor):
+    cursor.execute("""
+        SELECT ID, DATA_PREVISTA, DATA_CRIACAO, ID_LINHA_PRODUCAO
+        FROM ORDEMPRODUCAO WHERE STATUS = 'Em Andamento'
+    """)
+    orders = {row[0]: {"id": row[0], "due": row[1], "created": row[2], "line_id": row[3],
+                       "items": [], "materials": {}}
+              for row in cursor.fetchall()}
+    cursor.execute("""
+        SELECT OPI.ID_ORDEM_PRODUCAO, OPI.ID_PRODUTO, OPI.QUANTIDADE_PRODUZIR
+        FROM ORDEMPRODUCAO_ITENS OPI
+        JOIN ORDEMPRODUCAO OP ON OP.ID = OPI.ID_ORDEM_PRODUCAO
+        WHERE OP.STATUS = 'Em Andamento'
+    """)
+    for op_id, product_id, quantity in cursor.fetchall():
+        orders[op_id]["items"].append((product_id, quantity))
+    # A reserva de cada OP em andamento já é a composição explodida (ver production/reservations.py)
+    cursor.execute("SELECT ID_ORDEM_PRODUCAO, ID_INSUMO, QUANTIDADE FROM RESERVA")
+    for op_id, item_id, quantity in cursor.fetchall():
+        if op_id in orders:
+            orders[op_id]["materials"][item_id] = quantity
+    return list(orders.values())
+
+def _load_lines(cursor):
+    cursor.execute("SELECT ID, HORAS_DIA, DIAS_SEMANA FROM LINHAPRODUCAO_MASTER WHERE STATUS = 'Ativa'")
+    lines = {row[0]: {"id": row[0], "calendar": scheduler.LineCalendar(row[1], row[2]), "rates": {}}
+             for row in cursor.fetchall()}
+    cursor.execute("SELECT ID_LINHA_PRODUCAO, ID_PRODUTO, TAXA_HORA FROM LINHAPRODUCAO_ITEMS WHERE TAXA_HORA > 0")
+    for line_id, product_id, rate in cursor.fetchall():
+        if line_id in lines:
+            lines[line_id]["rates"][product_id] = rate
+    return list(lines.values())
+
+def _load_stock(cursor):
+    cursor.execute("SELECT ID, SALDO_ESTOQUE FROM ITEM WHERE ID IN (SELECT ID_INSUMO FROM RESERVA)")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+def _format(moment):
+    return moment.strftime(DATETIME_FORMAT) if moment else None
+
+@timed
+def build_schedule(start=None, save=True):
+    """
+    Programa todas as OPs em andamento nas linhas ativas e, com save, grava o resultado
+    em PROGRAMACAO (substituindo a programação anterior). Devolve a lista de resultados.
+    """
+    conn = get_db_manager().get_connection()
+    cursor = conn.cursor()
+    results = scheduler.schedule(_load_orders(cursor), _load_lines(cursor), _load_stock(cursor), start)
+    if save:
+        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            with conn:
+                cursor.execute("DELETE FROM PROGRAMACAO")
+                cursor.executemany("""
+                    INSERT INTO PROGRAMACAO (ID_ORDEM_PRODUCAO, ID_LINHA_PRODUCAO, SEQUENCIA, INICIO, FIM, SITUACAO, DATA_PROGRAMACAO)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [(r["order_id"], r["line_id"], r["sequence"], _format(r["start"]), _format(r["end"]),
+                       r["status"], created_at) for r in results])
+        except Exception as e:
+            print(f"Erro ao gravar a programação da produção: {e}")
+            return None
+    return results
+
+@timed
+def get_schedule():
+    """Programação gravada das OPs ainda em andamento, por linha e sequência."""
+    conn = get_db_manager().get_connection()
+    return fetch_records(conn.execute("""
+        SELECT P.ID_ORDEM_PRODUCAO, OP.NUMERO, OP.DATA_PREVISTA, P.ID_LINHA_PRODUCAO, L.NOME AS LINHA,
+               P.SEQUENCIA, P.INICIO, P.FIM, P.SITUACAO, P.DATA_PROGRAMACAO
+        FROM PROGRAMACAO P
+        JOIN ORDEMPRODUCAO OP ON OP.ID = P.ID_ORDEM_PRODUCAO
+        LEFT JOIN LINHAPRODUCAO_MASTER L ON L.ID = P.ID_LINHA_PRODUCAO
+        WHERE OP.STATUS = 'Em Andamento'
+        ORDER BY L.NOME IS NULL, L.NOME, P.SEQUENCIA, P.ID_ORDEM_PRODUCAO
+    """))
+
+@timed
+def estimate_completion(line_id, items_to_produce):
+    """
+    Data (AAAA-MM-DD) em que a linha termina os itens se entrarem no fim da fila da
+    programação gravada, ou None se a linha não tiver taxa para algum deles.
+    """
+    conn = get_db_manager().get_connection()
+    line = conn.execute("SELECT HORAS_DIA, DIAS_SEMANA FROM LINHAPRODUCAO_MASTER WHERE ID = ?", (line_id,)).fetchone()
+    if not line:
+        return None
+    calendar = scheduler.LineCalendar(line[0], line[1])
+    rates = dict(conn.execute(
+        "SELECT ID_PRODUTO, TAXA_HORA FROM LINHAPRODUCAO_ITEMS WHERE ID_LINHA_PRODUCAO = ? AND TAXA_HORA > 0", (line_id,)
+    ).fetchall())
+    if not calendar.is_usable() or any(item['id_produto'] not in rates for item in items_to_produce):
+        return None
+
+    now = datetime.now().replace(second=0, microsecond=0)
+    queue_end = conn.execute("""
+        SELECT MAX(P.FIM) FROM PROGRAMACAO P JOIN ORDEMPRODUCAO OP ON OP.ID = P.ID_ORDEM_PRODUCAO
+        WHERE P.ID_LINHA_PRODUCAO = ? AND OP.STATUS = 'Em Andamento'
+    """, (line_id,)).fetchone()[0]
+    begin = max(now, datetime.strptime(queue_end, DATETIME_FORMAT)) if queue_end else now
+    hours = sum(item['quantidade'] / rates[item['id_produto']] for item in items_to_produce)
+    return calendar.add_hours(begin, hours).date().isoformat()
@@ -0,0 +1,178 @@
+# app/production_line/scheduler.py
+"""
+Programação das OPs em andamento nas linhas de produção.
+
+Cada linha tem um calendário (horas por dia a partir de SHIFT_START e dias da semana
+de trabalho) e uma taxa em unidades por hora para cada produto que fabrica. Uma OP só
+pode ir para uma linha que tenha taxa para todos os produtos dela; se foi criada a
+partir de uma linha, fica nessa linha.
+
+Heurística: as OPs saem de uma fila de prioridade (heapq) pela menor data prevista
+(EDD), que minimiza o maior atraso numa linha só; OPs sem data prevista vão por último,
+na ordem de criação. Cada OP vai para a linha elegível em que termina mais cedo,
+começando quando a linha fica livre e os insumos estão disponíveis. O saldo de cada
+insumo é um conjunto de lotes datados: o estoque atual está disponível desde o início
+e a produção das OPs já programadas entra no fim de cada uma. Uma OP cujos insumos não
+cabem no saldo projetado fica sem programação.
+
+O módulo não acessa o banco (ver schedule_operations.py); o custo é O(OPs x linhas
+elegíveis), com avanço do calendário semana a semana nas OPs longas.
+"""
+import heapq
+from bisect import insort
+from datetime import datetime, time, timedelta
+
+SHIFT_START = time(8, 0)
+NO_DUE_DATE = "9999-12-31"
+
+STATUS_SCHEDULED = "Programada"
+STATUS_LATE = "Atrasada"
+STATUS_NO_LINE = "Sem Linha"
+STATUS_NO_MATERIAL = "Sem Insumo"
+
+class LineCalendar:
+    def __init__(self, hours_per_day=8, weekdays="12345", shift_start=SHIFT_START):
+        self.hours_per_day = min(max(hours_per_day or 0, 0), 24)
+        # Dias ISO: 1 = segunda ... 7 = domingo
+        self.weekdays = {int(day) for day in str(weekdays or "") if day in "1234567"}
+        self.shift_start = shift_start
+        self.shift = timedelta(hours=self.hours_per_day)
+        self.week_capacity = self.shift * len(self.weekdays)
+
+    def is_usable(self):
+        return bool(self.week_capacity)
+
+    def window(self, moment):
+        """(início, fim) do turno que contém moment ou do próximo, com o início a partir de moment."""
+        # O turno do dia anterior pode passar da meia-noite
+        day = moment.date() - timedelta(days=1)
+        for _ in range(9):
+            if day.isoweekday() in self.weekdays:
+                start = datetime.combine(day, self.shift_start)
+                end = start + self.shift
+                if moment < end:
+                    return max(moment, start), end
+            day += timedelta(days=1)
+        raise ValueError("Calendário sem dias de trabalho.")
+
+    def add_hours(self, moment, hours):
+        """Instante em que termina um trabalho de `hours` horas úteis que começa em moment."""
+        remaining = timedelta(hours=hours)
+        start, end = self.window(moment)
+        while remaining > end - start:
+            remaining -= end - start
+            # Semanas inteiras de uma vez: do fim de um turno ao mesmo turno 7 dias depois
+            weeks = int(remaining / self.week_capacity)
+            if weeks and remaining - self.week_capacity * weeks > timedelta(0):
+                remaining -= self.week_capacity * weeks
+                end += timedelta(days=7 * weeks)
+            start, end = self.window(end)
+        return start + remaining
+
+    def start_of(self, moment):
+        return self.window(moment)[0]
+
+class _MaterialLedger:
+    """Saldo projetado dos insumos como lotes (disponível a partir de, quantidade) em ordem de data."""
+
+    def __init__(self, stock, start):
+        self.start = start
+        self.lots = {item_id: [(start, quantity)] for item_id, quantity in stock.items() if quantity > 0}
+
+    def ready_at(self, materials):
+        """Instante em que todos os insumos estão disponíveis, ou None se o saldo não basta."""
+        ready = self.start
+        for item_id, needed in materials.items():
+            if needed <= 0:
+                continue
+            for available_at, quantity in self.lots.get(item_id, ()):
+                needed -= quantity
+                if needed <= 1e-9:
+                    ready = max(ready, available_at)
+                    break
+            else:
+                return None
+        return ready
+
+    def consume(self, materials):
+        for item_id, needed in materials.items():
+            lots = self.lots.get(item_id, [])
+            while needed > 1e-9 and lots:
+                available_at, quantity = lots[0]
+                if quantity <= needed + 1e-9:
+                    lots.pop(0)
+                    needed -= quantity
+                else:
+                    lots[0] = (available_at, quantity - needed)
+                    needed = 0
+
+    def add(self, item_id, available_at, quantity):
+        insort(self.lots.setdefault(item_id, []), (available_at, quantity))
+
+def schedule(orders, lines, stock, start=None):
+    """
+    Programa as OPs e devolve a lista de resultados na ordem em que foram programadas.
+
+    orders: dicts com id, due (AAAA-MM-DD ou None), created, line_id (linha fixa ou None),
+            items [(produto, quantidade)] e materials {insumo: quantidade}.
+    lines:  dicts com id, calendar (LineCalendar) e rates {produto: unidades por hora}.
+    stock:  {item: saldo atual}.
+    Cada resultado tem order_id, line_id, sequence, start, end (datetime ou None) e status.
+    """
+    start = start or datetime.now().replace(second=0, microsecond=0)
+    usable = {line["id"]: line for line in lines if line["calendar"].is_usable() and line["rates"]}
+    free_at = {line_id: line["calendar"].start_of(start) for line_id, line in usable.items()}
+    lines_by_product = {}
+    for line_id, line in usable.items():
+        for product_id, rate in line["rates"].items():
+            if rate and rate > 0:
+                lines_by_product.setdefault(product_id, set()).add(line_id)
+
+    queue = [(order["due"] or NO_DUE_DATE, order["created"] or "", order["id"], order) for order in orders]
+    heapq.heapify(queue)
+    ledger = _MaterialLedger(stock, start)
+    eligible_cache = {}
+    sequence = {line_id: 0 for line_id in usable}
+    results = []
+
+    while queue:
+        due, _, order_id, order = heapq.heappop(queue)
+        products = frozenset(product_id for product_id, _ in order["items"])
+        eligible = eligible_cache.get(products)
+        if eligible is None:
+            sets = [lines_by_product.get(product_id, set()) for product_id in products]
+            eligible = sorted(set.intersection(*sets)) if sets else []
+            eligible_cache[products] = eligible
+        if order["line_id"] in eligible:
+            eligible = [order["line_id"]]
+        if not eligible:
+            results.append(_result(order_id, None, None, None, None, STATUS_NO_LINE))
+            continue
+
+        ready = ledger.ready_at(order["materials"])
+        if ready is None:
+            results.append(_result(order_id, None, None, None, None, STATUS_NO_MATERIAL))
+            continue
+
+        best = None
+        for line_id in eligible:
+            line = usable[line_id]
+            hours = sum(quantity / line["rates"][product_id] for product_id, quantity in order["items"])
+            begin = line["calendar"].start_of(max(free_at[line_id], ready))
+            end = line["calendar"].add_hours(begin, hours)
+            if best is None or end < best[2]:
+                best = (line_id, begin, end)
+
+        line_id, begin, end = best
+        ledger.consume(order["materials"])
+        for product_id, quantity in order["items"]:
+            ledger.add(product_id, end, quantity)
+        free_at[line_id] = end
+        sequence[line_id] += 1
+        status = STATUS_LATE if due != NO_DUE_DATE and end.date().isoformat() > due[:10] else STATUS_SCHEDULED
+        results.append(_result(order_id, line_id, sequence[line_id], begin, end, status))
+    return results
+
+def _result(order_id, line_id, sequence, start, end, status):
+    return {"order_id": order_id, "line_id": line_id, "sequence": sequence, "start": start, "end": end,
+            "status": status}
@@ -2,12 +2,16 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout, QLineEdit,
     QPushButton, QMessageBox, QTableWidget, QTableWidgetItem, QComboBox,
-    QHeaderView, QAbstractItemView, QTextEdit
+    QHeaderView, QAbstractItemView, QTextEdit, QDoubleSpinBox, QCheckBox
 )
 from PySide6.QtCore import Qt
+from app.database.versioning import StaleDocumentError
 from app.production_line import line_operations
 from app.item.ui_search_window import ItemSearchWindow
 from app.utils.ui_utils import NumericTableWidgetItem
+from app.utils.row_model import parse_decimal
+
+WEEKDAY_LABELS = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
 
 class LineEditWindow(QWidget):
     def __init__(self, line_id=None, parent=None):
@@ -15,6 +19,7 @@ class LineEditWindow(QWidget):
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.parent = parent  # To refresh the list view
         self.current_line_id = line_id
+        self.current_version = None
         self.search_item_window = None
 
         self.setWindowTitle("Cadastro de Linha de Produção")
@@ -36,6 +41,21 @@ class LineEditWindow(QWidget):
         form_layout.addRow("Nome:", self.name_input)
         form_layout.addRow("Descrição:", self.description_input)
         form_layout.addRow("Status:", self.status_combo)
+
+        # Calendário usado na programação da produção
+        self.hours_input = QDoubleSpinBox()
+        self.hours_input.setRange(0, 24)
+        self.hours_input.setDecimals(1)
+        self.hours_input.setValue(8)
+        weekdays_layout = QHBoxLayout()
+        self.weekday_checkboxes = []
+        for index, label in enumerate(WEEKDAY_LABELS):
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(index < 5)
+            self.weekday_checkboxes.append(checkbox)
+            weekdays_layout.addWidget(checkbox)
+        form_layout.addRow("Horas por dia:", self.hours_input)
+        form_layout.addRow("Dias de trabalho:", weekdays_layout)
         form_group.setLayout(form_layout)
         self.main_layout.addWidget(form_group)
 
@@ -43,8 +63,8 @@ class LineEditWindow(QWidget):
         items_group = QGroupBox("Produtos da Linha")
         items_layout = QVBoxLayout()
         self.items_table = QTableWidget()
-        self.items_table.setColumnCount(4)
-        self.items_table.setHorizontalHeaderLabels(["ID Produto", "Descrição", "Quantidade", "Un."])
+        self.items_table.setColumnCount(5)
+        self.items_table.setHorizontalHeaderLabels(["ID Produto", "Descrição", "Quantidade", "Taxa (un/h)", "Un."])
         self.items_table.setColumnHidden(0, True)
         self.items_table.verticalHeader().setVisible(False)
         self.items_table.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -80,9 +100,14 @@ class LineEditWindow(QWidget):
         details = line_operations.get_production_line_details(self.current_line_id)
         if details:
             master = details['master']
+            self.current_version = master.get('VERSAO')
             self.name_input.setText(master.get('NOME', ''))
             self.description_input.setPlainText(master.get('DESCRICAO', ''))
             self.status_combo.setCurrentText(master.get('STATUS', 'Ativa'))
+            self.hours_input.setValue(master.get('HORAS_DIA', 8))
+            weekdays = master.get('DIAS_SEMANA', '12345')
+            for index, checkbox in enumerate(self.weekday_checkboxes):
+                checkbox.setChecked(str(index + 1) in weekdays)
             
             self.items_table.setRowCount(0)
             for item in details['items']:
@@ -99,16 +124,30 @@ class LineEditWindow(QWidget):
 
         items = []
         for row in range(self.items_table.rowCount()):
+            rate_text = self.items_table.item(row, 3).text().strip()
+            try:
+                rate = parse_decimal(rate_text) if rate_text else None
+            except ValueError:
+                QMessageBox.warning(self, "Atenção", f"Taxa inválida na linha {row + 1}.")
+                return
             items.append({
                 'id_produto': int(self.items_table.item(row, 0).text()),
-                'quantidade': float(self.items_table.item(row, 2).text())
+                'quantidade': float(self.items_table.item(row, 2).text()),
+                'taxa_hora': rate if rate and rate > 0 else None
             })
+        hours_per_day = self.hours_input.value()
+        weekdays = "".join(str(index + 1) for index, checkbox in enumerate(self.weekday_checkboxes) if checkbox.isChecked())
 
         if self.current_line_id:
-            success = line_operations.update_production_line(self.current_line_id, name, description, status, items)
+            try:
+                success = line_operations.update_production_line(self.current_line_id, name, description, status, items,
+                                                                 self.current_version, hours_per_day, weekdays)
+            except StaleDocumentError as e:
+                QMessageBox.warning(self, "Conflito de Edição", str(e))
+                return
             message = "Linha de produção atualizada com sucesso." if success else "Falha ao atualizar a linha de produção."
         else:
-            line_id = line_operations.create_production_line(name, description, status, items)
+            line_id = line_operations.create_production_line(name, description, status, items, hours_per_day, weekdays)
             success = line_id is not None
             message = "Linha de produção criada com sucesso." if success else "Falha ao criar a linha de produção."
 
@@ -135,6 +174,7 @@ class LineEditWindow(QWidget):
             'ID_PRODUTO': item_data['ID'],
             'DESCRICAO': item_data['DESCRICAO'],
             'QUANTIDADE': 1.0, # Default quantity
+            'TAXA_HORA': None,
             'UNIDADE': item_data['SIGLA']
         }
         self.add_item_to_table(item_to_add)
@@ -146,6 +186,7 @@ class LineEditWindow(QWidget):
         id_item = QTableWidgetItem(str(item['ID_PRODUTO']))
         desc_item = QTableWidgetItem(item['DESCRICAO'])
         qty_item = NumericTableWidgetItem(str(item['QUANTIDADE']))
+        rate_item = NumericTableWidgetItem(str(item['TAXA_HORA']) if item['TAXA_HORA'] else "")
         unit_item = QTableWidgetItem(item['UNIDADE'])
 
         id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
@@ -155,7 +196,8 @@ class LineEditWindow(QWidget):
         self.items_table.setItem(row, 0, id_item)
         self.items_table.setItem(row, 1, desc_item)
         self.items_table.setItem(row, 2, qty_item)
-        self.items_table.setItem(row, 3, unit_item)
+        self.items_table.setItem(row, 3, rate_item)
+        self.items_table.setItem(row, 4, unit_item)
 
     def remove_item(self):
         selected_rows = self.items_table.selectionModel().selectedRows()
@@ -1,12 +1,12 @@
 # app/production_line/ui_line_list_window.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QMessageBox,
-    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QInputDialog
 )
 from PySide6.QtCore import Qt
-from app.production_line import line_operations
+from app.production_line import line_operations, schedule_operations
 from app.production_line.ui_line_edit_window import LineEditWindow
-from app.production.ui_order_window import ProductionOrderWindow
+from app.production.ui_order_window import ProductionOrderWindow, shortage_message
 from app.production import order_operations
 
 class LineListWindow(QWidget):
@@ -34,11 +34,14 @@ class LineListWindow(QWidget):
         self.produce_button = QPushButton("Produzir")
         self.produce_button.setStyleSheet("background-color: #4CAF50; color: white;")
         self.produce_button.clicked.connect(self.produce_from_selected_line)
+        self.produce_all_button = QPushButton("Produzir Todas")
+        self.produce_all_button.clicked.connect(self.produce_from_active_lines)
         
         action_layout.addWidget(self.new_button)
         action_layout.addWidget(self.edit_button)
         action_layout.addWidget(self.delete_button)
         action_layout.addStretch()
+        action_layout.addWidget(self.produce_all_button)
         action_layout.addWidget(self.produce_button)
         self.main_layout.addLayout(action_layout)
 
@@ -136,10 +139,16 @@ class LineListWindow(QWidget):
         
         numero_op = f"LP-{line_id}-{self.lines_table.item(selected_row, 1).text()}"
 
-        new_op_id = order_operations.create_op(numero_op, None, items_to_produce, id_linha_producao=line_id)
+        # Data prevista: fim da fila da linha na programação gravada, pelas taxas da linha
+        due_date = schedule_operations.estimate_completion(line_id, items_to_produce)
+
+        new_op_id = order_operations.create_op(numero_op, due_date, items_to_produce, id_linha_producao=line_id)
         
         if new_op_id:
             QMessageBox.information(self, "Ordem de Produção Criada", f"Ordem de Produção #{new_op_id} foi criada. Por favor, revise e finalize.")
+            shortages = order_operations.get_op_shortages(new_op_id)
+            if shortages:
+                QMessageBox.warning(self, "Estoque Comprometido", shortage_message(shortages))
             if self.order_window is None:
                 self.order_window = ProductionOrderWindow(op_id=new_op_id)
                 self.order_window.destroyed.connect(lambda: setattr(self, 'order_window', None))
@@ -149,3 +158,36 @@ class LineListWindow(QWidget):
                 self.order_window.activateWindow()
         else:
             QMessageBox.critical(self, "Erro", "Falha ao criar a Ordem de Produção a partir da linha selecionada.")
+
+    def produce_from_active_lines(self):
+        shift_factor, ok = QInputDialog.getDouble(
+            self, "Produzir Todas", "Gerar OPs para todas as linhas ativas.\nFator do turno (x quantidade da linha):",
+            1.0, 0.01, 1000.0, 2
+        )
+        if not ok:
+            return
+
+        created, shortages = line_operations.generate_ops_for_active_lines(shift_factor)
+        if created is None:
+            QMessageBox.critical(self, "Erro", "Falha ao gerar as Ordens de Produção das linhas ativas.")
+            return
+        if shortages and not created:
+            lines = [f"- {row['DESCRICAO']}: necessário {row['NECESSARIO']:.3f}, disponível {row['DISPONIVEL']:.3f}"
+                     for row in shortages]
+            reply = QMessageBox.question(
+                self, "Insumos Insuficientes",
+                "O disponível não cobre a necessidade destes insumos:\n" + "\n".join(lines) + "\n\nGerar as OPs assim mesmo?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            created, shortages = line_operations.generate_ops_for_active_lines(shift_factor, allow_shortage=True)
+            if created is None:
+                QMessageBox.critical(self, "Erro", "Falha ao gerar as Ordens de Produção das linhas ativas.")
+                return
+
+        if created:
+            QMessageBox.information(self, "Ordens de Produção Criadas",
+                                    f"{len(created)} Ordens de Produção criadas (#{created[0]} a #{created[-1]}).")
+        else:
+            QMessageBox.warning(self, "Atenção", "Nenhuma linha ativa tem produtos para produzir.")
@@ -0,0 +1,90 @@
+# app/production_line/ui_schedule_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTableView, QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QDateTime
+from PySide6.QtGui import QStandardItemModel, QStandardItem
+from app.production_line import schedule_operations
+from app.production_line.scheduler import STATUS_SCHEDULED
+from app.production.ui_order_window import ProductionOrderWindow
+from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_date_for_display
+
+def format_moment(value):
+    moment = QDateTime.fromString(value or "", "yyyy-MM-dd HH:mm")
+    return moment.toString(f"{BRAZILIAN_DATE_FORMAT} HH:mm") if moment.isValid() else ""
+
+class ScheduleWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.order_window = None
+        self.setWindowTitle("Programação da Produção")
+        self.setGeometry(200, 200, 900, 600)
+        self.setup_ui()
+        self.load_schedule()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        action_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        schedule_button = QPushButton("Programar")
+        schedule_button.clicked.connect(self.run_schedule)
+        action_layout.addWidget(self.summary_label, 1)
+        action_layout.addWidget(schedule_button)
+        self.main_layout.addLayout(action_layout)
+
+        self.table_view = QTableView()
+        self.table_model = QStandardItemModel()
+        self.table_model.setHorizontalHeaderLabels(
+            ["Linha", "Seq.", "OP", "Número", "Início", "Fim", "Data Prevista", "Situação"]
+        )
+        self.table_view.setModel(self.table_model)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.doubleClicked.connect(self.open_order)
+        self.main_layout.addWidget(self.table_view)
+
+    def run_schedule(self):
+        schedule_operations.build_schedule()
+        self.load_schedule()
+
+    def load_schedule(self):
+        self.table_model.removeRows(0, self.table_model.rowCount())
+        rows = schedule_operations.get_schedule()
+        pending = 0
+        for entry in rows:
+            row = [
+                QStandardItem(entry['LINHA'] or ""),
+                QStandardItem(str(entry['SEQUENCIA'] or "")),
+                QStandardItem(str(entry['ID_ORDEM_PRODUCAO'])),
+                QStandardItem(entry['NUMERO'] or ""),
+                QStandardItem(format_moment(entry['INICIO'])),
+                QStandardItem(format_moment(entry['FIM'])),
+                QStandardItem(format_date_for_display(entry['DATA_PREVISTA'])),
+                QStandardItem(entry['SITUACAO'])
+            ]
+            if entry['SITUACAO'] != STATUS_SCHEDULED:
+                pending += 1
+                for item in row:
+                    item.setForeground(Qt.red)
+            self.table_model.appendRow(row)
+        if rows:
+            self.summary_label.setText(f"Programação de {format_date_for_display(rows[0]['DATA_PROGRAMACAO'])}: "
+                                       f"{len(rows)} OPs, {pending} atrasadas ou sem programação.")
+        else:
+            self.summary_label.setText("Nenhuma programação gravada.")
+
+    def open_order(self, index):
+        op_id = int(self.table_model.item(index.row(), 2).text())
+        if self.order_window is None:
+            self.order_window = ProductionOrderWindow(op_id=op_id)
+            self.order_window.destroyed.connect(lambda: setattr(self, 'order_window', None))
+            self.order_window.show()
+        else:
+            self.order_window.load_op_by_id(op_id)
+            self.order_window.activateWindow()
@@ -0,0 +1,73 @@
+# app/reports/aggregates.py
+"""
+Manutenção das tabelas de resumo diário usadas pelos relatórios.
+
+As funções recebem o cursor da transação em andamento, para que o resumo
+seja atualizado no mesmo commit que grava o MOVIMENTO correspondente.
+"""
+
+def record_consumption(cursor, item_id, movement_date, quantity, value):
+    """Soma um consumo de insumo por OP ao resumo diário."""
+    cursor.execute("""
+        INSERT INTO RESUMO_CONSUMO_DIARIO (DATA, ID_ITEM, QUANTIDADE, VALOR) VALUES (?, ?, ?, ?)
+        ON CONFLICT (DATA, ID_ITEM) DO UPDATE SET
+            QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE,
+            VALOR = VALOR + excluded.VALOR
+    """, (movement_date, item_id, quantity, value))
+
+def remove_op_consumption(cursor, op_id):
+    """Estorna do resumo diário os consumos gravados em MOVIMENTO para uma OP."""
+    cursor.execute("""
+        SELECT M.DATA_MOVIMENTO, M.ID_ITEM, SUM(M.QUANTIDADE) AS QUANTIDADE,
+               SUM(M.QUANTIDADE * COALESCE(M.VALOR_UNITARIO, I.CUSTO_MEDIO)) AS VALOR
+        FROM MOVIMENTO M
+        JOIN ITEM I ON M.ID_ITEM = I.ID
+        WHERE M.ID_ORDEM_PRODUCAO = ? AND M.TIPO_MOVIMENTO = 'Saída por OP'
+        GROUP BY M.DATA_MOVIMENTO, M.ID_ITEM
+    """, (op_id,))
+    rows = cursor.fetchall()
+    cursor.executemany("""
+        UPDATE RESUMO_CONSUMO_DIARIO SET QUANTIDADE = QUANTIDADE - ?, VALOR = VALOR - ?
+        WHERE DATA = ? AND ID_ITEM = ?
+    """, [(row['QUANTIDADE'], row['VALOR'], row['DATA_MOVIMENTO'], row['ID_ITEM']) for row in rows])
+    # Remove, entre os dias estornados, os que ficaram zerados (com tolerância para arredondamento)
+    cursor.executemany("""
+        DELETE FROM RESUMO_CONSUMO_DIARIO WHERE DATA = ? AND ID_ITEM = ? AND QUANTIDADE <= 1e-9
+    """, [(row['DATA_MOVIMENTO'], row['ID_ITEM']) for row in rows])
+
+def record_sale(cursor, product_id, sale_date, quantity, revenue, cost):
+    """Soma uma venda finalizada (quantidade, receita e custo) ao resumo diário."""
+    cursor.execute("""
+        INSERT INTO RESUMO_VENDAS_DIARIO (DATA, ID_PRODUTO, QUANTIDADE, RECEITA, CUSTO) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (DATA, ID_PRODUTO) DO UPDATE SET
+            QUANTIDADE = QUANTIDADE + excluded.QUANTIDADE,
+            RECEITA = RECEITA + excluded.RECEITA,
+            CUSTO = CUSTO + excluded.CUSTO
+    """, (sale_date, product_id, quantity, revenue, cost))
+
+def rebuild_aggregates(cursor):
+    """
+    Reconstrói os resumos diários a partir do histórico completo (inclusive o arquivado).
+    Consumos antigos sem VALOR_UNITARIO e vendas sem CUSTO_UNITARIO usam o custo médio atual.
+    """
+    cursor.execute("DELETE FROM RESUMO_CONSUMO_DIARIO")
+    cursor.execute("""
+        INSERT INTO RESUMO_CONSUMO_DIARIO (DATA, ID_ITEM, QUANTIDADE, VALOR)
+        SELECT M.DATA_MOVIMENTO, M.ID_ITEM, SUM(M.QUANTIDADE),
+               SUM(M.QUANTIDADE * COALESCE(M.VALOR_UNITARIO, I.CUSTO_MEDIO))
+        FROM MOVIMENTO_HISTORICO M
+        JOIN ITEM I ON M.ID_ITEM = I.ID
+        WHERE M.TIPO_MOVIMENTO = 'Saída por OP'
+        GROUP BY M.DATA_MOVIMENTO, M.ID_ITEM
+    """)
+    cursor.execute("DELETE FROM RESUMO_VENDAS_DIARIO")
+    cursor.execute("""
+        INSERT INTO RESUMO_VENDAS_DIARIO (DATA, ID_PRODUTO, QUANTIDADE, RECEITA, CUSTO)
+        SELECT S.DATA_SAIDA, SI.ID_PRODUTO, SUM(SI.QUANTIDADE), SUM(SI.QUANTIDADE * SI.VALOR_UNITARIO),
+               SUM(SI.QUANTIDADE * COALESCE(SI.CUSTO_UNITARIO, I.CUSTO_MEDIO))
+        FROM SAIDA_ITENS_HISTORICO SI
+        JOIN SAIDA_HISTORICO S ON SI.ID_SAIDA = S.ID
+        JOIN ITEM I ON SI.ID_PRODUTO = I.ID
+        WHERE S.STATUS = 'Finalizada'
+        GROUP BY S.DATA_SAIDA, SI.ID_PRODUTO
+    """)
@@ -0,0 +1,83 @@
+# app/reports/report_repository.py
+from app.database.db import get_db_manager
+from app.reports import aggregates
+
+class ReportRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def stock_valuation(self, period=None):
+        conn = self.db_manager.get_connection()
+        return conn.execute(*self.stock_valuation_query(period)).fetchall()
+
+    def consumption_by_period(self, start_date, end_date):
+        conn = self.db_manager.get_connection()
+        return conn.execute(*self.consumption_query(start_date, end_date)).fetchall()
+
+    def sales_margin_by_period(self, start_date, end_date):
+        conn = self.db_manager.get_connection()
+        return conn.execute(*self.sales_margin_query(start_date, end_date)).fetchall()
+
+    def stock_valuation_query(self, period=None):
+        """
+        Valor do estoque atual (SALDO_ESTOQUE x CUSTO_MEDIO) agrupado por tipo de item e unidade.
+        Com period (AAAA-MM), lê o saldo gravado no fechamento do mês.
+        """
+        if period:
+            return """
+                SELECT i.TIPO_ITEM, u.SIGLA, COUNT(*) AS QTD_ITENS,
+                       SUM(f.SALDO) AS SALDO_TOTAL,
+                       SUM(f.VALOR) AS VALOR_TOTAL
+                FROM SALDO_FECHAMENTO f
+                JOIN ITEM i ON f.ID_ITEM = i.ID
+                JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
+                WHERE f.PERIODO = ?
+                GROUP BY i.TIPO_ITEM, u.SIGLA
+                ORDER BY i.TIPO_ITEM, u.SIGLA
+            """, (period,)
+        return """
+            SELECT i.TIPO_ITEM, u.SIGLA, COUNT(*) AS QTD_ITENS,
+                   SUM(i.SALDO_ESTOQUE) AS SALDO_TOTAL,
+                   SUM(i.SALDO_ESTOQUE * i.CUSTO_MEDIO) AS VALOR_TOTAL
+            FROM ITEM i
+            JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
+            GROUP BY i.TIPO_ITEM, u.SIGLA
+            ORDER BY i.TIPO_ITEM, u.SIGLA
+        """, ()
+
+    def consumption_query(self, start_date, end_date):
+        """Consumo de insumos pelas OPs no período, lido do resumo diário."""
+        return """
+            SELECT r.ID_ITEM, i.DESCRICAO, u.SIGLA,
+                   SUM(r.QUANTIDADE) AS QUANTIDADE, SUM(r.VALOR) AS VALOR
+            FROM RESUMO_CONSUMO_DIARIO r
+            JOIN ITEM i ON r.ID_ITEM = i.ID
+            JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
+            WHERE r.DATA BETWEEN ? AND ?
+            GROUP BY r.ID_ITEM
+            ORDER BY VALOR DESC
+        """, (start_date, end_date)
+
+    def sales_margin_query(self, start_date, end_date):
+        """Receita, custo e margem das saídas finalizadas no período, por produto."""
+        return """
+            SELECT r.ID_PRODUTO, i.DESCRICAO, u.SIGLA,
+                   SUM(r.QUANTIDADE) AS QUANTIDADE, SUM(r.RECEITA) AS RECEITA, SUM(r.CUSTO) AS CUSTO,
+                   SUM(r.RECEITA) - SUM(r.CUSTO) AS MARGEM
+            FROM RESUMO_VENDAS_DIARIO r
+            JOIN ITEM i ON r.ID_PRODUTO = i.ID
+            JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
+            WHERE r.DATA BETWEEN ? AND ?
+            GROUP BY r.ID_PRODUTO
+            ORDER BY MARGEM DESC
+        """, (start_date, end_date)
+
+    def closed_periods(self):
+        conn = self.db_manager.get_connection()
+        return [row[0] for row in conn.execute("SELECT PERIODO FROM FECHAMENTO ORDER BY PERIODO DESC")]
+
+    def rebuild_aggregates(self):
+        conn = self.db_manager.get_connection()
+        with conn:
+            aggregates.rebuild_aggregates(conn.cursor())
+        return True
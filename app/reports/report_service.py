@@ -0,0 +1,52 @@
+# app/reports/report_service.py
+from app.reports.report_repository import ReportRepository
+from app.diagnostics.metrics import timed_service
+
+@timed_service
+class ReportService:
+    def __init__(self):
+        self.report_repository = ReportRepository()
+
+    def stock_valuation(self, period=None):
+        try:
+            rows = self.report_repository.stock_valuation(period)
+            return {"success": True, "data": rows}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao gerar a valorização do estoque: {e}"}
+
+    def consumption_by_period(self, start_date, end_date):
+        if not all([start_date, end_date]):
+            return {"success": False, "message": "Informe o período do relatório."}
+        if start_date > end_date:
+            return {"success": False, "message": "A data inicial deve ser anterior à data final."}
+
+        try:
+            rows = self.report_repository.consumption_by_period(start_date, end_date)
+            return {"success": True, "data": rows}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao gerar o relatório de consumo: {e}"}
+
+    def sales_margin_by_period(self, start_date, end_date):
+        if not all([start_date, end_date]):
+            return {"success": False, "message": "Informe o período do relatório."}
+        if start_date > end_date:
+            return {"success": False, "message": "A data inicial deve ser anterior à data final."}
+
+        try:
+            rows = self.report_repository.sales_margin_by_period(start_date, end_date)
+            return {"success": True, "data": rows}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao gerar o relatório de margem: {e}"}
+
+    def closed_periods(self):
+        try:
+            return {"success": True, "data": self.report_repository.closed_periods()}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao listar os períodos fechados: {e}"}
+
+    def rebuild_aggregates(self):
+        try:
+            self.report_repository.rebuild_aggregates()
+            return {"success": True, "message": "Resumos dos relatórios reconstruídos com sucesso."}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao reconstruir os resumos: {e}"}
@@ -0,0 +1,172 @@
+# app/reports/ui_report_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QComboBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QLabel, QDateEdit
+)
+from PySide6.QtCore import QDate, Qt
+from app.reports.report_service import ReportService
+from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db
+from app.utils.ui_utils import NumericTableWidgetItem, show_error_message, show_success_message
+
+class ReportWindow(QWidget):
+    # Relatório: (cabeçalhos, colunas do resultado, usa período)
+    REPORTS = {
+        "Valorização do Estoque": (
+            ["Tipo", "Un.", "Qtd. Itens", "Saldo Total", "Valor Total"],
+            ["TIPO_ITEM", "SIGLA", "QTD_ITENS", "SALDO_TOTAL", "VALOR_TOTAL"],
+            False
+        ),
+        "Consumo de Insumos por Período": (
+            ["ID", "Insumo", "Un.", "Quantidade", "Valor"],
+            ["ID_ITEM", "DESCRICAO", "SIGLA", "QUANTIDADE", "VALOR"],
+            True
+        ),
+        "Margem de Vendas por Período": (
+            ["ID", "Produto", "Un.", "Quantidade", "Receita", "Custo", "Margem"],
+            ["ID_PRODUTO", "DESCRICAO", "SIGLA", "QUANTIDADE", "RECEITA", "CUSTO", "MARGEM"],
+            True
+        ),
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.report_service = ReportService()
+        self.setWindowTitle("Relatórios")
+        self.setGeometry(200, 200, 900, 600)
+        self.setup_ui()
+        self.on_report_changed()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        filter_group = QGroupBox("Relatório")
+        layout = QHBoxLayout()
+        self.report_combo = QComboBox()
+        self.report_combo.addItems(list(self.REPORTS.keys()))
+        self.report_combo.currentTextChanged.connect(self.on_report_changed)
+        self.start_date_input = QDateEdit(calendarPopup=True)
+        self.start_date_input.setDisplayFormat(BRAZILIAN_DATE_FORMAT)
+        self.start_date_input.setDate(QDate.currentDate().addMonths(-1))
+        self.end_date_input = QDateEdit(calendarPopup=True)
+        self.end_date_input.setDisplayFormat(BRAZILIAN_DATE_FORMAT)
+        self.end_date_input.setDate(QDate.currentDate())
+        # Valorização: estoque atual ou o saldo gravado no fechamento de um mês
+        self.position_combo = QComboBox()
+        self.position_combo.addItem("Atual", None)
+        response = self.report_service.closed_periods()
+        for period in response.get("data", []):
+            self.position_combo.addItem(f"Fechamento {period[5:]}/{period[:4]}", period)
+        generate_button = QPushButton("Gerar")
+        generate_button.clicked.connect(self.generate_report)
+        rebuild_button = QPushButton("Reconstruir Resumos")
+        rebuild_button.clicked.connect(self.rebuild_aggregates)
+        export_button = QPushButton("Exportar")
+        export_button.clicked.connect(self.export_report)
+        export_movements_button = QPushButton("Exportar Movimentos")
+        export_movements_button.clicked.connect(self.export_movements)
+
+        layout.addWidget(self.report_combo, 1)
+        layout.addWidget(QLabel("Posição:"))
+        layout.addWidget(self.position_combo)
+        layout.addWidget(QLabel("De:"))
+        layout.addWidget(self.start_date_input)
+        layout.addWidget(QLabel("Até:"))
+        layout.addWidget(self.end_date_input)
+        layout.addWidget(generate_button)
+        layout.addWidget(export_button)
+        layout.addWidget(export_movements_button)
+        layout.addWidget(rebuild_button)
+        filter_group.setLayout(layout)
+        self.main_layout.addWidget(filter_group)
+
+        self.results_table = QTableWidget()
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.setSortingEnabled(True)
+        self.results_table.setStyleSheet("QTableView::item:selected { background-color: #D3D3D3; color: black; }")
+        self.main_layout.addWidget(self.results_table)
+
+        self.total_label = QLabel("")
+        self.main_layout.addWidget(self.total_label, 0, Qt.AlignRight)
+
+    def on_report_changed(self):
+        headers, _, uses_period = self.REPORTS[self.report_combo.currentText()]
+        self.start_date_input.setEnabled(uses_period)
+        self.end_date_input.setEnabled(uses_period)
+        self.position_combo.setEnabled(not uses_period)
+        self.results_table.setRowCount(0)
+        self.results_table.setColumnCount(len(headers))
+        self.results_table.setHorizontalHeaderLabels(headers)
+        header = self.results_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        self.total_label.clear()
+
+    def generate_report(self):
+        report_name = self.report_combo.currentText()
+        _, columns, _ = self.REPORTS[report_name]
+        start_date = format_qdate_for_db(self.start_date_input.date())
+        end_date = format_qdate_for_db(self.end_date_input.date())
+
+        if report_name == "Valorização do Estoque":
+            response = self.report_service.stock_valuation(self.position_combo.currentData())
+        elif report_name == "Consumo de Insumos por Período":
+            response = self.report_service.consumption_by_period(start_date, end_date)
+        else:
+            response = self.report_service.sales_margin_by_period(start_date, end_date)
+
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setRowCount(0)
+        for data in response["data"]:
+            row = self.results_table.rowCount()
+            self.results_table.insertRow(row)
+            for col, key in enumerate(columns):
+                value = data[key]
+                if isinstance(value, float):
+                    self.results_table.setItem(row, col, NumericTableWidgetItem(f"{value:.2f}"))
+                elif isinstance(value, int):
+                    self.results_table.setItem(row, col, NumericTableWidgetItem(str(value)))
+                else:
+                    self.results_table.setItem(row, col, QTableWidgetItem(value or ""))
+        self.results_table.setSortingEnabled(True)
+
+        # A última coluna de cada relatório é a de valor
+        total = sum(data[columns[-1]] or 0 for data in response["data"])
+        self.total_label.setText(f"Total: R$ {total:.2f}")
+
+    def export_report(self):
+        from app.export.ui_export import export_with_dialog
+        report_name = self.report_combo.currentText()
+        if report_name == "Valorização do Estoque":
+            period = self.position_combo.currentData()
+            export_with_dialog(self, "stock_valuation", f"valorizacao_estoque_{period}" if period else "valorizacao_estoque",
+                               {"period": period})
+            return
+        filters = {
+            "start_date": format_qdate_for_db(self.start_date_input.date()),
+            "end_date": format_qdate_for_db(self.end_date_input.date())
+        }
+        if report_name == "Consumo de Insumos por Período":
+            export_with_dialog(self, "consumption", "consumo_insumos", filters)
+        else:
+            export_with_dialog(self, "sales_margin", "margem_vendas", filters)
+
+    def export_movements(self):
+        from app.export.ui_export import export_with_dialog
+        export_with_dialog(self, "movements", "movimentos", {
+            "start_date": format_qdate_for_db(self.start_date_input.date()),
+            "end_date": format_qdate_for_db(self.end_date_input.date())
+        })
+
+    def rebuild_aggregates(self):
+        response = self.report_service.rebuild_aggregates()
+        if response["success"]:
+            show_success_message(self, "Sucesso", response["message"])
+        else:
+            show_error_message(self, "Erro", response["message"])
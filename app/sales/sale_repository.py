@@ -1,8 +1,16 @@
 # app/sales/sale_repository.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.records import fetch_record, fetch_records
+from app.database.detail_sync import sync_details
+from app.database.versioning import bump_version
+from app.lot import lots
+from app.reports import aggregates
 
 class SaleRepository:
+    # Campos de pesquisa da listagem (valor vindo da tela ou da API -> coluna)
+    SEARCH_FIELDS = {"id": "ID", "status": "STATUS", "data": "DATA_SAIDA"}
+
     def __init__(self):
         self.db_manager = get_db_manager()
 
@@ -22,65 +30,92 @@ class SaleRepository:
             print(f"Database error in create_sale: {e}")
             return None
 
-    def update_sale_master(self, sale_id, sale_date, observacao, total_value):
+    def update_sale(self, sale_id, sale_date, observacao, total_value, items, expected_version=None):
+        """
+        Atualiza cabeçalho e itens numa única transação e devolve a nova versão (False em erro).
+        Com expected_version, levanta StaleDocumentError se a saída foi salva por outra estação.
+        """
         conn = self.db_manager.get_connection()
         try:
-            conn.execute(
-                "UPDATE SAIDA SET DATA_SAIDA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
-                (sale_date, observacao, total_value, sale_id)
-            )
-            conn.commit()
-            return True
+            with conn:
+                cursor = conn.cursor()
+                new_version = bump_version(cursor, "SAIDA", sale_id, expected_version)
+                cursor.execute(
+                    "UPDATE SAIDA SET DATA_SAIDA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
+                    (sale_date, observacao, total_value, sale_id)
+                )
+                self._sync_sale_items(cursor, sale_id, items)
+            return new_version
+        except sqlite3.Error as e:
+            print(f"Database error in update_sale: {e}")
+            return False
+
+    def update_sale_master(self, sale_id, sale_date, observacao, total_value, expected_version=None):
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                new_version = bump_version(cursor, "SAIDA", sale_id, expected_version)
+                cursor.execute(
+                    "UPDATE SAIDA SET DATA_SAIDA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
+                    (sale_date, observacao, total_value, sale_id)
+                )
+            return new_version
         except sqlite3.Error as e:
-            conn.rollback()
             print(f"Database error in update_sale_master: {e}")
             return False
 
-    def update_sale_items(self, sale_id, items):
+    def update_sale_items(self, sale_id, items, expected_version=None):
         conn = self.db_manager.get_connection()
         try:
             with conn:
                 cursor = conn.cursor()
-                cursor.execute("DELETE FROM SAIDA_ITENS WHERE ID_SAIDA = ?", (sale_id,))
-                if items:
-                    cursor.executemany(
-                        "INSERT INTO SAIDA_ITENS (ID_SAIDA, ID_PRODUTO, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?)",
-                        [(sale_id, item['id_produto'], item['quantidade'], item['valor_unitario']) for item in items]
-                    )
-            return True
+                new_version = bump_version(cursor, "SAIDA", sale_id, expected_version)
+                self._sync_sale_items(cursor, sale_id, items)
+            return new_version
         except sqlite3.Error as e:
             print(f"Database error in update_sale_items: {e}")
             return False
 
+    def _sync_sale_items(self, cursor, sale_id, items):
+        return sync_details(cursor, "SAIDA_ITENS", "ID_SAIDA", sale_id, "ID_PRODUTO", ["QUANTIDADE", "VALOR_UNITARIO"],
+                            [(item['id_produto'], item['quantidade'], item['valor_unitario']) for item in items])
+
     def get_sale_details(self, sale_id):
         conn = self.db_manager.get_connection()
-        master = conn.execute("SELECT * FROM SAIDA WHERE ID = ?", (sale_id,)).fetchone()
+        master = fetch_record(conn.execute("SELECT * FROM SAIDA WHERE ID = ?", (sale_id,)))
         if not master:
             return None
-        items = conn.execute("""
+        items = fetch_records(conn.execute("""
             SELECT si.ID, si.ID_PRODUTO, i.DESCRICAO, u.SIGLA, si.QUANTIDADE, si.VALOR_UNITARIO
             FROM SAIDA_ITENS si
             JOIN ITEM i ON si.ID_PRODUTO = i.ID
             JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
             WHERE si.ID_SAIDA = ?
-        """, (sale_id,)).fetchall()
-        return {"master": dict(master), "items": [dict(row) for row in items]}
+        """, (sale_id,)))
+        return {"master": master, "items": items}
 
     def list_sales(self, search_term="", search_field="id"):
         conn = self.db_manager.get_connection()
+        query, params = self.list_sales_query(search_term, search_field)
+        return fetch_records(conn.execute(query, params))
+
+    def list_sales_query(self, search_term="", search_field="id"):
+        """Monta a consulta da listagem de saídas."""
         query = "SELECT ID, DATA_SAIDA, VALOR_TOTAL, STATUS FROM SAIDA"
         params = ()
         if search_term:
-            if search_field == "id" and search_term.isdigit():
+            column = self.SEARCH_FIELDS.get(search_field.lower(), "ID")
+            if column == "ID" and search_term.isdigit():
                 query += " WHERE ID = ?"
                 params = (int(search_term),)
             else:
-                query += f" WHERE {search_field} LIKE ?"
+                query += f" WHERE {column} LIKE ?"
                 params = (f'%{search_term}%',)
         query += " ORDER BY ID DESC"
-        return [dict(row) for row in conn.execute(query, params).fetchall()]
+        return query, params
 
-    def finalize_sale(self, sale_id):
+    def finalize_sale(self, sale_id, expected_version=None):
         conn = self.db_manager.get_connection()
         details = self.get_sale_details(sale_id)
         if not details or details['master']['STATUS'] == 'Finalizada':
@@ -89,15 +124,24 @@ class SaleRepository:
         try:
             with conn:
                 cursor = conn.cursor()
+                # Finaliza só a versão que a tela salvou por último (StaleDocumentError se outra estação gravou depois)
+                bump_version(cursor, 'SAIDA', sale_id, expected_version)
+                sale_date = details['master']['DATA_SAIDA']
                 for item in details['items']:
                     produto_id, quantity = item['ID_PRODUTO'], item['QUANTIDADE']
+                    # Guarda o custo médio do momento da venda para o relatório de margem
+                    unit_cost = cursor.execute("SELECT CUSTO_MEDIO FROM ITEM WHERE ID = ?", (produto_id,)).fetchone()['CUSTO_MEDIO']
+                    cursor.execute("UPDATE SAIDA_ITENS SET CUSTO_UNITARIO = ? WHERE ID = ?", (unit_cost, item['ID']))
+                    aggregates.record_sale(cursor, produto_id, sale_date, quantity, quantity * item['VALOR_UNITARIO'], quantity * unit_cost)
                     # Deduz do stock
                     cursor.execute("UPDATE ITEM SET SALDO_ESTOQUE = SALDO_ESTOQUE - ? WHERE ID = ?", (quantity, produto_id))
                     # Regista o movimento
                     cursor.execute(
                         "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, 'Saída por Venda', ?, ?, ?)",
-                        (produto_id, -quantity, item['VALOR_UNITARIO'], details['master']['DATA_SAIDA'])
+                        (produto_id, -quantity, item['VALOR_UNITARIO'], sale_date)
                     )
+                    # Baixa dos lotes do produto, para o rastreamento
+                    lots.record_sale(cursor, sale_id, produto_id, quantity)
                 # Atualiza o status da saída
                 cursor.execute("UPDATE SAIDA SET STATUS = 'Finalizada' WHERE ID = ?", (sale_id,))
             return True
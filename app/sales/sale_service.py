@@ -1,9 +1,14 @@
 # app/sales/sale_service.py
+from app.closing.closing_repository import ClosingRepository
+from app.database.versioning import StaleDocumentError
 from app.sales.sale_repository import SaleRepository
+from app.diagnostics.metrics import timed_service
 
+@timed_service
 class SaleService:
     def __init__(self):
         self.sale_repository = SaleRepository()
+        self.closing_repository = ClosingRepository()
 
     def create_sale(self, sale_date, observacao, items):
         if not sale_date:
@@ -14,23 +19,26 @@ class SaleService:
         try:
             sale_id = self.sale_repository.create_sale(sale_date, observacao, total_value)
             if sale_id:
-                self.sale_repository.update_sale_items(sale_id, items)
-                return {"success": True, "data": sale_id, "message": "Saída criada com sucesso."}
+                version = self.sale_repository.update_sale_items(sale_id, items)
+                return {"success": True, "data": sale_id, "version": version, "message": "Saída criada com sucesso."}
             else:
                 return {"success": False, "message": "Erro ao criar saída no banco de dados."}
         except Exception as e:
             return {"success": False, "message": f"Erro inesperado: {e}"}
 
-    def update_sale(self, sale_id, sale_date, observacao, items):
+    def update_sale(self, sale_id, sale_date, observacao, items, expected_version=None):
         if not all([sale_id, sale_date]):
             return {"success": False, "message": "ID da Saída e Data são obrigatórios."}
         
         total_value = sum(item['quantidade'] * item['valor_unitario'] for item in items)
         
         try:
-            self.sale_repository.update_sale_master(sale_id, sale_date, observacao, total_value)
-            self.sale_repository.update_sale_items(sale_id, items)
-            return {"success": True, "message": "Saída atualizada com sucesso."}
+            version = self.sale_repository.update_sale(sale_id, sale_date, observacao, total_value, items, expected_version)
+            if not version:
+                return {"success": False, "message": "Erro no banco de dados ao atualizar a saída."}
+            return {"success": True, "version": version, "message": "Saída atualizada com sucesso."}
+        except StaleDocumentError as e:
+            return {"success": False, "conflict": True, "message": str(e)}
         except Exception as e:
             return {"success": False, "message": f"Erro ao atualizar saída: {e}"}
 
@@ -51,7 +59,7 @@ class SaleService:
         except Exception as e:
             return {"success": False, "message": f"Erro ao listar saídas: {e}"}
 
-    def finalize_sale(self, sale_id):
+    def finalize_sale(self, sale_id, expected_version=None):
         if not sale_id:
             return {"success": False, "message": "ID da saída não fornecido."}
             
@@ -64,12 +72,16 @@ class SaleService:
             return {"success": False, "message": "Esta saída já foi finalizada."}
         if not details['items']:
             return {"success": False, "message": "Não é possível finalizar uma saída sem itens."}
+        if self.closing_repository.is_closed(details['master']['DATA_SAIDA']):
+            return {"success": False, "message": "A data da saída está em um período fechado."}
 
         try:
-            success = self.sale_repository.finalize_sale(sale_id)
+            success = self.sale_repository.finalize_sale(sale_id, expected_version)
             if success:
                 return {"success": True, "message": f"Saída #{sale_id} finalizada com sucesso."}
             else:
                 return {"success": False, "message": "Erro no banco de dados ao finalizar a saída."}
+        except StaleDocumentError as e:
+            return {"success": False, "conflict": True, "message": str(e)}
         except Exception as e:
             return {"success": False, "message": f"Um erro inesperado ocorreu: {e}"}
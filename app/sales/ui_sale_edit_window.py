@@ -8,6 +8,7 @@ from PySide6.QtCore import QDate, Qt
 from app.sales.sale_service import SaleService
 from app.item.ui_search_window import ItemSearchWindow
 from app.utils.ui_utils import NumericTableWidgetItem, show_error_message
+from app.utils.row_model import NumericRowModel, parse_decimal
 from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db
 
 class SaleEditWindow(QWidget):
@@ -17,6 +18,7 @@ class SaleEditWindow(QWidget):
         self.sale_service = SaleService()
         self.current_sale_id = sale_id
         self.search_item_window = None
+        self.row_model = NumericRowModel() # Valores numéricos das linhas da grade
         
         title = f"Editando Saída #{sale_id}" if sale_id else "Nova Saída de Produto"
         self.setWindowTitle(title)
@@ -89,16 +91,19 @@ class SaleEditWindow(QWidget):
 
     def new_sale(self):
         self.current_sale_id = None
+        self.current_version = None
         self.setWindowTitle("Nova Saída de Produto")
         self.sale_id_display.setText("(Nova)")
         self.date_input.setDate(QDate.currentDate())
         self.observacao_input.clear()
         self.status_display.setText("Em Aberto")
         self.items_table.setRowCount(0)
+        self.row_model.clear()
         self.update_total_value()
         self.set_read_only(False)
 
     def save_sale(self):
+        """Grava a saída; devolve True se gravou (a finalização só segue nesse caso)."""
         sale_date = format_qdate_for_db(self.date_input.date())
         observacao = self.observacao_input.text()
 
@@ -106,12 +111,12 @@ class SaleEditWindow(QWidget):
         for row in range(self.items_table.rowCount()):
             items.append({
                 'id_produto': int(self.items_table.item(row, 0).text()),
-                'quantidade': float(self.items_table.item(row, 3).text().replace(',', '.')),
-                'valor_unitario': float(self.items_table.item(row, 4).text().replace(',', '.'))
+                'quantidade': self.row_model.quantity(row),
+                'valor_unitario': self.row_model.unit_value(row)
             })
 
         if self.current_sale_id:
-            response = self.sale_service.update_sale(self.current_sale_id, sale_date, observacao, items)
+            response = self.sale_service.update_sale(self.current_sale_id, sale_date, observacao, items, self.current_version)
         else:
             response = self.sale_service.create_sale(sale_date, observacao, items)
             if response["success"]:
@@ -120,9 +125,14 @@ class SaleEditWindow(QWidget):
                 self.sale_id_display.setText(str(self.current_sale_id))
 
         if response["success"]:
+            self.current_version = response.get("version")
             QMessageBox.information(self, "Sucesso", response["message"])
+            return True
+        if response.get("conflict"):
+            QMessageBox.warning(self, "Conflito de Edição", response["message"])
         else:
             show_error_message(self, "Erro", response["message"])
+        return False
 
     def load_sale_data(self):
         response = self.sale_service.get_sale_details(self.current_sale_id)
@@ -133,12 +143,14 @@ class SaleEditWindow(QWidget):
 
         details = response["data"]
         master = details['master']
+        self.current_version = master.get('VERSAO')
         self.sale_id_display.setText(str(master['ID']))
         self.date_input.setDate(QDate.fromString(master['DATA_SAIDA'], "yyyy-MM-dd"))
         self.observacao_input.setText(master.get('OBSERVACAO', ''))
         self.status_display.setText(master.get('STATUS', ''))
         
         self.items_table.setRowCount(0)
+        self.row_model.clear()
         for item in details['items']:
             self.add_item_to_table(item)
         
@@ -148,7 +160,7 @@ class SaleEditWindow(QWidget):
 
     def open_item_search(self):
         if self.search_item_window is None:
-            self.search_item_window = ItemSearchWindow(selection_mode=True, item_type_filter=['Produto', 'Ambos'])
+            self.search_item_window = ItemSearchWindow(selection_mode=True, item_type_filter=['Produto', 'Ambos'], only_in_stock=True)
             self.search_item_window.item_selected.connect(self.add_item_from_search)
             self.search_item_window.destroyed.connect(lambda: setattr(self, 'search_item_window', None))
             self.search_item_window.show()
@@ -170,8 +182,10 @@ class SaleEditWindow(QWidget):
             'VALOR_UNITARIO': 0.0
         }
         self.add_item_to_table(item_to_add)
+        self.update_total_value()
 
     def add_item_to_table(self, item):
+        self.items_table.blockSignals(True)
         row = self.items_table.rowCount()
         self.items_table.insertRow(row)
         
@@ -180,11 +194,12 @@ class SaleEditWindow(QWidget):
         self.items_table.setItem(row, 2, QTableWidgetItem(item['SIGLA'].upper()))
         self.items_table.setItem(row, 3, NumericTableWidgetItem(str(item['QUANTIDADE'])))
         self.items_table.setItem(row, 4, NumericTableWidgetItem(f"{item['VALOR_UNITARIO']:.2f}"))
-        total = item['QUANTIDADE'] * item['VALOR_UNITARIO']
+        total = self.row_model.append(item['QUANTIDADE'], item['VALOR_UNITARIO'])
         self.items_table.setItem(row, 5, NumericTableWidgetItem(f"{total:.2f}"))
 
         for col in [0, 1, 2]:
             self.items_table.item(row, col).setFlags(self.items_table.item(row, col).flags() & ~Qt.ItemIsEditable)
+        self.items_table.blockSignals(False)
 
     def remove_item(self):
         rows = self.items_table.selectionModel().selectedRows()
@@ -193,42 +208,39 @@ class SaleEditWindow(QWidget):
             return
         for index in sorted([r.row() for r in rows], reverse=True):
             self.items_table.removeRow(index)
+            self.row_model.remove(index)
         self.update_total_value()
 
     def on_cell_changed(self, row, column):
         if column not in [3, 4, 5]:  # Quantidade, Valor Venda, Valor Total
             return
             
-        self.items_table.blockSignals(True)
+        # Apenas a célula editada é convertida; os demais valores vêm do modelo
+        text = self.items_table.item(row, column).text()
         try:
-            qty_item = self.items_table.item(row, 3)
-            unit_price_item = self.items_table.item(row, 4)
-            total_price_item = self.items_table.item(row, 5)
+            value = parse_decimal(text or 0)
+        except ValueError:
+            value = None
+        if value is not None:
+            if column == 3:
+                self.row_model.set_quantity(row, value)
+            elif column == 4:
+                self.row_model.set_unit_value(row, value)
+            else:
+                self.row_model.set_line_total(row, value)
 
-            qty = float(qty_item.text().replace(',', '.'))
-            
-            if column == 3 or column == 4:
-                unit_price = float(unit_price_item.text().replace(',', '.'))
-                total_price_item.setText(f"{qty * unit_price:.2f}")
-            elif column == 5:
-                total_price = float(total_price_item.text().replace(',', '.'))
-                if qty > 0:
-                    unit_price_item.setText(f"{total_price / qty:.2f}")
-                else:
-                    unit_price_item.setText("0.00")
-        except (ValueError, ZeroDivisionError) as e:
-             print(f"Error in on_cell_changed: {e}")
-        finally:
-            self.items_table.blockSignals(False)
+        # A grade volta a mostrar o que o modelo guardou (valor normalizado ou o anterior)
+        self.items_table.blockSignals(True)
+        for col, cell_text in zip((3, 4, 5), self.row_model.display_texts(row)):
+            self.items_table.item(row, col).setText(cell_text)
+        self.items_table.blockSignals(False)
         self.update_total_value()
+        if value is None:
+            show_error_message(self, "Valor Inválido", f"'{text}' não é um número válido. O valor anterior foi mantido.")
         
     def update_total_value(self):
-        total = 0.0
-        for row in range(self.items_table.rowCount()):
-            total_item = self.items_table.item(row, 5)
-            if total_item and total_item.text():
-                total += float(total_item.text().replace(',', '.'))
-        self.total_label.setText(f"Valor Total da Saída: R$ {total:.2f}")
+        # O total é mantido incrementalmente pelo modelo de linhas
+        self.total_label.setText(f"Valor Total da Saída: R$ {self.row_model.total:.2f}")
 
     def set_read_only(self, read_only):
         self.date_input.setReadOnly(read_only)
@@ -249,10 +261,14 @@ class SaleEditWindow(QWidget):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            self.save_sale() 
-            response = self.sale_service.finalize_sale(self.current_sale_id)
+            # Se a gravação falhar (ex.: conflito de edição), a saída não é finalizada
+            if not self.save_sale():
+                return
+            response = self.sale_service.finalize_sale(self.current_sale_id, self.current_version)
             if response["success"]:
                 QMessageBox.information(self, "Sucesso", response["message"])
                 self.load_sale_data()
+            elif response.get("conflict"):
+                QMessageBox.warning(self, "Conflito de Edição", response["message"])
             else:
                 show_error_message(self, "Erro", response["message"])
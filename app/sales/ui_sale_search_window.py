@@ -34,11 +34,14 @@ class SaleSearchWindow(QWidget):
         search_button.clicked.connect(self.load_sales)
         new_button = QPushButton("Nova Saída")
         new_button.clicked.connect(self.open_new_sale_window)
+        export_button = QPushButton("Exportar")
+        export_button.clicked.connect(self.export_sales)
         
         search_layout.addWidget(self.search_field)
         search_layout.addWidget(self.search_term, 1)
         search_layout.addWidget(search_button)
         search_layout.addWidget(new_button)
+        search_layout.addWidget(export_button)
         search_group.setLayout(search_layout)
         main_layout.addWidget(search_group)
 
@@ -82,6 +85,13 @@ class SaleSearchWindow(QWidget):
         else:
             show_error_message(self, "Error", response["message"])
 
+    def export_sales(self):
+        from app.export.ui_export import export_with_dialog
+        export_with_dialog(self, "sales", "saidas", {
+            "search_term": self.search_term.text(),
+            "search_field": self.search_field.currentText().lower()
+        })
+
     def open_new_sale_window(self):
         self.show_edit_window(sale_id=None)
 
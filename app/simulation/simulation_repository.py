@@ -0,0 +1,114 @@
+# app/simulation/simulation_repository.py
+"""
+Cópia em memória do banco para simular finalizações sem tocar nos dados reais.
+
+Bancos pequenos são copiados inteiros pela API de backup do SQLite. Acima de
+FULL_COPY_LIMIT a cópia é enxuta: o esquema vem do sqlite_master e os dados só das
+tabelas que as finalizações leem (cadastros, composição, reservas e os documentos
+ainda abertos). O histórico (MOVIMENTO, resumos diários, arquivamento) fica de fora;
+as finalizações só acrescentam linhas a ele, então o saldo e o custo simulados não
+mudam.
+"""
+import os
+import sqlite3
+from pathlib import Path
+from app.database import archive
+from app.database.db import get_db_manager
+from app.database.records import fetch_records
+
+FULL_COPY_LIMIT = 256 * 1024 * 1024
+SOURCE_SCHEMA = "origem"
+
+# Tabelas só de histórico: a cópia enxuta leva apenas o esquema
+HISTORY_TABLES = {"MOVIMENTO", "RESUMO_CONSUMO_DIARIO", "RESUMO_VENDAS_DIARIO", "SALDO_ARQUIVADO",
+                  "ARQUIVAMENTO", "SALDO_FECHAMENTO", "LOTE_GENEALOGIA", "LOTE_SAIDA", "LOTE_ENTRADA", "PROGRAMACAO", "CEP"}
+
+# Documentos: a cópia enxuta leva só os abertos, que são os que podem ser finalizados
+DOCUMENT_FILTERS = {
+    "ORDEMPRODUCAO": "STATUS = 'Em Andamento'",
+    "ORDEMPRODUCAO_ITENS": f"ID_ORDEM_PRODUCAO IN (SELECT ID FROM {SOURCE_SCHEMA}.ORDEMPRODUCAO WHERE STATUS = 'Em Andamento')",
+    "ENTRADANOTA": "STATUS = 'Em Aberto'",
+    "ENTRADANOTA_ITENS": f"ID_ENTRADA IN (SELECT ID FROM {SOURCE_SCHEMA}.ENTRADANOTA WHERE STATUS = 'Em Aberto')",
+    "SAIDA": "STATUS = 'Em Aberto'",
+    "SAIDA_ITENS": f"ID_SAIDA IN (SELECT ID FROM {SOURCE_SCHEMA}.SAIDA WHERE STATUS = 'Em Aberto')",
+}
+
+class SimulationRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def clone_database(self, full_copy=None):
+        """
+        Devolve uma conexão com a cópia em memória do banco principal.
+        full_copy None escolhe pelo tamanho do arquivo (ver FULL_COPY_LIMIT).
+        """
+        if full_copy is None:
+            full_copy = os.path.getsize(self.db_manager.db_path) <= FULL_COPY_LIMIT
+        clone = sqlite3.connect("file::memory:", uri=True, check_same_thread=False)
+        clone.row_factory = sqlite3.Row
+        try:
+            if full_copy:
+                source = self.db_manager.open_connection(read_only=True)
+                try:
+                    source.backup(clone)
+                finally:
+                    source.close()
+            else:
+                self._copy_lean(clone)
+            # Views de histórico só sobre a cópia (o arquivo não é anexado)
+            archive.create_history_views(clone, False)
+        except Exception:
+            clone.close()
+            raise
+        return clone
+
+    def _copy_lean(self, clone):
+        source_uri = f"{Path(self.db_manager.db_path).resolve().as_uri()}?mode=ro"
+        clone.execute(f"ATTACH DATABASE ? AS {SOURCE_SCHEMA}", (source_uri,))
+        try:
+            schema = clone.execute(f"""
+                SELECT type, name, sql FROM {SOURCE_SCHEMA}.sqlite_master
+                WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+                ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END
+            """).fetchall()
+            for entry in schema:
+                clone.execute(entry['sql'])
+            # Uma transação só: todas as tabelas são lidas no mesmo instante do banco real
+            clone.execute("BEGIN")
+            for entry in schema:
+                table = entry['name']
+                if entry['type'] != 'table' or table in HISTORY_TABLES:
+                    continue
+                condition = DOCUMENT_FILTERS.get(table)
+                query = f"INSERT INTO main.{table} SELECT * FROM {SOURCE_SCHEMA}.{table}"
+                clone.execute(f"{query} WHERE {condition}" if condition else query)
+            # Mantém a numeração dos IDs, inclusive a do MOVIMENTO, que não foi copiado
+            if clone.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+                clone.execute("DELETE FROM main.sqlite_sequence")
+                clone.execute(f"INSERT INTO main.sqlite_sequence SELECT * FROM {SOURCE_SCHEMA}.sqlite_sequence")
+            clone.commit()
+        finally:
+            if clone.in_transaction:
+                clone.rollback()
+            clone.execute(f"DETACH DATABASE {SOURCE_SCHEMA}")
+
+    def item_balances(self, connection):
+        """{ID: linha com DESCRICAO, TIPO_ITEM, SALDO_ESTOQUE, CUSTO_MEDIO e SALDO_RESERVADO} de todos os itens."""
+        rows = connection.execute(
+            "SELECT ID, DESCRICAO, TIPO_ITEM, SALDO_ESTOQUE, CUSTO_MEDIO, SALDO_RESERVADO FROM ITEM"
+        ).fetchall()
+        return {row['ID']: row for row in rows}
+
+    def open_documents(self):
+        """OPs em andamento, entradas e saídas em aberto que podem entrar numa simulação."""
+        conn = self.db_manager.get_connection()
+        return fetch_records(conn.execute("""
+            SELECT 'OP' AS TIPO, OP.ID, OP.NUMERO AS DOCUMENTO, OP.DATA_PREVISTA AS DATA,
+                   (SELECT SUM(QUANTIDADE_PRODUZIR) FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = OP.ID) AS QUANTIDADE
+            FROM ORDEMPRODUCAO OP WHERE OP.STATUS = 'Em Andamento'
+            UNION ALL
+            SELECT 'Entrada', ID, NUMERO_NOTA, DATA_ENTRADA, NULL FROM ENTRADANOTA WHERE STATUS = 'Em Aberto'
+            UNION ALL
+            SELECT 'Saída', ID, OBSERVACAO, DATA_SAIDA, NULL FROM SAIDA WHERE STATUS = 'Em Aberto'
+            ORDER BY 1, 2
+        """))
@@ -0,0 +1,99 @@
+# app/simulation/simulation_service.py
+import time
+from app.database.db import get_db_manager
+from app.diagnostics.metrics import timed_service
+from app.production import order_operations
+from app.sales.sale_service import SaleService
+from app.simulation.simulation_repository import SimulationRepository
+from app.stock.service import StockService
+
+@timed_service
+class SimulationService:
+    def __init__(self):
+        self.simulation_repository = SimulationRepository()
+        self.stock_service = StockService()
+        self.sale_service = SaleService()
+
+    def list_open_documents(self):
+        try:
+            return {"success": True, "data": self.simulation_repository.open_documents()}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao listar os documentos em aberto: {e}"}
+
+    def simulate(self, entries=(), production=(), sales=(), full_copy=None):
+        """
+        Finaliza numa cópia em memória do banco as entradas, as OPs [(id, quantidade produzida)]
+        e as saídas, nessa ordem, com a mesma lógica da aplicação, e devolve o saldo e o custo
+        dos itens alterados antes e depois. O banco real não é tocado.
+        """
+        if not (entries or production or sales):
+            return {"success": False, "message": "Selecione ao menos um documento para simular."}
+
+        started = time.perf_counter()
+        try:
+            clone = self.simulation_repository.clone_database(full_copy)
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao copiar o banco para a simulação: {e}"}
+        copied = time.perf_counter() - started
+
+        try:
+            before = self.simulation_repository.item_balances(clone)
+            steps = []
+            # As operações usam get_connection; nesta thread ele devolve a cópia
+            with get_db_manager().bound_connection(clone):
+                for entry_id in entries:
+                    response = self.stock_service.finalize_entry(entry_id)
+                    steps.append({"documento": f"Entrada #{entry_id}", **response})
+                for op_id, quantity in production:
+                    success, message = order_operations.finalize_op(op_id, quantity)
+                    steps.append({"documento": f"OP #{op_id}", "success": success, "message": message})
+                for sale_id in sales:
+                    response = self.sale_service.finalize_sale(sale_id)
+                    steps.append({"documento": f"Saída #{sale_id}", **response})
+            after = self.simulation_repository.item_balances(clone)
+        except Exception as e:
+            return {"success": False, "message": f"Erro durante a simulação: {e}"}
+        finally:
+            clone.close()
+
+        items = _diff_balances(before, after)
+        data = {
+            "steps": steps,
+            "items": items,
+            "valor_antes": sum(row['SALDO_ESTOQUE'] * row['CUSTO_MEDIO'] for row in before.values()),
+            "valor_depois": sum(row['SALDO_ESTOQUE'] * row['CUSTO_MEDIO'] for row in after.values()),
+            "tempo_copia": copied,
+            "tempo_total": time.perf_counter() - started,
+        }
+        failures = sum(1 for step in steps if not step["success"])
+        message = f"Simulação concluída: {len(steps) - failures} documentos finalizados, {len(items)} itens alterados."
+        if failures:
+            message += f" {failures} documentos não puderam ser finalizados."
+        return {"success": True, "data": data, "message": message}
+
+def _diff_balances(before, after):
+    """Itens com saldo, custo médio ou reserva diferentes entre os dois retratos, por descrição."""
+    changed = []
+    for item_id, new in after.items():
+        old = before.get(item_id)
+        if old is not None and all(abs(old[column] - new[column]) <= 1e-9
+                                   for column in ('SALDO_ESTOQUE', 'CUSTO_MEDIO', 'SALDO_RESERVADO')):
+            continue
+        old_balance = old['SALDO_ESTOQUE'] if old is not None else 0
+        old_cost = old['CUSTO_MEDIO'] if old is not None else 0
+        old_reserved = old['SALDO_RESERVADO'] if old is not None else 0
+        changed.append({
+            "ID": item_id,
+            "DESCRICAO": new['DESCRICAO'],
+            "TIPO_ITEM": new['TIPO_ITEM'],
+            "SALDO_ANTES": old_balance,
+            "SALDO_DEPOIS": new['SALDO_ESTOQUE'],
+            "CUSTO_ANTES": old_cost,
+            "CUSTO_DEPOIS": new['CUSTO_MEDIO'],
+            "VALOR_ANTES": old_balance * old_cost,
+            "VALOR_DEPOIS": new['SALDO_ESTOQUE'] * new['CUSTO_MEDIO'],
+            "DISPONIVEL_ANTES": old_balance - old_reserved,
+            "DISPONIVEL_DEPOIS": new['SALDO_ESTOQUE'] - new['SALDO_RESERVADO'],
+        })
+    changed.sort(key=lambda row: row['DESCRICAO'])
+    return changed
@@ -0,0 +1,140 @@
+# app/simulation/ui_simulation_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QPushButton, QLabel, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView
+)
+from PySide6.QtCore import Qt
+from app.simulation.simulation_service import SimulationService
+from app.utils.date_utils import format_date_for_display
+from app.utils.row_model import parse_decimal
+from app.utils.ui_utils import NumericTableWidgetItem, show_error_message
+
+class SimulationWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.simulation_service = SimulationService()
+        self.setWindowTitle("Simulação de Produção")
+        self.setGeometry(200, 200, 900, 650)
+        self.setup_ui()
+        self.load_documents()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        documents_group = QGroupBox("Documentos em aberto (marque os que serão finalizados)")
+        documents_layout = QVBoxLayout()
+        self.documents_table = QTableWidget()
+        self.documents_table.setColumnCount(5)
+        self.documents_table.setHorizontalHeaderLabels(["Tipo", "ID", "Documento", "Data", "Qtd. Produzida"])
+        self.documents_table.verticalHeader().setVisible(False)
+        self.documents_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.documents_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        documents_layout.addWidget(self.documents_table)
+
+        buttons_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        refresh_button = QPushButton("Atualizar")
+        refresh_button.clicked.connect(self.load_documents)
+        simulate_button = QPushButton("Simular")
+        simulate_button.clicked.connect(self.run_simulation)
+        buttons_layout.addWidget(self.summary_label, 1)
+        buttons_layout.addWidget(refresh_button)
+        buttons_layout.addWidget(simulate_button)
+        documents_layout.addLayout(buttons_layout)
+        documents_group.setLayout(documents_layout)
+        self.main_layout.addWidget(documents_group)
+
+        results_group = QGroupBox("Resultado da simulação")
+        results_layout = QVBoxLayout()
+        self.results_table = QTableWidget()
+        self.results_table.setColumnCount(8)
+        self.results_table.setHorizontalHeaderLabels(
+            ["Item", "Saldo Atual", "Saldo Simulado", "Custo Atual", "Custo Simulado",
+             "Valor Atual", "Valor Simulado", "Disponível Simulado"]
+        )
+        self.results_table.verticalHeader().setVisible(False)
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_table.setSortingEnabled(True)
+        header = self.results_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        results_layout.addWidget(self.results_table)
+        results_group.setLayout(results_layout)
+        self.main_layout.addWidget(results_group)
+
+    def load_documents(self):
+        self.documents_table.setRowCount(0)
+        response = self.simulation_service.list_open_documents()
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        for document in response["data"]:
+            row = self.documents_table.rowCount()
+            self.documents_table.insertRow(row)
+            type_item = QTableWidgetItem(document['TIPO'])
+            type_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+            type_item.setCheckState(Qt.Unchecked)
+            cells = [type_item, QTableWidgetItem(str(document['ID'])), QTableWidgetItem(document['DOCUMENTO'] or ""),
+                     QTableWidgetItem(format_date_for_display(document['DATA']) if document['DATA'] else "")]
+            for column, cell in enumerate(cells):
+                if column:
+                    cell.setFlags(cell.flags() & ~Qt.ItemIsEditable)
+                self.documents_table.setItem(row, column, cell)
+            # Só a quantidade produzida das OPs é editável
+            quantity_item = QTableWidgetItem(str(document['QUANTIDADE']) if document['TIPO'] == 'OP' else "")
+            if document['TIPO'] != 'OP':
+                quantity_item.setFlags(quantity_item.flags() & ~Qt.ItemIsEditable)
+            self.documents_table.setItem(row, 4, quantity_item)
+
+    def run_simulation(self):
+        entries, production, sales = [], [], []
+        for row in range(self.documents_table.rowCount()):
+            type_item = self.documents_table.item(row, 0)
+            if type_item.checkState() != Qt.Checked:
+                continue
+            document_id = int(self.documents_table.item(row, 1).text())
+            if type_item.text() == 'OP':
+                try:
+                    quantity = parse_decimal(self.documents_table.item(row, 4).text())
+                except ValueError:
+                    show_error_message(self, "Atenção", f"Quantidade inválida na OP #{document_id}.")
+                    return
+                production.append((document_id, quantity))
+            elif type_item.text() == 'Entrada':
+                entries.append(document_id)
+            else:
+                sales.append(document_id)
+
+        response = self.simulation_service.simulate(entries, production, sales)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        data = response["data"]
+        self.show_results(data["items"])
+        failures = [f"{step['documento']}: {step['message']}" for step in data["steps"] if not step["success"]]
+        text = (f"{response['message']} Valor do estoque: {data['valor_antes']:.2f} → {data['valor_depois']:.2f} "
+                f"({data['tempo_total']:.2f} s).")
+        if failures:
+            text += "\n" + "\n".join(failures)
+        self.summary_label.setText(text)
+
+    def show_results(self, items):
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setRowCount(0)
+        for item in items:
+            row = self.results_table.rowCount()
+            self.results_table.insertRow(row)
+            self.results_table.setItem(row, 0, QTableWidgetItem(item['DESCRICAO']))
+            values = [item['SALDO_ANTES'], item['SALDO_DEPOIS'], item['CUSTO_ANTES'], item['CUSTO_DEPOIS'],
+                      item['VALOR_ANTES'], item['VALOR_DEPOIS'], item['DISPONIVEL_DEPOIS']]
+            for column, value in enumerate(values, start=1):
+                cell = NumericTableWidgetItem(f"{value:.2f}")
+                cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                if column == 7 and value < 0:
+                    cell.setForeground(Qt.red)
+                self.results_table.setItem(row, column, cell)
+        self.results_table.setSortingEnabled(True)
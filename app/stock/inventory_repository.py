@@ -0,0 +1,154 @@
+# app/stock/inventory_repository.py
+import sqlite3
+from datetime import datetime
+from app.database.db import get_db_manager
+from app.database.records import fetch_record, fetch_records
+from app.database.detail_sync import sync_details
+from app.database.versioning import bump_version
+
+# Diferença entre contado e sistema abaixo disso não gera ajuste
+TOLERANCE = 1e-9
+
+class InventoryRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def create_inventory(self, inventory_date, observacao):
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                return conn.execute(
+                    "INSERT INTO INVENTARIO (DATA_INVENTARIO, OBSERVACAO, STATUS) VALUES (?, ?, 'Em Aberto')",
+                    (inventory_date, observacao)
+                ).lastrowid
+        except sqlite3.Error as e:
+            print(f"Database error in create_inventory: {e}")
+            return None
+
+    def get_inventory(self, inventory_id):
+        conn = self.db_manager.get_connection()
+        return fetch_record(conn.execute("SELECT * FROM INVENTARIO WHERE ID = ?", (inventory_id,)))
+
+    def list_inventories(self):
+        conn = self.db_manager.get_connection()
+        return fetch_records(conn.execute("""
+            SELECT INV.ID, INV.DATA_INVENTARIO, INV.OBSERVACAO, INV.STATUS, INV.DATA_FINALIZACAO,
+                   (SELECT COUNT(*) FROM INVENTARIO_ITENS WHERE ID_INVENTARIO = INV.ID) AS ITENS
+            FROM INVENTARIO INV ORDER BY INV.ID DESC
+        """))
+
+    def save_counts(self, inventory_id, observacao, counts, expected_version=None):
+        """
+        Grava a observação e as contagens [(id_item, quantidade)] do inventário em aberto,
+        aplicando só a diferença (ver detail_sync.py). Devolve a nova versão (False em erro).
+        """
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                new_version = bump_version(cursor, "INVENTARIO", inventory_id, expected_version)
+                cursor.execute("UPDATE INVENTARIO SET OBSERVACAO = ? WHERE ID = ?", (observacao, inventory_id))
+                sync_details(cursor, "INVENTARIO_ITENS", "ID_INVENTARIO", inventory_id, "ID_ITEM",
+                             ["QUANTIDADE_CONTADA"], counts)
+            return new_version
+        except sqlite3.Error as e:
+            print(f"Database error in save_counts: {e}")
+            return False
+
+    def import_counts(self, inventory_id, counts):
+        """
+        Grava em lote contagens importadas [(id_item, quantidade)], substituindo a contagem já
+        gravada dos mesmos itens e mantendo as demais. Devolve a nova versão (False em erro).
+        """
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                new_version = bump_version(cursor, "INVENTARIO", inventory_id)
+                cursor.executemany("""
+                    INSERT INTO INVENTARIO_ITENS (ID_INVENTARIO, ID_ITEM, QUANTIDADE_CONTADA) VALUES (?, ?, ?)
+                    ON CONFLICT (ID_INVENTARIO, ID_ITEM) DO UPDATE SET
+                        QUANTIDADE_CONTADA = excluded.QUANTIDADE_CONTADA
+                """, [(inventory_id, item_id, quantity) for item_id, quantity in counts])
+            return new_version
+        except sqlite3.Error as e:
+            print(f"Database error in import_counts: {e}")
+            return False
+
+    def item_ids_by_code(self):
+        """{código interno: ID} dos itens com código, para a importação das contagens."""
+        conn = self.db_manager.get_connection()
+        return dict(conn.execute("SELECT CODIGO_INTERNO, ID FROM ITEM WHERE CODIGO_INTERNO IS NOT NULL").fetchall())
+
+    def reconciliation(self, inventory_id):
+        """
+        Contado x sistema de cada item do inventário. Em aberto, compara com o saldo atual;
+        finalizado, com o saldo e o custo gravados na finalização.
+        """
+        conn = self.db_manager.get_connection()
+        return fetch_records(conn.execute("""
+            SELECT II.ID_ITEM, I.CODIGO_INTERNO, I.DESCRICAO, U.SIGLA AS UNIDADE, II.QUANTIDADE_CONTADA,
+                   COALESCE(II.SALDO_SISTEMA, I.SALDO_ESTOQUE) AS SALDO_SISTEMA,
+                   II.QUANTIDADE_CONTADA - COALESCE(II.SALDO_SISTEMA, I.SALDO_ESTOQUE) AS DIFERENCA,
+                   COALESCE(II.CUSTO_UNITARIO, I.CUSTO_MEDIO) AS CUSTO_UNITARIO,
+                   (II.QUANTIDADE_CONTADA - COALESCE(II.SALDO_SISTEMA, I.SALDO_ESTOQUE))
+                       * COALESCE(II.CUSTO_UNITARIO, I.CUSTO_MEDIO) AS VALOR_DIFERENCA
+            FROM INVENTARIO_ITENS II
+            JOIN ITEM I ON I.ID = II.ID_ITEM
+            JOIN UNIDADE U ON U.ID = I.ID_UNIDADE
+            WHERE II.ID_INVENTARIO = ?
+            ORDER BY I.DESCRICAO
+        """, (inventory_id,)))
+
+    def finalize_inventory(self, inventory_id, expected_version=None):
+        """
+        Numa única transação: grava em cada item contado o saldo e o custo do sistema, lança um
+        movimento 'Ajuste de Inventário' com a diferença ao custo médio e leva o saldo do item
+        à quantidade contada. Itens não contados não mudam. Devolve o número de ajustes (None em erro).
+        """
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                inventory = cursor.execute("SELECT DATA_INVENTARIO, STATUS FROM INVENTARIO WHERE ID = ?",
+                                           (inventory_id,)).fetchone()
+                if not inventory or inventory['STATUS'] != 'Em Aberto':
+                    return None
+                cursor.execute("""
+                    UPDATE INVENTARIO_ITENS SET SALDO_SISTEMA = I.SALDO_ESTOQUE, CUSTO_UNITARIO = I.CUSTO_MEDIO
+                    FROM ITEM I WHERE I.ID = INVENTARIO_ITENS.ID_ITEM AND INVENTARIO_ITENS.ID_INVENTARIO = ?
+                """, (inventory_id,))
+                cursor.execute("""
+                    INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO)
+                    SELECT ID_ITEM, 'Ajuste de Inventário', QUANTIDADE_CONTADA - SALDO_SISTEMA, CUSTO_UNITARIO, ?
+                    FROM INVENTARIO_ITENS
+                    WHERE ID_INVENTARIO = ? AND ABS(QUANTIDADE_CONTADA - SALDO_SISTEMA) > ?
+                    ORDER BY ID_ITEM
+                """, (inventory['DATA_INVENTARIO'], inventory_id, TOLERANCE))
+                adjustments = cursor.rowcount
+                cursor.execute("""
+                    UPDATE ITEM SET SALDO_ESTOQUE = II.QUANTIDADE_CONTADA
+                    FROM INVENTARIO_ITENS II
+                    WHERE II.ID_ITEM = ITEM.ID AND II.ID_INVENTARIO = ? AND ABS(II.QUANTIDADE_CONTADA - II.SALDO_SISTEMA) > ?
+                """, (inventory_id, TOLERANCE))
+                bump_version(cursor, "INVENTARIO", inventory_id, expected_version)
+                cursor.execute("UPDATE INVENTARIO SET STATUS = 'Finalizado', DATA_FINALIZACAO = ? WHERE ID = ?",
+                               (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), inventory_id))
+            return adjustments
+        except sqlite3.Error as e:
+            print(f"Database error in finalize_inventory: {e}")
+            return None
+
+    def delete_inventory(self, inventory_id):
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM INVENTARIO_ITENS WHERE ID_INVENTARIO = ?", (inventory_id,))
+                cursor.execute("DELETE FROM INVENTARIO WHERE ID = ? AND STATUS = 'Em Aberto'", (inventory_id,))
+                if cursor.rowcount == 0:
+                    raise sqlite3.IntegrityError("Somente inventários em aberto podem ser excluídos.")
+            return True
+        except sqlite3.Error as e:
+            print(f"Database error in delete_inventory: {e}")
+            return False
@@ -0,0 +1,177 @@
+# app/stock/inventory_service.py
+"""
+Inventário físico: contagem dos itens e ajuste do estoque ao contado.
+
+O inventário é criado em aberto; as contagens são digitadas na tela ou importadas de
+um CSV (colunas código ou id e quantidade) e podem ser gravadas várias vezes. A
+conciliação compara cada item contado com o saldo do sistema numa única consulta. Ao
+finalizar, os itens com diferença recebem um movimento 'Ajuste de Inventário' (positivo
+ou negativo, ao custo médio) e passam a ter o saldo contado, tudo numa única transação.
+"""
+import csv
+import math
+from app.closing.closing_repository import ClosingRepository
+from app.database.versioning import StaleDocumentError
+from app.diagnostics.metrics import timed_service
+from app.stock.inventory_repository import InventoryRepository
+from app.utils.row_model import parse_decimal
+
+IMPORT_COLUMNS = {
+    "codigo": ("codigo", "código", "codigo_interno", "código interno", "codigo interno"),
+    "id": ("id", "id_item"),
+    "quantidade": ("quantidade", "qtd", "contagem", "quantidade_contada"),
+}
+
+@timed_service
+class InventoryService:
+    def __init__(self):
+        self.inventory_repository = InventoryRepository()
+        self.closing_repository = ClosingRepository()
+
+    def create_inventory(self, inventory_date, observacao=""):
+        if not inventory_date:
+            return {"success": False, "message": "A data do inventário é obrigatória."}
+        inventory_id = self.inventory_repository.create_inventory(inventory_date, observacao)
+        if inventory_id is None:
+            return {"success": False, "message": "Erro ao criar o inventário no banco de dados."}
+        return {"success": True, "data": inventory_id, "message": f"Inventário #{inventory_id} criado."}
+
+    def list_inventories(self):
+        try:
+            return {"success": True, "data": self.inventory_repository.list_inventories()}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao listar os inventários: {e}"}
+
+    def get_inventory(self, inventory_id):
+        """Cabeçalho e conciliação (contado x sistema) do inventário."""
+        try:
+            master = self.inventory_repository.get_inventory(inventory_id)
+            if not master:
+                return {"success": False, "message": "Inventário não encontrado."}
+            items = self.inventory_repository.reconciliation(inventory_id)
+            totals = self._totals(items)
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao buscar o inventário: {e}"}
+        return {"success": True, "data": {"master": master, "items": items, "totals": totals}}
+
+    def _totals(self, items):
+        # Diferença ou valor nulos (ex.: item sem custo médio) contam como zero
+        differences = [item for item in items if abs(item['DIFERENCA'] or 0) > 1e-9]
+        values = [item['VALOR_DIFERENCA'] or 0 for item in differences]
+        return {
+            "itens": len(items),
+            "divergentes": len(differences),
+            "sobra": sum(value for value in values if value > 0),
+            "falta": sum(value for value in values if value < 0),
+        }
+
+    def _check_open(self, inventory_id):
+        master = self.inventory_repository.get_inventory(inventory_id)
+        if not master:
+            return "Inventário não encontrado."
+        if master['STATUS'] != 'Em Aberto':
+            return "Este inventário já foi finalizado."
+        return None
+
+    def save_counts(self, inventory_id, observacao, counts, expected_version=None):
+        """counts: [(id_item, quantidade contada)] de todos os itens do inventário."""
+        error = self._check_open(inventory_id)
+        if error:
+            return {"success": False, "message": error}
+        if any(not math.isfinite(quantity) for _, quantity in counts):
+            return {"success": False, "message": "A quantidade contada deve ser um número válido."}
+        if any(quantity < 0 for _, quantity in counts):
+            return {"success": False, "message": "A quantidade contada não pode ser negativa."}
+        try:
+            version = self.inventory_repository.save_counts(inventory_id, observacao, counts, expected_version)
+        except StaleDocumentError as e:
+            return {"success": False, "conflict": True, "message": str(e)}
+        if not version:
+            return {"success": False, "message": "Erro no banco de dados ao gravar as contagens."}
+        return {"success": True, "version": version, "message": f"{len(counts)} contagens gravadas."}
+
+    def import_file(self, inventory_id, file_path):
+        """
+        Importa as contagens de um CSV (UTF-8 ou Latin-1). Linhas repetidas do mesmo item são
+        somadas; itens já contados no inventário ficam com a quantidade do arquivo.
+        """
+        error = self._check_open(inventory_id)
+        if error:
+            return {"success": False, "message": error}
+        try:
+            try:
+                counts, unknown = self._read_csv(file_path, "utf-8-sig")
+            except UnicodeDecodeError:
+                counts, unknown = self._read_csv(file_path, "latin-1")
+        except (OSError, ValueError, csv.Error) as e:
+            return {"success": False, "message": f"Erro ao importar as contagens: {e}"}
+        if not counts:
+            return {"success": False, "message": "Nenhuma contagem válida no arquivo."}
+
+        version = self.inventory_repository.import_counts(inventory_id, list(counts.items()))
+        if not version:
+            return {"success": False, "message": "Erro no banco de dados ao gravar as contagens importadas."}
+        message = f"{len(counts)} itens importados."
+        if unknown:
+            message += f" {len(unknown)} códigos não encontrados: {', '.join(unknown[:10])}"
+            message += "..." if len(unknown) > 10 else "."
+        return {"success": True, "data": len(counts), "version": version, "message": message}
+
+    def _read_csv(self, file_path, encoding):
+        """({id_item: quantidade}, [códigos não encontrados]) do arquivo."""
+        with open(file_path, newline="", encoding=encoding) as file:
+            sample = file.read(4096)
+            file.seek(0)
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+            reader = csv.DictReader(file, dialect=dialect)
+            header = {name.strip().lower(): name for name in reader.fieldnames or []}
+            columns = {field: next((header[alias] for alias in aliases if alias in header), None)
+                       for field, aliases in IMPORT_COLUMNS.items()}
+            if columns["quantidade"] is None or (columns["codigo"] is None and columns["id"] is None):
+                raise ValueError("O arquivo precisa das colunas 'codigo' (ou 'id') e 'quantidade'.")
+
+            ids_by_code = self.inventory_repository.item_ids_by_code() if columns["codigo"] else {}
+            counts, unknown = {}, []
+            for line, record in enumerate(reader, start=2):
+                key = (record.get(columns["codigo"] or columns["id"]) or "").strip()
+                if not key:
+                    continue
+                item_id = ids_by_code.get(key) if columns["codigo"] else (int(key) if key.isdigit() else None)
+                if item_id is None:
+                    unknown.append(key)
+                    continue
+                try:
+                    quantity = parse_decimal(record.get(columns["quantidade"]) or "0")
+                except ValueError:
+                    raise ValueError(f"Quantidade inválida na linha {line}.") from None
+                if quantity < 0:
+                    raise ValueError(f"Quantidade negativa na linha {line}.")
+                counts[item_id] = counts.get(item_id, 0) + quantity
+                if not math.isfinite(counts[item_id]):
+                    raise ValueError(f"Quantidade inválida na linha {line}.")
+            return counts, unknown
+
+    def finalize_inventory(self, inventory_id, expected_version=None):
+        error = self._check_open(inventory_id)
+        if error:
+            return {"success": False, "message": error}
+        if not self.inventory_repository.reconciliation(inventory_id):
+            return {"success": False, "message": "Não é possível finalizar um inventário sem itens contados."}
+        if self.closing_repository.is_closed(self.inventory_repository.get_inventory(inventory_id)['DATA_INVENTARIO']):
+            return {"success": False, "message": "A data do inventário está em um período fechado."}
+        try:
+            adjustments = self.inventory_repository.finalize_inventory(inventory_id, expected_version)
+        except StaleDocumentError as e:
+            return {"success": False, "conflict": True, "message": str(e)}
+        if adjustments is None:
+            return {"success": False, "message": "Erro no banco de dados ao finalizar o inventário."}
+        return {"success": True, "data": adjustments,
+                "message": f"Inventário #{inventory_id} finalizado com {adjustments} ajustes de estoque."}
+
+    def delete_inventory(self, inventory_id):
+        error = self._check_open(inventory_id)
+        if error:
+            return {"success": False, "message": error}
+        if not self.inventory_repository.delete_inventory(inventory_id):
+            return {"success": False, "message": "Erro no banco de dados ao excluir o inventário."}
+        return {"success": True, "message": f"Inventário #{inventory_id} excluído."}
@@ -0,0 +1,65 @@
+# app/stock/replenishment_repository.py
+import sqlite3
+from app.database.db import get_db_manager
+from app.database.records import fetch_records
+
+class ReplenishmentRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def first_consumption_date(self):
+        conn = self.db_manager.get_connection()
+        return conn.execute("SELECT MIN(DATA) FROM RESUMO_CONSUMO_DIARIO").fetchone()[0]
+
+    def consumption_positions(self, start_date):
+        """
+        Por insumo: soma e soma dos quadrados do consumo diário por OP desde start_date
+        (do resumo diário, que já inclui o histórico arquivado), saldo, reserva, quantidade
+        em entradas ainda em aberto e fornecedor padrão.
+        """
+        conn = self.db_manager.get_connection()
+        return fetch_records(conn.execute("""
+            SELECT I.ID, I.DESCRICAO, I.CUSTO_MEDIO, I.SALDO_ESTOQUE, I.SALDO_RESERVADO,
+                   I.ID_FORNECEDOR_PADRAO, F.RAZAO_SOCIAL AS FORNECEDOR, U.SIGLA AS UNIDADE,
+                   COALESCE(C.TOTAL, 0) AS CONSUMO_TOTAL, COALESCE(C.QUADRADOS, 0) AS CONSUMO_QUADRADOS,
+                   COALESCE(P.PENDENTE, 0) AS PENDENTE
+            FROM ITEM I
+            JOIN UNIDADE U ON U.ID = I.ID_UNIDADE
+            LEFT JOIN FORNECEDOR F ON F.ID = I.ID_FORNECEDOR_PADRAO
+            LEFT JOIN (
+                SELECT ID_ITEM, SUM(QUANTIDADE) AS TOTAL, SUM(QUANTIDADE * QUANTIDADE) AS QUADRADOS
+                FROM RESUMO_CONSUMO_DIARIO WHERE DATA >= ? GROUP BY ID_ITEM
+            ) C ON C.ID_ITEM = I.ID
+            LEFT JOIN (
+                SELECT EI.ID_INSUMO, SUM(EI.QUANTIDADE) AS PENDENTE
+                FROM ENTRADANOTA_ITENS EI JOIN ENTRADANOTA E ON E.ID = EI.ID_ENTRADA
+                WHERE E.STATUS = 'Em Aberto' GROUP BY EI.ID_INSUMO
+            ) P ON P.ID_INSUMO = I.ID
+            WHERE I.TIPO_ITEM IN ('Insumo', 'Ambos')
+        """, (start_date,)))
+
+    def create_draft_entries(self, entry_date, observacao, entries):
+        """
+        Cria uma entrada em aberto, sem número de nota, para cada fornecedor.
+        entries: {id_fornecedor: [(id_insumo, quantidade, valor_unitario)]}. Devolve os IDs criados.
+        """
+        conn = self.db_manager.get_connection()
+        created = []
+        try:
+            with conn:
+                cursor = conn.cursor()
+                for supplier_id, items in entries.items():
+                    cursor.execute(
+                        "INSERT INTO ENTRADANOTA (DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, OBSERVACAO, STATUS, VALOR_TOTAL) VALUES (?, ?, '', ?, 'Em Aberto', ?)",
+                        (entry_date, entry_date, observacao, sum(quantity * cost for _, quantity, cost in items))
+                    )
+                    entry_id = cursor.lastrowid
+                    cursor.executemany(
+                        "INSERT INTO ENTRADANOTA_ITENS (ID_ENTRADA, ID_INSUMO, ID_FORNECEDOR, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?, ?)",
+                        [(entry_id, item_id, supplier_id, quantity, cost) for item_id, quantity, cost in items]
+                    )
+                    created.append(entry_id)
+            return created
+        except sqlite3.Error as e:
+            print(f"Database error in create_draft_entries: {e}")
+            return None
@@ -0,0 +1,91 @@
+# app/stock/replenishment_service.py
+"""
+Sugestão de compra de insumos por ponto de pedido.
+
+O consumo diário de cada insumo (saídas por OP, do resumo diário) dá a média d e o
+desvio padrão s no período, contando como zero os dias sem consumo. Com prazo de
+entrega L e intervalo entre compras R, em dias, e o fator de nível de serviço z:
+
+    ponto de pedido = d·L + z·s·√L
+    estoque máximo  = d·(L + R) + z·s·√(L + R)
+
+A posição do insumo é saldo − reservado para OPs + quantidade em entradas em aberto.
+Quando ela chega ao ponto de pedido, a sugestão é completar até o estoque máximo.
+"""
+import math
+from datetime import date, timedelta
+from app.diagnostics.metrics import timed_service
+from app.stock.replenishment_repository import ReplenishmentRepository
+
+@timed_service
+class ReplenishmentService:
+    def __init__(self):
+        self.replenishment_repository = ReplenishmentRepository()
+
+    def suggest(self, days=180, lead_time_days=7, review_days=30, service_factor=1.65):
+        """Insumos a comprar, por fornecedor padrão. days None usa todo o histórico de consumo."""
+        if lead_time_days < 0 or review_days < 0 or service_factor < 0:
+            return {"success": False, "message": "Prazo, intervalo e fator de serviço não podem ser negativos."}
+
+        try:
+            today = date.today()
+            if days is None:
+                first = self.replenishment_repository.first_consumption_date()
+                start = date.fromisoformat(first) if first else today
+            else:
+                start = today - timedelta(days=days - 1)
+            period = max((today - start).days + 1, 1)
+            rows = self.replenishment_repository.consumption_positions(start.isoformat())
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao consultar o consumo dos insumos: {e}"}
+
+        lead_factor = math.sqrt(lead_time_days)
+        cover_factor = math.sqrt(lead_time_days + review_days)
+        suggestions = []
+        for row in rows:
+            mean = row['CONSUMO_TOTAL'] / period
+            deviation = math.sqrt(max(row['CONSUMO_QUADRADOS'] / period - mean * mean, 0))
+            reorder_point = mean * lead_time_days + service_factor * deviation * lead_factor
+            maximum = mean * (lead_time_days + review_days) + service_factor * deviation * cover_factor
+            position = row['SALDO_ESTOQUE'] - row['SALDO_RESERVADO'] + row['PENDENTE']
+            quantity = round(maximum - position, 3)
+            if position > reorder_point or quantity <= 0:
+                continue
+            suggestions.append({
+                "ID": row['ID'],
+                "DESCRICAO": row['DESCRICAO'],
+                "UNIDADE": row['UNIDADE'],
+                "ID_FORNECEDOR": row['ID_FORNECEDOR_PADRAO'],
+                "FORNECEDOR": row['FORNECEDOR'],
+                "CONSUMO_MEDIO": mean,
+                "DESVIO": deviation,
+                "POSICAO": position,
+                "PONTO_PEDIDO": reorder_point,
+                "ESTOQUE_MAXIMO": maximum,
+                "SUGESTAO": quantity,
+                "CUSTO_MEDIO": row['CUSTO_MEDIO'],
+            })
+        suggestions.sort(key=lambda item: (item['FORNECEDOR'] is None, item['FORNECEDOR'] or "", item['DESCRICAO']))
+        return {"success": True, "data": suggestions,
+                "message": f"{len(suggestions)} insumos no ponto de pedido (consumo de {period} dias)."}
+
+    def create_draft_entries(self, suggestions):
+        """Cria uma entrada em aberto por fornecedor padrão com as quantidades sugeridas, ao custo médio."""
+        entries = {}
+        without_supplier = 0
+        for item in suggestions:
+            if not item['ID_FORNECEDOR']:
+                without_supplier += 1
+                continue
+            entries.setdefault(item['ID_FORNECEDOR'], []).append((item['ID'], item['SUGESTAO'], item['CUSTO_MEDIO']))
+        if not entries:
+            return {"success": False, "message": "Nenhum insumo sugerido tem fornecedor padrão."}
+
+        today = date.today().isoformat()
+        created = self.replenishment_repository.create_draft_entries(today, "Sugestão de reposição", entries)
+        if created is None:
+            return {"success": False, "message": "Erro no banco de dados ao criar as entradas."}
+        message = f"{len(created)} entradas em aberto criadas."
+        if without_supplier:
+            message += f" {without_supplier} insumos sem fornecedor padrão ficaram de fora."
+        return {"success": True, "data": created, "message": message}
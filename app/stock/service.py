@@ -1,9 +1,27 @@
 # app/stock/service.py
+import math
+from app.closing.closing_repository import ClosingRepository
+from app.database.versioning import StaleDocumentError
+from app.lot.lots import LotConsumedError
 from app.stock.stock_repository import StockRepository
-
+from app.diagnostics.metrics import timed_service
+
+def _validate_items(items):
+    """Mensagem de erro do primeiro item inválido da nota, ou None."""
+    for position, item in enumerate(items, 1):
+        if not item.get('id_insumo') or not item.get('id_fornecedor'):
+            return f"O item {position} precisa do insumo e do fornecedor."
+        for field, label in (('quantidade', "A quantidade"), ('valor_unitario', "O valor unitário")):
+            value = item.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+                return f"{label} do item {position} deve ser um número maior que zero."
+    return None
+
+@timed_service
 class StockService:
     def __init__(self):
         self.stock_repository = StockRepository()
+        self.closing_repository = ClosingRepository()
 
     def create_entry(self, entry_date, typing_date, note_number, observacao):
         if not all([entry_date, typing_date, note_number]):
@@ -18,15 +36,37 @@ class StockService:
         except Exception as e:
             return {"success": False, "message": f"Erro inesperado: {e}"}
 
-    def update_entry(self, entry_id, entry_date, typing_date, note_number, observacao, items):
+    def create_entry_with_items(self, entry_date, typing_date, note_number, observacao, items):
+        """Cria a nota já com os itens; se algo falhar, nenhum cabeçalho fica para trás."""
+        if not all([entry_date, typing_date, note_number]):
+            return {"success": False, "message": "Todos os campos do cabeçalho são obrigatórios."}
+        error = _validate_items(items)
+        if error:
+            return {"success": False, "message": error}
+
+        try:
+            total_value = sum(item['quantidade'] * item['valor_unitario'] for item in items)
+            entry_id = self.stock_repository.create_entry_with_items(entry_date, typing_date, note_number, observacao,
+                                                                     total_value, items)
+            if entry_id:
+                return {"success": True, "data": entry_id, "message": "Nota de entrada criada com sucesso."}
+            return {"success": False, "message": "Erro ao criar nota de entrada no banco de dados."}
+        except Exception as e:
+            return {"success": False, "message": f"Erro inesperado: {e}"}
+
+    def update_entry(self, entry_id, entry_date, typing_date, note_number, observacao, items, expected_version=None):
         if not all([entry_id, entry_date, typing_date, note_number]):
             return {"success": False, "message": "Todos os campos do cabeçalho são obrigatórios."}
         
         try:
             total_value = sum(item['quantidade'] * item['valor_unitario'] for item in items)
-            self.stock_repository.update_entry_master(entry_id, entry_date, typing_date, note_number, observacao, total_value)
-            self.stock_repository.update_entry_items(entry_id, items)
-            return {"success": True, "message": "Nota de entrada atualizada com sucesso."}
+            version = self.stock_repository.update_entry(entry_id, entry_date, typing_date, note_number, observacao,
+                                                         total_value, items, expected_version)
+            if not version:
+                return {"success": False, "message": "Erro no banco de dados ao atualizar a nota de entrada."}
+            return {"success": True, "version": version, "message": "Nota de entrada atualizada com sucesso."}
+        except StaleDocumentError as e:
+            return {"success": False, "conflict": True, "message": str(e)}
         except Exception as e:
             return {"success": False, "message": f"Erro ao atualizar nota de entrada: {e}"}
             
@@ -55,7 +95,7 @@ class StockService:
         except Exception as e:
             return {"success": False, "message": f"Erro ao listar notas de entrada: {e}"}
 
-    def finalize_entry(self, entry_id):
+    def finalize_entry(self, entry_id, expected_version=None):
         if not entry_id:
             return {"success": False, "message": "ID da nota de entrada não fornecido."}
             
@@ -66,13 +106,20 @@ class StockService:
             return {"success": False, "message": "Esta nota de entrada já foi finalizada."}
         if not details['items']:
             return {"success": False, "message": "Não é possível finalizar uma entrada sem itens."}
+        for item in details['items']:
+            if not (item['QUANTIDADE'] > 0 and item['VALOR_UNITARIO'] > 0):
+                return {"success": False, "message": f"A quantidade e o valor unitário do item '{item['DESCRICAO']}' devem ser maiores que zero."}
+        if self.closing_repository.is_closed(details['master']['DATA_ENTRADA']):
+            return {"success": False, "message": "A data da entrada está em um período fechado."}
 
         try:
-            success, total_value = self.stock_repository.finalize_entry(entry_id)
+            success, total_value = self.stock_repository.finalize_entry(entry_id, expected_version)
             if success:
                 return {"success": True, "message": f"Entrada #{entry_id} finalizada com sucesso. Valor total: {total_value:.2f}"}
             else:
                 return {"success": False, "message": "Erro no banco de dados ao finalizar a entrada."}
+        except StaleDocumentError as e:
+            return {"success": False, "conflict": True, "message": str(e)}
         except Exception as e:
             return {"success": False, "message": f"Um erro inesperado ocorreu: {e}"}
 
@@ -87,12 +134,16 @@ class StockService:
                 return {"success": False, "message": "Nota de entrada não encontrada."}
             if details['master']['STATUS'] != 'Finalizada':
                 return {"success": False, "message": "Apenas notas finalizadas podem ser reabertas."}
+            if self.closing_repository.is_closed(details['master']['DATA_ENTRADA']):
+                return {"success": False, "message": "A entrada pertence a um período fechado e não pode ser reaberta."}
 
             success = self.stock_repository.reopen_entry(entry_id)
             if success:
                 return {"success": True, "message": f"Entrada #{entry_id} reaberta com sucesso. O estoque foi estornado."}
             else:
                 return {"success": False, "message": "Erro no banco de dados ao tentar reabrir a entrada."}
+        except LotConsumedError as e:
+            return {"success": False, "message": str(e)}
         except Exception as e:
             return {"success": False, "message": f"Um erro inesperado ocorreu: {e}"}
 
@@ -1,6 +1,10 @@
 # app/stock/stock_repository.py
 import sqlite3
 from app.database.db import get_db_manager
+from app.database.records import fetch_record, fetch_records
+from app.database.detail_sync import sync_details
+from app.database.versioning import bump_version
+from app.lot import lots
 
 class StockRepository:
     def __init__(self):
@@ -22,51 +26,98 @@ class StockRepository:
             print(f"Database error in create_entry: {e}")
             return None
 
-    def update_entry_master(self, entry_id, entry_date, typing_date, note_number, observacao, total_value):
+    def create_entry_with_items(self, entry_date, typing_date, note_number, observacao, total_value, items):
+        """Cria cabeçalho e itens numa única transação e devolve o ID (None em erro, sem deixar cabeçalho)."""
         conn = self.db_manager.get_connection()
         try:
-            conn.execute(
-                "UPDATE ENTRADANOTA SET DATA_ENTRADA = ?, DATA_DIGITACAO = ?, NUMERO_NOTA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
-                (entry_date, typing_date, note_number, observacao, total_value, entry_id)
-            )
-            conn.commit()
-            return True
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO ENTRADANOTA (DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, OBSERVACAO, STATUS, VALOR_TOTAL) VALUES (?, ?, ?, ?, 'Em Aberto', ?)",
+                    (entry_date, typing_date, note_number, observacao, total_value)
+                )
+                entry_id = cursor.lastrowid
+                self._sync_entry_items(cursor, entry_id, items)
+            return entry_id
+        except sqlite3.Error as e:
+            print(f"Database error in create_entry_with_items: {e}")
+            return None
+
+    def update_entry(self, entry_id, entry_date, typing_date, note_number, observacao, total_value, items, expected_version=None):
+        """
+        Atualiza cabeçalho e itens numa única transação e devolve a nova versão (False em erro).
+        Com expected_version, levanta StaleDocumentError se a nota foi salva por outra estação.
+        """
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                new_version = bump_version(cursor, "ENTRADANOTA", entry_id, expected_version)
+                cursor.execute(
+                    "UPDATE ENTRADANOTA SET DATA_ENTRADA = ?, DATA_DIGITACAO = ?, NUMERO_NOTA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
+                    (entry_date, typing_date, note_number, observacao, total_value, entry_id)
+                )
+                self._sync_entry_items(cursor, entry_id, items)
+            return new_version
+        except sqlite3.Error as e:
+            print(f"Database error in update_entry: {e}")
+            return False
+
+    def update_entry_master(self, entry_id, entry_date, typing_date, note_number, observacao, total_value, expected_version=None):
+        conn = self.db_manager.get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                new_version = bump_version(cursor, "ENTRADANOTA", entry_id, expected_version)
+                cursor.execute(
+                    "UPDATE ENTRADANOTA SET DATA_ENTRADA = ?, DATA_DIGITACAO = ?, NUMERO_NOTA = ?, OBSERVACAO = ?, VALOR_TOTAL = ? WHERE ID = ?",
+                    (entry_date, typing_date, note_number, observacao, total_value, entry_id)
+                )
+            return new_version
         except sqlite3.Error:
-            conn.rollback()
             return False
 
-    def update_entry_items(self, entry_id, items):
+    def update_entry_items(self, entry_id, items, expected_version=None):
         conn = self.db_manager.get_connection()
         try:
             with conn:
                 cursor = conn.cursor()
-                cursor.execute("DELETE FROM ENTRADANOTA_ITENS WHERE ID_ENTRADA = ?", (entry_id,))
-                if items:
-                    cursor.executemany(
-                        "INSERT INTO ENTRADANOTA_ITENS (ID_ENTRADA, ID_INSUMO, ID_FORNECEDOR, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?, ?)",
-                        [(entry_id, item['id_insumo'], item['id_fornecedor'], item['quantidade'], item['valor_unitario']) for item in items]
-                    )
-            return True
+                new_version = bump_version(cursor, "ENTRADANOTA", entry_id, expected_version)
+                self._sync_entry_items(cursor, entry_id, items)
+            return new_version
         except sqlite3.Error:
             return False
 
+    def _sync_entry_items(self, cursor, entry_id, items):
+        return sync_details(cursor, "ENTRADANOTA_ITENS", "ID_ENTRADA", entry_id, "ID_INSUMO",
+                            ["ID_FORNECEDOR", "QUANTIDADE", "VALOR_UNITARIO", "LOTE"],
+                            [(item['id_insumo'], item['id_fornecedor'], item['quantidade'], item['valor_unitario'],
+                              item.get('lote') or None) for item in items])
+
     def get_entry_details(self, entry_id):
         conn = self.db_manager.get_connection()
-        master = conn.execute("SELECT * FROM ENTRADANOTA WHERE ID = ?", (entry_id,)).fetchone()
+        master = fetch_record(conn.execute("SELECT * FROM ENTRADANOTA WHERE ID = ?", (entry_id,)))
         if not master:
             return None
-        items = conn.execute("""
-            SELECT tei.ID, tei.ID_INSUMO, tei.ID_FORNECEDOR, f.NOME_FANTASIA as FORNECEDOR, i.DESCRICAO, u.SIGLA, tei.QUANTIDADE, tei.VALOR_UNITARIO
+        items = fetch_records(conn.execute("""
+            SELECT tei.ID, tei.ID_INSUMO, tei.ID_FORNECEDOR, f.NOME_FANTASIA as FORNECEDOR, i.DESCRICAO, u.SIGLA, tei.QUANTIDADE, tei.VALOR_UNITARIO, tei.LOTE
             FROM ENTRADANOTA_ITENS tei
             JOIN ITEM i ON tei.ID_INSUMO = i.ID
             JOIN UNIDADE u ON i.ID_UNIDADE = u.ID
             JOIN FORNECEDOR f ON tei.ID_FORNECEDOR = f.ID
             WHERE tei.ID_ENTRADA = ?
-        """, (entry_id,)).fetchall()
-        return {"master": dict(master), "items": [dict(row) for row in items]}
+        """, (entry_id,)))
+        return {"master": master, "items": items}
 
     def list_entries(self, search_term="", search_field="ID"):
         conn = self.db_manager.get_connection()
+        query, params = self.list_entries_query(search_term, search_field)
+        if query is None:
+            return []
+        return fetch_records(conn.execute(query, params))
+
+    def list_entries_query(self, search_term="", search_field="ID"):
+        """Monta a consulta da listagem de notas. Retorna (None, None) se a pesquisa não puder ter resultados."""
         query = """
             SELECT T.ID, T.DATA_ENTRADA, T.DATA_DIGITACAO, T.NUMERO_NOTA, T.VALOR_TOTAL, T.STATUS 
             FROM ENTRADANOTA T
@@ -89,7 +140,7 @@ class StockRepository:
                     query += f" WHERE {column} = ?"
                     params = (int(search_term),)
                 else: # Se o ID não for um número, não retorna nada
-                    return []
+                    return None, None
             elif search_field == "Valor Total":
                 try:
                     # Permite pesquisar valores aproximados
@@ -97,15 +148,39 @@ class StockRepository:
                     val = float(search_term.replace(',', '.'))
                     params = (val, val + 1)
                 except ValueError:
-                    return [] # Se não for um número válido, não retorna nada
+                    return None, None # Se não for um número válido, não retorna nada
             else: # Para Nº Nota, Data Entrada, Status
                 query += f" WHERE {column} LIKE ?"
                 params = (f'%{search_term}%',)
                 
         query += " ORDER BY T.ID DESC"
-        return [dict(row) for row in conn.execute(query, params).fetchall()]
+        return query, params
+
+    def movements_query(self, start_date=None, end_date=None, item_id=None):
+        """Monta a consulta do histórico de movimentos de estoque (inclusive o arquivado), com filtros opcionais."""
+        query = """
+            SELECT M.ID, M.DATA_MOVIMENTO, M.ID_ITEM, I.DESCRICAO, M.TIPO_MOVIMENTO,
+                   M.QUANTIDADE, M.VALOR_UNITARIO, M.ID_ORDEM_PRODUCAO
+            FROM MOVIMENTO_HISTORICO M
+            JOIN ITEM I ON M.ID_ITEM = I.ID
+        """
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("M.DATA_MOVIMENTO >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("M.DATA_MOVIMENTO <= ?")
+            params.append(end_date)
+        if item_id:
+            conditions.append("M.ID_ITEM = ?")
+            params.append(item_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY M.ID"
+        return query, tuple(params)
 
-    def finalize_entry(self, entry_id):
+    def finalize_entry(self, entry_id, expected_version=None):
         conn = self.db_manager.get_connection()
         details = self.get_entry_details(entry_id)
         if not details or details['master']['STATUS'] == 'Finalizada':
@@ -114,6 +189,8 @@ class StockRepository:
         try:
             with conn:
                 cursor = conn.cursor()
+                # Finaliza só a versão que a tela salvou por último (StaleDocumentError se outra estação gravou depois)
+                bump_version(cursor, 'ENTRADANOTA', entry_id, expected_version)
                 total_value = 0
                 for item in details['items']:
                     insumo_id, quantity, unit_cost = item['ID_INSUMO'], item['QUANTIDADE'], item['VALOR_UNITARIO']
@@ -127,6 +204,8 @@ class StockRepository:
                         "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, 'Entrada por Nota', ?, ?, ?)",
                         (insumo_id, quantity, unit_cost, details['master']['DATA_ENTRADA'])
                     )
+                    lots.receive(cursor, insumo_id, item['LOTE'] or f"E{entry_id}", quantity,
+                                 details['master']['DATA_ENTRADA'], entry_id=entry_id)
                 cursor.execute("UPDATE ENTRADANOTA SET VALOR_TOTAL = ?, STATUS = 'Finalizada' WHERE ID = ?", (total_value, entry_id))
             return True, total_value
         except sqlite3.Error:
@@ -163,9 +242,10 @@ class StockRepository:
                         "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, DATA_MOVIMENTO) VALUES (?, 'Estorno de Entrada', ?, ?, ?)",
                         (insumo_id, -quantity, unit_cost, details['master']['DATA_ENTRADA'])
                     )
+                    lots.reverse(cursor, insumo_id, item['LOTE'] or f"E{entry_id}", quantity, entry_id)
 
                 # Muda o status da nota para 'Em Aberto'
-                cursor.execute("UPDATE ENTRADANOTA SET STATUS = 'Em Aberto' WHERE ID = ?", (entry_id,))
+                cursor.execute("UPDATE ENTRADANOTA SET STATUS = 'Em Aberto', VERSAO = VERSAO + 1 WHERE ID = ?", (entry_id,))
             return True
         except sqlite3.Error as e:
             print(f"Database error in reopen_entry: {e}")
@@ -11,6 +11,7 @@ from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_qdate_for_db, for
 from app.item.ui_search_window import ItemSearchWindow
 from app.supplier.ui_search_window import SupplierSearchWindow
 from app.utils.ui_utils import NumericTableWidgetItem, show_error_message
+from app.utils.row_model import NumericRowModel, parse_decimal
 from PySide6.QtWidgets import QStyledItemDelegate
 
 class SupplierDelegate(QStyledItemDelegate):
@@ -35,6 +36,7 @@ class EntryEditWindow(QWidget):
         self.selected_supplier_id = None
         self.search_item_window = None
         self.search_supplier_window = None
+        self.row_model = NumericRowModel() # Valores numéricos das linhas da grade
         
         title = f"Editando Entrada #{entry_id}" if entry_id else "Nova Entrada de Insumo"
         self.setWindowTitle(title)
@@ -94,8 +96,8 @@ class EntryEditWindow(QWidget):
         items_group = QGroupBox("Insumos da Nota")
         items_layout = QVBoxLayout()
         self.items_table = QTableWidget()
-        self.items_table.setColumnCount(7)
-        self.items_table.setHorizontalHeaderLabels(["ID Insumo", "Descrição", "Fornecedor", "Quantidade", "Un.", "Valor Unit.", "Valor Total"])
+        self.items_table.setColumnCount(8)
+        self.items_table.setHorizontalHeaderLabels(["ID Insumo", "Descrição", "Fornecedor", "Quantidade", "Un.", "Valor Unit.", "Valor Total", "Lote"])
         self.items_table.verticalHeader().setVisible(False)
         self.items_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.items_table.setColumnHidden(0, True)
@@ -130,6 +132,7 @@ class EntryEditWindow(QWidget):
 
     def new_entry(self):
         self.current_entry_id = None
+        self.current_version = None
         self.setWindowTitle("Nova Entrada de Insumo")
         self.entry_id_display.setText("(Nova)")
         self.date_input.setDate(QDate.currentDate())
@@ -138,9 +141,12 @@ class EntryEditWindow(QWidget):
         self.observacao_input.clear()
         self.status_display.setText("Em Aberto")
         self.items_table.setRowCount(0)
+        self.row_model.clear()
+        self.update_total_value()
         self.set_read_only(False)
 
     def save_entry(self):
+        """Grava a nota; devolve True se gravou (a finalização só segue nesse caso)."""
         entry_date = format_qdate_for_db(self.date_input.date())
         typing_date = format_qdatetime_for_db(self.typing_date_input.dateTime())
         note_number = self.note_number_input.text()
@@ -152,16 +158,22 @@ class EntryEditWindow(QWidget):
             items.append({
                 'id_insumo': int(self.items_table.item(row, 0).text()),
                 'id_fornecedor': supplier_id,
-                'quantidade': float(self.items_table.item(row, 3).text().replace(',', '.')),
-                'valor_unitario': float(self.items_table.item(row, 5).text().replace(',', '.'))
+                'quantidade': self.row_model.quantity(row),
+                'valor_unitario': self.row_model.unit_value(row),
+                'lote': self.items_table.item(row, 7).text().strip()
             })
 
         if self.current_entry_id:
-            response = self.stock_service.update_entry(self.current_entry_id, entry_date, typing_date, note_number, observacao, items)
+            response = self.stock_service.update_entry(self.current_entry_id, entry_date, typing_date, note_number, observacao, items, self.current_version)
             if response["success"]:
+                self.current_version = response["version"]
                 QMessageBox.information(self, "Sucesso", response["message"])
+                return True
+            if response.get("conflict"):
+                QMessageBox.warning(self, "Conflito de Edição", response["message"])
             else:
                 show_error_message(self, "Error", response["message"])
+            return False
         else:
             # Primeiro, cria a entrada mestre para obter um ID
             create_response = self.stock_service.create_entry(entry_date, typing_date, note_number, observacao)
@@ -171,14 +183,16 @@ class EntryEditWindow(QWidget):
                 # Agora, chama o update para salvar os itens e o valor total
                 update_response = self.stock_service.update_entry(self.current_entry_id, entry_date, typing_date, note_number, observacao, items)
                 if update_response["success"]:
+                    self.current_version = update_response["version"]
                     self.setWindowTitle(f"Editando Entrada #{self.current_entry_id}")
                     self.entry_id_display.setText(str(self.current_entry_id))
                     QMessageBox.information(self, "Sucesso", "Nota de entrada criada e salva com sucesso.")
-                else:
-                    # Se o update falhar, informa o utilizador. O cabeçalho foi criado.
-                    show_error_message(self, "Aviso", f"O cabeçalho da nota foi criado (ID: {self.current_entry_id}), mas falhou ao salvar os itens: {update_response['message']}")
+                    return True
+                # Se o update falhar, informa o utilizador. O cabeçalho foi criado.
+                show_error_message(self, "Aviso", f"O cabeçalho da nota foi criado (ID: {self.current_entry_id}), mas falhou ao salvar os itens: {update_response['message']}")
             else:
                 show_error_message(self, "Error", create_response["message"])
+            return False
 
     def load_entry_data(self):
         response = self.stock_service.get_entry_details(self.current_entry_id)
@@ -189,6 +203,7 @@ class EntryEditWindow(QWidget):
 
         details = response["data"]
         master = details['master']
+        self.current_version = master.get('VERSAO')
         self.entry_id_display.setText(str(master['ID']))
         self.date_input.setDate(QDate.fromString(master['DATA_ENTRADA'], "yyyy-MM-dd"))
         self.typing_date_input.setDateTime(QDateTime.fromString(master['DATA_DIGITACAO'], "yyyy-MM-dd HH:mm:ss"))
@@ -198,8 +213,10 @@ class EntryEditWindow(QWidget):
         self.status_display.setText(master['STATUS'] if 'STATUS' in master else '')
         
         self.items_table.setRowCount(0)
+        self.row_model.clear()
         for item in details['items']:
             self.add_item_to_table(item, is_loading=True)
+        self.update_total_value()
         
         is_finalizada = master['STATUS'] == 'Finalizada'
         self.set_read_only(is_finalizada)
@@ -279,16 +296,20 @@ class EntryEditWindow(QWidget):
         self.items_table.setItem(row, 4, unit_item)
 
         self.items_table.setItem(row, 5, NumericTableWidgetItem(f"{item['VALOR_UNITARIO']:.2f}"))
-        total = item['QUANTIDADE'] * item['VALOR_UNITARIO']
+        total = self.row_model.append(item['QUANTIDADE'], item['VALOR_UNITARIO'])
         self.items_table.setItem(row, 6, NumericTableWidgetItem(f"{total:.2f}"))
 
+        # Em branco, a finalização usa E<nº da entrada> como lote
+        self.items_table.setItem(row, 7, QTableWidgetItem(item.get('LOTE') or ''))
+
         # Colunas não editáveis
         for col in [0, 1, 4]: # ID, Descrição, Un.
             if self.items_table.item(row, col):
                  self.items_table.item(row, col).setFlags(self.items_table.item(row, col).flags() & ~Qt.ItemIsEditable)
         
         self.items_table.blockSignals(False)
-        self.update_total_value()
+        if not is_loading:
+            self.update_total_value()
 
     def remove_item(self):
         rows = self.items_table.selectionModel().selectedRows()
@@ -297,49 +318,40 @@ class EntryEditWindow(QWidget):
             return
         for index in sorted([r.row() for r in rows], reverse=True):
             self.items_table.removeRow(index)
+            self.row_model.remove(index)
         self.update_total_value()
 
     def update_total_value(self):
-        total = 0.0
-        for row in range(self.items_table.rowCount()):
-            total_item = self.items_table.item(row, 6)
-            if total_item and total_item.text():
-                try:
-                    total += float(total_item.text().replace(',', '.'))
-                except ValueError:
-                    pass  # Ignora valores que não podem ser convertidos para float
-        self.total_label.setText(f"Valor Total da Nota: R$ {total:.2f}")
+        # O total é mantido incrementalmente pelo modelo de linhas
+        self.total_label.setText(f"Valor Total da Nota: R$ {self.row_model.total:.2f}")
 
     def on_cell_changed(self, row, column):
         # Quantidade(3), Valor Unit.(5), Valor Total(6)
         if column not in [3, 5, 6]:
             return
 
-        self.items_table.blockSignals(True)
+        # Apenas a célula editada é convertida; os demais valores vêm do modelo
+        text = self.items_table.item(row, column).text()
         try:
-            qty_item = self.items_table.item(row, 3)
-            unit_price_item = self.items_table.item(row, 5)
-            total_price_item = self.items_table.item(row, 6)
-
-            qty = float(qty_item.text().replace(',', '.')) if qty_item and qty_item.text() else 0.0
-            unit_price = float(unit_price_item.text().replace(',', '.')) if unit_price_item and unit_price_item.text() else 0.0
-            
-            if column == 3 or column == 5: # Quantidade ou Valor Unitário
-                new_total = qty * unit_price
-                total_price_item.setText(f"{new_total:.2f}")
+            value = parse_decimal(text or 0)
+        except ValueError:
+            value = None
+        if value is not None:
+            if column == 3: # Quantidade
+                self.row_model.set_quantity(row, value)
+            elif column == 5: # Valor Unitário
+                self.row_model.set_unit_value(row, value)
             elif column == 6: # Valor Total
-                total_price = float(total_price_item.text().replace(',', '.')) if total_price_item and total_price_item.text() else 0.0
-                if qty > 0:
-                    new_unit_price = total_price / qty
-                    unit_price_item.setText(f"{new_unit_price:.2f}")
-                else:
-                    unit_price_item.setText("0.00")
-        except (ValueError, TypeError, ZeroDivisionError) as e:
-            print(f"Error in on_cell_changed: {e}")
-        finally:
-            self.items_table.blockSignals(False)
-        
+                self.row_model.set_line_total(row, value)
+
+        # A grade volta a mostrar o que o modelo guardou (valor normalizado ou o anterior)
+        self.items_table.blockSignals(True)
+        for col, cell_text in zip((3, 5, 6), self.row_model.display_texts(row)):
+            self.items_table.item(row, col).setText(cell_text)
+        self.items_table.blockSignals(False)
         self.update_total_value()
+        if value is None:
+            show_error_message(self, "Valor Inválido", f"'{text}' não é um número válido. O valor anterior foi mantido.")
 
     def set_read_only(self, read_only):
         self.date_input.setReadOnly(read_only)
@@ -416,12 +428,12 @@ class EntryEditWindow(QWidget):
                 show_error_message(self, "Erro de Validação", f"O item '{self.items_table.item(row, 1).text()}' não possui um fornecedor definido.")
                 return
 
-            quantity = float(self.items_table.item(row, 3).text().replace(',', '.'))
+            quantity = self.row_model.quantity(row)
             if quantity <= 0:
                 show_error_message(self, "Erro de Validação", f"A quantidade do item '{self.items_table.item(row, 1).text()}' deve ser maior que zero.")
                 return
 
-            unit_price = float(self.items_table.item(row, 5).text().replace(',', '.'))
+            unit_price = self.row_model.unit_value(row)
             if unit_price <= 0:
                 show_error_message(self, "Erro de Validação", f"O valor unitário do item '{self.items_table.item(row, 1).text()}' deve ser maior que zero.")
                 return
@@ -432,10 +444,14 @@ class EntryEditWindow(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            self.save_entry() 
-            response = self.stock_service.finalize_entry(self.current_entry_id)
+            # Se a gravação falhar (ex.: conflito de edição), a nota não é finalizada
+            if not self.save_entry():
+                return
+            response = self.stock_service.finalize_entry(self.current_entry_id, self.current_version)
             if response["success"]:
                 QMessageBox.information(self, "Sucesso", response["message"])
                 self.load_entry_data()
+            elif response.get("conflict"):
+                QMessageBox.warning(self, "Conflito de Edição", response["message"])
             else:
                 show_error_message(self, "Error", response["message"])
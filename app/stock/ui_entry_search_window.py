@@ -8,6 +8,7 @@ from PySide6.QtCore import Qt
 from app.stock.service import StockService
 from app.utils.ui_utils import show_error_message
 from app.stock.ui_entry_edit_window import EntryEditWindow
+from app.stock.ui_replenishment_window import ReplenishmentWindow
 from app.utils.date_utils import format_date_for_display
 
 class EntrySearchWindow(QWidget):
@@ -16,6 +17,7 @@ class EntrySearchWindow(QWidget):
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.stock_service = StockService()
         self.edit_window = None
+        self.replenishment_window = None
         self.setWindowTitle("Pesquisa de Entradas de Insumo")
         self.setGeometry(200, 200, 900, 700)
         self.setup_ui()
@@ -36,11 +38,17 @@ class EntrySearchWindow(QWidget):
         search_button.clicked.connect(self.load_entries)
         new_button = QPushButton("Nova Entrada")
         new_button.clicked.connect(self.open_new_entry_window)
+        export_button = QPushButton("Exportar")
+        export_button.clicked.connect(self.export_entries)
+        replenishment_button = QPushButton("Sugestão de Compra")
+        replenishment_button.clicked.connect(self.open_replenishment_window)
         
         search_layout.addWidget(self.search_field)
         search_layout.addWidget(self.search_term, 1)
         search_layout.addWidget(search_button)
         search_layout.addWidget(new_button)
+        search_layout.addWidget(export_button)
+        search_layout.addWidget(replenishment_button)
         search_group.setLayout(search_layout)
         main_layout.addWidget(search_group)
 
@@ -85,6 +93,23 @@ class EntrySearchWindow(QWidget):
         else:
             show_error_message(self, "Error", response["message"])
 
+    def export_entries(self):
+        from app.export.ui_export import export_with_dialog
+        export_with_dialog(self, "entries", "entradas", {
+            "search_term": self.search_term.text(),
+            "search_field": self.search_field.currentText()
+        })
+
+    def open_replenishment_window(self):
+        if self.replenishment_window is None:
+            self.replenishment_window = ReplenishmentWindow()
+            self.replenishment_window.entries_created.connect(self.load_entries)
+            self.replenishment_window.destroyed.connect(lambda: setattr(self, 'replenishment_window', None))
+            self.replenishment_window.show()
+        else:
+            self.replenishment_window.activateWindow()
+            self.replenishment_window.raise_()
+
     def open_new_entry_window(self):
         self.show_edit_window(entry_id=None)
 
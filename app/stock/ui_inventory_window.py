@@ -0,0 +1,301 @@
+# app/stock/ui_inventory_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout, QComboBox, QDateEdit, QLineEdit, QPushButton,
+    QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QDate
+from app.item.ui_search_window import ItemSearchWindow
+from app.stock.inventory_service import InventoryService
+from app.utils.date_utils import BRAZILIAN_DATE_FORMAT, format_date_for_display, format_qdate_for_db
+from app.utils.row_model import parse_decimal
+from app.utils.ui_utils import NumericTableWidgetItem, show_confirmation_message, show_error_message, show_success_message
+
+COUNTED_COLUMN = 4
+SYSTEM_COLUMN = 5
+DIFFERENCE_COLUMN = 6
+COST_COLUMN = 7
+VALUE_COLUMN = 8
+
+class InventoryWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.inventory_service = InventoryService()
+        self.inventory_id = None
+        self.version = None
+        self.search_item_window = None
+        self.setWindowTitle("Inventário Físico")
+        self.setGeometry(250, 250, 1000, 650)
+        self.setup_ui()
+        self.load_inventories()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        select_layout = QHBoxLayout()
+        self.inventory_combo = QComboBox()
+        self.inventory_combo.currentIndexChanged.connect(self.on_inventory_changed)
+        self.new_date_input = QDateEdit(calendarPopup=True)
+        self.new_date_input.setDisplayFormat(BRAZILIAN_DATE_FORMAT)
+        self.new_date_input.setDate(QDate.currentDate())
+        new_button = QPushButton("Novo Inventário")
+        new_button.clicked.connect(self.create_inventory)
+        select_layout.addWidget(QLabel("Inventário:"))
+        select_layout.addWidget(self.inventory_combo, 1)
+        select_layout.addWidget(QLabel("Data:"))
+        select_layout.addWidget(self.new_date_input)
+        select_layout.addWidget(new_button)
+        self.main_layout.addLayout(select_layout)
+
+        header_group = QGroupBox("Contagem")
+        form_layout = QFormLayout()
+        self.status_label = QLabel()
+        self.observacao_input = QLineEdit()
+        form_layout.addRow("Status:", self.status_label)
+        form_layout.addRow("Observação:", self.observacao_input)
+        header_group.setLayout(form_layout)
+        self.main_layout.addWidget(header_group)
+
+        action_layout = QHBoxLayout()
+        self.add_button = QPushButton("Adicionar Item")
+        self.add_button.clicked.connect(self.open_item_search)
+        self.remove_button = QPushButton("Remover Item")
+        self.remove_button.clicked.connect(self.remove_item)
+        self.import_button = QPushButton("Importar CSV")
+        self.import_button.clicked.connect(self.import_counts)
+        self.save_button = QPushButton("Salvar")
+        self.save_button.clicked.connect(self.save_counts)
+        self.finalize_button = QPushButton("Finalizar")
+        self.finalize_button.clicked.connect(self.finalize_inventory)
+        self.delete_button = QPushButton("Excluir")
+        self.delete_button.clicked.connect(self.delete_inventory)
+        for button in (self.add_button, self.remove_button, self.import_button,
+                       self.save_button, self.finalize_button, self.delete_button):
+            action_layout.addWidget(button)
+        action_layout.addStretch()
+        self.main_layout.addLayout(action_layout)
+
+        self.items_table = QTableWidget()
+        self.items_table.setColumnCount(9)
+        self.items_table.setHorizontalHeaderLabels(
+            ["ID", "Código", "Item", "Un.", "Contado", "Sistema", "Diferença", "Custo Médio", "Valor Diferença"]
+        )
+        self.items_table.verticalHeader().setVisible(False)
+        self.items_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.items_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        self.items_table.itemChanged.connect(self.on_item_changed)
+        self.main_layout.addWidget(self.items_table)
+
+        self.summary_label = QLabel()
+        self.main_layout.addWidget(self.summary_label)
+
+    def load_inventories(self, select_id=None):
+        response = self.inventory_service.list_inventories()
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        self.inventory_combo.blockSignals(True)
+        self.inventory_combo.clear()
+        for inventory in response["data"]:
+            label = (f"#{inventory['ID']} - {format_date_for_display(inventory['DATA_INVENTARIO'])} - "
+                     f"{inventory['STATUS']} ({inventory['ITENS']} itens)")
+            if inventory['OBSERVACAO']:
+                label += f" - {inventory['OBSERVACAO']}"
+            self.inventory_combo.addItem(label, inventory['ID'])
+        index = self.inventory_combo.findData(select_id) if select_id is not None else 0
+        self.inventory_combo.setCurrentIndex(max(index, 0) if self.inventory_combo.count() else -1)
+        self.inventory_combo.blockSignals(False)
+        self.on_inventory_changed()
+
+    def on_inventory_changed(self):
+        self.inventory_id = self.inventory_combo.currentData()
+        self.load_inventory()
+
+    def load_inventory(self):
+        self.items_table.blockSignals(True)
+        self.items_table.setRowCount(0)
+        self.items_table.blockSignals(False)
+        if self.inventory_id is None:
+            self.version = None
+            self.status_label.clear()
+            self.observacao_input.clear()
+            self.summary_label.clear()
+            self.set_editable(False)
+            return
+
+        response = self.inventory_service.get_inventory(self.inventory_id)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        master = response["data"]["master"]
+        self.version = master['VERSAO']
+        status = master['STATUS']
+        if master['DATA_FINALIZACAO']:
+            status += f" em {master['DATA_FINALIZACAO']}"
+        self.status_label.setText(status)
+        self.observacao_input.setText(master['OBSERVACAO'] or "")
+        self.set_editable(master['STATUS'] == 'Em Aberto')
+
+        self.items_table.setUpdatesEnabled(False)
+        self.items_table.blockSignals(True)
+        self.items_table.setRowCount(len(response["data"]["items"]))
+        for row, item in enumerate(response["data"]["items"]):
+            self.fill_row(row, item['ID_ITEM'], item['CODIGO_INTERNO'], item['DESCRICAO'], item['UNIDADE'],
+                          item['QUANTIDADE_CONTADA'], item['SALDO_SISTEMA'], item['CUSTO_UNITARIO'])
+        self.items_table.blockSignals(False)
+        self.items_table.setUpdatesEnabled(True)
+        self.update_summary()
+
+    def set_editable(self, editable):
+        for widget in (self.observacao_input, self.add_button, self.remove_button, self.import_button,
+                       self.save_button, self.finalize_button, self.delete_button):
+            widget.setEnabled(editable)
+        self.items_table.setEditTriggers(QAbstractItemView.AllEditTriggers if editable else QAbstractItemView.NoEditTriggers)
+
+    def fill_row(self, row, item_id, code, description, unit, counted, system, cost):
+        cells = [QTableWidgetItem(str(item_id)), QTableWidgetItem(code or ""),
+                 QTableWidgetItem(description), QTableWidgetItem(unit)]
+        for value in (counted, system, counted - system, cost, (counted - system) * cost):
+            cell = NumericTableWidgetItem(f"{value:.3f}")
+            cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            cells.append(cell)
+        cells[SYSTEM_COLUMN].setData(Qt.UserRole, system)
+        cells[COST_COLUMN].setData(Qt.UserRole, cost)
+        for column, cell in enumerate(cells):
+            if column != COUNTED_COLUMN:
+                cell.setFlags(cell.flags() & ~Qt.ItemIsEditable)
+            self.items_table.setItem(row, column, cell)
+
+    def on_item_changed(self, cell):
+        if cell.column() != COUNTED_COLUMN:
+            return
+        row = cell.row()
+        try:
+            counted = parse_decimal(cell.text())
+        except ValueError:
+            counted = 0.0
+        difference = counted - self.items_table.item(row, SYSTEM_COLUMN).data(Qt.UserRole)
+        self.items_table.blockSignals(True)
+        self.items_table.item(row, DIFFERENCE_COLUMN).setText(f"{difference:.3f}")
+        self.items_table.item(row, VALUE_COLUMN).setText(
+            f"{difference * self.items_table.item(row, COST_COLUMN).data(Qt.UserRole):.3f}"
+        )
+        self.items_table.blockSignals(False)
+        self.update_summary()
+
+    def update_summary(self):
+        divergent, surplus, shortage = 0, 0.0, 0.0
+        for row in range(self.items_table.rowCount()):
+            value = float(self.items_table.item(row, VALUE_COLUMN).text())
+            if abs(float(self.items_table.item(row, DIFFERENCE_COLUMN).text())) > 0:
+                divergent += 1
+            if value > 0:
+                surplus += value
+            else:
+                shortage += value
+        self.summary_label.setText(
+            f"{self.items_table.rowCount()} itens contados, {divergent} com diferença. "
+            f"Sobra: {surplus:.2f}  Falta: {shortage:.2f}"
+        )
+
+    def create_inventory(self):
+        response = self.inventory_service.create_inventory(format_qdate_for_db(self.new_date_input.date()))
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        self.load_inventories(response["data"])
+
+    def open_item_search(self):
+        if self.search_item_window is None:
+            self.search_item_window = ItemSearchWindow(selection_mode=True)
+            self.search_item_window.item_selected.connect(self.add_item_from_search)
+            self.search_item_window.destroyed.connect(lambda: setattr(self, 'search_item_window', None))
+            self.search_item_window.show()
+        else:
+            self.search_item_window.activateWindow()
+            self.search_item_window.raise_()
+
+    def add_item_from_search(self, item_data):
+        for row in range(self.items_table.rowCount()):
+            if int(self.items_table.item(row, 0).text()) == item_data['ID']:
+                QMessageBox.warning(self, "Atenção", "Este item já está no inventário.")
+                return
+        row = self.items_table.rowCount()
+        self.items_table.blockSignals(True)
+        self.items_table.insertRow(row)
+        self.fill_row(row, item_data['ID'], item_data.get('CODIGO_INTERNO'), item_data['DESCRICAO'],
+                      item_data.get('SIGLA') or "", 0.0, item_data['SALDO_ESTOQUE'], item_data['CUSTO_MEDIO'])
+        self.items_table.blockSignals(False)
+        self.items_table.setCurrentCell(row, COUNTED_COLUMN)
+        self.update_summary()
+
+    def remove_item(self):
+        rows = sorted({index.row() for index in self.items_table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.items_table.removeRow(row)
+        self.update_summary()
+
+    def collect_counts(self):
+        counts = []
+        for row in range(self.items_table.rowCount()):
+            try:
+                quantity = parse_decimal(self.items_table.item(row, COUNTED_COLUMN).text())
+            except ValueError:
+                show_error_message(self, "Atenção", f"Quantidade inválida para {self.items_table.item(row, 2).text()}.")
+                return None
+            counts.append((int(self.items_table.item(row, 0).text()), quantity))
+        return counts
+
+    def save_counts(self, show_message=True):
+        counts = self.collect_counts()
+        if counts is None:
+            return False
+        response = self.inventory_service.save_counts(self.inventory_id, self.observacao_input.text(),
+                                                      counts, self.version)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return False
+        self.version = response["version"]
+        if show_message:
+            show_success_message(self, "Sucesso", response["message"])
+        return True
+
+    def import_counts(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Importar Contagens", "", "CSV (*.csv *.txt)")
+        if not file_path:
+            return
+        # A importação grava direto no banco; o que foi digitado é salvo antes
+        if not self.save_counts(show_message=False):
+            return
+        response = self.inventory_service.import_file(self.inventory_id, file_path)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        show_success_message(self, "Sucesso", response["message"])
+        self.load_inventories(self.inventory_id)
+
+    def finalize_inventory(self):
+        reply = show_confirmation_message(self, "Finalizar Inventário",
+                                          "Ajustar o estoque de todos os itens contados para a quantidade contada?")
+        if reply != QMessageBox.Yes:
+            return
+        if not self.save_counts(show_message=False):
+            return
+        response = self.inventory_service.finalize_inventory(self.inventory_id, self.version)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        show_success_message(self, "Sucesso", response["message"])
+        self.load_inventories(self.inventory_id)
+
+    def delete_inventory(self):
+        reply = show_confirmation_message(self, "Excluir Inventário", f"Excluir o inventário #{self.inventory_id}?")
+        if reply != QMessageBox.Yes:
+            return
+        response = self.inventory_service.delete_inventory(self.inventory_id)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        self.load_inventories()
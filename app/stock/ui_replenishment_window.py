@@ -0,0 +1,112 @@
+# app/stock/ui_replenishment_window.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QFormLayout, QSpinBox, QDoubleSpinBox, QCheckBox,
+    QPushButton, QLabel, QTableView, QHeaderView, QAbstractItemView, QMessageBox
+)
+from PySide6.QtGui import QStandardItemModel, QStandardItem
+from PySide6.QtCore import Qt, Signal
+from app.stock.replenishment_service import ReplenishmentService
+from app.utils.ui_utils import show_confirmation_message, show_error_message, show_success_message
+
+class ReplenishmentWindow(QWidget):
+    entries_created = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.replenishment_service = ReplenishmentService()
+        self.suggestions = []
+        self.setWindowTitle("Sugestão de Compra de Insumos")
+        self.setGeometry(250, 250, 1000, 600)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+
+        parameters_group = QGroupBox("Parâmetros")
+        form_layout = QFormLayout()
+        self.days_input = QSpinBox()
+        self.days_input.setRange(7, 3650)
+        self.days_input.setValue(180)
+        self.all_history_checkbox = QCheckBox("Todo o histórico")
+        self.all_history_checkbox.toggled.connect(self.days_input.setDisabled)
+        days_layout = QHBoxLayout()
+        days_layout.addWidget(self.days_input)
+        days_layout.addWidget(self.all_history_checkbox)
+        self.lead_time_input = QSpinBox()
+        self.lead_time_input.setRange(0, 365)
+        self.lead_time_input.setValue(7)
+        self.review_input = QSpinBox()
+        self.review_input.setRange(0, 365)
+        self.review_input.setValue(30)
+        self.service_input = QDoubleSpinBox()
+        self.service_input.setRange(0, 4)
+        self.service_input.setSingleStep(0.05)
+        self.service_input.setValue(1.65)
+        form_layout.addRow("Consumo dos últimos (dias):", days_layout)
+        form_layout.addRow("Prazo de entrega (dias):", self.lead_time_input)
+        form_layout.addRow("Intervalo entre compras (dias):", self.review_input)
+        form_layout.addRow("Fator de serviço (z):", self.service_input)
+        parameters_group.setLayout(form_layout)
+        self.main_layout.addWidget(parameters_group)
+
+        action_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        calculate_button = QPushButton("Calcular")
+        calculate_button.clicked.connect(self.load_suggestions)
+        self.create_button = QPushButton("Gerar Entradas")
+        self.create_button.setEnabled(False)
+        self.create_button.clicked.connect(self.create_entries)
+        action_layout.addWidget(self.summary_label, 1)
+        action_layout.addWidget(calculate_button)
+        action_layout.addWidget(self.create_button)
+        self.main_layout.addLayout(action_layout)
+
+        self.table_view = QTableView()
+        self.table_model = QStandardItemModel()
+        self.table_model.setHorizontalHeaderLabels(
+            ["Fornecedor", "Insumo", "Un.", "Consumo/Dia", "Posição", "Ponto de Pedido", "Estoque Máximo", "Sugestão"]
+        )
+        self.table_view.setModel(self.table_model)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_view.verticalHeader().setVisible(False)
+        self.main_layout.addWidget(self.table_view)
+
+    def load_suggestions(self):
+        days = None if self.all_history_checkbox.isChecked() else self.days_input.value()
+        response = self.replenishment_service.suggest(days, self.lead_time_input.value(),
+                                                      self.review_input.value(), self.service_input.value())
+        self.table_model.removeRows(0, self.table_model.rowCount())
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        self.suggestions = response["data"]
+        for item in self.suggestions:
+            row = [QStandardItem(item['FORNECEDOR'] or "(sem fornecedor padrão)"),
+                   QStandardItem(item['DESCRICAO']),
+                   QStandardItem(item['UNIDADE'])]
+            for value in (item['CONSUMO_MEDIO'], item['POSICAO'], item['PONTO_PEDIDO'],
+                          item['ESTOQUE_MAXIMO'], item['SUGESTAO']):
+                cell = QStandardItem(f"{value:.3f}")
+                cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                row.append(cell)
+            self.table_model.appendRow(row)
+        self.summary_label.setText(response["message"])
+        self.create_button.setEnabled(bool(self.suggestions))
+
+    def create_entries(self):
+        reply = show_confirmation_message(self, "Gerar Entradas",
+                                          "Criar uma entrada em aberto por fornecedor com as quantidades sugeridas?")
+        if reply != QMessageBox.Yes:
+            return
+        response = self.replenishment_service.create_draft_entries(self.suggestions)
+        if not response["success"]:
+            show_error_message(self, "Erro", response["message"])
+            return
+        show_success_message(self, "Sucesso", response["message"])
+        self.entries_created.emit()
+        self.load_suggestions()
@@ -0,0 +1,47 @@
+# app/supplier/cep_repository.py
+from app.database.db import get_db_manager
+
+IMPORT_BATCH_SIZE = 10000
+
+class CepRepository:
+    def __init__(self):
+        self.db_manager = get_db_manager()
+
+    def get(self, cep):
+        conn = self.db_manager.get_connection()
+        return conn.execute("SELECT CEP, LOGRADOURO, BAIRRO, CIDADE, UF FROM CEP WHERE CEP = ?", (cep,)).fetchone()
+
+    def save(self, cep, logradouro, bairro, cidade, uf):
+        conn = self.db_manager.get_connection()
+        with conn:
+            conn.execute(self._upsert_sql(), (cep, logradouro, bairro, cidade, uf))
+
+    def import_rows(self, rows):
+        """Grava (cep, logradouro, bairro, cidade, uf) em lotes numa única transação e devolve a quantidade."""
+        conn = self.db_manager.get_connection()
+        total = 0
+        batch = []
+        with conn:
+            cursor = conn.cursor()
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    cursor.executemany(self._upsert_sql(), batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(self._upsert_sql(), batch)
+                total += len(batch)
+        return total
+
+    def count(self):
+        conn = self.db_manager.get_connection()
+        return conn.execute("SELECT COUNT(*) FROM CEP").fetchone()[0]
+
+    def _upsert_sql(self):
+        return """
+            INSERT INTO CEP (CEP, LOGRADOURO, BAIRRO, CIDADE, UF) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (CEP) DO UPDATE SET
+                LOGRADOURO = excluded.LOGRADOURO, BAIRRO = excluded.BAIRRO,
+                CIDADE = excluded.CIDADE, UF = excluded.UF
+        """
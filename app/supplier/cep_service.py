@@ -0,0 +1,215 @@
+# app/supplier/cep_service.py
+"""
+Resolução de CEP para o cadastro de fornecedores.
+
+A consulta segue, em ordem: o cache LRU das últimas consultas, a tabela CEP do banco
+(importada de uma base de CEPs ou preenchida pelas consultas anteriores) e, só se o
+CEP não estiver em nenhum dos dois, o serviço remoto. O serviço remoto roda numa
+thread, com tempo limite, e pode ser trocado ou desligado:
+
+    MINISIS_CEP_REMOTE_URL   base do serviço no formato do ViaCEP (padrão https://viacep.com.br/ws;
+                             vazio ou 0 desliga a consulta remota)
+    MINISIS_CEP_TIMEOUT      tempo limite da consulta remota em segundos (padrão 3)
+
+Importação de uma base de CEPs (CSV com cabeçalho cep, logradouro, bairro, cidade, uf;
+separador , ou ;) a partir da raiz do projeto:
+    python -m app.supplier.cep_service --importar ceps.csv
+"""
+import argparse
+import csv
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from app.diagnostics.metrics import timed_service
+from app.supplier.cep_repository import CepRepository
+
+DEFAULT_REMOTE_URL = "https://viacep.com.br/ws"
+DEFAULT_TIMEOUT = 3.0
+CACHE_SIZE = 2048
+
+# Nomes aceitos no cabeçalho do CSV para cada campo
+IMPORT_COLUMNS = {
+    "cep": ("cep",),
+    "logradouro": ("logradouro", "endereco", "endereço", "rua"),
+    "bairro": ("bairro",),
+    "cidade": ("cidade", "localidade", "municipio", "município"),
+    "uf": ("uf", "estado"),
+}
+
+def normalize_cep(cep):
+    """Só os 8 dígitos do CEP, ou None se não for um CEP válido."""
+    digits = "".join(filter(str.isdigit, cep or ""))
+    return digits if len(digits) == 8 else None
+
+class LruCache:
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class ViaCepBackend:
+    """Consulta remota no formato do ViaCEP: GET <base>/<cep>/json/."""
+
+    def __init__(self, base_url=DEFAULT_REMOTE_URL, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def fetch(self, cep):
+        """Devolve o endereço ou None se o CEP não existir; falhas de rede levantam requests.RequestException."""
+        response = requests.get(f"{self.base_url}/{cep}/json/", timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("erro"):
+            return None
+        return {
+            "cep": cep,
+            "logradouro": data.get("logradouro", ""),
+            "bairro": data.get("bairro", ""),
+            "cidade": data.get("localidade", ""),
+            "uf": data.get("uf", ""),
+        }
+
+def remote_backend_from_environment():
+    url = os.environ.get("MINISIS_CEP_REMOTE_URL", DEFAULT_REMOTE_URL)
+    if url in ("", "0"):
+        return None
+    return ViaCepBackend(url, float(os.environ.get("MINISIS_CEP_TIMEOUT", DEFAULT_TIMEOUT)))
+
+# Compartilhados entre as janelas: o cache vale para a sessão inteira
+_cache = LruCache()
+_remote_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cep-remoto")
+_FROM_ENVIRONMENT = object()
+
+def _address_from_row(row):
+    return {"cep": row['CEP'], "logradouro": row['LOGRADOURO'] or "", "bairro": row['BAIRRO'] or "",
+            "cidade": row['CIDADE'] or "", "uf": row['UF'] or ""}
+
+@timed_service
+class CepService:
+    def __init__(self, remote_backend=_FROM_ENVIRONMENT):
+        self.cep_repository = CepRepository()
+        if remote_backend is _FROM_ENVIRONMENT:
+            remote_backend = remote_backend_from_environment()
+        self.remote_backend = remote_backend
+
+    def lookup_local(self, cep):
+        """Consulta o cache e a tabela CEP. data é None se o CEP não estiver na base local."""
+        cep = normalize_cep(cep)
+        if not cep:
+            return {"success": False, "message": "CEP inválido."}
+        address = _cache.get(cep)
+        if address is not None:
+            return {"success": True, "data": address, "source": "cache"}
+        try:
+            row = self.cep_repository.get(cep)
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao consultar a base de CEPs: {e}"}
+        if row is None:
+            return {"success": True, "data": None, "source": "local"}
+        address = _address_from_row(row)
+        _cache.put(cep, address)
+        return {"success": True, "data": address, "source": "local"}
+
+    def fetch_remote_async(self, cep):
+        """
+        Dispara a consulta remota numa thread e devolve o Future (resultado: endereço ou None),
+        ou None se não houver serviço remoto. A thread não usa o banco: grave o resultado
+        com remember() na thread da conexão.
+        """
+        cep = normalize_cep(cep)
+        if not cep or self.remote_backend is None:
+            return None
+        return _remote_executor.submit(self.remote_backend.fetch, cep)
+
+    def remember(self, address):
+        """Guarda um endereço obtido remotamente no cache e na tabela CEP, para consultas offline."""
+        try:
+            self.cep_repository.save(address["cep"], address["logradouro"], address["bairro"],
+                                     address["cidade"], address["uf"])
+            _cache.put(address["cep"], address)
+            return {"success": True}
+        except Exception as e:
+            return {"success": False, "message": f"Erro ao gravar o CEP: {e}"}
+
+    def lookup(self, cep):
+        """Consulta completa e bloqueante (base local e, se preciso, serviço remoto)."""
+        response = self.lookup_local(cep)
+        if not response["success"] or response["data"] is not None:
+            return response
+        future = self.fetch_remote_async(cep)
+        if future is None:
+            return response
+        try:
+            address = future.result()
+        except requests.RequestException as e:
+            return {"success": False, "message": f"Não foi possível consultar o CEP: {e}"}
+        if address is not None:
+            self.remember(address)
+        return {"success": True, "data": address, "source": "remote"}
+
+    def import_file(self, file_path):
+        """Importa uma base de CEPs em CSV (UTF-8 ou Latin-1) para a tabela CEP."""
+        try:
+            try:
+                total = self.cep_repository.import_rows(self._read_csv(file_path, "utf-8-sig"))
+            except UnicodeDecodeError:
+                total = self.cep_repository.import_rows(self._read_csv(file_path, "latin-1"))
+        except (OSError, ValueError, csv.Error) as e:
+            return {"success": False, "message": f"Erro ao importar a base de CEPs: {e}"}
+        _cache.clear()
+        return {"success": True, "data": total, "message": f"{total} CEPs importados."}
+
+    def _read_csv(self, file_path, encoding):
+        with open(file_path, newline="", encoding=encoding) as file:
+            sample = file.read(4096)
+            file.seek(0)
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+            reader = csv.DictReader(file, dialect=dialect)
+            header = {name.strip().lower(): name for name in reader.fieldnames or []}
+            columns = {}
+            for field, aliases in IMPORT_COLUMNS.items():
+                columns[field] = next((header[alias] for alias in aliases if alias in header), None)
+            if columns["cep"] is None:
+                raise ValueError("O arquivo não tem a coluna 'cep'.")
+            for record in reader:
+                cep = normalize_cep(record.get(columns["cep"]))
+                if cep:
+                    yield (cep, *((record.get(columns[field]) or "").strip() if columns[field] else ""
+                                  for field in ("logradouro", "bairro", "cidade", "uf")))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Base local de CEPs do MiniSis.")
+    parser.add_argument("--importar", metavar="CSV", help="Importa uma base de CEPs em CSV.")
+    parser.add_argument("--consultar", metavar="CEP", help="Consulta um CEP.")
+    args = parser.parse_args(argv)
+
+    service = CepService()
+    if args.importar:
+        response = service.import_file(args.importar)
+        print(response["message"])
+    if args.consultar:
+        response = service.lookup(args.consultar)
+        print(response["data"] if response["success"] else response["message"])
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 # app/supplier/service.py
 from app.supplier.supplier_repository import SupplierRepository
 from app.validators import validate_cpf_cnpj
+from app.diagnostics.metrics import timed_service
 
+@timed_service
 class SupplierService:
     def __init__(self):
         self.supplier_repository = SupplierRepository()
@@ -3,6 +3,15 @@ import sqlite3
 from app.database.db import get_db_manager
 
 class SupplierRepository:
+    # Campos de pesquisa: rótulos da tela e nomes das colunas (API) -> coluna
+    SEARCH_FIELDS = {
+        "Razão Social": "RAZAO_SOCIAL",
+        "Nome Fantasia": "NOME_FANTASIA",
+        "CNPJ": "CNPJ",
+        "RAZAO_SOCIAL": "RAZAO_SOCIAL",
+        "NOME_FANTASIA": "NOME_FANTASIA",
+    }
+
     def __init__(self):
         self.db_manager = get_db_manager()
 
@@ -26,7 +35,7 @@ class SupplierRepository:
 
     def get_all(self):
         conn = self.db_manager.get_connection()
-        return conn.execute("SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR ORDER BY NOME_FANTASIA").fetchall()
+        return conn.execute(*self.search_query(None, None)).fetchall()
 
     def get_by_id(self, supplier_id):
         conn = self.db_manager.get_connection()
@@ -69,14 +78,14 @@ class SupplierRepository:
             
     def search(self, search_text, search_field):
         conn = self.db_manager.get_connection()
-        
-        field_map = {
-            "Razão Social": "RAZAO_SOCIAL",
-            "Nome Fantasia": "NOME_FANTASIA",
-            "CNPJ": "CNPJ"
-        }
-        
-        column = field_map.get(search_field, "NOME_FANTASIA")
+        return conn.execute(*self.search_query(search_text, search_field)).fetchall()
+
+    def search_query(self, search_text=None, search_field=None):
+        """Monta a consulta de fornecedores; sem campo de busca, lista todos."""
+        if search_field is None:
+            return "SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR ORDER BY NOME_FANTASIA", ()
+
+        column = self.SEARCH_FIELDS.get(search_field, "NOME_FANTASIA")
         
         if column == 'CNPJ':
             query = f"SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR WHERE {column} = ?"
@@ -85,4 +94,4 @@ class SupplierRepository:
             query = f"SELECT ID, RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, TELEFONE, EMAIL, CIDADE, UF, STATUS FROM FORNECEDOR WHERE {column} LIKE ?"
             params = (f'%{search_text}%',)
             
-        return conn.execute(query, params).fetchall()
+        return query, params
@@ -1,19 +1,25 @@
 # app/supplier/ui_edit_window.py
-import requests
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QLineEdit,
-    QPushButton, QTabWidget, QFormLayout, QMessageBox, QComboBox
+    QPushButton, QTabWidget, QFormLayout, QMessageBox, QComboBox, QLabel
 )
 from PySide6.QtGui import QRegularExpressionValidator
-from PySide6.QtCore import QRegularExpression, Qt
+from PySide6.QtCore import QRegularExpression, Qt, Signal
+from app.supplier.cep_service import CepService, normalize_cep
 from app.supplier.service import SupplierService
 from app.utils.ui_utils import show_error_message
 
 class SupplierEditWindow(QWidget):
+    # (cep, endereço ou None, mensagem de erro) vindo da thread da consulta remota
+    cep_fetched = Signal(str, object, str)
+
     def __init__(self, supplier_id=None):
         super().__init__()
         self.setAttribute(Qt.WA_DeleteOnClose)
         self.supplier_service = SupplierService()
+        self.cep_service = CepService()
+        self.pending_cep = None
+        self.cep_fetched.connect(self.on_cep_fetched)
         self.current_supplier_id = supplier_id
         
         title = f"Editando Fornecedor #{supplier_id}" if supplier_id else "Novo Fornecedor"
@@ -78,6 +84,10 @@ class SupplierEditWindow(QWidget):
         self.cep_input = QLineEdit()
         self.cep_input.setInputMask("00000-000")
         self.cep_input.editingFinished.connect(self.fetch_address_from_cep)
+        self.cep_status_label = QLabel()
+        cep_layout = QHBoxLayout()
+        cep_layout.addWidget(self.cep_input)
+        cep_layout.addWidget(self.cep_status_label)
         
         self.logradouro_input = QLineEdit()
         self.numero_input = QLineEdit()
@@ -88,7 +98,7 @@ class SupplierEditWindow(QWidget):
         self.uf_input = QLineEdit()
         self.uf_input.setInputMask("AA")
         
-        layout.addRow("CEP:", self.cep_input)
+        layout.addRow("CEP:", cep_layout)
         layout.addRow("Logradouro:", self.logradouro_input)
         layout.addRow("Número:", self.numero_input)
         layout.addRow("Complemento:", self.complemento_input)
@@ -152,20 +162,61 @@ class SupplierEditWindow(QWidget):
         self.phone_input.blockSignals(False)
 
     def fetch_address_from_cep(self):
-        cep = self.cep_input.text().replace("-", "").strip()
-        if len(cep) == 8:
-            try:
-                response = requests.get(f"https://viacep.com.br/ws/{cep}/json/")
-                if response.status_code == 200:
-                    data = response.json()
-                    if not data.get("erro"):
-                        self.logradouro_input.setText(data.get("logradouro", ""))
-                        self.bairro_input.setText(data.get("bairro", ""))
-                        self.cidade_input.setText(data.get("localidade", ""))
-                        self.uf_input.setText(data.get("uf", ""))
-                        self.numero_input.setFocus()
-            except requests.RequestException:
-                show_error_message(self, "Error", "Não foi possível buscar o CEP. Verifique sua conexão com a internet.")
+        cep = normalize_cep(self.cep_input.text())
+        if not cep or cep == self.pending_cep:
+            return
+        self.cep_status_label.clear()
+        response = self.cep_service.lookup_local(cep)
+        if not response["success"]:
+            self.cep_status_label.setText(response["message"])
+            return
+        if response["data"]:
+            self.fill_address(response["data"])
+            return
+
+        # Fora da base local: consulta remota em segundo plano, sem travar a janela
+        future = self.cep_service.fetch_remote_async(cep)
+        if future is None:
+            self.cep_status_label.setText("CEP não encontrado na base local.")
+            return
+        self.pending_cep = cep
+        self.cep_status_label.setText("Buscando CEP...")
+        future.add_done_callback(lambda done, cep=cep: self.emit_cep_fetched(cep, done))
+
+    def emit_cep_fetched(self, cep, future):
+        try:
+            address, error = future.result(), ""
+        except Exception as e:
+            address, error = None, str(e)
+        try:
+            self.cep_fetched.emit(cep, address, error)
+        except RuntimeError:
+            # A janela foi fechada antes da resposta
+            pass
+
+    def on_cep_fetched(self, cep, address, error):
+        if cep != self.pending_cep:
+            return
+        self.pending_cep = None
+        # Resposta atrasada de um CEP que o usuário já trocou
+        if cep != normalize_cep(self.cep_input.text()):
+            self.cep_status_label.clear()
+            return
+        if error:
+            self.cep_status_label.setText("Não foi possível consultar o CEP.")
+        elif address is None:
+            self.cep_status_label.setText("CEP não encontrado.")
+        else:
+            self.cep_service.remember(address)
+            self.cep_status_label.clear()
+            self.fill_address(address)
+
+    def fill_address(self, address):
+        self.logradouro_input.setText(address["logradouro"])
+        self.bairro_input.setText(address["bairro"])
+        self.cidade_input.setText(address["cidade"])
+        self.uf_input.setText(address["uf"])
+        self.numero_input.setFocus()
 
     def load_supplier_data(self):
         response = self.supplier_service.get_supplier_by_id(self.current_supplier_id)
@@ -236,4 +287,5 @@ class SupplierEditWindow(QWidget):
         self.setWindowTitle("Novo Fornecedor")
         for widget in self.findChildren(QLineEdit):
             widget.clear()
+        self.cep_status_label.clear()
         self.tab_widget.setCurrentIndex(0)
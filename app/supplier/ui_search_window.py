@@ -52,6 +52,9 @@ class SupplierSearchWindow(QWidget):
             new_button = QPushButton("Novo")
             new_button.clicked.connect(self.open_new_supplier_window)
             search_layout.addWidget(new_button)
+            export_button = QPushButton("Exportar")
+            export_button.clicked.connect(self.export_suppliers)
+            search_layout.addWidget(export_button)
             
         search_group.setLayout(search_layout)
         main_layout.addWidget(search_group)
@@ -118,6 +121,12 @@ class SupplierSearchWindow(QWidget):
         else:
             self.open_edit_supplier_window(item_data['ID'])
 
+    def export_suppliers(self):
+        from app.export.ui_export import export_with_dialog
+        search_text = self.search_input.text()
+        filters = {"search_text": search_text, "search_field": self.search_field_combo.currentText()} if search_text else None
+        export_with_dialog(self, "suppliers", "fornecedores", filters)
+
     def open_new_supplier_window(self):
         self.show_edit_window(supplier_id=None)
 
@@ -0,0 +1,93 @@
+# app/utils/row_model.py
+import math
+
+def parse_decimal(text):
+    """Converte um texto digitado na grade (aceita vírgula decimal) em float finito."""
+    if text is None:
+        raise ValueError("valor vazio")
+    value = float(str(text).strip().replace(',', '.'))
+    if not math.isfinite(value):
+        raise ValueError(f"valor inválido: {text}")
+    return value
+
+
+class NumericRowModel:
+    """
+    Guarda os valores numéricos de cada linha de uma grade de documento
+    (quantidade, valor unitário e valor total) e mantém o total geral
+    de forma incremental. A grade só formata texto para exibição.
+
+    As linhas seguem a mesma ordem das linhas da QTableWidget.
+    """
+    QUANTITY, UNIT_VALUE, LINE_TOTAL = 0, 1, 2
+
+    def __init__(self):
+        self.rows = []
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def clear(self):
+        self.rows = []
+        self.total = 0.0
+
+    def append(self, quantity, unit_value):
+        line_total = quantity * unit_value
+        self.rows.append([quantity, unit_value, line_total])
+        self.total += line_total
+        return line_total
+
+    def remove(self, row):
+        removed = self.rows.pop(row)
+        self.total = self.total - removed[self.LINE_TOTAL] if self.rows else 0.0
+        self._check_total()
+
+    def quantity(self, row):
+        return self.rows[row][self.QUANTITY]
+
+    def unit_value(self, row):
+        return self.rows[row][self.UNIT_VALUE]
+
+    def line_total(self, row):
+        return self.rows[row][self.LINE_TOTAL]
+
+    def display_texts(self, row):
+        """(quantidade, valor unitário, total) da linha formatados como a grade os exibe."""
+        quantity, unit_value, line_total = self.rows[row]
+        return str(quantity), f"{unit_value:.2f}", f"{line_total:.2f}"
+
+    def set_quantity(self, row, quantity):
+        """Altera a quantidade e recalcula o total da linha. Retorna o novo total da linha."""
+        values = self.rows[row]
+        values[self.QUANTITY] = quantity
+        return self._set_line_total(values, quantity * values[self.UNIT_VALUE])
+
+    def set_unit_value(self, row, unit_value):
+        """Altera o valor unitário e recalcula o total da linha. Retorna o novo total da linha."""
+        values = self.rows[row]
+        values[self.UNIT_VALUE] = unit_value
+        return self._set_line_total(values, values[self.QUANTITY] * unit_value)
+
+    def set_line_total(self, row, line_total):
+        """
+        Altera o total da linha e deriva o valor unitário. Retorna o novo valor unitário.
+        Sem quantidade não há como derivar o valor unitário: a linha fica com total zero.
+        """
+        values = self.rows[row]
+        quantity = values[self.QUANTITY]
+        values[self.UNIT_VALUE] = line_total / quantity if quantity > 0 else 0.0
+        self._set_line_total(values, values[self.QUANTITY] * values[self.UNIT_VALUE])
+        return values[self.UNIT_VALUE]
+
+    def _set_line_total(self, values, line_total):
+        self.total += line_total - values[self.LINE_TOTAL]
+        values[self.LINE_TOTAL] = line_total
+        self._check_total()
+        return line_total
+
+    def _check_total(self):
+        # Um total de linha que estourou (inf) deixaria o total geral em nan para sempre:
+        # nesse caso o total é somado de novo a partir das linhas
+        if not math.isfinite(self.total):
+            self.total = math.fsum(values[self.LINE_TOTAL] for values in self.rows)
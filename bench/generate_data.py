@@ -0,0 +1,223 @@
+# bench/generate_data.py
+"""
+Gera um DADOS.DB sintético e reprodutível para os benchmarks.
+
+Uso (a partir da raiz do projeto):
+    python -m bench.generate_data --db bench/data/DADOS.DB --items 2000 --ops 500
+
+A mesma semente e as mesmas quantidades geram sempre o mesmo banco. O esquema é
+criado pelo próprio DatabaseManager, então o banco gerado passa pelas migrações
+da versão atual do código.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+BASE_DATE = date(2024, 1, 1)
+
+DEFAULTS = {
+    "seed": 42,
+    "units": 10,
+    "suppliers": 200,
+    "materials": 2000,
+    "intermediates": 300,
+    "products": 500,
+    "levels": 2,
+    "components": 6,
+    "ops": 2000,
+    "entries": 1000,
+    "sales": 1000,
+    "movements": 100000,
+    "open_documents": 200,
+    "lines_per_document": 5,
+    "days": 365,
+}
+
+def _random_date(rng, days):
+    return (BASE_DATE + timedelta(days=rng.randrange(days))).isoformat()
+
+def _insert_units(cursor, count):
+    """Completa a tabela UNIDADE (que já vem com as unidades padrão) até a quantidade pedida."""
+    existing = cursor.execute("SELECT COUNT(*) FROM UNIDADE").fetchone()[0]
+    cursor.executemany(
+        "INSERT INTO UNIDADE (NOME, SIGLA) VALUES (?, ?)",
+        [(f"Unidade Sintética {n}", f"us{n}") for n in range(existing + 1, count + 1)]
+    )
+    return [row[0] for row in cursor.execute("SELECT ID FROM UNIDADE ORDER BY ID")]
+
+def _insert_suppliers(cursor, count):
+    cursor.executemany(
+        "INSERT INTO FORNECEDOR (RAZAO_SOCIAL, NOME_FANTASIA, CNPJ, STATUS, CIDADE, UF) VALUES (?, ?, ?, 'Ativo', 'Cidade', 'SP')",
+        [(f"Fornecedor Sintético {n} LTDA", f"Fornecedor {n}", f"{n:014d}") for n in range(1, count + 1)]
+    )
+    return [row[0] for row in cursor.execute("SELECT ID FROM FORNECEDOR ORDER BY ID")]
+
+def _insert_items(cursor, rng, prefix, item_type, count, unit_ids, supplier_ids, stock):
+    rows = []
+    for n in range(1, count + 1):
+        supplier_id = rng.choice(supplier_ids) if supplier_ids else None
+        rows.append((f"{prefix}{n:06d}", f"{item_type} Sintético {prefix}{n}", item_type,
+                     rng.choice(unit_ids), supplier_id, stock, round(rng.uniform(0.5, 50), 2)))
+    first_id = cursor.execute("SELECT COALESCE(MAX(ID), 0) + 1 FROM ITEM").fetchone()[0]
+    cursor.executemany("""
+        INSERT INTO ITEM (CODIGO_INTERNO, DESCRICAO, TIPO_ITEM, ID_UNIDADE, ID_FORNECEDOR_PADRAO, SALDO_ESTOQUE, CUSTO_MEDIO)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    return list(range(first_id, first_id + count))
+
+def _insert_compositions(cursor, rng, levels, components):
+    """
+    Monta a estrutura em vários níveis: cada item de um nível é composto por itens
+    dos níveis abaixo (insumos no nível 0, itens 'Ambos' nos intermediários).
+    """
+    rows = []
+    for level in range(1, len(levels)):
+        candidates = [item_id for lower in levels[:level] for item_id in lower]
+        for product_id in levels[level]:
+            for material_id in rng.sample(candidates, min(components, len(candidates))):
+                rows.append((product_id, material_id, round(rng.uniform(0.01, 2), 3)))
+    cursor.executemany("INSERT INTO COMPOSICAO (ID_PRODUTO, ID_INSUMO, QUANTIDADE) VALUES (?, ?, ?)", rows)
+    return len(rows)
+
+def _insert_ops(cursor, rng, count, open_count, product_ids, lines, days):
+    """OPs concluídas de histórico e as 'Em Andamento' usadas pelos benchmarks de finalização."""
+    for n in range(1, count + 1):
+        is_open = n > count - open_count
+        created = _random_date(rng, days)
+        op_id = cursor.execute("""
+            INSERT INTO ORDEMPRODUCAO (NUMERO, DATA_CRIACAO, DATA_PREVISTA, STATUS, QUANTIDADE_PRODUZIDA, CUSTO_TOTAL)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (f"OP-{n:06d}", f"{created} 08:00:00", created,
+              'Em Andamento' if is_open else 'Concluída',
+              None if is_open else rng.randint(1, 50), None if is_open else round(rng.uniform(10, 1000), 2))).lastrowid
+        cursor.executemany(
+            "INSERT INTO ORDEMPRODUCAO_ITENS (ID_ORDEM_PRODUCAO, ID_PRODUTO, QUANTIDADE_PRODUZIR) VALUES (?, ?, ?)",
+            [(op_id, product_id, rng.randint(1, 50)) for product_id in rng.sample(product_ids, min(lines, len(product_ids)))]
+        )
+
+def _insert_entries(cursor, rng, count, open_count, material_ids, supplier_ids, lines, days):
+    for n in range(1, count + 1):
+        is_open = n > count - open_count
+        entry_date = _random_date(rng, days)
+        items = [(material_id, rng.choice(supplier_ids), rng.randint(1, 500), round(rng.uniform(0.5, 50), 2))
+                 for material_id in rng.sample(material_ids, min(lines, len(material_ids)))]
+        entry_id = cursor.execute("""
+            INSERT INTO ENTRADANOTA (DATA_ENTRADA, DATA_DIGITACAO, NUMERO_NOTA, VALOR_TOTAL, STATUS)
+            VALUES (?, ?, ?, ?, ?)
+        """, (entry_date, entry_date, f"NF{n:06d}", sum(q * v for _, _, q, v in items),
+              'Em Aberto' if is_open else 'Finalizada')).lastrowid
+        cursor.executemany(
+            "INSERT INTO ENTRADANOTA_ITENS (ID_ENTRADA, ID_INSUMO, ID_FORNECEDOR, QUANTIDADE, VALOR_UNITARIO) VALUES (?, ?, ?, ?, ?)",
+            [(entry_id,) + item for item in items]
+        )
+
+def _insert_sales(cursor, rng, count, open_count, product_ids, lines, days):
+    for n in range(1, count + 1):
+        is_open = n > count - open_count
+        items = [(product_id, rng.randint(1, 20), round(rng.uniform(5, 200), 2))
+                 for product_id in rng.sample(product_ids, min(lines, len(product_ids)))]
+        sale_id = cursor.execute(
+            "INSERT INTO SAIDA (DATA_SAIDA, VALOR_TOTAL, STATUS) VALUES (?, ?, ?)",
+            (_random_date(rng, days), sum(q * v for _, q, v in items), 'Em Aberto' if is_open else 'Finalizada')
+        ).lastrowid
+        cursor.executemany(
+            "INSERT INTO SAIDA_ITENS (ID_SAIDA, ID_PRODUTO, QUANTIDADE, VALOR_UNITARIO, CUSTO_UNITARIO) VALUES (?, ?, ?, ?, ?)",
+            [(sale_id, product_id, quantity, value, None if is_open else round(value * 0.6, 2))
+             for product_id, quantity, value in items]
+        )
+
+def _insert_movements(cursor, rng, count, item_ids, op_ids, days):
+    """Histórico de MOVIMENTO com os mesmos tipos gravados pela aplicação."""
+    movement_types = ['Entrada por Nota', 'Saída por OP', 'Entrada por OP', 'Saída por Venda', 'Entrada Manual']
+    batch = []
+    for _ in range(count):
+        movement_type = rng.choice(movement_types)
+        op_id = rng.choice(op_ids) if op_ids and movement_type.endswith('por OP') else None
+        quantity = round(rng.uniform(0.1, 100), 3)
+        if movement_type == 'Saída por Venda':
+            quantity = -quantity
+        batch.append((rng.choice(item_ids), movement_type, quantity, round(rng.uniform(0.5, 50), 2), op_id, _random_date(rng, days)))
+        if len(batch) >= 10000:
+            cursor.executemany(
+                "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, ?, ?)",
+                batch
+            )
+            batch = []
+    if batch:
+        cursor.executemany(
+            "INSERT INTO MOVIMENTO (ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO) VALUES (?, ?, ?, ?, ?, ?)",
+            batch
+        )
+
+def generate(db_path, **options):
+    """Cria o banco sintético em db_path (que não pode existir) e devolve as quantidades geradas."""
+    config = dict(DEFAULTS)
+    config.update({key: value for key, value in options.items() if value is not None})
+    if os.path.exists(db_path):
+        raise FileExistsError(f"O arquivo {db_path} já existe.")
+    if config["levels"] < 1:
+        raise ValueError("É preciso ao menos um nível de composição.")
+
+    os.environ["MINISIS_DB_PATH"] = db_path
+    from app.database.db import get_db_manager
+    from app.reports.aggregates import rebuild_aggregates
+    db_manager = get_db_manager()
+    if os.path.abspath(db_manager.db_path) != os.path.abspath(db_path):
+        raise RuntimeError("O DatabaseManager já foi inicializado com outro banco.")
+
+    rng = random.Random(config["seed"])
+    conn = db_manager.get_connection()
+    with conn:
+        cursor = conn.cursor()
+        unit_ids = _insert_units(cursor, config["units"])
+        supplier_ids = _insert_suppliers(cursor, config["suppliers"])
+
+        # Estoque alto nos componentes para que as OPs de benchmark possam ser finalizadas
+        component_stock = 10 ** 9
+        materials = _insert_items(cursor, rng, "INS", "Insumo", config["materials"], unit_ids, supplier_ids, component_stock)
+        levels = [materials]
+        for level in range(1, config["levels"]):
+            levels.append(_insert_items(cursor, rng, f"INT{level}-", "Ambos", config["intermediates"], unit_ids, None, component_stock))
+        products = _insert_items(cursor, rng, "PRD", "Produto", config["products"], unit_ids, None, component_stock)
+        levels.append(products)
+        composition_count = _insert_compositions(cursor, rng, levels, config["components"])
+
+        lines = config["lines_per_document"]
+        _insert_ops(cursor, rng, config["ops"], config["open_documents"], products, max(1, lines // 2), config["days"])
+        _insert_entries(cursor, rng, config["entries"], config["open_documents"], materials, supplier_ids, lines, config["days"])
+        _insert_sales(cursor, rng, config["sales"], config["open_documents"], products, lines, config["days"])
+
+        item_ids = [item_id for level in levels for item_id in level]
+        op_ids = [row[0] for row in cursor.execute("SELECT ID FROM ORDEMPRODUCAO WHERE STATUS = 'Concluída'")]
+        _insert_movements(cursor, rng, config["movements"], item_ids, op_ids, config["days"])
+        rebuild_aggregates(cursor)
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    config["compositions"] = composition_count
+    return config
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um banco sintético para os benchmarks.")
+    parser.add_argument("--db", required=True, help="Caminho do banco a criar.")
+    for key, value in DEFAULTS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=None, help=f"Padrão: {value}")
+    args = parser.parse_args(argv)
+
+    options = {key: getattr(args, key) for key in DEFAULTS}
+    db_dir = os.path.dirname(args.db)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    config = generate(args.db, **options)
+    print(f"Banco sintético gerado em {args.db}")
+    for key, value in config.items():
+        print(f"  {key}: {value}")
+
+if __name__ == "__main__":
+    main()
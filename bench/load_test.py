@@ -0,0 +1,336 @@
+# bench/load_test.py
+"""
+Teste de carga: simula várias estações do chão de fábrica usando o mesmo DADOS.DB.
+
+Uso (a partir da raiz do projeto):
+    python -m bench.load_test --clients 8 --duration 30               # via API local
+    python -m bench.load_test --clients 8 --duration 30 --mode direct
+    python -m bench.load_test --db bench/data/DADOS.DB --mix op:40,sale:30,entry:10,search:20
+
+Cada cliente é uma thread que sorteia operações segundo o --mix:
+    op      create_op + finalize_op
+    sale    create_sale + finalize_sale
+    entry   criação da nota com itens + finalize_entry
+    search  busca de itens por descrição
+No modo "api" os clientes falam HTTP com um ApiServer iniciado no próprio processo
+(pool de leitura + escritor único). No modo "direct" cada cliente abre sua própria
+conexão e chama os serviços diretamente, como várias instâncias da aplicação
+desktop apontando para o mesmo arquivo, o que expõe os erros "database is locked".
+O relatório (vazão, percentis de latência por operação, erros e bloqueios) é
+impresso e gravado em JSON em bench/results/.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from urllib.parse import quote
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from bench.run_bench import RESULTS_DIR, _git_commit, percentile
+
+DEFAULT_MIX = {"op": 30, "sale": 25, "entry": 15, "search": 30}
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition(":")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Operação desconhecida no mix: {name}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+class DirectClient:
+    """Cliente que chama os serviços com uma conexão própria."""
+
+    def __init__(self, catalog):
+        from app.database.db import get_db_manager
+        from app.item.service import ItemService
+        from app.production import order_operations
+        from app.sales.sale_service import SaleService
+        from app.stock.service import StockService
+        self.catalog = catalog
+        self.db_manager = get_db_manager()
+        self.order_operations = order_operations
+        self.item_service = ItemService()
+        self.sale_service = SaleService()
+        self.stock_service = StockService()
+        self.connection = None
+
+    def open(self):
+        self.connection = self.db_manager.open_connection()
+        self.db_manager.bind_thread_connection(self.connection)
+
+    def close(self):
+        self.db_manager.bind_thread_connection(None)
+        self.connection.close()
+
+    def op(self, rng, numero):
+        product_id, quantity = rng.choice(self.catalog["products"]), rng.randint(1, 5)
+        op_id = self.order_operations.create_op(numero, date.today().isoformat(), [{"id_produto": product_id, "quantidade": quantity}])
+        if op_id is None:
+            return False, "create_op falhou"
+        return self.order_operations.finalize_op(op_id, quantity)
+
+    def sale(self, rng, numero):
+        items = [{"id_produto": product_id, "quantidade": rng.randint(1, 5), "valor_unitario": 10.0}
+                 for product_id in rng.sample(self.catalog["products"], 3)]
+        response = self.sale_service.create_sale(date.today().isoformat(), numero, items)
+        if not response["success"]:
+            return False, response["message"]
+        response = self.sale_service.finalize_sale(response["data"])
+        return response["success"], response["message"]
+
+    def entry(self, rng, numero):
+        today = date.today().isoformat()
+        items = [{"id_insumo": material_id, "id_fornecedor": rng.choice(self.catalog["suppliers"]),
+                  "quantidade": rng.randint(1, 100), "valor_unitario": 2.5}
+                 for material_id in rng.sample(self.catalog["materials"], 3)]
+        response = self.stock_service.create_entry(today, today, numero, None)
+        if not response["success"]:
+            return False, response["message"]
+        entry_id = response["data"]
+        response = self.stock_service.update_entry(entry_id, today, today, numero, None, items)
+        if not response["success"]:
+            return False, response["message"]
+        response = self.stock_service.finalize_entry(entry_id)
+        return response["success"], response["message"]
+
+    def search(self, rng, numero):
+        response = self.item_service.search_items("DESCRICAO", rng.choice(self.catalog["terms"]))
+        return response["success"], response.get("message", "")
+
+class ApiClient:
+    """Cliente HTTP com conexão persistente (keep-alive) para o ApiServer."""
+
+    def __init__(self, catalog, port):
+        self.catalog = catalog
+        self.port = port
+        self.http = None
+
+    def open(self):
+        self.http = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+
+    def close(self):
+        self.http.close()
+
+    def _call(self, method, path, body=None):
+        self.http.request(method, path, body=json.dumps(body) if body is not None else None,
+                          headers={"Content-Type": "application/json"})
+        response = self.http.getresponse()
+        return json.loads(response.read())
+
+    def op(self, rng, numero):
+        product_id, quantity = rng.choice(self.catalog["products"]), rng.randint(1, 5)
+        response = self._call("POST", "/ops", {"numero": numero, "data_prevista": date.today().isoformat(),
+                                               "itens": [{"id_produto": product_id, "quantidade": quantity}]})
+        if not response["success"]:
+            return False, response["message"]
+        response = self._call("POST", f"/ops/{response['data']}/finalize", {"quantidade": quantity})
+        return response["success"], response["message"]
+
+    def sale(self, rng, numero):
+        items = [{"id_produto": product_id, "quantidade": rng.randint(1, 5), "valor_unitario": 10.0}
+                 for product_id in rng.sample(self.catalog["products"], 3)]
+        response = self._call("POST", "/sales", {"data_saida": date.today().isoformat(), "observacao": numero, "itens": items})
+        if not response["success"]:
+            return False, response["message"]
+        response = self._call("POST", f"/sales/{response['data']}/finalize", {})
+        return response["success"], response["message"]
+
+    def entry(self, rng, numero):
+        today = date.today().isoformat()
+        items = [{"id_insumo": material_id, "id_fornecedor": rng.choice(self.catalog["suppliers"]),
+                  "quantidade": rng.randint(1, 100), "valor_unitario": 2.5}
+                 for material_id in rng.sample(self.catalog["materials"], 3)]
+        response = self._call("POST", "/entries", {"data_entrada": today, "data_digitacao": today,
+                                                   "numero_nota": numero, "itens": items})
+        if not response["success"]:
+            return False, response["message"]
+        response = self._call("POST", f"/entries/{response['data']}/finalize", {})
+        return response["success"], response["message"]
+
+    def search(self, rng, numero):
+        term = rng.choice(self.catalog["terms"])
+        response = self._call("GET", f"/items?texto={quote(term)}")
+        return response["success"], response.get("message", "")
+
+def load_catalog(connection):
+    """Ids usados para montar as operações sorteadas."""
+    def ids(query):
+        return [row[0] for row in connection.execute(query)]
+    return {
+        "products": ids("SELECT ID FROM ITEM WHERE TIPO_ITEM = 'Produto'"),
+        "materials": ids("SELECT ID FROM ITEM WHERE TIPO_ITEM = 'Insumo'"),
+        "suppliers": ids("SELECT ID FROM FORNECEDOR"),
+        # Último trecho da descrição (ex.: "INS000123"), como um operador buscando um item específico
+        "terms": [row[0].split()[-1] for row in connection.execute("SELECT DESCRICAO FROM ITEM ORDER BY RANDOM() LIMIT 200")],
+    }
+
+def client_loop(index, client, mix, deadline, seed, samples, errors, lock):
+    rng = random.Random(seed + index)
+    names, weights = list(mix.keys()), list(mix.values())
+    local_samples = {name: [] for name in names}
+    local_errors = {name: [] for name in names}
+    client.open()
+    try:
+        counter = 0
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            counter += 1
+            start = time.perf_counter()
+            try:
+                success, message = getattr(client, name)(rng, f"LT{index}-{counter}")
+            except Exception as e:
+                success, message = False, str(e)
+            local_samples[name].append(time.perf_counter() - start)
+            if not success:
+                local_errors[name].append(message)
+    finally:
+        client.close()
+    with lock:
+        for name in names:
+            samples[name].extend(local_samples[name])
+            errors[name].extend(local_errors[name])
+
+def run_load(mode, clients, duration, mix, seed):
+    from app.database.db import get_db_manager
+    db_manager = get_db_manager()
+    catalog = load_catalog(db_manager.get_connection())
+    profiler = db_manager.profiler
+    if profiler:
+        profiler.reset()
+
+    server = loop = None
+    if mode == "api":
+        from app.api.server import ApiServer
+        server = ApiServer(port=0, readers=max(2, min(clients, 8)))
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(server.start())
+            started.set()
+            loop.run_forever()
+        threading.Thread(target=serve, daemon=True).start()
+        started.wait()
+    else:
+        # No modo direto também em WAL, para comparar as duas arquiteturas no mesmo modo de journal
+        db_manager.get_connection().execute("PRAGMA journal_mode = WAL")
+
+    samples = {name: [] for name in mix}
+    errors = {name: [] for name in mix}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = []
+    started_at = time.perf_counter()
+    for index in range(clients):
+        client = ApiClient(catalog, server.port) if mode == "api" else DirectClient(catalog)
+        thread = threading.Thread(target=client_loop, args=(index, client, mix, deadline, seed, samples, errors, lock))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    if server:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    operations = {}
+    for name in mix:
+        timings = sorted(samples[name])
+        lock_messages = sum(1 for message in errors[name] if "locked" in str(message).lower())
+        operations[name] = {
+            "count": len(timings),
+            "errors": len(errors[name]),
+            "locked_errors": lock_messages,
+            "throughput_per_s": round(len(timings) / elapsed, 2),
+            "p50_ms": round(percentile(timings, 50) * 1000, 3),
+            "p95_ms": round(percentile(timings, 95) * 1000, 3),
+            "p99_ms": round(percentile(timings, 99) * 1000, 3),
+            "max_ms": round(timings[-1] * 1000, 3) if timings else 0.0,
+            "sample_errors": sorted(set(str(message) for message in errors[name]))[:5],
+        }
+    total = sum(result["count"] for result in operations.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "total_operations": total,
+        "throughput_per_s": round(total / elapsed, 2),
+        # Comandos SQL que falharam por bloqueio, inclusive os que os repositórios tratam internamente
+        "sql_lock_errors": profiler.lock_errors if profiler else None,
+        "operations": operations,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga com clientes simultâneos.")
+    parser.add_argument("--mode", choices=["api", "direct"], default="api")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30, help="Duração em segundos.")
+    parser.add_argument("--mix", default=",".join(f"{k}:{v}" for k, v in DEFAULT_MIX.items()))
+    parser.add_argument("--db", help="Banco sintético já gerado (é copiado antes do teste).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: bench/results/load_<data>_<commit>.json).")
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix)
+    # O teste de carga conta os erros de bloqueio pelo profiler de SQL
+    os.environ.setdefault("MINISIS_SQL_INSTRUMENTATION", "1")
+
+    work_dir = tempfile.mkdtemp(prefix="minisis_load_")
+    db_path = os.path.join(work_dir, "DADOS.DB")
+    try:
+        if args.db:
+            shutil.copyfile(args.db, db_path)
+            os.environ["MINISIS_DB_PATH"] = db_path
+            dataset = {"source": os.path.abspath(args.db)}
+        else:
+            from bench.generate_data import generate
+            dataset = generate(db_path, seed=args.seed, ops=200, entries=200, sales=200, movements=20000)
+
+        result = run_load(args.mode, args.clients, args.duration, mix, args.seed)
+
+        from app.database.db import get_db_manager
+        get_db_manager().close_connection()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "mode": args.mode,
+        "clients": args.clients,
+        "duration_s": args.duration,
+        "mix": mix,
+        "dataset": dataset,
+        **result,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"load_{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+
+    print(f"Modo {args.mode}, {args.clients} clientes, {result['elapsed_s']} s: "
+          f"{result['total_operations']} operações ({result['throughput_per_s']}/s), "
+          f"bloqueios SQL: {result['sql_lock_errors']}")
+    print(f"{'operação':<8} {'qtd':>7} {'erros':>6} {'locked':>7} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, op in result["operations"].items():
+        print(f"{name:<8} {op['count']:>7} {op['errors']:>6} {op['locked_errors']:>7} {op['throughput_per_s']:>8.2f} "
+              f"{op['p50_ms']:>9.2f} {op['p95_ms']:>9.2f} {op['p99_ms']:>9.2f}")
+    print(f"\nResultados gravados em {output}")
+
+if __name__ == "__main__":
+    main()
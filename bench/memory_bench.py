@@ -0,0 +1,128 @@
+# bench/memory_bench.py
+"""
+Compara a memória e o tempo para carregar uma listagem grande em cada representação
+de linha: tupla crua, sqlite3.Row, dict(row) (o formato usado antes) e Record.
+
+Uso (a partir da raiz do projeto):
+    python -m bench.memory_bench                      # gera 1.000.000 de MOVIMENTOs num banco temporário
+    python -m bench.memory_bench --db bench/data/DADOS.DB --output memoria.json
+
+A memória é a retida pela lista inteira de linhas (tracemalloc), medida numa
+carga separada da de tempo para que o rastreamento não distorça os tempos.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.database.records import fetch_records
+
+QUERY = """
+    SELECT ID, ID_ITEM, TIPO_MOVIMENTO, QUANTIDADE, VALOR_UNITARIO, ID_ORDEM_PRODUCAO, DATA_MOVIMENTO
+    FROM MOVIMENTO
+"""
+
+def _load_tuples(connection):
+    connection.row_factory = None
+    return connection.execute(QUERY).fetchall()
+
+def _load_rows(connection):
+    connection.row_factory = sqlite3.Row
+    return connection.execute(QUERY).fetchall()
+
+def _load_dicts(connection):
+    connection.row_factory = sqlite3.Row
+    return [dict(row) for row in connection.execute(QUERY).fetchall()]
+
+def _load_records(connection):
+    connection.row_factory = sqlite3.Row
+    return fetch_records(connection.execute(QUERY))
+
+LOADERS = {
+    "tuple": _load_tuples,
+    "sqlite3.Row": _load_rows,
+    "dict(row)": _load_dicts,
+    "Record": _load_records,
+}
+
+def measure(connection, loader):
+    gc.collect()
+    start = time.perf_counter()
+    rows = loader(connection)
+    elapsed = time.perf_counter() - start
+    count = len(rows)
+    del rows
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    rows = loader(connection)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del rows
+    return {
+        "rows": count,
+        "seconds": round(elapsed, 3),
+        "mb": round(retained / 1024 ** 2, 1),
+        "bytes_per_row": round(retained / count, 1) if count else 0.0,
+    }
+
+def run(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        return {name: measure(connection, loader) for name, loader in LOADERS.items()}
+    finally:
+        connection.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de memória das representações de linha.")
+    parser.add_argument("--db", help="Banco já gerado; se omitido, gera um banco temporário.")
+    parser.add_argument("--movements", type=int, default=1000000, help="MOVIMENTOs do banco gerado.")
+    parser.add_argument("--output", help="Arquivo JSON para gravar o resultado.")
+    args = parser.parse_args(argv)
+
+    work_dir = None
+    try:
+        if args.db:
+            db_path = args.db
+        else:
+            from bench.generate_data import generate
+            work_dir = tempfile.mkdtemp(prefix="minisis_memory_")
+            db_path = os.path.join(work_dir, "DADOS.DB")
+            generate(db_path, movements=args.movements, ops=200, entries=100, sales=100, open_documents=10)
+            from app.database.db import get_db_manager
+            get_db_manager().close_connection()
+        results = run(db_path)
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'representação':<14} {'linhas':>10} {'segundos':>10} {'MB':>10} {'bytes/linha':>12}")
+    for name, result in results.items():
+        print(f"{name:<14} {result['rows']:>10} {result['seconds']:>10.3f} {result['mb']:>10.1f} {result['bytes_per_row']:>12.1f}")
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.output}")
+
+if __name__ == "__main__":
+    main()
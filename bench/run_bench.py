@@ -0,0 +1,201 @@
+# bench/run_bench.py
+"""
+Mede os caminhos críticos da aplicação sem interface gráfica.
+
+Uso (a partir da raiz do projeto):
+    python -m bench.run_bench                         # gera um banco sintético temporário
+    python -m bench.run_bench --db bench/data/DADOS.DB --iterations 100
+    python -m bench.run_bench --compare bench/results/anterior.json
+
+O banco informado em --db é copiado para uma pasta temporária antes da medição,
+já que as finalizações e exclusões alteram os dados. O resultado (p50/p95 em ms e
+linhas/s de cada operação) é gravado em JSON em bench/results/, identificado pelo
+commit atual, para comparar execuções entre commits.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "bench", "results")
+
+def percentile(sorted_values, pct):
+    """Percentil por interpolação linear sobre uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def measure(operation, arguments):
+    """
+    Executa operation(argumento) para cada argumento. operation devolve a quantidade
+    de linhas processadas, usada no cálculo de linhas/s.
+    """
+    timings = []
+    total_rows = 0
+    for argument in arguments:
+        start = time.perf_counter()
+        rows = operation(argument)
+        timings.append(time.perf_counter() - start)
+        total_rows += rows or 0
+    timings.sort()
+    total_time = sum(timings)
+    return {
+        "iterations": len(timings),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(total_time / len(timings) * 1000, 3) if timings else 0.0,
+        "rows": total_rows,
+        "rows_per_s": round(total_rows / total_time, 1) if total_time > 0 else 0.0,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+def run(iterations):
+    """Mede as operações no banco apontado por MINISIS_DB_PATH."""
+    from app.database.db import get_db_manager
+    from app.item.item_repository import ItemRepository
+    from app.production import order_operations
+    from app.sales.sale_repository import SaleRepository
+    from app.stock.stock_repository import StockRepository
+
+    conn = get_db_manager().get_connection()
+    item_repository = ItemRepository()
+    stock_repository = StockRepository()
+    sale_repository = SaleRepository()
+
+    def ids(query):
+        return [row[0] for row in conn.execute(query + f" LIMIT {iterations}")]
+
+    open_ops = ids("SELECT ID FROM ORDEMPRODUCAO WHERE STATUS = 'Em Andamento' ORDER BY ID")
+    open_entries = ids("SELECT ID FROM ENTRADANOTA WHERE STATUS = 'Em Aberto' ORDER BY ID")
+    open_sales = ids("SELECT ID FROM SAIDA WHERE STATUS = 'Em Aberto' ORDER BY ID")
+    any_ops = ids("SELECT ID FROM ORDEMPRODUCAO ORDER BY RANDOM()")
+    search_terms = [row[0][:6] for row in conn.execute(f"SELECT DESCRICAO FROM ITEM ORDER BY RANDOM() LIMIT {iterations}")]
+
+    def count_op_lines(op_id):
+        return conn.execute("SELECT COUNT(*) FROM ORDEMPRODUCAO_ITENS WHERE ID_ORDEM_PRODUCAO = ?", (op_id,)).fetchone()[0]
+
+    def finalize_op(op_id):
+        success, message = order_operations.finalize_op(op_id, 1)
+        if not success:
+            raise RuntimeError(f"finalize_op({op_id}) falhou: {message}")
+        return count_op_lines(op_id)
+
+    def finalize_entry(entry_id):
+        success, _ = stock_repository.finalize_entry(entry_id)
+        if not success:
+            raise RuntimeError(f"finalize_entry({entry_id}) falhou")
+        return conn.execute("SELECT COUNT(*) FROM ENTRADANOTA_ITENS WHERE ID_ENTRADA = ?", (entry_id,)).fetchone()[0]
+
+    def finalize_sale(sale_id):
+        if not sale_repository.finalize_sale(sale_id):
+            raise RuntimeError(f"finalize_sale({sale_id}) falhou")
+        return conn.execute("SELECT COUNT(*) FROM SAIDA_ITENS WHERE ID_SAIDA = ?", (sale_id,)).fetchone()[0]
+
+    def get_op_details(op_id):
+        return len(order_operations.get_op_details(op_id)["items"])
+
+    def delete_op(op_id):
+        rows = count_op_lines(op_id)
+        success, message = order_operations.delete_op(op_id)
+        if not success:
+            raise RuntimeError(f"delete_op({op_id}) falhou: {message}")
+        return rows
+
+    # As OPs finalizadas são as mesmas excluídas depois, exercitando o estorno completo
+    return {
+        "finalize_op": measure(finalize_op, open_ops),
+        "finalize_entry": measure(finalize_entry, open_entries),
+        "finalize_sale": measure(finalize_sale, open_sales),
+        "list_ops": measure(lambda _: len(order_operations.list_ops()), range(iterations)),
+        "list_ops_search": measure(lambda term: len(order_operations.list_ops(term, "numero")),
+                                   [f"OP-{n:03d}" for n in range(iterations)]),
+        "item_search": measure(lambda term: len(item_repository.search("DESCRICAO", term)), search_terms),
+        "get_op_details": measure(get_op_details, any_ops),
+        "delete_op": measure(delete_op, open_ops),
+    }
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    print(f"\nComparação com {baseline.get('commit')} ({os.path.basename(baseline_path)}):")
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["p50_ms"]:
+            continue
+        delta = (result["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] * 100
+        print(f"  {name:<18} p50 {previous['p50_ms']:>10.3f} -> {result['p50_ms']:>10.3f} ms ({delta:+.1f}%)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos.")
+    parser.add_argument("--db", help="Banco sintético já gerado (é copiado antes da medição).")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42, help="Semente do banco gerado quando --db não é informado.")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: bench/results/<data>_<commit>.json).")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar.")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="minisis_bench_")
+    db_path = os.path.join(work_dir, "DADOS.DB")
+    try:
+        if args.db:
+            shutil.copyfile(args.db, db_path)
+            os.environ["MINISIS_DB_PATH"] = db_path
+            dataset = {"source": os.path.abspath(args.db)}
+        else:
+            from bench.generate_data import generate
+            dataset = generate(db_path, seed=args.seed, open_documents=args.iterations)
+
+        results = run(args.iterations)
+
+        from app.database.db import get_db_manager
+        get_db_manager().close_connection()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "iterations": args.iterations,
+        "dataset": dataset,
+        "results": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+
+    print(f"{'operação':<18} {'p50 ms':>10} {'p95 ms':>10} {'linhas/s':>12}")
+    for name, result in results.items():
+        print(f"{name:<18} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['rows_per_s']:>12.1f}")
+    print(f"\nResultados gravados em {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench/scheduler_bench.py
+"""
+Mede a programação da produção (app/production_line/scheduler.py) com dados sintéticos,
+sem banco: OPs com um a três produtos, linhas com calendários e taxas variados e
+insumos com saldo para parte das OPs.
+
+Uso (a partir da raiz do projeto):
+    python -m bench.scheduler_bench
+    python -m bench.scheduler_bench --orders 10000 --lines 60 --products 400
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.production_line.scheduler import LineCalendar, schedule
+
+def generate(orders, lines, products, materials, seed):
+    rng = random.Random(seed)
+    calendars = [("12345", 8), ("12345", 16), ("123456", 8), ("1234567", 24)]
+    line_list = []
+    for line_id in range(1, lines + 1):
+        weekdays, hours = rng.choice(calendars)
+        made = rng.sample(range(1, products + 1), max(1, products // lines * 3))
+        line_list.append({"id": line_id, "calendar": LineCalendar(hours, weekdays),
+                          "rates": {product_id: rng.uniform(5, 50) for product_id in made}})
+
+    today = date.today()
+    order_list = []
+    for order_id in range(1, orders + 1):
+        # Os produtos de uma OP saem de uma mesma linha (como nas OPs geradas a partir de uma linha)
+        made = list(rng.choice(line_list)["rates"])
+        items = [(product_id, rng.randint(10, 500)) for product_id in rng.sample(made, min(len(made), rng.randint(1, 3)))]
+        order_materials = Counter()
+        for product_id, quantity in items:
+            for material_id in (product_id % materials + 10_000, (product_id * 7) % materials + 10_000):
+                order_materials[material_id] += quantity * 0.5
+        due = today + timedelta(days=rng.randint(1, 120)) if rng.random() < 0.9 else None
+        order_list.append({"id": order_id, "due": due.isoformat() if due else None,
+                           "created": f"{today.isoformat()} 00:00:{order_id % 60:02d}",
+                           "line_id": None, "items": items, "materials": dict(order_materials)})
+    stock = {material_id: rng.uniform(0, orders * 1500 / materials) for material_id in range(10_000, 10_000 + materials)}
+    return order_list, line_list, stock
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da programação da produção.")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--materials", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    orders, lines, stock = generate(args.orders, args.lines, args.products, args.materials, args.seed)
+    start = time.perf_counter()
+    results = schedule(orders, lines, stock, datetime.now().replace(second=0, microsecond=0))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.orders} OPs em {args.lines} linhas: {elapsed:.2f} s ({args.orders / elapsed:,.0f} OPs/s)")
+    for status, count in sorted(Counter(result["status"] for result in results).items()):
+        print(f"  {status:<12} {count}")
+
+if __name__ == "__main__":
+    main()
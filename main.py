@@ -39,10 +39,19 @@ class MainWindow(QMainWindow):
         from app.stock.ui_entry_search_window import EntrySearchWindow
         self._add_menu_action(movement_menu, "Entrada de Insumos", "stock_entry_window", EntrySearchWindow)
 
+        from app.stock.ui_inventory_window import InventoryWindow
+        self._add_menu_action(movement_menu, "Inventário Físico", "inventory_window", InventoryWindow)
+
         movement_menu.addSeparator()
 
         from app.production_line.ui_line_list_window import LineListWindow
         self._add_menu_action(movement_menu, "Linhas de Produção", "line_list_window", LineListWindow)
+
+        from app.production_line.ui_schedule_window import ScheduleWindow
+        self._add_menu_action(movement_menu, "Programação da Produção", "schedule_window", ScheduleWindow)
+
+        from app.simulation.ui_simulation_window import SimulationWindow
+        self._add_menu_action(movement_menu, "Simulação de Produção", "simulation_window", SimulationWindow)
         
         from app.production.ui_op_search_window import OPSearchWindow
         self._add_menu_action(movement_menu, "Ordem de Produção", "op_search_window", OPSearchWindow)
@@ -52,9 +61,27 @@ class MainWindow(QMainWindow):
         from app.sales.ui_sale_search_window import SaleSearchWindow
         self._add_menu_action(movement_menu, "Saída de Produtos", "sale_search_window", SaleSearchWindow)
 
+        from app.lot.ui_trace_window import TraceWindow
+        self._add_menu_action(movement_menu, "Rastreabilidade de Lotes", "trace_window", TraceWindow)
+
+        # Menu Relatórios
+        reports_menu = menu_bar.addMenu("&Relatórios")
+
+        from app.reports.ui_report_window import ReportWindow
+        self._add_menu_action(reports_menu, "Relatórios Gerenciais", "report_window", ReportWindow)
+
         # Menu Configurações
         settings_menu = menu_bar.addMenu("&Configurações")
 
+        from app.diagnostics.ui_diagnostics_window import DiagnosticsWindow
+        self._add_menu_action(settings_menu, "Diagnóstico de Desempenho", "diagnostics_window", DiagnosticsWindow)
+
+        from app.archive.ui_archive_window import ArchiveWindow
+        self._add_menu_action(settings_menu, "Arquivar Histórico", "archive_window", ArchiveWindow)
+
+        from app.closing.ui_closing_window import ClosingWindow
+        self._add_menu_action(settings_menu, "Fechamento de Período", "closing_window", ClosingWindow)
+
     def _add_menu_action(self, menu, text, window_name, window_class):
         action = QAction(text, self)
         action.triggered.connect(partial(self._open_window, window_name, window_class))
@@ -87,7 +114,19 @@ def main():
         logging.info("Application starting up.")
         from app.database.db import get_db_manager
         get_db_manager()
+        from app.database.backup import BackupScheduler
+        backup_scheduler = BackupScheduler.from_environment()
+        if backup_scheduler:
+            backup_scheduler.start()
+        from app.item.classification import ClassificationScheduler
+        classification_scheduler = ClassificationScheduler.from_environment()
+        if classification_scheduler:
+            classification_scheduler.start()
         app = QApplication(sys.argv)
+        if backup_scheduler:
+            app.aboutToQuit.connect(backup_scheduler.stop)
+        if classification_scheduler:
+            app.aboutToQuit.connect(classification_scheduler.stop)
         main_window = MainWindow()
         main_window.show()
         sys.exit(app.exec())